@@ -4,7 +4,7 @@ import os
 import logging
 import json
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, List, Optional, Sequence
 
 import pandas as pd
 import pyarrow as pa
@@ -202,8 +202,72 @@ def upload_dataframe(df: pd.DataFrame, path: str) -> str:
     return path
 
 
-def download_dataframe(path: str) -> pd.DataFrame:
-    """Download a dataframe from the Arrow Flight service with debug logs."""
+def _table_to_ipc_bytes(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def query_table(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> pa.Table:
+    """Return only the requested columns/rows of the table at ``path``.
+
+    The projection, filters (``{"column", "op", "value"}`` dicts combined with
+    AND) and ``limit``/``offset`` are evaluated by the Flight server so only the
+    selected slice crosses the wire.  If the Flight server is unavailable the
+    full table is downloaded through the usual MinIO fallbacks and the query
+    is applied locally.
+    """
+    # Imported here so that loading the client does not require the query
+    # module (callers that stub this package only provide flight_registry).
+    from .flight_query import FlightQuery
+
+    query = FlightQuery(
+        path=path,
+        columns=list(columns) if columns is not None else None,
+        filters=list(filters or []),
+        limit=limit,
+        offset=offset,
+    )
+    client = _get_client()
+    try:
+        table = client.do_get(flight.Ticket(query.to_ticket())).read_all()
+        logger.info(
+            "✔️ flight query %s columns=%s filters=%d rows=%d",
+            path,
+            query.columns,
+            len(query.filters),
+            table.num_rows,
+        )
+        return table
+    except Exception as exc:
+        logger.error("❌ flight query failed for %s: %s", path, exc)
+    data = download_table_bytes(path)
+    table = ipc.open_file(pa.BufferReader(data)).read_all()
+    return query.apply(table)
+
+
+def download_dataframe(
+    path: str,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> pd.DataFrame:
+    """Download a dataframe from the Arrow Flight service with debug logs.
+
+    Passing ``columns``, ``filters``, ``limit`` or ``offset`` pushes the
+    selection down to the Flight server (see :func:`query_table`).
+    """
+    if columns is not None or filters or limit is not None or offset:
+        return query_table(path, columns, filters, limit, offset).to_pandas()
     logger.info("⬇️ downloading via flight: %s", path)
     client = _get_client()
     descriptor = flight.FlightDescriptor.for_path(path)
@@ -340,8 +404,21 @@ def download_dataframe(path: str) -> pd.DataFrame:
         raise
 
 
-def download_table_bytes(path: str) -> bytes:
-    """Return the Arrow IPC bytes for the table at the given flight path."""
+def download_table_bytes(
+    path: str,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> bytes:
+    """Return the Arrow IPC bytes for the table at the given flight path.
+
+    Passing ``columns``, ``filters``, ``limit`` or ``offset`` pushes the
+    selection down to the Flight server (see :func:`query_table`).
+    """
+    if columns is not None or filters or limit is not None or offset:
+        return _table_to_ipc_bytes(query_table(path, columns, filters, limit, offset))
     logger.info("⬇️ downloading arrow bytes via flight: %s", path)
     client = _get_client()
     descriptor = flight.FlightDescriptor.for_path(path)
@@ -452,3 +529,12 @@ def flight_table_exists(path: str) -> bool:
         return True
     except Exception:
         return False
+
+
+def get_flight_cache_stats() -> Dict[str, object]:
+    """Return hit/miss/eviction counters reported by the Flight server cache."""
+    client = _get_client()
+    results = list(client.do_action(flight.Action("cache_stats", b"")))
+    if not results:
+        return {}
+    return json.loads(results[0].body.to_pybytes().decode())
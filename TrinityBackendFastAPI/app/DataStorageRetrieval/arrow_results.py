@@ -0,0 +1,144 @@
+"""Arrow IPC persistence of atom results.
+
+Groupby, concat and merge used to write their results as CSV, so every
+downstream atom re-parsed the text with type inference and dates, integer
+columns with nulls and categorical codes drifted from step to step.
+:func:`save_arrow_result` writes the result as an Arrow IPC file instead:
+
+* the schema is stored with the data, so chained pipelines read back exactly
+  the dtypes that were written;
+* buffers can be ``zstd`` or ``lz4`` compressed (``ARROW_RESULT_COMPRESSION``,
+  uncompressed by default because the frontend reads some results directly);
+* the object is registered in :mod:`flight_registry` under its object name,
+  so the Flight server can serve it without a separate upload;
+* the decoded table primes :mod:`dataset_cache`, so the next atom opening the
+  result does not even download it.
+
+CSV remains available through the atoms' export endpoints.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+from pathlib import PurePosixPath
+from typing import Any, Dict, Optional, Union
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from .dataset_cache import dataset_cache, table_from_pandas
+
+logger = logging.getLogger("trinity.arrow_results")
+
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.file"
+COMPRESSION_CODECS = ("zstd", "lz4")
+_EXPORT_SUFFIXES = (".csv", ".xlsx", ".xls")
+
+
+def result_compression() -> Optional[str]:
+    """Codec configured through ``ARROW_RESULT_COMPRESSION`` or ``None``."""
+    value = (os.getenv("ARROW_RESULT_COMPRESSION") or "").strip().lower()
+    if not value or value in {"none", "uncompressed"}:
+        return None
+    if value not in COMPRESSION_CODECS:
+        logger.warning("Unknown ARROW_RESULT_COMPRESSION %s, writing uncompressed", value)
+        return None
+    return value
+
+
+def arrow_result_name(object_name: str) -> str:
+    """Return ``object_name`` with an ``.arrow`` extension instead of an export one."""
+    path = PurePosixPath(object_name)
+    if path.suffix.lower() == ".arrow":
+        return object_name
+    if path.suffix.lower() in _EXPORT_SUFFIXES:
+        return str(path.with_suffix(".arrow"))
+    return f"{object_name}.arrow"
+
+
+def to_arrow_table(frame: Union[pd.DataFrame, pl.DataFrame, pa.Table]) -> pa.Table:
+    if isinstance(frame, pa.Table):
+        return frame
+    if isinstance(frame, pl.DataFrame):
+        return frame.to_arrow()
+    return table_from_pandas(frame)
+
+
+def encode_arrow_ipc(table: pa.Table, compression: Optional[str] = None) -> bytes:
+    """Serialise ``table`` as an Arrow IPC file, optionally compressing buffers."""
+    options = ipc.IpcWriteOptions(compression=compression) if compression else None
+    sink = pa.BufferOutputStream()
+    with ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def register_result(object_name: str, original_name: Optional[str] = None) -> None:
+    """Register ``object_name`` with the Flight registry under its own path."""
+    try:
+        from .flight_registry import set_ticket
+    except Exception as exc:  # pragma: no cover - registry optional in tooling
+        logger.warning("Flight registry unavailable for %s: %s", object_name, exc)
+        return
+    try:
+        set_ticket(object_name, object_name, object_name, original_name or PurePosixPath(object_name).name)
+    except Exception as exc:
+        logger.warning("Failed to register %s with the flight registry: %s", object_name, exc)
+
+
+def save_arrow_result(
+    client: Any,
+    bucket: str,
+    object_name: str,
+    frame: Union[pd.DataFrame, pl.DataFrame, pa.Table],
+    *,
+    compression: Optional[str] = None,
+    register: bool = True,
+) -> Dict[str, Any]:
+    """Write ``frame`` to ``bucket/object_name`` as Arrow IPC.
+
+    ``compression`` defaults to :func:`result_compression`.  Returns the
+    object name, the encoded payload (for callers that also cache it in
+    Redis), its size and the codec used.
+    """
+    table = to_arrow_table(frame)
+    codec = compression if compression is not None else result_compression()
+    payload = encode_arrow_ipc(table, codec)
+    result = client.put_object(
+        bucket,
+        object_name,
+        data=io.BytesIO(payload),
+        length=len(payload),
+        content_type=ARROW_CONTENT_TYPE,
+    )
+    dataset_cache.prime(bucket, object_name, getattr(result, "etag", None), table)
+    if register:
+        register_result(object_name)
+    logger.info(
+        "💾 saved %s as arrow (%d rows, %d bytes, compression=%s)",
+        object_name,
+        table.num_rows,
+        len(payload),
+        codec or "none",
+    )
+    return {
+        "object_name": object_name,
+        "payload": payload,
+        "size": len(payload),
+        "compression": codec,
+        "rows": table.num_rows,
+    }
+
+
+__all__ = [
+    "ARROW_CONTENT_TYPE",
+    "arrow_result_name",
+    "encode_arrow_ipc",
+    "register_result",
+    "result_compression",
+    "save_arrow_result",
+    "to_arrow_table",
+]
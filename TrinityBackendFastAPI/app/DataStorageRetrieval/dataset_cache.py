@@ -0,0 +1,304 @@
+"""Shared in-process cache of decoded datasets for the feature atoms.
+
+Groupby, concat, correlation, clustering, pivot, select-models and
+build-model all read the same saved dataframes from MinIO.  Each of them used
+to download and re-parse the Arrow/CSV bytes on every request; opening five
+atoms on one file parsed it five times.
+
+:func:`load_table` is the single loader they share now.  Decoded tables are
+kept in a byte-budgeted :class:`TableCache` keyed by ``bucket/object`` plus the
+object's ETag, so an overwritten object is re-read on its next access and the
+superseded version is dropped.  The ETag comes from a ``stat_object`` call,
+which costs a HEAD request instead of a full download.  Concurrent misses on
+the same version are coalesced through :class:`SingleFlight`.
+
+The cache stores ``pa.Table`` objects:
+
+* :func:`load_polars` wraps the cached buffers without copying;
+* :func:`load_pandas` returns a fresh, writable ``pd.DataFrame`` because the
+  atoms mutate their frames in place.  Read-only callers may pass
+  ``zero_copy=True`` to share the numeric buffers instead.
+
+Hits and misses are counted per feature and exposed through
+:func:`dataset_cache_stats` (``GET /api/health/dataset-cache``).
+
+Configuration:
+
+* ``DATASET_CACHE_MAX_BYTES`` - memory budget, defaults to 1 GiB;
+  ``0`` disables the budget.
+* ``DATASET_CACHE_ENABLED`` - set to ``0`` to always read from MinIO.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from .env_config import env_bool, env_int
+from .table_cache import SingleFlight, TableCache
+
+logger = logging.getLogger("trinity.dataset_cache")
+
+DEFAULT_MAX_BYTES = 1024**3
+
+
+class UnsupportedDatasetFormat(ValueError):
+    """Raised when an object has an extension the loader cannot decode."""
+
+
+@dataclass
+class FeatureCacheStats:
+    """Per-feature counters of :class:`DatasetCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    decoded_bytes: int = 0
+    load_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        total = self.hits + self.misses
+        data["hit_rate"] = self.hits / total if total else None
+        data["load_seconds"] = round(self.load_seconds, 6)
+        return data
+
+
+def table_from_pandas(frame: pd.DataFrame) -> pa.Table:
+    """Convert ``frame`` to Arrow, stringifying object columns Arrow cannot type."""
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Columns mixing numbers and strings (common in CSV/Excel uploads)
+        # cannot be typed by Arrow; keep them as strings like pandas shows them.
+        frame = frame.copy()
+        for column in frame.columns:
+            if frame[column].dtype == object:
+                series = frame[column]
+                frame[column] = series.where(series.isna(), series.astype(str))
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def decode_table(object_name: str, payload: bytes) -> pa.Table:
+    """Decode the raw bytes of ``object_name`` into an Arrow table.
+
+    CSV and Excel files are parsed with pandas so column dtypes match what the
+    atoms got from ``pd.read_csv`` / ``pd.read_excel`` before.
+    """
+    name = object_name.lower()
+    if name.endswith((".arrow", ".feather")):
+        return ipc.open_file(pa.BufferReader(payload)).read_all()
+    if name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(pa.BufferReader(payload))
+    if name.endswith(".csv"):
+        return table_from_pandas(pd.read_csv(io.BytesIO(payload)))
+    if name.endswith((".xls", ".xlsx")):
+        return table_from_pandas(pd.read_excel(io.BytesIO(payload)))
+    raise UnsupportedDatasetFormat(f"Unsupported file type for object '{object_name}'")
+
+
+def _normalise_etag(etag: Optional[str]) -> str:
+    return str(etag or "").strip('"')
+
+
+def _read_object(client: Any, bucket: str, object_name: str) -> bytes:
+    response = client.get_object(bucket, object_name)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+class DatasetCache:
+    """ETag-versioned cache of decoded tables shared by all feature atoms."""
+
+    def __init__(self, max_bytes: Optional[int] = None, enabled: Optional[bool] = None):
+        if max_bytes is None:
+            max_bytes = env_int("DATASET_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        if enabled is None:
+            enabled = env_bool("DATASET_CACHE_ENABLED", True)
+        self.enabled = enabled
+        self._tables = TableCache(max_bytes=max_bytes, policy="lru")
+        self._loads = SingleFlight()
+        self._lock = threading.Lock()
+        self._versions: Dict[str, str] = {}
+        self._features: Dict[str, FeatureCacheStats] = {}
+
+    def _feature(self, feature: str) -> FeatureCacheStats:
+        stats = self._features.get(feature)
+        if stats is None:
+            stats = self._features[feature] = FeatureCacheStats()
+        return stats
+
+    def load(self, client: Any, bucket: str, object_name: str, feature: str = "default") -> pa.Table:
+        """Return the decoded table of ``bucket/object_name``.
+
+        Errors raised by the MinIO client (``S3Error`` for missing objects)
+        propagate unchanged so callers keep their existing error handling.
+        """
+        path = f"{bucket}/{object_name}"
+        if not self.enabled:
+            return decode_table(object_name, _read_object(client, bucket, object_name))
+
+        etag = _normalise_etag(client.stat_object(bucket, object_name).etag)
+        key = f"{path}@{etag}"
+        table = self._tables.get(key)
+        if table is not None:
+            with self._lock:
+                self._feature(feature).hits += 1
+            return table
+
+        def _load() -> pa.Table:
+            started = time.perf_counter()
+            loaded = decode_table(object_name, _read_object(client, bucket, object_name))
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._feature(feature)
+                stats.decoded_bytes += int(loaded.nbytes)
+                stats.load_seconds += elapsed
+                previous = self._versions.get(path)
+                self._versions[path] = key
+            if previous and previous != key:
+                self._tables.pop(previous)
+            self._tables.put(key, loaded)
+            logger.info(
+                "📦 decoded %s for %s (%d rows, %d bytes) in %.3fs",
+                path,
+                feature,
+                loaded.num_rows,
+                loaded.nbytes,
+                elapsed,
+            )
+            return loaded
+
+        with self._lock:
+            self._feature(feature).misses += 1
+        return self._loads.do(key, _load)
+
+    def prime(self, bucket: str, object_name: str, etag: str, table: pa.Table) -> None:
+        """Cache ``table`` as version ``etag`` of an object that was just written."""
+        etag = _normalise_etag(etag)
+        if not self.enabled or not etag:
+            return
+        path = f"{bucket}/{object_name}"
+        key = f"{path}@{etag}"
+        with self._lock:
+            previous = self._versions.get(path)
+            self._versions[path] = key
+        if previous and previous != key:
+            self._tables.pop(previous)
+        self._tables.put(key, table)
+
+    def version(self, bucket: str, object_name: str) -> Optional[str]:
+        """ETag of the version of ``bucket/object_name`` loaded last, if any."""
+        with self._lock:
+            key = self._versions.get(f"{bucket}/{object_name}")
+        return key.rsplit("@", 1)[1] if key else None
+
+    def invalidate(self, bucket: str, object_name: str) -> None:
+        with self._lock:
+            key = self._versions.pop(f"{bucket}/{object_name}", None)
+        if key:
+            self._tables.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+            self._features.clear()
+        self._tables.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            features = {name: stats.to_dict() for name, stats in sorted(self._features.items())}
+        return {
+            "enabled": self.enabled,
+            "tables": self._tables.stats(),
+            "single_flight": self._loads.stats(),
+            "features": features,
+        }
+
+
+dataset_cache = DatasetCache()
+
+
+def load_table(client: Any, bucket: str, object_name: str, *, feature: str = "default") -> pa.Table:
+    """Load ``bucket/object_name`` through the shared :data:`dataset_cache`."""
+    return dataset_cache.load(client, bucket, object_name, feature)
+
+
+def load_pandas(
+    client: Any,
+    bucket: str,
+    object_name: str,
+    *,
+    feature: str = "default",
+    columns: Optional[Sequence[str]] = None,
+    zero_copy: bool = False,
+) -> pd.DataFrame:
+    """Return the cached dataset as a pandas frame.
+
+    With ``zero_copy=True`` numeric columns without nulls share the cached
+    Arrow buffers and are read-only; only use it for frames that are not
+    modified in place.
+    """
+    table = load_table(client, bucket, object_name, feature=feature)
+    if columns is not None:
+        table = table.select(list(columns))
+    if zero_copy:
+        return table.to_pandas(split_blocks=True)
+    return table.to_pandas()
+
+
+def load_polars(
+    client: Any,
+    bucket: str,
+    object_name: str,
+    *,
+    feature: str = "default",
+    columns: Optional[Sequence[str]] = None,
+) -> pl.DataFrame:
+    """Return the cached dataset as a polars frame backed by the cached buffers."""
+    table = load_table(client, bucket, object_name, feature=feature)
+    if columns is not None:
+        table = table.select(list(columns))
+    return pl.from_arrow(table)
+
+
+def dataset_version(bucket: str, object_name: str) -> Optional[str]:
+    """ETag of the cached version of an object; ``None`` when it is not cached."""
+    return dataset_cache.version(bucket, object_name)
+
+
+def invalidate_dataset(bucket: str, object_name: str) -> None:
+    """Drop the cached version of an object, e.g. right after overwriting it."""
+    dataset_cache.invalidate(bucket, object_name)
+
+
+def dataset_cache_stats() -> Dict[str, object]:
+    return dataset_cache.stats()
+
+
+__all__ = [
+    "DatasetCache",
+    "FeatureCacheStats",
+    "UnsupportedDatasetFormat",
+    "dataset_cache",
+    "dataset_cache_stats",
+    "dataset_version",
+    "decode_table",
+    "invalidate_dataset",
+    "load_pandas",
+    "load_polars",
+    "load_table",
+    "table_from_pandas",
+]
@@ -0,0 +1,119 @@
+"""Environment settings shared by the caches and worker pools.
+
+Every cache, store and pool of the backend is sized from an environment
+variable read when it is first used:
+
+* :func:`env_int` - integer settings; a blank value means the default and an
+  unparseable one falls back to it with a warning.  By convention ``0`` turns
+  the cache or pool off;
+* :func:`env_bool` - ``1`` / ``true`` / ``yes`` / ``on`` (any case) are true;
+* :func:`pool_workers` - worker count of a process or thread pool, defaulting
+  to the CPU count capped at :data:`DEFAULT_POOL_CAP`; ``0`` means the work
+  runs in-process;
+* :class:`ProcessPool` - a module-level ``ProcessPoolExecutor`` sized by
+  :func:`pool_workers`, started on first use and stopped by
+  :func:`shutdown_pools` when the API shuts down.
+
+The module only uses the standard library so that the Flight server, which
+runs with ``app/`` on ``sys.path``, can import it as well as the API.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CAP = 8
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %s", name, value)
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in {"1", "true", "yes", "on"}
+
+
+def pool_workers(name: str, default: Optional[int] = None) -> int:
+    """Pool size from ``name``; ``0`` (never negative) runs the work in-process."""
+    if default is None:
+        default = min(os.cpu_count() or 1, DEFAULT_POOL_CAP)
+    return max(env_int(name, default), 0)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class ProcessPool:
+    """Process pool of ``pool_workers(env_name)`` workers, created on first use.
+
+    ``initializer`` runs once in every worker; with ``prewarm`` every worker
+    is started as soon as the pool is created instead of on its first task.
+    """
+
+    _instances: "weakref.WeakSet[ProcessPool]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        env_name: str,
+        label: str,
+        initializer: Optional[Callable[[], None]] = None,
+        prewarm: bool = False,
+    ) -> None:
+        self.env_name = env_name
+        self.label = label
+        self.initializer = initializer
+        self.prewarm = prewarm
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        ProcessPool._instances.add(self)
+
+    def workers(self) -> int:
+        return pool_workers(self.env_name)
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self.executor is None:
+                workers = self.workers()
+                self.executor = ProcessPoolExecutor(max_workers=workers, initializer=self.initializer)
+                if self.prewarm:
+                    for _ in range(workers):
+                        self.executor.submit(_ready)
+                logger.info("🧵 [%s] Started pool with %d workers", self.label, workers)
+            return self.executor
+
+    def discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken ``executor``; the next :meth:`get` starts a new one."""
+        with self._lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """Stop the pool; the next :meth:`get` starts a new one."""
+        with self._lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def shutdown_pools() -> None:
+    """Stop every :class:`ProcessPool` of the process."""
+    for pool in list(ProcessPool._instances):
+        pool.shutdown()
@@ -0,0 +1,202 @@
+"""JSON ticket commands for column projection and predicate pushdown.
+
+A plain Flight ticket is the UTF-8 flight path of a table.  A ticket whose
+payload is a JSON object is treated as a query against that table::
+
+    {
+        "path": "client/app/project/file",
+        "columns": ["Region", "Sales"],
+        "filters": [{"column": "Year", "op": ">=", "value": 2023}],
+        "limit": 100,
+        "offset": 0
+    }
+
+Filters are combined with AND.  The Flight server evaluates the query batch
+by batch with ``pyarrow.compute`` so only the selected rows and columns are
+sent over the wire, and scanning stops as soon as ``limit`` rows have been
+produced.  Clients use the same class to build tickets and to apply a query
+locally when they have to fall back to a full MinIO download.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+FILTER_OPS = {
+    "==": pc.equal,
+    "!=": pc.not_equal,
+    "<": pc.less,
+    "<=": pc.less_equal,
+    ">": pc.greater,
+    ">=": pc.greater_equal,
+}
+SET_OPS = ("in", "not_in")
+NULL_OPS = ("is_null", "not_null")
+STRING_OPS = ("contains",)
+
+
+class FlightQueryError(ValueError):
+    """Raised when a ticket command cannot be parsed or applied."""
+
+
+@dataclass
+class FlightQuery:
+    path: str
+    columns: Optional[List[str]] = None
+    filters: List[Dict[str, Any]] = field(default_factory=list)
+    limit: Optional[int] = None
+    offset: int = 0
+
+    # ------------------------------------------------------------------
+    # Ticket encoding
+    # ------------------------------------------------------------------
+    @property
+    def is_passthrough(self) -> bool:
+        """True when the query returns the table unchanged."""
+        return self.columns is None and not self.filters and self.limit is None and not self.offset
+
+    def to_ticket(self) -> bytes:
+        if self.is_passthrough:
+            return self.path.encode()
+        payload: Dict[str, Any] = {"path": self.path}
+        if self.columns is not None:
+            payload["columns"] = list(self.columns)
+        if self.filters:
+            payload["filters"] = self.filters
+        if self.limit is not None:
+            payload["limit"] = self.limit
+        if self.offset:
+            payload["offset"] = self.offset
+        return json.dumps(payload).encode()
+
+    @classmethod
+    def from_ticket(cls, raw: bytes) -> "FlightQuery":
+        text = raw.decode()
+        if not text.lstrip().startswith("{"):
+            return cls(path=text)
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise FlightQueryError(f"Invalid ticket command: {exc}") from exc
+        path = payload.get("path")
+        if not path:
+            raise FlightQueryError("Ticket command requires a 'path'")
+        columns = payload.get("columns")
+        try:
+            limit = payload.get("limit")
+            limit = int(limit) if limit is not None else None
+            offset = int(payload.get("offset") or 0)
+            columns = list(columns) if columns is not None else None
+            filters = list(payload.get("filters") or [])
+        except (TypeError, ValueError) as exc:
+            raise FlightQueryError(f"Invalid ticket command: {exc}") from exc
+        if (limit is not None and limit < 0) or offset < 0:
+            raise FlightQueryError("limit and offset must be non-negative")
+        query = cls(path=path, columns=columns, filters=filters, limit=limit, offset=offset)
+        for flt in query.filters:
+            _validate_filter(flt)
+        return query
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    def output_schema(self, schema: pa.Schema) -> pa.Schema:
+        if self.columns is None:
+            return schema
+        missing = [c for c in self.columns if schema.get_field_index(c) < 0]
+        if missing:
+            raise FlightQueryError(f"Unknown columns: {missing}")
+        return pa.schema([schema.field(c) for c in self.columns], metadata=schema.metadata)
+
+    def iter_batches(self, table: pa.Table) -> Iterator[pa.RecordBatch]:
+        """Yield the record batches of ``table`` that satisfy the query."""
+        out_schema = self.output_schema(table.schema)
+        filter_cols = [f["column"] for f in self.filters]
+        missing = [c for c in filter_cols if table.schema.get_field_index(c) < 0]
+        if missing:
+            raise FlightQueryError(f"Unknown filter columns: {missing}")
+        needed = list(dict.fromkeys(out_schema.names + filter_cols))
+        source = table.select(needed)
+        if not self.filters:
+            # Without predicates offset/limit can be applied as a zero-copy slice.
+            source = source.slice(self.offset, self.limit)
+            for batch in source.to_batches():
+                yield batch.select(out_schema.names)
+            return
+
+        to_skip = self.offset
+        remaining = self.limit
+        for batch in source.to_batches():
+            if remaining is not None and remaining <= 0:
+                return
+            mask = self._mask(batch)
+            batch = batch.filter(mask)
+            if to_skip:
+                skipped = min(to_skip, batch.num_rows)
+                batch = batch.slice(skipped)
+                to_skip -= skipped
+            if remaining is not None:
+                batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+            if batch.num_rows:
+                yield batch.select(out_schema.names)
+
+    def apply(self, table: pa.Table) -> pa.Table:
+        schema = self.output_schema(table.schema)
+        return pa.Table.from_batches(list(self.iter_batches(table)), schema=schema)
+
+    def _mask(self, batch: pa.RecordBatch) -> pa.Array:
+        mask = None
+        for flt in self.filters:
+            cond = _evaluate_filter(batch.column(flt["column"]), flt)
+            mask = cond if mask is None else pc.and_kleene(mask, cond)
+        # Comparisons against nulls yield null; treat those rows as excluded.
+        return pc.fill_null(mask, False)
+
+
+def _validate_filter(flt: Dict[str, Any]) -> None:
+    if not isinstance(flt, dict) or "column" not in flt or "op" not in flt:
+        raise FlightQueryError(f"Invalid filter {flt!r}")
+    op = flt["op"]
+    if op not in FILTER_OPS and op not in SET_OPS + NULL_OPS + STRING_OPS:
+        raise FlightQueryError(f"Unsupported filter op {op!r}")
+    if op in SET_OPS and not isinstance(flt.get("value"), list):
+        raise FlightQueryError(f"Filter op {op!r} requires a list value")
+
+
+def _value_type(column: pa.Array) -> pa.DataType:
+    if pa.types.is_dictionary(column.type):
+        return column.type.value_type
+    return column.type
+
+
+def _evaluate_filter(column: pa.Array, flt: Dict[str, Any]) -> pa.Array:
+    try:
+        return _filter_mask(column, flt)
+    except (TypeError, ValueError, pa.ArrowNotImplementedError) as exc:
+        # Values that cannot be cast to the column type, e.g. "abc" for an
+        # integer column, are a client error like any other bad filter.
+        raise FlightQueryError(f"Invalid filter {flt!r}: {exc}") from exc
+
+
+def _filter_mask(column: pa.Array, flt: Dict[str, Any]) -> pa.Array:
+    op = flt["op"]
+    value = flt.get("value")
+    if op in FILTER_OPS:
+        if value is None:
+            return pa.nulls(len(column), pa.bool_())
+        return FILTER_OPS[op](column, pa.scalar(value).cast(_value_type(column)))
+    if op in SET_OPS:
+        matched = pc.is_in(column, value_set=pa.array(value).cast(_value_type(column)))
+        return pc.invert(matched) if op == "not_in" else matched
+    if op == "is_null":
+        return pc.is_null(column)
+    if op == "not_null":
+        return pc.is_valid(column)
+    if op == "contains":
+        return pc.match_substring(pc.cast(column, pa.string()), str(value))
+    raise FlightQueryError(f"Unsupported filter op {op!r}")
@@ -0,0 +1,293 @@
+"""Byte-budgeted in-memory cache of Arrow tables for the Flight server.
+
+Entries are accounted by ``pa.Table.nbytes`` and evicted in LRU or LFU order
+once the configured budget is exceeded.  Tables that are currently being
+streamed to a client can be pinned so that eviction never drops them while a
+``do_get`` is in progress.  Evicted tables are not lost: the Flight server
+reloads them from MinIO through the flight registry on the next request.
+
+:class:`SingleFlight` coalesces concurrent reloads of the same path so that a
+burst of cache misses results in a single MinIO download.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Set, TypeVar
+
+import pyarrow as pa
+
+from .env_config import env_int
+
+logger = logging.getLogger("trinity.flight")
+
+T = TypeVar("T")
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+CACHE_POLICIES = ("lru", "lfu")
+
+
+@dataclass
+class TableCacheStats:
+    """Counters exposed through the Flight ``cache_stats`` action."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+    rejected: int = 0
+    entries: int = 0
+    current_bytes: int = 0
+    pinned: int = 0
+    max_bytes: int = 0
+    policy: str = "lru"
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class TableCache:
+    """Thread-safe LRU/LFU cache of Arrow tables bounded by total bytes."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        policy: Optional[str] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        """``on_evict`` is called with the path of every table dropped from the
+        cache by eviction, :meth:`pop` or :meth:`clear` (not when :meth:`put`
+        replaces it), while the cache lock is held."""
+        if max_bytes is None:
+            max_bytes = env_int("FLIGHT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        policy = (policy or os.getenv("FLIGHT_CACHE_POLICY", "lru")).lower()
+        if policy not in CACHE_POLICIES:
+            logger.warning("Unknown FLIGHT_CACHE_POLICY %s, falling back to lru", policy)
+            policy = "lru"
+        self.max_bytes = max(int(max_bytes), 0)
+        self.policy = policy
+        self._on_evict = on_evict
+        self._lock = threading.RLock()
+        self._tables: "OrderedDict[str, pa.Table]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._frequency: Dict[str, int] = {}
+        self._pins: Dict[str, int] = {}
+        # Pinned paths that were popped or cleared; dropped on their last unpin.
+        self._doomed: Set[str] = set()
+        self._bytes = 0
+        self._stats = TableCacheStats(max_bytes=self.max_bytes, policy=policy)
+
+    # ------------------------------------------------------------------
+    # Mapping-style access
+    # ------------------------------------------------------------------
+    def __contains__(self, path: str) -> bool:
+        # A popped table still held by a stream is not served any more, so
+        # callers must treat it as missing and reload it.
+        with self._lock:
+            return path in self._tables and path not in self._doomed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tables)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._tables.keys())
+
+    def get(self, path: str) -> Optional[pa.Table]:
+        """Return the cached table for ``path`` and record a hit or miss."""
+        with self._lock:
+            table = self._tables.get(path)
+            if table is None or path in self._doomed:
+                self._stats.misses += 1
+                return None
+            self._stats.hits += 1
+            self._touch(path)
+            return table
+
+    def put(self, path: str, table: pa.Table) -> bool:
+        """Store ``table`` under ``path`` evicting older entries if required.
+
+        Returns ``False`` when the table alone exceeds the configured budget;
+        such tables are not cached and will be served straight from MinIO.
+        """
+        size = int(table.nbytes)
+        with self._lock:
+            if path in self._tables:
+                self._remove(path)
+            if self.max_bytes and size > self.max_bytes:
+                self._stats.rejected += 1
+                logger.warning(
+                    "table %s (%d bytes) exceeds flight cache budget %d; not cached",
+                    path,
+                    size,
+                    self.max_bytes,
+                )
+                return False
+            self._tables[path] = table
+            self._sizes[path] = size
+            self._frequency[path] = 1
+            self._bytes += size
+            self._evict_to_budget(exclude=path)
+            return True
+
+    def pop(self, path: str) -> Optional[pa.Table]:
+        """Drop ``path`` and return its table.
+
+        A pinned table is only marked: lookups miss from now on and it is
+        dropped when its last pin is released.  ``None`` is returned for it.
+        """
+        with self._lock:
+            if path not in self._tables:
+                return None
+            if self._pins.get(path):
+                self._doomed.add(path)
+                return None
+            return self._drop(path)
+
+    def clear(self) -> None:
+        """Drop every table; pinned ones are dropped when released, as in :meth:`pop`."""
+        with self._lock:
+            for path in list(self._tables.keys()):
+                if self._pins.get(path):
+                    self._doomed.add(path)
+                else:
+                    self._drop(path)
+
+    # ------------------------------------------------------------------
+    # Pinning
+    # ------------------------------------------------------------------
+    @contextmanager
+    def pinned(self, path: str) -> Iterator[None]:
+        """Protect ``path`` from eviction for the duration of the block."""
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                remaining = self._pins.get(path, 0) - 1
+                if remaining > 0:
+                    self._pins[path] = remaining
+                else:
+                    self._pins.pop(path, None)
+                    if path in self._doomed and path in self._tables:
+                        self._drop(path)
+                self._evict_to_budget()
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._stats.entries = len(self._tables)
+            self._stats.current_bytes = self._bytes
+            self._stats.pinned = len(self._pins)
+            return self._stats.to_dict()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _touch(self, path: str) -> None:
+        self._tables.move_to_end(path)
+        self._frequency[path] = self._frequency.get(path, 0) + 1
+
+    def _remove(self, path: str) -> pa.Table:
+        self._doomed.discard(path)
+        table = self._tables.pop(path)
+        self._bytes -= self._sizes.pop(path, 0)
+        self._frequency.pop(path, None)
+        return table
+
+    def _drop(self, path: str) -> pa.Table:
+        table = self._remove(path)
+        if self._on_evict is not None:
+            try:
+                self._on_evict(path)
+            except Exception as exc:
+                logger.warning("eviction callback failed for %s: %s", path, exc)
+        return table
+
+    def _candidates(self, exclude: Optional[str]) -> List[str]:
+        paths = [p for p in self._tables if p != exclude and not self._pins.get(p)]
+        if self.policy == "lfu":
+            # ``sorted`` is stable so ties fall back to recency order.
+            paths.sort(key=lambda p: self._frequency.get(p, 0))
+        return paths
+
+    def _evict_to_budget(self, exclude: Optional[str] = None) -> None:
+        if not self.max_bytes or self._bytes <= self.max_bytes:
+            return
+        for path in self._candidates(exclude):
+            if self._bytes <= self.max_bytes:
+                break
+            size = self._sizes.get(path, 0)
+            self._drop(path)
+            self._stats.evictions += 1
+            self._stats.evicted_bytes += size
+            logger.info("♻️ evicted table %s from flight cache (%d bytes)", path, size)
+        if self._bytes > self.max_bytes:
+            logger.warning(
+                "flight cache over budget (%d/%d bytes) because of pinned tables",
+                self._bytes,
+                self.max_bytes,
+            )
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters exposed alongside the cache stats."""
+
+    loads: int = 0
+    coalesced: int = 0
+    failures: int = 0
+    in_flight: int = 0
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class SingleFlight:
+    """Run at most one loader per key; concurrent callers wait for its result."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._stats = SingleFlightStats()
+
+    def do(self, key: str, loader: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats.loads += 1
+            else:
+                self._stats.coalesced += 1
+        if not leader:
+            logger.info("⏳ waiting for in-flight load of %s", key)
+            return future.result()
+        try:
+            result = loader()
+        except BaseException as exc:
+            with self._lock:
+                self._stats.failures += 1
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._stats.in_flight = len(self._calls)
+            return self._stats.to_dict()
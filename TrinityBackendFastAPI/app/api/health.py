@@ -69,3 +69,10 @@ def redis_health() -> Dict[str, Any]:
             "allocator_active": memory.get("allocator_active") if isinstance(memory, dict) else None,
         },
     }
+
+
+@router.get("/dataset-cache", summary="Inspect the shared decoded-dataset cache")
+def dataset_cache_health() -> Dict[str, Any]:
+    from app.DataStorageRetrieval.dataset_cache import dataset_cache_stats
+
+    return {"status": "ok", **dataset_cache_stats()}
@@ -263,289 +263,395 @@ def process_model_cpu_bound(model_name, y_series_data, forecast_horizon, frequen
         return {'model_name': model_name, 'error': str(e)}
 
 
-async def forecast_for_combination(df, y_var, forecast_horizon=12, fiscal_start_month=1, frequency="M", combination=None, models_to_run=None):
+def process_model_batch(tasks):
     """
-    Run autoregressive forecasting on a dataframe that already contains data for a specific combination.
-    
-    Parameters:
-    - df: DataFrame containing data for a specific combination (no filtering needed)
-    - y_var: Target variable column name
-    - forecast_horizon: Number of periods to forecast
-    - fiscal_start_month: Fiscal year start month (1-12)
-    - frequency: Data frequency ('D', 'W', 'M', 'Q', 'Y')
-    - combination: Combination dictionary for reference (optional)
+    Fit a batch of models in one worker round trip.
+
+    ``tasks`` is a list of keyword dicts for :func:`process_model_cpu_bound`.
+    Each result gains ``fit_seconds``, the time spent in that fit, which the
+    caller aggregates into per-model throughput.
     """
-    # Import pandas locally to ensure it's available in all contexts
-    import pandas as pd
-    import numpy as np
-    
-    try:
-        # Check if data exists
-        if df.empty:
-            return {
-                "status": "FAILURE",
-                "error": f"No data found for combination: {combination}"
-            }
+    import time
+
+    results = []
+    for task in tasks:
+        started = time.perf_counter()
+        try:
+            result = process_model_cpu_bound(**task)
+        except Exception as e:
+            result = {'model_name': task['model_name'], 'error': str(e)}
+        result['fit_seconds'] = time.perf_counter() - started
+        results.append(result)
+    return results
+
+
+async def _run_model_tasks(tasks):
+    """
+    Run ``process_model_cpu_bound`` tasks on the shared forecasting pool.
+
+    Returns the results in task order together with a
+    :class:`forecast_pool.ModelThroughput` for the run.  When the pool is
+    disabled or breaks, the remaining fits run in-process.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    from . import forecast_pool
+
+    throughput = forecast_pool.ModelThroughput()
+    results = [None] * len(tasks)
+    batches = forecast_pool.plan_batches(
+        [{'model_name': task['model_name'], 'points': len(task['y_series_data']['values'])} for task in tasks]
+    )
+
+    def collect(batch, batch_results):
+        for index, result in zip(batch, batch_results):
+            results[index] = result
+            throughput.record(
+                tasks[index]['model_name'],
+                result.get('fit_seconds', 0.0),
+                len(tasks[index]['y_series_data']['values']),
+                'error' not in result,
+            )
+
+    pending = batches
+    if forecast_pool.enabled():
+        executor = forecast_pool.pool.get()
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(executor, process_model_batch, [tasks[i] for i in batch])
+            for batch in batches
+        ]
+        logger.info("Submitted %d model tasks in %d batches to the forecasting pool", len(tasks), len(batches))
+        pending = []
+        for batch, outcome in zip(batches, await asyncio.gather(*futures, return_exceptions=True)):
+            if isinstance(outcome, BaseException):
+                logger.warning("Forecasting batch failed: %s", outcome)
+                if isinstance(outcome, BrokenProcessPool):
+                    forecast_pool.pool.discard(executor)
+                pending.append(batch)
+            else:
+                collect(batch, outcome)
+
+    if pending:
+        logger.info("Processing %d model tasks sequentially", sum(len(batch) for batch in pending))
+        for batch in pending:
+            collect(batch, process_model_batch([tasks[i] for i in batch]))
+
+    throughput.log()
+    return results, throughput
+
+
+def _safe_mape(actual, predicted):
+    mask = (actual != 0) & ~np.isnan(actual) & ~np.isnan(predicted)
+    if mask.sum() == 0:
+        return None
+    return np.mean(np.abs((actual[mask] - predicted[mask]) / actual[mask])) * 100
+
 
-        # Check and set datetime index - handle different date column names
-        date_col = None
-        for col in ['date', 'Date', 'DATE']:
-            if col in df.columns:
-                date_col = col
+def _smape(actual, predicted):
+    actual = np.array(actual)
+    predicted = np.array(predicted)
+    denominator = (np.abs(actual) + np.abs(predicted)) / 2
+    mask = (denominator != 0) & ~np.isnan(actual) & ~np.isnan(predicted)
+    if mask.sum() == 0:
+        return None
+    return np.mean(np.abs(actual[mask] - predicted[mask]) / denominator[mask]) * 100
+
+
+def _calculate_metrics(actual, fitted):
+    actual = pd.Series(actual)
+    fitted = pd.Series(fitted)
+
+    aligned = pd.concat([actual, fitted], axis=1).dropna()
+    if aligned.empty:
+        return None
+
+    actual_vals = aligned.iloc[:, 0]
+    fitted_vals = aligned.iloc[:, 1]
+
+    return {
+        'MAE': mean_absolute_error(actual_vals, fitted_vals),
+        'MSE': mean_squared_error(actual_vals, fitted_vals),
+        'RMSE': np.sqrt(mean_squared_error(actual_vals, fitted_vals)),
+        'MAPE': _safe_mape(actual_vals, fitted_vals),
+        'SMAPE': _smape(actual_vals, fitted_vals),
+    }
+
+
+def _prepare_forecast(df, y_var, forecast_horizon, frequency, combination, models_to_run):
+    """
+    Validate and resample one combination's data.
+
+    Returns ``(plan, None)`` where ``plan`` holds the resampled series and the
+    model tasks to run, or ``(None, failure)`` with the FAILURE response.
+    """
+    # Check if data exists
+    if df.empty:
+        return None, {
+            "status": "FAILURE",
+            "error": f"No data found for combination: {combination}"
+        }
+
+    # Check and set datetime index - handle different date column names
+    date_col = None
+    for col in ['date', 'Date', 'DATE']:
+        if col in df.columns:
+            date_col = col
+            break
+
+    if not date_col:
+        return None, {
+            "status": "FAILURE",
+            "error": "No date column found. Expected columns: 'date', 'Date', or 'DATE'"
+        }
+
+    # Convert and set index
+    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    df = df.dropna(subset=[date_col])
+    df = df.set_index(date_col).sort_index()
+
+    # Ensure target column exists (case-insensitive matching)
+    print(f"🔍 Checking for target variable '{y_var}' in columns: {list(df.columns)}")
+
+    # Try exact match first
+    if y_var in df.columns:
+        actual_y_var = y_var
+        print(f"✅ Target variable '{y_var}' found in data (exact match)")
+    else:
+        # Try case-insensitive match
+        actual_y_var = None
+        for col in df.columns:
+            if col.lower() == y_var.lower():
+                actual_y_var = col
                 break
-        
-        if not date_col:
-            return {
+
+        if actual_y_var is None:
+            print(f"❌ Target variable '{y_var}' not found in data (case-insensitive)")
+            return None, {
                 "status": "FAILURE",
-                "error": "No date column found. Expected columns: 'date', 'Date', or 'DATE'"
+                "error": f"The target variable '{y_var}' is not in the data. Available columns: {list(df.columns)}"
             }
+        print(f"✅ Target variable '{y_var}' found as '{actual_y_var}' in data (case-insensitive match)")
 
-        # Convert and set index
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-        df = df.dropna(subset=[date_col])
-        df = df.set_index(date_col).sort_index()
+    # Use the actual column name from the data
+    y_var = actual_y_var
 
-        # Ensure target column exists (case-insensitive matching)
-        print(f"🔍 Checking for target variable '{y_var}' in columns: {list(df.columns)}")
-        
-        # Try exact match first
-        if y_var in df.columns:
-            actual_y_var = y_var
-            print(f"✅ Target variable '{y_var}' found in data (exact match)")
-        else:
-            # Try case-insensitive match
-            actual_y_var = None
-            for col in df.columns:
-                if col.lower() == y_var.lower():
-                    actual_y_var = col
-                    break
-            
-            if actual_y_var is None:
-                print(f"❌ Target variable '{y_var}' not found in data (case-insensitive)")
-                return {
-                    "status": "FAILURE",
-                    "error": f"The target variable '{y_var}' is not in the data. Available columns: {list(df.columns)}"
-                }
-            print(f"✅ Target variable '{y_var}' found as '{actual_y_var}' in data (case-insensitive match)")
-        
-        # Use the actual column name from the data
-        y_var = actual_y_var
+    print(f"🔢 Converting target variable '{y_var}' to numeric...")
+    y_series = pd.to_numeric(df[y_var], errors='coerce')
+    print(f"📊 Original y_series length: {len(y_series)}")
 
-        print(f"🔢 Converting target variable '{y_var}' to numeric...")
-        y_series = pd.to_numeric(df[y_var], errors='coerce')
-        print(f"📊 Original y_series length: {len(y_series)}")
-        
-        print(f"🔄 Resampling with frequency '{frequency}'...")
-        y_series = y_series.resample(frequency).mean().ffill().dropna()
-        print(f"📊 After resampling y_series length: {len(y_series)}")
+    print(f"🔄 Resampling with frequency '{frequency}'...")
+    y_series = y_series.resample(frequency).mean().ffill().dropna()
+    print(f"📊 After resampling y_series length: {len(y_series)}")
 
-        # Final check
-        if y_series.empty:
-            print(f"❌ No valid data found for target variable '{y_var}' after cleaning")
-            return {
+    # Final check
+    if y_series.empty:
+        print(f"❌ No valid data found for target variable '{y_var}' after cleaning")
+        return None, {
+            "status": "FAILURE",
+            "error": f"No valid data found for target variable '{y_var}' after cleaning"
+        }
+    print(f"✅ Valid data found for target variable '{y_var}': {len(y_series)} points")
+
+    # Define available models
+    available_models = ['ARIMA', 'SARIMA', 'Holt-Winters', 'ETS', 'Prophet']
+
+    # If models_to_run is None, run all models; otherwise run only specified models
+    if models_to_run is None:
+        models_to_run = available_models
+    else:
+        # Validate that all requested models are available
+        invalid_models = [model for model in models_to_run if model not in available_models]
+        if invalid_models:
+            return None, {
                 "status": "FAILURE",
-                "error": f"No valid data found for target variable '{y_var}' after cleaning"
+                "error": f"Invalid models specified: {invalid_models}. Available models: {available_models}"
             }
-        print(f"✅ Valid data found for target variable '{y_var}': {len(y_series)} points")
 
-        # Define available models
-        available_models = ['ARIMA', 'SARIMA', 'Holt-Winters', 'ETS', 'Prophet']
-        
-        # If models_to_run is None, run all models; otherwise run only specified models
-        if models_to_run is None:
-            models_to_run = available_models
-        else:
-            # Validate that all requested models are available
-            invalid_models = [model for model in models_to_run if model not in available_models]
-            if invalid_models:
-                return {
-                    "status": "FAILURE",
-                    "error": f"Invalid models specified: {invalid_models}. Available models: {available_models}"
-                }
-        
-        results = {
-            'status': 'SUCCESS',
-            'forecast_df': None,
-            'metrics': {},
-            'model_params': {},
-            'combination': combination,
-            'models_run': models_to_run
+    seasonal_periods = {'D': 7, 'W': 52, 'Q': 4, 'Y': 1, 'M': 12}.get(frequency, 12)
+    freq_params = get_arima_params(frequency)
+
+    # Convert y_series to serializable format for multiprocessing
+    y_series_data = {
+        'values': y_series.values.tolist(),
+        'index': y_series.index.tolist()
+    }
+    tasks = [
+        {
+            'model_name': model_name,
+            'y_series_data': y_series_data,
+            'forecast_horizon': forecast_horizon,
+            'frequency': frequency,
+            'seasonal_periods': seasonal_periods,
+            'freq_params': freq_params,
         }
-        
-        # Helper functions for metrics calculation (from working version)
-        def safe_mape(actual, predicted):
-            mask = (actual != 0) & ~np.isnan(actual) & ~np.isnan(predicted)
-            if mask.sum() == 0:
-                return None
-            return np.mean(np.abs((actual[mask] - predicted[mask]) / actual[mask])) * 100
-        
-        def smape(actual, predicted):
-            actual = np.array(actual)
-            predicted = np.array(predicted)
-            denominator = (np.abs(actual) + np.abs(predicted)) / 2
-            mask = (denominator != 0) & ~np.isnan(actual) & ~np.isnan(predicted)
-            if mask.sum() == 0:
-                return None
-            return np.mean(np.abs(actual[mask] - predicted[mask]) / denominator[mask]) * 100
-        
-        def calculate_metrics(actual, fitted, model_name):
-            actual = pd.Series(actual)
-            fitted = pd.Series(fitted)
-            
-            aligned = pd.concat([actual, fitted], axis=1).dropna()
-            if aligned.empty:
-                return None
-            
-            actual_vals = aligned.iloc[:, 0]
-            fitted_vals = aligned.iloc[:, 1]
-            
-            metrics = {
-                'MAE': mean_absolute_error(actual_vals, fitted_vals),
-                'MSE': mean_squared_error(actual_vals, fitted_vals),
-                'RMSE': np.sqrt(mean_squared_error(actual_vals, fitted_vals)),
-                'MAPE': safe_mape(actual_vals, fitted_vals),
-                'SMAPE': smape(actual_vals, fitted_vals),
-            }
-            results['metrics'][model_name] = metrics
-            return metrics
+        for model_name in models_to_run
+    ]
+    return {'y_series': y_series, 'models_to_run': models_to_run, 'tasks': tasks}, None
+
+
+def _assemble_forecast(plan, model_results, forecast_horizon, frequency, combination):
+    """Build the response of one combination from its model results."""
+    y_series = plan['y_series']
+    models_to_run = plan['models_to_run']
+    results = {
+        'status': 'SUCCESS',
+        'forecast_df': None,
+        'metrics': {},
+        'model_params': {},
+        'combination': combination,
+        'models_run': models_to_run
+    }
 
-        last_date = y_series.index[-1]
-        if frequency == "M":
-            forecast_start = last_date + pd.offsets.MonthBegin(1)
-        elif frequency == "Q":
-            forecast_start = last_date + pd.offsets.QuarterBegin(1)
-        elif frequency == "Y":
-            forecast_start = last_date + pd.offsets.YearBegin(1)
-        elif frequency == "W":
-            forecast_start = last_date + pd.offsets.Week(1)
-        elif frequency == "D":
-            forecast_start = last_date + pd.offsets.Day(1)
+    last_date = y_series.index[-1]
+    if frequency == "M":
+        forecast_start = last_date + pd.offsets.MonthBegin(1)
+    elif frequency == "Q":
+        forecast_start = last_date + pd.offsets.QuarterBegin(1)
+    elif frequency == "Y":
+        forecast_start = last_date + pd.offsets.YearBegin(1)
+    elif frequency == "W":
+        forecast_start = last_date + pd.offsets.Week(1)
+    elif frequency == "D":
+        forecast_start = last_date + pd.offsets.Day(1)
+    else:
+        forecast_start = last_date + pd.offsets.MonthBegin(1)
+
+    future_dates = pd.date_range(start=forecast_start, periods=forecast_horizon, freq=frequency)
+    all_dates = list(y_series.index) + list(future_dates)
+
+    df_results = pd.DataFrame({
+        'date': all_dates,
+        'Actual': list(y_series) + [None] * forecast_horizon
+    })
+
+    # Process results and populate df_results
+    successful_models = []
+    for result in model_results:
+        model_name = result.get('model_name', 'Unknown')
+        if 'error' not in result:
+            # Model succeeded
+            successful_models.append(model_name)
+            forecast_values = result.get('forecast', [])
+            fitted_values = result.get('fitted', [])
+
+            # Ensure we have the right number of values
+            if len(forecast_values) == forecast_horizon and len(fitted_values) == len(y_series):
+                df_results[model_name] = fitted_values + forecast_values
+                results['model_params'][model_name] = result.get('params', {})
+
+                # Calculate metrics
+                fitted_series = pd.Series(fitted_values, index=y_series.index)
+                metrics = _calculate_metrics(y_series, fitted_series)
+                if metrics is not None:
+                    results['metrics'][model_name] = metrics
+            else:
+                print(f"Debug: {model_name} has incorrect data lengths - fitted: {len(fitted_values)}, forecast: {len(forecast_values)}")
+                df_results[model_name] = [None] * len(df_results)
         else:
-            forecast_start = last_date + pd.offsets.MonthBegin(1)
+            # Model failed
+            print(f"Debug: {model_name} failed: {result.get('error', 'Unknown error')}")
+            df_results[model_name] = [None] * len(df_results)
+
+    # Ensure all requested models have columns in df_results
+    for model_name in models_to_run:
+        if model_name not in df_results.columns:
+            df_results[model_name] = [None] * len(df_results)
+
+    print(f"Debug: Successfully processed {len(successful_models)} models: {successful_models}")
+    results['models_run'] = successful_models
+
+    # Convert DataFrame to serializable format
+    results['forecast_df'] = df_results.to_dict('records') if df_results is not None else None
+    return results
+
+
+def _forecast_failure(e):
+    import traceback
+    error_traceback = traceback.format_exc()
+    print(f"❌ Error in forecast_for_combination: {str(e)}")
+    print(f"❌ Full traceback: {error_traceback}")
+    return {
+        "status": "FAILURE",
+        "error": f"Error in forecast_for_combination: {str(e)}",
+        "traceback": error_traceback
+    }
 
-        future_dates = pd.date_range(start=forecast_start, periods=forecast_horizon, freq=frequency)
-        all_dates = list(y_series.index) + list(future_dates)
 
-        df_results = pd.DataFrame({
-            'date': all_dates,
-            'Actual': list(y_series) + [None] * forecast_horizon
-        })
+async def forecast_for_combination(df, y_var, forecast_horizon=12, fiscal_start_month=1, frequency="M", combination=None, models_to_run=None):
+    """
+    Run autoregressive forecasting on a dataframe that already contains data for a specific combination.
+    
+    Parameters:
+    - df: DataFrame containing data for a specific combination (no filtering needed)
+    - y_var: Target variable column name
+    - forecast_horizon: Number of periods to forecast
+    - fiscal_start_month: Fiscal year start month (1-12)
+    - frequency: Data frequency ('D', 'W', 'M', 'Q', 'Y')
+    - combination: Combination dictionary for reference (optional)
 
-        # Process models in parallel using ProcessPoolExecutor for CPU-bound tasks (from working version)
-        seasonal_periods = {'D': 7, 'W': 52, 'Q': 4, 'Y': 1, 'M': 12}.get(frequency, 12)
-        freq_params = get_arima_params(frequency)
-        
-        # Convert y_series to serializable format for multiprocessing
-        y_series_data = {
-            'values': y_series.values.tolist(),
-            'index': y_series.index.tolist()
-        }
-        
-        # Use ProcessPoolExecutor to utilize multiple CPU cores
-        from concurrent.futures import ProcessPoolExecutor, as_completed
-        import multiprocessing
-        
-        max_workers = min(multiprocessing.cpu_count(), len(models_to_run))
-        print(f"Debug: Starting parallel processing with {max_workers} workers for models: {models_to_run}")
-        
-        model_results = []
-        
+    The models are fitted on the shared forecasting pool (see
+    ``forecast_pool``); use :func:`forecast_for_combinations` to schedule
+    several combinations at once.
+    """
+    try:
+        plan, failure = _prepare_forecast(df, y_var, forecast_horizon, frequency, combination, models_to_run)
+        if failure is not None:
+            return failure
+        logger.info("Fitting models %s on the forecasting pool", plan['models_to_run'])
+        model_results, _ = await _run_model_tasks(plan['tasks'])
+        return _assemble_forecast(plan, model_results, forecast_horizon, frequency, combination)
+    except Exception as e:
+        return _forecast_failure(e)
+
+
+async def forecast_for_combinations(frames, y_var, forecast_horizon=12, fiscal_start_month=1, frequency="M", models_to_run=None):
+    """
+    Forecast many combinations, scheduling the whole (combination x model) matrix at once.
+
+    Parameters:
+    - frames: list of ``(combination, df)`` pairs, one DataFrame per combination
+    - the other parameters are those of :func:`forecast_for_combination`
+
+    Returns ``{"results": [...], "throughput": {...}}`` with one
+    :func:`forecast_for_combination` response per frame, in input order, and
+    fit counts and timings per model type for the run.
+    """
+    from . import forecast_pool
+
+    responses = [None] * len(frames)
+    plans = {}
+    tasks = []
+    owners = []
+    for position, (combination, df) in enumerate(frames):
         try:
-            with ProcessPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all model tasks
-                future_to_model = {
-                    executor.submit(
-                        process_model_cpu_bound, 
-                        model_name, 
-                        y_series_data, 
-                        forecast_horizon, 
-                        frequency, 
-                        seasonal_periods, 
-                        freq_params
-                    ): model_name 
-                    for model_name in models_to_run
-                }
-                print(f"Debug: Submitted {len(future_to_model)} model tasks")
-                
-                # Collect results as they complete
-                for future in as_completed(future_to_model):
-                    model_name = future_to_model[future]
-                    try:
-                        result = future.result()
-                        print(f"Debug: {model_name} completed: {result.get('model_name', 'unknown')} - {'error' in result and 'failed' or 'success'}")
-                        model_results.append(result)
-                    except Exception as e:
-                        print(f"Debug: {model_name} future exception: {str(e)}")
-                        model_results.append({'model_name': model_name, 'error': str(e)})
+            plan, failure = _prepare_forecast(df, y_var, forecast_horizon, frequency, combination, models_to_run)
         except Exception as e:
-            print(f"Debug: ProcessPoolExecutor failed: {str(e)}")
-            # Fallback to sequential processing if parallel processing fails
-            print(f"Debug: Falling back to sequential processing")
-            for model_name in models_to_run:
-                try:
-                    result = process_model_cpu_bound(
-                        model_name, 
-                        y_series_data, 
-                        forecast_horizon, 
-                        frequency, 
-                        seasonal_periods, 
-                        freq_params
-                    )
-                    print(f"Debug: {model_name} sequential result: {result.get('model_name', 'unknown')} - {'error' in result and 'failed' or 'success'}")
-                    model_results.append(result)
-                except Exception as e:
-                    print(f"Debug: {model_name} sequential exception: {str(e)}")
-                    model_results.append({'model_name': model_name, 'error': str(e)})
-        
-        # Process results and populate df_results
-        successful_models = []
-        for result in model_results:
-            model_name = result.get('model_name', 'Unknown')
-            if 'error' not in result:
-                # Model succeeded
-                successful_models.append(model_name)
-                forecast_values = result.get('forecast', [])
-                fitted_values = result.get('fitted', [])
-                
-                # Ensure we have the right number of values
-                if len(forecast_values) == forecast_horizon and len(fitted_values) == len(y_series):
-                    df_results[model_name] = fitted_values + forecast_values
-                    results['model_params'][model_name] = result.get('params', {})
-                    
-                    # Calculate metrics
-                    fitted_series = pd.Series(fitted_values, index=y_series.index)
-                    calculate_metrics(y_series, fitted_series, model_name)
-                else:
-                    print(f"Debug: {model_name} has incorrect data lengths - fitted: {len(fitted_values)}, forecast: {len(forecast_values)}")
-                    df_results[model_name] = [None] * len(df_results)
-            else:
-                # Model failed
-                print(f"Debug: {model_name} failed: {result.get('error', 'Unknown error')}")
-                df_results[model_name] = [None] * len(df_results)
-        
-        # Ensure all requested models have columns in df_results
-        for model_name in models_to_run:
-            if model_name not in df_results.columns:
-                df_results[model_name] = [None] * len(df_results)
-        
-        print(f"Debug: Successfully processed {len(successful_models)} models: {successful_models}")
-        results['models_run'] = successful_models
+            responses[position] = _forecast_failure(e)
+            continue
+        if failure is not None:
+            responses[position] = failure
+            continue
+        plans[position] = plan
+        tasks.extend(plan['tasks'])
+        owners.extend([position] * len(plan['tasks']))
+
+    if tasks:
+        model_results, throughput = await _run_model_tasks(tasks)
+    else:
+        model_results, throughput = [], forecast_pool.ModelThroughput()
+
+    by_position = {position: [] for position in plans}
+    for position, result in zip(owners, model_results):
+        by_position[position].append(result)
+    for position, plan in plans.items():
+        try:
+            responses[position] = _assemble_forecast(
+                plan, by_position[position], forecast_horizon, frequency, frames[position][0]
+            )
+        except Exception as e:
+            responses[position] = _forecast_failure(e)
 
-        # Convert DataFrame to serializable format
-        results['forecast_df'] = df_results.to_dict('records') if df_results is not None else None
-        
-        return results
-        
-    except Exception as e:
-        import traceback
-        error_traceback = traceback.format_exc()
-        print(f"❌ Error in forecast_for_combination: {str(e)}")
-        print(f"❌ Full traceback: {error_traceback}")
-        return {
-            "status": "FAILURE",
-            "error": f"Error in forecast_for_combination: {str(e)}",
-            "traceback": error_traceback
-        }
+    return {"results": responses, "throughput": throughput.summary()}
 
 
 
@@ -0,0 +1,154 @@
+"""Long-lived process pool for the autoregressive forecasting models.
+
+``forecast_for_combination`` used to open a new ``ProcessPoolExecutor`` for
+every combination and only spread that combination's 3-6 models over it, so
+each combination paid for process start-up and the statsmodels / prophet
+imports again, and most cores idled while the slowest model finished.
+
+This module keeps one executor for the lifetime of the process:
+
+* workers are started with :func:`_warm_worker`, which imports statsmodels
+  and prophet once, and :data:`pool` starts them all as soon as the
+  executor is created;
+* callers submit the whole (combination x model) matrix at once;
+  :func:`plan_batches` groups short series into one task so their fits share
+  a round trip, and submits the slowest model types first;
+* :class:`ModelThroughput` aggregates fit time per model type.
+
+The ``train-autoregressive-models-direct`` route still serves the simulated results
+of ``build_autoregressive.service``, so nothing in the API calls
+``forecast_for_combinations`` yet; the pool is only started on first use.
+
+Configuration:
+
+* ``FORECAST_POOL_WORKERS`` - pool size (see
+  :func:`~app.DataStorageRetrieval.env_config.pool_workers`); ``0`` fits every
+  model in-process;
+* ``FORECAST_BATCH_POINTS`` - series with at most this many points are
+  batched together (default 104), up to ``FORECAST_BATCH_SIZE`` fits per task
+  (default 8).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, List, Sequence
+
+from app.DataStorageRetrieval.env_config import ProcessPool, env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_POINTS = 104
+DEFAULT_BATCH_SIZE = 8
+
+# Typical relative cost, used to submit the slowest fits first.
+MODEL_COST = {"SARIMA": 5, "Prophet": 4, "ETS": 3, "Holt-Winters": 2, "ARIMA": 1}
+
+
+def configured_workers() -> int:
+    return pool.workers()
+
+
+def enabled() -> bool:
+    return configured_workers() > 0
+
+
+def _warm_worker() -> None:
+    """Import the model libraries once per worker instead of once per fit."""
+    import statsmodels.tsa.arima.model  # noqa: F401
+    import statsmodels.tsa.holtwinters  # noqa: F401
+    import statsmodels.tsa.statespace.sarimax  # noqa: F401
+
+    try:
+        import prophet  # noqa: F401
+    except ImportError:
+        pass
+
+
+# Every worker is started with the pool so the first request does not pay for it.
+pool = ProcessPool("FORECAST_POOL_WORKERS", "FORECAST-POOL", initializer=_warm_worker, prewarm=True)
+
+
+def shutdown() -> None:
+    pool.shutdown()
+
+
+def plan_batches(tasks: Sequence[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Group task indices into pool submissions.
+
+    Each task carries ``model_name`` and ``points`` (series length).  Tasks of
+    the same model on series of at most ``FORECAST_BATCH_POINTS`` points are
+    packed together, up to ``FORECAST_BATCH_SIZE`` per batch; longer series
+    get a batch of their own.  Batches of the most expensive model types come
+    first so they are not the tail of the run.
+    """
+    max_points = env_int("FORECAST_BATCH_POINTS", DEFAULT_BATCH_POINTS)
+    max_size = max(env_int("FORECAST_BATCH_SIZE", DEFAULT_BATCH_SIZE), 1)
+    order = sorted(range(len(tasks)), key=lambda i: -MODEL_COST.get(tasks[i]["model_name"], 0))
+
+    batches: List[List[int]] = []
+    open_batches: Dict[str, List[int]] = {}
+    for index in order:
+        task = tasks[index]
+        if task["points"] > max_points or max_size == 1:
+            batches.append([index])
+            continue
+        batch = open_batches.get(task["model_name"])
+        if batch is None or len(batch) >= max_size:
+            batch = []
+            open_batches[task["model_name"]] = batch
+            batches.append(batch)
+        batch.append(index)
+    return batches
+
+
+class ModelThroughput:
+    """Fit counts and fit time per model type across one forecasting run."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.models: Dict[str, Dict[str, float]] = {}
+
+    def record(self, model_name: str, seconds: float, points: int, ok: bool) -> None:
+        entry = self.models.setdefault(
+            model_name, {"fits": 0, "failed": 0, "fit_seconds": 0.0, "points": 0}
+        )
+        entry["fits"] += 1
+        entry["failed"] += 0 if ok else 1
+        entry["fit_seconds"] += seconds
+        entry["points"] += points
+
+    def summary(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self.started
+        models = {}
+        for name, entry in self.models.items():
+            fit_seconds = entry["fit_seconds"]
+            models[name] = {
+                "fits": int(entry["fits"]),
+                "failed": int(entry["failed"]),
+                "fit_seconds": round(fit_seconds, 4),
+                "mean_fit_seconds": round(fit_seconds / entry["fits"], 4) if entry["fits"] else None,
+                "fits_per_worker_second": round(entry["fits"] / fit_seconds, 2) if fit_seconds else None,
+                "points": int(entry["points"]),
+            }
+        total = sum(int(entry["fits"]) for entry in self.models.values())
+        return {
+            "wall_seconds": round(wall, 4),
+            "total_fits": total,
+            "fits_per_second": round(total / wall, 2) if wall else None,
+            "workers": configured_workers(),
+            "models": models,
+        }
+
+    def log(self) -> None:
+        summary = self.summary()
+        logger.info(
+            "📈 [FORECAST-POOL] %d fits in %.2fs (%.1f/s) on %d workers",
+            summary["total_fits"], summary["wall_seconds"], summary["fits_per_second"] or 0.0, summary["workers"],
+        )
+        for name, entry in summary["models"].items():
+            logger.info(
+                "📈 [FORECAST-POOL]   %s: %d fits, mean %.3fs, %s failed",
+                name, entry["fits"], entry["mean_fit_seconds"] or 0.0, entry["failed"],
+            )
@@ -2,6 +2,7 @@ import motor.motor_asyncio
 from minio import Minio
 from minio.error import S3Error
 from .config import settings
+from app.DataStorageRetrieval.dataset_cache import UnsupportedDatasetFormat, load_pandas
 import logging
 from datetime import timedelta
 from typing import Any, Dict, List, Optional
@@ -194,6 +195,26 @@ def get_file_from_source(file_key: str) -> io.BytesIO:
         logger.error(f"Error reading file {file_key} from {settings.minio_source_bucket}: {e}")
         raise
 
+def read_training_frame(bucket_name: str, file_key: str) -> pd.DataFrame:
+    """
+    Read a training file through the shared dataset cache.
+    Columns are lowercased for consistency; unknown extensions are read as CSV.
+    """
+    if minio_client is None:
+        raise Exception("MinIO client not available")
+    try:
+        df = load_pandas(minio_client, bucket_name, file_key, feature="build_model")
+    except UnsupportedDatasetFormat:
+        response = minio_client.get_object(bucket_name, file_key)
+        try:
+            df = pd.read_csv(io.BytesIO(response.read()))
+        finally:
+            response.close()
+            response.release_conn()
+        logger.info(f"Read file as CSV (fallback): {file_key}, shape: {df.shape}")
+    df.columns = df.columns.str.lower()
+    return df
+
 async def get_scope_set_with_columns(scope_id: str, set_name: str) -> Optional[Dict[str, Any]]:
     """
     Get scope combinations filtered by set_name and extract columns from first file.
@@ -441,6 +462,54 @@ async def train_models_for_combination_enhanced(
     Train models with enhanced result tracking including elasticities (only if price is in X variables).
     Returns: (model_results, variable_statistics)
     """
+    # Read data from MinIO
+    try:
+        if bucket_name:
+            # Use the passed bucket name instead of hardcoded one
+            logger.info(f"Reading file from custom bucket {bucket_name}: {file_key}")
+            df = read_training_frame(bucket_name, file_key)
+            logger.info(f"Successfully read file: {file_key}, shape: {df.shape}")
+        else:
+            # Fallback to original method
+            df = read_training_frame(settings.minio_source_bucket, file_key)
+    except Exception as e:
+        logger.error(f"Error training models for {file_key}: {e}")
+        raise
+
+    return train_models_for_frame(
+        df,
+        file_key=file_key,
+        x_variables=x_variables,
+        y_variable=y_variable,
+        variable_configs=variable_configs,
+        price_column=price_column,
+        standardization=standardization,
+        models_to_run=models_to_run,
+        custom_configs=custom_configs,
+        test_size=test_size,
+        k_folds=k_folds,
+    )
+
+
+def train_models_for_frame(
+    df: pd.DataFrame,
+    file_key: str,
+    x_variables: List[str],
+    y_variable: str,
+    variable_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+    price_column: Optional[str] = None,
+    standardization: str = 'none',
+    models_to_run: Optional[List[str]] = None,
+    custom_configs: Optional[Dict[str, Any]] = None,
+    test_size: float = 0.2,
+    k_folds: int = 5
+) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Synchronous core of train_models_for_combination_enhanced for a frame that is
+    already loaded (columns lowercased). It only does CPU work, so the training
+    pool can run it in a worker process.
+    Returns: (model_results, variable_statistics)
+    """
     
     # Check if price elasticity calculation is applicable
     calculate_elasticity = False
@@ -450,50 +519,7 @@ async def train_models_for_combination_enhanced(
     elif price_column and price_column not in x_variables:
         logger.warning(f"Price column '{price_column}' specified but not in x_variables. Elasticity will not be calculated.")
     
-    # Read data from MinIO
     try:
-        if bucket_name:
-            # Use the passed bucket name instead of hardcoded one
-            logger.info(f"Reading file from custom bucket {bucket_name}: {file_key}")
-            if minio_client is None:
-                raise Exception("MinIO client not available")
-            
-            response = minio_client.get_object(bucket_name, file_key)
-            file_data = response.read()
-            response.close()
-            response.release_conn()
-            
-            # Handle different file formats
-            if file_key.endswith('.arrow'):
-                try:
-                    import pyarrow as pa
-                    import pyarrow.ipc as ipc
-                    reader = ipc.RecordBatchFileReader(pa.BufferReader(file_data))
-                    df = reader.read_all().to_pandas()
-                    # Convert columns to lowercase for consistency
-                    df.columns = df.columns.str.lower()
-                    logger.info(f"Successfully read Arrow file: {file_key}, shape: {df.shape}")
-                except Exception as arrow_error:
-                    logger.error(f"Error reading Arrow file: {arrow_error}")
-                    raise
-            elif file_key.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(file_data))
-                # Convert columns to lowercase for consistency
-                df.columns = df.columns.str.lower()
-                logger.info(f"Successfully read CSV file: {file_key}, shape: {df.shape}")
-            else:
-                # Try CSV as fallback
-                df = pd.read_csv(io.BytesIO(file_data))
-                # Convert columns to lowercase for consistency
-                df.columns = df.columns.str.lower()
-                logger.info(f"Read file as CSV (fallback): {file_key}, shape: {df.shape}")
-        else:
-            # Fallback to original method
-            file_data = get_file_from_source(file_key)
-            df = pd.read_csv(file_data)
-            # Convert columns to lowercase for consistency
-            df.columns = df.columns.str.lower()
-        
         # Debug: Log available columns and required variables
         logger.info(f"Available columns in data: {list(df.columns)}")
         logger.info(f"Required X variables: {x_variables}")
@@ -1,3 +1,4 @@
+import copy
 import logging
 import pandas as pd
 import numpy as np
@@ -28,6 +29,11 @@ class MMMTransformationEngine:
     
     def __init__(self):
         self.transformation_metadata = {}
+        # Per-variable results for the frame bound by prepare_grid():
+        # (variable, config key) -> (column, metadata, updated config).
+        self._grid_frame = None
+        self._grid_columns = {}
+        self._grid_adstock = {}
     
     def _detect_data_frequency(self, df: pd.DataFrame) -> str:
         """
@@ -232,19 +238,125 @@ class MMMTransformationEngine:
         Returns:
             Adstock transformed values
         """
-        if decay_rate <= 0 or decay_rate >= 1:
-            logger.warning(f"Invalid decay_rate {decay_rate}, using 0.5")
-            decay_rate = 0.5
+        return self.apply_adstock_batch(x, [decay_rate])[:, 0]
+    
+    def apply_adstock_batch(self, x: np.ndarray, decay_rates: List[float]) -> np.ndarray:
+        """
+        Adstock of one series for several decay rates at once
         
-        adstock_values = np.zeros_like(x)
-        for i in range(len(x)):
-            if i == 0:
-                adstock_values[i] = x[i]
-            else:
-                adstock_values[i] = x[i] + decay_rate * adstock_values[i-1]
+        Runs the recursion adstock_t = x_t + decay * adstock_{t-1} once over a
+        (len(x), len(decay_rates)) array, so every decay rate of a parameter
+        grid costs one pass over the series. Column j equals
+        apply_adstock_transform(x, decay_rates[j]) exactly, dtype included.
+        
+        Returns:
+            Array with one adstock column per decay rate
+        """
+        x = np.asarray(x)
+        return self._adstock_filter(np.repeat(x[:, None], len(decay_rates), axis=1), self._valid_decays(decay_rates))
+    
+    def adstock_grid(self, df: pd.DataFrame, decays_by_var: Dict[str, List[float]]) -> Dict[Tuple[str, float], np.ndarray]:
+        """
+        Adstock of every (variable, decay) pair in one pass over the rows
+        
+        Columns of the same dtype are filtered together as one 2D array.
+        Returns {(variable, decay): adstock series}.
+        """
+        groups = {}
+        for var_name, decay_rates in decays_by_var.items():
+            values = np.asarray(df[var_name].values)
+            groups.setdefault(values.dtype, []).append((var_name, values, list(decay_rates)))
         
+        adstock = {}
+        for dtype, members in groups.items():
+            keys = [(var_name, decay) for var_name, _, decay_rates in members for decay in decay_rates]
+            values = np.column_stack([
+                np.repeat(column[:, None], len(decay_rates), axis=1) for _, column, decay_rates in members
+            ])
+            decays = self._valid_decays([decay for _, decay in keys])
+            batch = self._adstock_filter(values, decays)
+            for j, key in enumerate(keys):
+                adstock[key] = batch[:, j]
+        return adstock
+    
+    @staticmethod
+    def _valid_decays(decay_rates: List[float]) -> np.ndarray:
+        decays = []
+        for decay_rate in decay_rates:
+            if decay_rate <= 0 or decay_rate >= 1:
+                logger.warning(f"Invalid decay_rate {decay_rate}, using 0.5")
+                decay_rate = 0.5
+            decays.append(decay_rate)
+        return np.asarray(decays, dtype=float)
+    
+    @staticmethod
+    def _adstock_filter(values: np.ndarray, decays: np.ndarray) -> np.ndarray:
+        """Recursive filter over the rows of a 2D array, one decay per column."""
+        adstock_values = np.zeros_like(values)
+        if len(values):
+            adstock_values[0] = values[0]
+        for i in range(1, len(values)):
+            adstock_values[i] = values[i] + decays * adstock_values[i-1]
         return adstock_values
     
+    @staticmethod
+    def _first(value):
+        """Single value of a parameter that may be given as a list (first entry)."""
+        return value[0] if isinstance(value, list) else value
+    
+    def prepare_grid(self, df: pd.DataFrame, parameter_combinations: List[Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Bind the transformed-column cache to ``df`` for a parameter grid
+        
+        Computes the adstock of every media variable for all decay rates of
+        the grid in one batch (adstock_grid). Afterwards apply_variable_transformations(df, ...)
+        transforms each (variable, parameters) pair once and reuses it for every
+        combination that shares it. The frame must not be modified while bound;
+        call clear_grid() when done.
+        """
+        self._grid_frame = df
+        self._grid_columns = {}
+        self._grid_adstock = {}
+        decays_by_var = {}
+        for combo_config in parameter_combinations:
+            for var_name, config in combo_config.items():
+                if config.get("type") == "media" and var_name in df.columns:
+                    decay = self._first(config.get("adstock_decay", 0.5))
+                    decays_by_var.setdefault(var_name, {})[decay] = None
+        self._grid_adstock = self.adstock_grid(df, decays_by_var)
+    
+    def clear_grid(self) -> None:
+        self._grid_frame = None
+        self._grid_columns = {}
+        self._grid_adstock = {}
+    
+    def grid_matrix(self, df: pd.DataFrame, combo_config: Dict[str, Dict[str, Any]], columns: List[str]) -> np.ndarray:
+        """
+        Design matrix of ``columns`` for one combination, built straight from
+        the cached transformed columns (raw values for untransformed columns).
+        """
+        arrays = []
+        for column in columns:
+            config = combo_config.get(column)
+            if config is not None and df is self._grid_frame:
+                arrays.append(self._grid_transform(df, column, config)[0])
+            elif config is not None:
+                arrays.append(self._transform_variable(df[column].values, config)[0])
+            else:
+                arrays.append(df[column].values)
+        return np.column_stack(arrays)
+    
+    def _grid_transform(self, df: pd.DataFrame, var_name: str, config: Dict[str, Any]):
+        key = (var_name, repr(sorted(config.items())))
+        cached = self._grid_columns.get(key)
+        if cached is None:
+            adstock = None
+            if config.get("type") == "media":
+                adstock = self._grid_adstock.get((var_name, self._first(config.get("adstock_decay", 0.5))))
+            cached = self._transform_variable(df[var_name].values, config, adstock=adstock)
+            self._grid_columns[key] = cached
+        return cached
+    
     def apply_logistic_transform(self, x: np.ndarray, growth_rate: float, midpoint: float, carryover: float) -> np.ndarray:
         """
         Apply logistic transformation (S-curve)
@@ -397,179 +509,202 @@ class MMMTransformationEngine:
         Returns:
             Tuple of (transformed_dataframe, transformation_metadata, updated_variable_configs_with_actual_params)
         """
-        transformed_df = df.copy()
+        columns = {}
         transformation_metadata = {}
         # Create a copy of variable_configs to store actual parameters used
         updated_variable_configs = variable_configs.copy()
+        use_grid = df is self._grid_frame
         
         for var_name, config in variable_configs.items():
             if var_name not in df.columns:
                 logger.warning(f"Variable {var_name} not found in DataFrame")
                 continue
             
-            var_type = config.get("type", "none")
-            original_data = df[var_name].values
-            
-
-            
-            # Store original statistics
-            var_metadata = {
-                "original_mean": float(original_data.mean()),
-                "original_std": float(original_data.std()),
-                "original_min": float(original_data.min()),
-                "original_max": float(original_data.max()),
-                "transformation_steps": [],
-                "final_mean": 0.0,
-                "final_std": 0.0,
-                "final_min": 0.0,
-                "final_max": 0.0,
-                # Store intermediate values for media elasticity calculation
-                "adstock_std": 0.0,  # σ_A: std after adstock
-                "logistic_mean": 0.0,  # L_t: mean after adstock→standard→logistic
-                "logistic_max": 0.0,  # L_max: max after adstock→standard→logistic
-                "logistic_min": 0.0   # L_min: min after adstock→standard→logistic
-            }
-            
-            current_data = original_data.copy()
-            
-            if var_type == "media":
-                # Media transformation pipeline: Adstock -> Standard -> Logistic -> MinMax
-                
-                # Step 1: Adstock transformation
-                adstock_decay = config.get("adstock_decay", 0.5)
-                # Handle both single values and lists (take first value if list)
-                if isinstance(adstock_decay, list):
-                    adstock_decay = adstock_decay[0]
-                current_data = self.apply_adstock_transform(current_data, adstock_decay)
-                # Store σ_A: standard deviation after adstock transformation
-                var_metadata["adstock_std"] = float(current_data.std())
-                var_metadata["transformation_steps"].append({
-                    "step": "adstock",
-                    "decay_rate": adstock_decay,
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Step 2: Standardization
-                current_data, standard_scaler = self.apply_standardization(current_data)
-                var_metadata["transformation_steps"].append({
-                    "step": "standardization",
-                    "scaler_mean": float(standard_scaler.mean_[0]),
-                    "scaler_scale": float(standard_scaler.scale_[0]),
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Step 3: Logistic transformation
-                logistic_growth = config.get("logistic_growth", 2.0)
-                logistic_midpoint = config.get("logistic_midpoint", 0.0)
-                logistic_carryover = config.get("logistic_carryover", 0.0)
-                
-                # Handle both single values and lists (take first value if list)
-                if isinstance(logistic_growth, list):
-                    logistic_growth = logistic_growth[0]
-                if isinstance(logistic_midpoint, list):
-                    logistic_midpoint = logistic_midpoint[0]
-                if isinstance(logistic_carryover, list):
-                    logistic_carryover = logistic_carryover[0]
-                
-                current_data = self.apply_logistic_transform(current_data, logistic_growth, logistic_midpoint, logistic_carryover)
-                # Store L_t, L_max, L_min: values after adstock→standard→logistic (BEFORE MinMax)
-                var_metadata["logistic_mean"] = float(current_data.mean())  # L_t
-                var_metadata["logistic_max"] = float(current_data.max())    # L_max
-                var_metadata["logistic_min"] = float(current_data.min())    # L_min
-                var_metadata["transformation_steps"].append({
-                    "step": "logistic",
-                    "growth_rate": logistic_growth,
-                    "midpoint": logistic_midpoint,
-                    "carryover": logistic_carryover,
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Step 4: MinMax scaling
-                current_data, minmax_scaler = self.apply_minmax_scaling(current_data)
-                var_metadata["transformation_steps"].append({
-                    "step": "minmax",
-                    "scaler_min": float(minmax_scaler.data_min_[0]),
-                    "scaler_scale": float(minmax_scaler.scale_[0]),
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Update variable_configs with actual parameters used for this transformation
-                updated_variable_configs[var_name] = {
-                    "type": "media",
-                    "adstock_decay": adstock_decay,
-                    "logistic_growth": logistic_growth,
-                    "logistic_midpoint": logistic_midpoint,
-                    "logistic_carryover": logistic_carryover,
-                    "standardization_mean": float(standard_scaler.mean_[0]),
-                    "standardization_scale": float(standard_scaler.scale_[0]),
-                    "minmax_min": float(minmax_scaler.data_min_[0]),
-                    "minmax_scale": float(minmax_scaler.scale_[0])
-                }
-                
-            elif var_type == "standard":
-                # Only StandardScaler
-                current_data, standard_scaler = self.apply_standardization(current_data)
-                var_metadata["transformation_steps"].append({
-                    "step": "standardization",
-                    "scaler_mean": float(standard_scaler.mean_[0]),
-                    "scaler_scale": float(standard_scaler.scale_[0]),
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Update variable_configs with actual parameters used for this transformation
-                updated_variable_configs[var_name] = {
-                    "type": "standard",
-                    "standardization_mean": float(standard_scaler.mean_[0]),
-                    "standardization_scale": float(standard_scaler.scale_[0])
-                }
-                
-            elif var_type == "minmax":
-                # Only MinMaxScaler
-                current_data, minmax_scaler = self.apply_minmax_scaling(current_data)
-                var_metadata["transformation_steps"].append({
-                    "step": "minmax",
-                    "scaler_min": float(minmax_scaler.data_min_[0]),
-                    "scaler_scale": float(minmax_scaler.scale_[0]),
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Update variable_configs with actual parameters used for this transformation
-                updated_variable_configs[var_name] = {
-                    "type": "minmax",
-                    "minmax_min": float(minmax_scaler.data_min_[0]),
-                    "minmax_scale": float(minmax_scaler.scale_[0])
-                }
-                
-            else:  # "none"
-                # No transformation
-                var_metadata["transformation_steps"].append({
-                    "step": "none",
-                    "mean": float(current_data.mean()),
-                    "std": float(current_data.std())
-                })
-                
-                # Update variable_configs with actual parameters used for this transformation
-                updated_variable_configs[var_name] = {
-                    "type": "none"
-                }
-            
-            # Update final statistics
-            var_metadata["final_mean"] = float(current_data.mean())
-            var_metadata["final_std"] = float(current_data.std())
-            var_metadata["final_min"] = float(current_data.min())
-            var_metadata["final_max"] = float(current_data.max())
+            if use_grid:
+                current_data, var_metadata, updated_config = self._grid_transform(df, var_name, config)
+                current_data = current_data.copy()
+                var_metadata = copy.deepcopy(var_metadata)
+                updated_config = dict(updated_config)
+            else:
+                current_data, var_metadata, updated_config = self._transform_variable(df[var_name].values, config)
             
             # Update DataFrame
-            transformed_df[var_name] = current_data
+            columns[var_name] = current_data
             transformation_metadata[var_name] = var_metadata
+            updated_variable_configs[var_name] = updated_config
+        
+        transformed_df = df.copy()
+        for var_name, current_data in columns.items():
+            transformed_df[var_name] = current_data
         
         return transformed_df, transformation_metadata, updated_variable_configs
+    
+    def _transform_variable(self, original_data: np.ndarray, config: Dict[str, Any], adstock: Optional[np.ndarray] = None):
+        """
+        Transform one variable according to its config
+        
+        ``adstock`` is the precomputed adstock series of a media variable, if
+        the caller already has it. Returns (transformed_values, metadata,
+        updated_config).
+        """
+        var_type = config.get("type", "none")
+        
+        # Store original statistics
+        var_metadata = {
+            "original_mean": float(original_data.mean()),
+            "original_std": float(original_data.std()),
+            "original_min": float(original_data.min()),
+            "original_max": float(original_data.max()),
+            "transformation_steps": [],
+            "final_mean": 0.0,
+            "final_std": 0.0,
+            "final_min": 0.0,
+            "final_max": 0.0,
+            # Store intermediate values for media elasticity calculation
+            "adstock_std": 0.0,  # σ_A: std after adstock
+            "logistic_mean": 0.0,  # L_t: mean after adstock→standard→logistic
+            "logistic_max": 0.0,  # L_max: max after adstock→standard→logistic
+            "logistic_min": 0.0   # L_min: min after adstock→standard→logistic
+        }
+
+        current_data = original_data.copy()
+
+        if var_type == "media":
+            # Media transformation pipeline: Adstock -> Standard -> Logistic -> MinMax
+
+            # Step 1: Adstock transformation
+            adstock_decay = config.get("adstock_decay", 0.5)
+            # Handle both single values and lists (take first value if list)
+            if isinstance(adstock_decay, list):
+                adstock_decay = adstock_decay[0]
+            if adstock is None:
+                adstock = self.apply_adstock_transform(current_data, adstock_decay)
+            current_data = adstock
+            # Store σ_A: standard deviation after adstock transformation
+            var_metadata["adstock_std"] = float(current_data.std())
+            var_metadata["transformation_steps"].append({
+                "step": "adstock",
+                "decay_rate": adstock_decay,
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Step 2: Standardization
+            current_data, standard_scaler = self.apply_standardization(current_data)
+            var_metadata["transformation_steps"].append({
+                "step": "standardization",
+                "scaler_mean": float(standard_scaler.mean_[0]),
+                "scaler_scale": float(standard_scaler.scale_[0]),
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Step 3: Logistic transformation
+            logistic_growth = config.get("logistic_growth", 2.0)
+            logistic_midpoint = config.get("logistic_midpoint", 0.0)
+            logistic_carryover = config.get("logistic_carryover", 0.0)
+
+            # Handle both single values and lists (take first value if list)
+            if isinstance(logistic_growth, list):
+                logistic_growth = logistic_growth[0]
+            if isinstance(logistic_midpoint, list):
+                logistic_midpoint = logistic_midpoint[0]
+            if isinstance(logistic_carryover, list):
+                logistic_carryover = logistic_carryover[0]
+
+            current_data = self.apply_logistic_transform(current_data, logistic_growth, logistic_midpoint, logistic_carryover)
+            # Store L_t, L_max, L_min: values after adstock→standard→logistic (BEFORE MinMax)
+            var_metadata["logistic_mean"] = float(current_data.mean())  # L_t
+            var_metadata["logistic_max"] = float(current_data.max())    # L_max
+            var_metadata["logistic_min"] = float(current_data.min())    # L_min
+            var_metadata["transformation_steps"].append({
+                "step": "logistic",
+                "growth_rate": logistic_growth,
+                "midpoint": logistic_midpoint,
+                "carryover": logistic_carryover,
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Step 4: MinMax scaling
+            current_data, minmax_scaler = self.apply_minmax_scaling(current_data)
+            var_metadata["transformation_steps"].append({
+                "step": "minmax",
+                "scaler_min": float(minmax_scaler.data_min_[0]),
+                "scaler_scale": float(minmax_scaler.scale_[0]),
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Update variable_configs with actual parameters used for this transformation
+            updated_config = {
+                "type": "media",
+                "adstock_decay": adstock_decay,
+                "logistic_growth": logistic_growth,
+                "logistic_midpoint": logistic_midpoint,
+                "logistic_carryover": logistic_carryover,
+                "standardization_mean": float(standard_scaler.mean_[0]),
+                "standardization_scale": float(standard_scaler.scale_[0]),
+                "minmax_min": float(minmax_scaler.data_min_[0]),
+                "minmax_scale": float(minmax_scaler.scale_[0])
+            }
+
+        elif var_type == "standard":
+            # Only StandardScaler
+            current_data, standard_scaler = self.apply_standardization(current_data)
+            var_metadata["transformation_steps"].append({
+                "step": "standardization",
+                "scaler_mean": float(standard_scaler.mean_[0]),
+                "scaler_scale": float(standard_scaler.scale_[0]),
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Update variable_configs with actual parameters used for this transformation
+            updated_config = {
+                "type": "standard",
+                "standardization_mean": float(standard_scaler.mean_[0]),
+                "standardization_scale": float(standard_scaler.scale_[0])
+            }
+
+        elif var_type == "minmax":
+            # Only MinMaxScaler
+            current_data, minmax_scaler = self.apply_minmax_scaling(current_data)
+            var_metadata["transformation_steps"].append({
+                "step": "minmax",
+                "scaler_min": float(minmax_scaler.data_min_[0]),
+                "scaler_scale": float(minmax_scaler.scale_[0]),
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Update variable_configs with actual parameters used for this transformation
+            updated_config = {
+                "type": "minmax",
+                "minmax_min": float(minmax_scaler.data_min_[0]),
+                "minmax_scale": float(minmax_scaler.scale_[0])
+            }
+
+        else:  # "none"
+            # No transformation
+            var_metadata["transformation_steps"].append({
+                "step": "none",
+                "mean": float(current_data.mean()),
+                "std": float(current_data.std())
+            })
+
+            # Update variable_configs with actual parameters used for this transformation
+            updated_config = {
+                "type": "none"
+            }
+
+        # Update final statistics
+        var_metadata["final_mean"] = float(current_data.mean())
+        var_metadata["final_std"] = float(current_data.std())
+        var_metadata["final_min"] = float(current_data.min())
+        var_metadata["final_max"] = float(current_data.max())
+        
+        return current_data, var_metadata, updated_config
 
 
 class MMMModelTrainer:
@@ -911,135 +1046,75 @@ class MMMModelTrainer:
         all_model_results = []
         all_variable_stats = []
         
-        for combo_idx, combo_config in enumerate(parameter_combinations):
+        # Every (variable, parameters) pair of the grid is transformed once;
+        # combinations that share it reuse the cached column.
+        self.transformation_engine.prepare_grid(df, parameter_combinations)
+        
+        try:
+            for combo_idx, combo_config in enumerate(parameter_combinations):
   
             
-            # Apply per-variable transformations for this combination
-            transformed_df, transformation_metadata, updated_combo_config = self.transformation_engine.apply_variable_transformations(
-                df, combo_config
-            )
+                # Apply per-variable transformations for this combination
+                transformed_df, transformation_metadata, updated_combo_config = self.transformation_engine.apply_variable_transformations(
+                    df, combo_config
+                )
         
-            # Prepare data for modeling
-            X = transformed_df[x_variables_lower].values
-            y = transformed_df[y_variable_lower].values
+                # Prepare data for modeling
+                X = self.transformation_engine.grid_matrix(df, combo_config, x_variables_lower)
+                y = self.transformation_engine.grid_matrix(df, combo_config, [y_variable_lower])[:, 0]
             
-            # Store original data statistics for elasticity calculation
-            X_original = df[x_variables_lower]
-            y_original = df[y_variable_lower]
+                # Store original data statistics for elasticity calculation
+                X_original = df[x_variables_lower]
+                y_original = df[y_variable_lower]
             
-            # Train/test split
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42, shuffle=True
-            )
+                # Train/test split
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=test_size, random_state=42, shuffle=True
+                )
             
-            # Get models
-            all_models = get_models()
+                # Get models
+                all_models = get_models()
             
-            # Filter models if specified
-            if models_to_run:
-                models_dict = {name: model for name, model in all_models.items() if name in models_to_run}
-            else:
-                models_dict = all_models
+                # Filter models if specified
+                if models_to_run:
+                    models_dict = {name: model for name, model in all_models.items() if name in models_to_run}
+                else:
+                    models_dict = all_models
             
-            # Apply custom configurations and constraints
-            if custom_configs:
-                for model_name, config in custom_configs.items():
-                    if model_name in models_dict:
-                        parameters = config.get('parameters', {})
-                        tuning_mode = config.get('tuning_mode', 'manual')
+                # Apply custom configurations and constraints
+                if custom_configs:
+                    for model_name, config in custom_configs.items():
+                        if model_name in models_dict:
+                            parameters = config.get('parameters', {})
+                            tuning_mode = config.get('tuning_mode', 'manual')
                         
-                        # Handle CV models and constrained models - use same approach as database.py
-                        if model_name == "Ridge Regression" and tuning_mode == 'auto':
-                            # Use RidgeCV for automatic alpha tuning with reasonable alpha range
-                            alphas = np.logspace(-2, 3, 50)  # 0.0001 to 10000 (reasonable range)
-                            models_dict[model_name] = RidgeCV(alphas=alphas, cv=k_folds)
-                            
-                        elif model_name == "Lasso Regression" and tuning_mode == 'auto':
-                            # Use LassoCV for automatic alpha tuning with reasonable alpha range
-                            alphas = np.logspace(-3, 2, 50)  # 0.0001 to 10 (reasonable range for Lasso)
-                            models_dict[model_name] = LassoCV(alphas=alphas, cv=k_folds, random_state=42)
-                            
-                        elif model_name == "ElasticNet Regression" and tuning_mode == 'auto':
-                            # Use ElasticNetCV for automatic alpha and l1_ratio tuning with reasonable ranges
-                            alphas = np.logspace(-3, 2, 50)  # 0.0001 to 10 (reasonable range for ElasticNet)
-                            l1_ratios = np.linspace(0.1, 0.9, 9)  # Default l1_ratio range
-                            models_dict[model_name] = ElasticNetCV(
-                                alphas=alphas, l1_ratio=l1_ratios, cv=k_folds, random_state=42
-                            )
-                            
-                        elif model_name == "Custom Constrained Ridge":
-                            # Extract constraints from parameters object - handle both old and new formats
-                            variable_constraints = parameters.get('variable_constraints', [])
+                            # Handle CV models and constrained models - use same approach as database.py
+                            if model_name == "Ridge Regression" and tuning_mode == 'auto':
+                                # Use RidgeCV for automatic alpha tuning with reasonable alpha range
+                                alphas = np.logspace(-2, 3, 50)  # 0.0001 to 10000 (reasonable range)
+                                models_dict[model_name] = RidgeCV(alphas=alphas, cv=k_folds)
                             
-                            # Convert new format to old format for compatibility
-                            negative_constraints = []
-                            positive_constraints = []
+                            elif model_name == "Lasso Regression" and tuning_mode == 'auto':
+                                # Use LassoCV for automatic alpha tuning with reasonable alpha range
+                                alphas = np.logspace(-3, 2, 50)  # 0.0001 to 10 (reasonable range for Lasso)
+                                models_dict[model_name] = LassoCV(alphas=alphas, cv=k_folds, random_state=42)
                             
-                            if variable_constraints:
-                                for constraint in variable_constraints:
-                                    if constraint.get('constraint_type') == 'negative':
-                                        negative_constraints.append(constraint.get('variable_name'))
-                                    elif constraint.get('constraint_type') == 'positive':
-                                        positive_constraints.append(constraint.get('variable_name'))
-                            else:
-                                # Fallback to old format if new format not available
-                                negative_constraints = parameters.get('negative_constraints', [])
-                                positive_constraints = parameters.get('positive_constraints', [])
-                            
-                            # Check if we should use auto-tuning for l2_penalty
-                            if tuning_mode == 'auto':
-                                # First run RidgeCV to find optimal alpha, then use it as l2_penalty
-                                logger.info(f"🔧 {model_name} - Auto tuning: Running RidgeCV to find optimal l2_penalty")
-                                alphas = np.logspace(-2, 3, 50)  # Same range as Ridge Regression
-                                ridge_cv = RidgeCV(alphas=alphas, cv=k_folds)
-                                ridge_cv.fit(X_train, y_train)
-                                optimal_l2_penalty = ridge_cv.alpha_
-                                logger.info(f"🎯 {model_name} - Optimal l2_penalty from RidgeCV: {optimal_l2_penalty:.6f}")
-                                
-                                models_dict[model_name] = CustomConstrainedRidge(
-                                    l2_penalty=optimal_l2_penalty,
-                                    learning_rate=parameters.get('learning_rate', 0.001),
-                                    iterations=parameters.get('iterations', 10000),
-                                    adam=parameters.get('adam', False),
-                                    negative_constraints=negative_constraints,
-                                    positive_constraints=positive_constraints
-                                )
-                            else:
-                                # Manual tuning - use provided l2_penalty
-                                l2_penalty = parameters.get('l2_penalty', 0.1)
-                                logger.info(f"🔧 {model_name} - Manual tuning with l2_penalty: {l2_penalty}")
-                                models_dict[model_name] = CustomConstrainedRidge(
-                                    l2_penalty=float(l2_penalty),
-                                    learning_rate=parameters.get('learning_rate', 0.001),
-                                    iterations=parameters.get('iterations', 10000),
-                                    adam=parameters.get('adam', False),
-                                    negative_constraints=negative_constraints,
-                                    positive_constraints=positive_constraints
+                            elif model_name == "ElasticNet Regression" and tuning_mode == 'auto':
+                                # Use ElasticNetCV for automatic alpha and l1_ratio tuning with reasonable ranges
+                                alphas = np.logspace(-3, 2, 50)  # 0.0001 to 10 (reasonable range for ElasticNet)
+                                l1_ratios = np.linspace(0.1, 0.9, 9)  # Default l1_ratio range
+                                models_dict[model_name] = ElasticNetCV(
+                                    alphas=alphas, l1_ratio=l1_ratios, cv=k_folds, random_state=42
                                 )
-                        else:
-                            # Manual parameter tuning - use provided parameters (same as database.py)
-                            if model_name == "Ridge Regression":
-                                alpha = parameters.get('Alpha', 1.0)
-                                logger.info(f"🔧 {model_name} - Manual tuning with alpha: {alpha}")
-                                models_dict[model_name] = Ridge(alpha=float(alpha))
-                            elif model_name == "Lasso Regression":
-                                alpha = parameters.get('Alpha', 1.0)
-                                logger.info(f"🔧 {model_name} - Manual tuning with alpha: {alpha}")
-                                models_dict[model_name] = Lasso(alpha=float(alpha), random_state=42)
-                            elif model_name == "ElasticNet Regression":
-                                alpha = parameters.get('Alpha', 1.0)
-                                l1_ratio = parameters.get('L1_ratio', 0.5)
-                                logger.info(f"🔧 {model_name} - Manual tuning with alpha: {alpha}, l1_ratio: {l1_ratio}")
-                                models_dict[model_name] = ElasticNet(alpha=float(alpha), l1_ratio=float(l1_ratio), random_state=42)
-                        
-                            elif model_name == "Constrained Linear Regression":
+                            
+                            elif model_name == "Custom Constrained Ridge":
                                 # Extract constraints from parameters object - handle both old and new formats
                                 variable_constraints = parameters.get('variable_constraints', [])
-                                
+                            
                                 # Convert new format to old format for compatibility
                                 negative_constraints = []
                                 positive_constraints = []
-                                
+                            
                                 if variable_constraints:
                                     for constraint in variable_constraints:
                                         if constraint.get('constraint_type') == 'negative':
@@ -1050,304 +1125,371 @@ class MMMModelTrainer:
                                     # Fallback to old format if new format not available
                                     negative_constraints = parameters.get('negative_constraints', [])
                                     positive_constraints = parameters.get('positive_constraints', [])
+                            
+                                # Check if we should use auto-tuning for l2_penalty
+                                if tuning_mode == 'auto':
+                                    # First run RidgeCV to find optimal alpha, then use it as l2_penalty
+                                    logger.info(f"🔧 {model_name} - Auto tuning: Running RidgeCV to find optimal l2_penalty")
+                                    alphas = np.logspace(-2, 3, 50)  # Same range as Ridge Regression
+                                    ridge_cv = RidgeCV(alphas=alphas, cv=k_folds)
+                                    ridge_cv.fit(X_train, y_train)
+                                    optimal_l2_penalty = ridge_cv.alpha_
+                                    logger.info(f"🎯 {model_name} - Optimal l2_penalty from RidgeCV: {optimal_l2_penalty:.6f}")
                                 
-                                logger.info(f"🔍 MMM Constrained Linear Regression - Negative constraints: {negative_constraints}")
-                                logger.info(f"🔍 MMM Constrained Linear Regression - Positive constraints: {positive_constraints}")
+                                    models_dict[model_name] = CustomConstrainedRidge(
+                                        l2_penalty=optimal_l2_penalty,
+                                        learning_rate=parameters.get('learning_rate', 0.001),
+                                        iterations=parameters.get('iterations', 10000),
+                                        adam=parameters.get('adam', False),
+                                        negative_constraints=negative_constraints,
+                                        positive_constraints=positive_constraints
+                                    )
+                                else:
+                                    # Manual tuning - use provided l2_penalty
+                                    l2_penalty = parameters.get('l2_penalty', 0.1)
+                                    logger.info(f"🔧 {model_name} - Manual tuning with l2_penalty: {l2_penalty}")
+                                    models_dict[model_name] = CustomConstrainedRidge(
+                                        l2_penalty=float(l2_penalty),
+                                        learning_rate=parameters.get('learning_rate', 0.001),
+                                        iterations=parameters.get('iterations', 10000),
+                                        adam=parameters.get('adam', False),
+                                        negative_constraints=negative_constraints,
+                                        positive_constraints=positive_constraints
+                                    )
+                            else:
+                                # Manual parameter tuning - use provided parameters (same as database.py)
+                                if model_name == "Ridge Regression":
+                                    alpha = parameters.get('Alpha', 1.0)
+                                    logger.info(f"🔧 {model_name} - Manual tuning with alpha: {alpha}")
+                                    models_dict[model_name] = Ridge(alpha=float(alpha))
+                                elif model_name == "Lasso Regression":
+                                    alpha = parameters.get('Alpha', 1.0)
+                                    logger.info(f"🔧 {model_name} - Manual tuning with alpha: {alpha}")
+                                    models_dict[model_name] = Lasso(alpha=float(alpha), random_state=42)
+                                elif model_name == "ElasticNet Regression":
+                                    alpha = parameters.get('Alpha', 1.0)
+                                    l1_ratio = parameters.get('L1_ratio', 0.5)
+                                    logger.info(f"🔧 {model_name} - Manual tuning with alpha: {alpha}, l1_ratio: {l1_ratio}")
+                                    models_dict[model_name] = ElasticNet(alpha=float(alpha), l1_ratio=float(l1_ratio), random_state=42)
+                        
+                                elif model_name == "Constrained Linear Regression":
+                                    # Extract constraints from parameters object - handle both old and new formats
+                                    variable_constraints = parameters.get('variable_constraints', [])
                                 
-                                models_dict[model_name] = ConstrainedLinearRegression(
-                                    learning_rate=parameters.get('learning_rate', 0.001),
-                                    iterations=parameters.get('iterations', 10000),
-                                    adam=parameters.get('adam', False),
-                                    negative_constraints=negative_constraints,
-                                    positive_constraints=positive_constraints
-                                )
+                                    # Convert new format to old format for compatibility
+                                    negative_constraints = []
+                                    positive_constraints = []
+                                
+                                    if variable_constraints:
+                                        for constraint in variable_constraints:
+                                            if constraint.get('constraint_type') == 'negative':
+                                                negative_constraints.append(constraint.get('variable_name'))
+                                            elif constraint.get('constraint_type') == 'positive':
+                                                positive_constraints.append(constraint.get('variable_name'))
+                                    else:
+                                        # Fallback to old format if new format not available
+                                        negative_constraints = parameters.get('negative_constraints', [])
+                                        positive_constraints = parameters.get('positive_constraints', [])
+                                
+                                    logger.info(f"🔍 MMM Constrained Linear Regression - Negative constraints: {negative_constraints}")
+                                    logger.info(f"🔍 MMM Constrained Linear Regression - Positive constraints: {positive_constraints}")
+                                
+                                    models_dict[model_name] = ConstrainedLinearRegression(
+                                        learning_rate=parameters.get('learning_rate', 0.001),
+                                        iterations=parameters.get('iterations', 10000),
+                                        adam=parameters.get('adam', False),
+                                        negative_constraints=negative_constraints,
+                                        positive_constraints=positive_constraints
+                                    )
             
-            # Train models for this combination
-            model_results = []
+                # Train models for this combination
+                model_results = []
             
-            for model_name, model in models_dict.items():
-                logger.info(f"Training model: {model_name}")
+                for model_name, model in models_dict.items():
+                    logger.info(f"Training model: {model_name}")
                 
-                try:
-                    # Train model
-                    if hasattr(model, 'fit'):
-                        if model_name in ["Custom Constrained Ridge", "Constrained Linear Regression"]:
-                            model.fit(X_train, y_train, feature_names=x_variables_lower)
-                        else:
-                            model.fit(X_train, y_train)
+                    try:
+                        # Train model
+                        if hasattr(model, 'fit'):
+                            if model_name in ["Custom Constrained Ridge", "Constrained Linear Regression"]:
+                                model.fit(X_train, y_train, feature_names=x_variables_lower)
+                            else:
+                                model.fit(X_train, y_train)
                     
-                    # Make predictions
-                    y_train_pred = model.predict(X_train)
-                    y_test_pred = model.predict(X_test)
+                        # Make predictions
+                        y_train_pred = model.predict(X_train)
+                        y_test_pred = model.predict(X_test)
                     
-                    # Calculate metrics
-                    mape_train = safe_mape(y_train, y_train_pred)
-                    mape_test = safe_mape(y_test, y_test_pred)
-                    r2_train = r2_score(y_train, y_train_pred)
-                    r2_test = r2_score(y_test, y_test_pred)
+                        # Calculate metrics
+                        mape_train = safe_mape(y_train, y_train_pred)
+                        mape_test = safe_mape(y_test, y_test_pred)
+                        r2_train = r2_score(y_train, y_train_pred)
+                        r2_test = r2_score(y_test, y_test_pred)
                     
-                    # Get coefficients
-                    coefficients = {}
-                    unstandardized_coefficients = {}
-                    intercept = model.intercept_ if hasattr(model, 'intercept_') else 0.0
+                        # Get coefficients
+                        coefficients = {}
+                        unstandardized_coefficients = {}
+                        intercept = model.intercept_ if hasattr(model, 'intercept_') else 0.0
                     
-                    # Initialize intercept destandardization components
-                    unstandardized_intercept = intercept
-                    y_mean = y_original.mean()
-                    intercept_adjustment = 0.0
+                        # Initialize intercept destandardization components
+                        unstandardized_intercept = intercept
+                        y_mean = y_original.mean()
+                        intercept_adjustment = 0.0
                     
-                    if hasattr(model, 'coef_'):
+                        if hasattr(model, 'coef_'):
     
-                        for i, var in enumerate(x_variables_lower):
-                            coefficients[f"Beta_{var}"] = float(model.coef_[i])
+                            for i, var in enumerate(x_variables_lower):
+                                coefficients[f"Beta_{var}"] = float(model.coef_[i])
     
                             
-                            # Attempt back-transformation based on transformation type
-                            var_config = combo_config.get(var, {})
-                            var_type = var_config.get("type", "none")
+                                # Attempt back-transformation based on transformation type
+                                var_config = combo_config.get(var, {})
+                                var_type = var_config.get("type", "none")
                             
-                            if var_type == "media":
-                                # For media variables, back-transformation is complex
-                                # We'll use the coefficient as-is for now
-                                unstandardized_coef = float(model.coef_[i])
-                                unstandardized_coefficients[f"Beta_{var}"] = unstandardized_coef
+                                if var_type == "media":
+                                    # For media variables, back-transformation is complex
+                                    # We'll use the coefficient as-is for now
+                                    unstandardized_coef = float(model.coef_[i])
+                                    unstandardized_coefficients[f"Beta_{var}"] = unstandardized_coef
                                 
-                            elif var_type == "standard":
-                                # Back-transform from standardization
-                                transform_meta = transformation_metadata[var]
-                                if transform_meta["original_std"] != 0:
-                                    unstandardized_coef = model.coef_[i] / transform_meta["original_std"]
-                                else:
-                                    unstandardized_coef = model.coef_[i]
-                                unstandardized_coefficients[f"Beta_{var}"] = float(unstandardized_coef)
+                                elif var_type == "standard":
+                                    # Back-transform from standardization
+                                    transform_meta = transformation_metadata[var]
+                                    if transform_meta["original_std"] != 0:
+                                        unstandardized_coef = model.coef_[i] / transform_meta["original_std"]
+                                    else:
+                                        unstandardized_coef = model.coef_[i]
+                                    unstandardized_coefficients[f"Beta_{var}"] = float(unstandardized_coef)
                                 
-                                # Accumulate intercept adjustment for standard transformation
-                                intercept_adjustment += unstandardized_coef * X_original[var].mean()
+                                    # Accumulate intercept adjustment for standard transformation
+                                    intercept_adjustment += unstandardized_coef * X_original[var].mean()
                                 
-                            elif var_type == "minmax":
-                                # Back-transform from minmax
-                                transform_meta = transformation_metadata[var]
-                                original_range = transform_meta["original_max"] - transform_meta["original_min"]
-                                if original_range != 0:
-                                    unstandardized_coef = model.coef_[i] / original_range
-                                else:
-                                    unstandardized_coef = model.coef_[i]
-                                unstandardized_coefficients[f"Beta_{var}"] = float(unstandardized_coef)
+                                elif var_type == "minmax":
+                                    # Back-transform from minmax
+                                    transform_meta = transformation_metadata[var]
+                                    original_range = transform_meta["original_max"] - transform_meta["original_min"]
+                                    if original_range != 0:
+                                        unstandardized_coef = model.coef_[i] / original_range
+                                    else:
+                                        unstandardized_coef = model.coef_[i]
+                                    unstandardized_coefficients[f"Beta_{var}"] = float(unstandardized_coef)
                                 
-                                # Accumulate intercept adjustment for minmax transformation
-                                intercept_adjustment += unstandardized_coef * X_original[var].min()
+                                    # Accumulate intercept adjustment for minmax transformation
+                                    intercept_adjustment += unstandardized_coef * X_original[var].min()
                                 
-                            else:  # "none"
-                                unstandardized_coefficients[f"Beta_{var}"] = float(model.coef_[i])
+                                else:  # "none"
+                                    unstandardized_coefficients[f"Beta_{var}"] = float(model.coef_[i])
                     
-                    # Apply intercept destandardization based on transformation types
-                    has_standardized_vars = any(
-                        combo_config.get(var, {}).get("type") == "standard" 
-                        for var in x_variables_lower
-                    )
-                    has_minmax_vars = any(
-                        combo_config.get(var, {}).get("type") == "minmax" 
-                        for var in x_variables_lower
-                    )
+                        # Apply intercept destandardization based on transformation types
+                        has_standardized_vars = any(
+                            combo_config.get(var, {}).get("type") == "standard" 
+                            for var in x_variables_lower
+                        )
+                        has_minmax_vars = any(
+                            combo_config.get(var, {}).get("type") == "minmax" 
+                            for var in x_variables_lower
+                        )
                     
-                    if has_standardized_vars:
-                        # For standard transformation: intercept = intercept - sum(beta_i * x_mean_i)
-                        unstandardized_intercept = intercept - intercept_adjustment
-                    elif has_minmax_vars:
-                        unstandardized_intercept = intercept - intercept_adjustment
-                    # For "none" or "media" transformations, intercept remains as-is
+                        if has_standardized_vars:
+                            # For standard transformation: intercept = intercept - sum(beta_i * x_mean_i)
+                            unstandardized_intercept = intercept - intercept_adjustment
+                        elif has_minmax_vars:
+                            unstandardized_intercept = intercept - intercept_adjustment
+                        # For "none" or "media" transformations, intercept remains as-is
                     
 
-                    # logger.info(f"Unstandardized coefficients: {unstandardized_coefficients}")
-                    # logger.info(f"standardized coefficients: {coefficients}")
-                    # Calculate AIC and BIC
-                    n_samples = len(y_train)
-                    n_params = len(x_variables_lower) + 1  # +1 for intercept
-                    mse = np.mean((y_test - y_test_pred) ** 2)
+                        # logger.info(f"Unstandardized coefficients: {unstandardized_coefficients}")
+                        # logger.info(f"standardized coefficients: {coefficients}")
+                        # Calculate AIC and BIC
+                        n_samples = len(y_train)
+                        n_params = len(x_variables_lower) + 1  # +1 for intercept
+                        mse = np.mean((y_test - y_test_pred) ** 2)
                     
-                    # AIC = 2k - 2ln(L), where k = number of parameters, L = likelihood
-                    # For linear regression: AIC = n*ln(mse) + 2k
-                    aic = n_samples * np.log(mse) + 2 * n_params
+                        # AIC = 2k - 2ln(L), where k = number of parameters, L = likelihood
+                        # For linear regression: AIC = n*ln(mse) + 2k
+                        aic = n_samples * np.log(mse) + 2 * n_params
                     
-                    # BIC = n*ln(mse) + k*ln(n)
-                    bic = n_samples * np.log(mse) + n_params * np.log(n_samples)
+                        # BIC = n*ln(mse) + k*ln(n)
+                        bic = n_samples * np.log(mse) + n_params * np.log(n_samples)
                     
-                    # Calculate elasticities and contributions
-                    elasticities = {}
-                    contributions = {}
+                        # Calculate elasticities and contributions
+                        elasticities = {}
+                        contributions = {}
                     
-                    if price_column and price_column.lower() in x_variables_lower:
-                        # Calculate price elasticity
-                        price_idx = x_variables_lower.index(price_column.lower())
-                        price_coef = unstandardized_coefficients.get(f"Beta_{price_column.lower()}", 0)
-                        price_mean = X_original[price_column.lower()].mean()
-                        y_mean = y_original.mean()
+                        if price_column and price_column.lower() in x_variables_lower:
+                            # Calculate price elasticity
+                            price_idx = x_variables_lower.index(price_column.lower())
+                            price_coef = unstandardized_coefficients.get(f"Beta_{price_column.lower()}", 0)
+                            price_mean = X_original[price_column.lower()].mean()
+                            y_mean = y_original.mean()
                         
-                        if y_mean != 0 and price_mean != 0:
-                            price_elasticity = (price_coef * price_mean) / y_mean
+                            if y_mean != 0 and price_mean != 0:
+                                price_elasticity = (price_coef * price_mean) / y_mean
+                            else:
+                                price_elasticity = 0
                         else:
-                            price_elasticity = 0
-                    else:
-                        price_elasticity = None
+                            price_elasticity = None
                     
-                    # Calculate elasticities for all variables
-                    for var in x_variables_lower:
-                        var_config = combo_config.get(var, {})
-                        var_type = var_config.get("type", "none")
+                        # Calculate elasticities for all variables
+                        for var in x_variables_lower:
+                            var_config = combo_config.get(var, {})
+                            var_type = var_config.get("type", "none")
                         
-                        if var_type == "media":
-                            # For media variables, calculate original beta using the transformation formula
-                            original_beta = self.transformation_engine._calculate_original_beta_for_media(
-                                transformed_beta=unstandardized_coefficients.get(f"Beta_{var}", 0),
-                                var=var,
-                                combo_config=combo_config,
-                                transformation_metadata=transformation_metadata,
-                                X_transformed=transformed_df
-                            )
-                            var_mean = X_original[var].mean()
-                            y_mean = y_original.mean()
-                            adstock_decay = combo_config.get(var, {}).get('adstock_decay', 0.5)
+                            if var_type == "media":
+                                # For media variables, calculate original beta using the transformation formula
+                                original_beta = self.transformation_engine._calculate_original_beta_for_media(
+                                    transformed_beta=unstandardized_coefficients.get(f"Beta_{var}", 0),
+                                    var=var,
+                                    combo_config=combo_config,
+                                    transformation_metadata=transformation_metadata,
+                                    X_transformed=transformed_df
+                                )
+                                var_mean = X_original[var].mean()
+                                y_mean = y_original.mean()
+                                adstock_decay = combo_config.get(var, {}).get('adstock_decay', 0.5)
 
-                            if isinstance(adstock_decay, list):
-                                adstock_decay = adstock_decay[0]
+                                if isinstance(adstock_decay, list):
+                                    adstock_decay = adstock_decay[0]
                             
-                            if y_mean != 0 and var_mean != 0 and adstock_decay < 1.0:
-                                elasticity = original_beta * (var_mean / y_mean) * (1 / (1 - adstock_decay))
-                            else:
-                                elasticity = 0
+                                if y_mean != 0 and var_mean != 0 and adstock_decay < 1.0:
+                                    elasticity = original_beta * (var_mean / y_mean) * (1 / (1 - adstock_decay))
+                                else:
+                                    elasticity = 0
                             
-                            # For contributions, use transformed beta with transformed mean (consistent scaling)
-                            transformed_mean = transformed_df[var].mean() if var in transformed_df.columns else var_mean
-                            contributions[var] = abs(unstandardized_coefficients.get(f"Beta_{var}", 0) * transformed_mean)
+                                # For contributions, use transformed beta with transformed mean (consistent scaling)
+                                transformed_mean = transformed_df[var].mean() if var in transformed_df.columns else var_mean
+                                contributions[var] = abs(unstandardized_coefficients.get(f"Beta_{var}", 0) * transformed_mean)
                             
-                        else:
-                            # For non-media variables, use the simple approach
-                            var_coef = unstandardized_coefficients.get(f"Beta_{var}", 0)
-                            var_mean = X_original[var].mean()
-                            y_mean = y_original.mean()
-                            
-                            if y_mean != 0 and var_mean != 0:
-                                elasticity = (var_coef * var_mean) / y_mean
                             else:
-                                elasticity = 0
+                                # For non-media variables, use the simple approach
+                                var_coef = unstandardized_coefficients.get(f"Beta_{var}", 0)
+                                var_mean = X_original[var].mean()
+                                y_mean = y_original.mean()
+                            
+                                if y_mean != 0 and var_mean != 0:
+                                    elasticity = (var_coef * var_mean) / y_mean
+                                else:
+                                    elasticity = 0
                             
-                            contributions[var] = abs(var_coef * var_mean)
+                                contributions[var] = abs(var_coef * var_mean)
                         
-                        elasticities[var] = elasticity
+                            elasticities[var] = elasticity
                     
-                    # Normalize contributions
-                    total_contribution = sum(contributions.values())
-                    if total_contribution > 0:
-                        for var in contributions:
-                            contributions[var] = contributions[var] / total_contribution
+                        # Normalize contributions
+                        total_contribution = sum(contributions.values())
+                        if total_contribution > 0:
+                            for var in contributions:
+                                contributions[var] = contributions[var] / total_contribution
                     
-                    # Extract actual parameter values used for this combination
-                    actual_params = {}
-                    for var_name, config in combo_config.items():
-                        if config.get("type") == "media":
-                            actual_params[var_name] = {
-                                "type": "media",
-                                "adstock_decay": config.get("adstock_decay", "N/A"),
-                                "logistic_growth": config.get("logistic_growth", "N/A"),
-                                "logistic_midpoint": config.get("logistic_midpoint", "N/A"),
-                                "logistic_carryover": config.get("logistic_carryover", "N/A")
-                            }
-                        else:
-                            actual_params[var_name] = config
+                        # Extract actual parameter values used for this combination
+                        actual_params = {}
+                        for var_name, config in combo_config.items():
+                            if config.get("type") == "media":
+                                actual_params[var_name] = {
+                                    "type": "media",
+                                    "adstock_decay": config.get("adstock_decay", "N/A"),
+                                    "logistic_growth": config.get("logistic_growth", "N/A"),
+                                    "logistic_midpoint": config.get("logistic_midpoint", "N/A"),
+                                    "logistic_carryover": config.get("logistic_carryover", "N/A")
+                                }
+                            else:
+                                actual_params[var_name] = config
                     
                     
-                    # Calculate ROI for selected features if ROI config is provided
-                    roi_results = {}
-                    if roi_config and combination_name:   
-                        # Apply transformations to FULL dataset first for consistent standardization
-                        transformed_df_full, transformation_metadata, updated_combo_config = self.transformation_engine.apply_variable_transformations(
-                            df, combo_config
-                        )
+                        # Calculate ROI for selected features if ROI config is provided
+                        roi_results = {}
+                        if roi_config and combination_name:   
+                            # Apply transformations to FULL dataset first for consistent standardization
+                            transformed_df_full, transformation_metadata, updated_combo_config = self.transformation_engine.apply_variable_transformations(
+                                df, combo_config
+                            )
  
-                        transformed_df_last_12_months = self._filter_last_12_months(transformed_df_full)
+                            transformed_df_last_12_months = self._filter_last_12_months(transformed_df_full)
                         
-                        df_last_12_months = self._filter_last_12_months(df)
+                            df_last_12_months = self._filter_last_12_months(df)
 
                         
-                        roi_results = self.calculate_roi_for_features(
-                            roi_config=roi_config,
-                            x_variables=x_variables_lower,
-                            unstandardized_coefficients=coefficients,  # Use transformed coefficients
-                            transformed_df=transformed_df_last_12_months,
-                            X_original=df_last_12_months[x_variables_lower],
-                            full_original_df=df_last_12_months,  # Pass the filtered original dataframe
-                            combination_name=combination_name,
-                            price_column=price_column
-                        )
+                            roi_results = self.calculate_roi_for_features(
+                                roi_config=roi_config,
+                                x_variables=x_variables_lower,
+                                unstandardized_coefficients=coefficients,  # Use transformed coefficients
+                                transformed_df=transformed_df_last_12_months,
+                                X_original=df_last_12_months[x_variables_lower],
+                                full_original_df=df_last_12_months,  # Pass the filtered original dataframe
+                                combination_name=combination_name,
+                                price_column=price_column
+                            )
                         
-                        logger.info(f"ROI calculation completed for {model_name} in combination {combination_name}: {len(roi_results)} features processed")
+                            logger.info(f"ROI calculation completed for {model_name} in combination {combination_name}: {len(roi_results)} features processed")
                         
-                        # # Log ROI results for verification
-                        # if roi_results:
-                        #     logger.info("=" * 80)
-                        #     logger.info(f"🎯 ROI RESULTS FOR {model_name} - {combination_name}")
-                        #     logger.info("=" * 80)
-                        #     for feature_name, roi_data in roi_results.items():
-                        #         logger.info(f"📊 {feature_name}:")
-                        #         logger.info(f"   🎯 FINAL ROI: {roi_data['roi']:.6f}")
-                        #         logger.info("-" * 40)
-                        #     logger.info("=" * 80)
-                        # else:
-                        #     logger.warning(f"⚠️ No ROI results generated for {model_name} in {combination_name}")
+                            # # Log ROI results for verification
+                            # if roi_results:
+                            #     logger.info("=" * 80)
+                            #     logger.info(f"🎯 ROI RESULTS FOR {model_name} - {combination_name}")
+                            #     logger.info("=" * 80)
+                            #     for feature_name, roi_data in roi_results.items():
+                            #         logger.info(f"📊 {feature_name}:")
+                            #         logger.info(f"   🎯 FINAL ROI: {roi_data['roi']:.6f}")
+                            #         logger.info("-" * 40)
+                            #     logger.info("=" * 80)
+                            # else:
+                            #     logger.warning(f"⚠️ No ROI results generated for {model_name} in {combination_name}")
                             
-                    elif roi_config:
-                        logger.warning("ROI config provided but combination_name is missing. Skipping ROI calculation.")
+                        elif roi_config:
+                            logger.warning("ROI config provided but combination_name is missing. Skipping ROI calculation.")
                     
-                    # Store model result with combination info
-                    model_result = {
-                        "model_name": model_name,
-                        "combination_index": combo_idx,
-                        "parameter_combination": updated_combo_config,
-                        "actual_parameters_used": actual_params,
-                        "mape_train": float(mape_train),
-                        "mape_test": float(mape_test),
-                        "r2_train": float(r2_train),
-                        "r2_test": float(r2_test),
-                        "coefficients": unstandardized_coefficients,
-                        "standardized_coefficients": coefficients,
-                        "intercept": float(intercept),
-                        "unstandardized_intercept": float(unstandardized_intercept),
-                        "aic": float(aic),
-                        "bic": float(bic),
-                        "n_parameters": n_params,
-                        "price_elasticity": price_elasticity,
-                        "elasticities": elasticities,
-                        "contributions": contributions,
-                        "roi_results": roi_results,  # Add ROI results
-                        "transformation_metadata": transformation_metadata,
-                        "variable_configs": updated_combo_config
-                    }
+                        # Store model result with combination info
+                        model_result = {
+                            "model_name": model_name,
+                            "combination_index": combo_idx,
+                            "parameter_combination": updated_combo_config,
+                            "actual_parameters_used": actual_params,
+                            "mape_train": float(mape_train),
+                            "mape_test": float(mape_test),
+                            "r2_train": float(r2_train),
+                            "r2_test": float(r2_test),
+                            "coefficients": unstandardized_coefficients,
+                            "standardized_coefficients": coefficients,
+                            "intercept": float(intercept),
+                            "unstandardized_intercept": float(unstandardized_intercept),
+                            "aic": float(aic),
+                            "bic": float(bic),
+                            "n_parameters": n_params,
+                            "price_elasticity": price_elasticity,
+                            "elasticities": elasticities,
+                            "contributions": contributions,
+                            "roi_results": roi_results,  # Add ROI results
+                            "transformation_metadata": transformation_metadata,
+                            "variable_configs": updated_combo_config
+                        }
                     
-                    # Debug: Log final coefficients being returned
-                    # logger.info(f"Final coefficients for {model_name}: {coefficients}")
-                    # logger.info(f"Final unstandardized coefficients for {model_name}: {unstandardized_coefficients}")
+                        # Debug: Log final coefficients being returned
+                        # logger.info(f"Final coefficients for {model_name}: {coefficients}")
+                        # logger.info(f"Final unstandardized coefficients for {model_name}: {unstandardized_coefficients}")
                     
-                    model_results.append(model_result)
-                    # logger.info(f"Completed training {model_name} (combo {combo_idx + 1}): MAPE={mape_test:.4f}, R²={r2_test:.4f}")
+                        model_results.append(model_result)
+                        # logger.info(f"Completed training {model_name} (combo {combo_idx + 1}): MAPE={mape_test:.4f}, R²={r2_test:.4f}")
                     
-                except Exception as e:
-                    logger.error(f"Error training model {model_name} (combo {combo_idx + 1}): {e}")
-                    continue
+                    except Exception as e:
+                        logger.error(f"Error training model {model_name} (combo {combo_idx + 1}): {e}")
+                        continue
             
-            # Store results for this combination
-            all_model_results.extend(model_results)
+                # Store results for this combination
+                all_model_results.extend(model_results)
             
-            # Store variable statistics for this combination
-            variable_statistics = {
-                "combination_index": combo_idx,
-                "parameter_combination": updated_combo_config,
-                "variable_averages": {**{var: float(X_original[var].mean()) for var in x_variables_lower}, 
-                                    y_variable_lower: float(y_original.mean())},
-                "transformation_metadata": transformation_metadata,
-                "original_data_shape": df.shape,
-                "transformed_data_shape": transformed_df.shape
-            }
-            all_variable_stats.append(variable_statistics)
+                # Store variable statistics for this combination
+                variable_statistics = {
+                    "combination_index": combo_idx,
+                    "parameter_combination": updated_combo_config,
+                    "variable_averages": {**{var: float(X_original[var].mean()) for var in x_variables_lower}, 
+                                        y_variable_lower: float(y_original.mean())},
+                    "transformation_metadata": transformation_metadata,
+                    "original_data_shape": df.shape,
+                    "transformed_data_shape": transformed_df.shape
+                }
+                all_variable_stats.append(variable_statistics)
+        finally:
+            self.transformation_engine.clear_grid()
         
         # Prepare final variable statistics summary
         final_variable_statistics = {
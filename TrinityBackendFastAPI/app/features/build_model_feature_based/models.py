@@ -1,14 +1,98 @@
 import numpy as np
+from scipy.optimize import lsq_linear
 from sklearn.base import BaseEstimator, RegressorMixin
 from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet, BayesianRidge
 
+# "bounded" solves the constrained least-squares problem exactly; "gradient"
+# keeps the original projected gradient descent loop.
+SOLVERS = ("bounded", "gradient")
+
+
+def solve_bounded_least_squares(X, Y, l2_penalty=0.0, lower=None, upper=None, transform=None):
+    """
+    Minimise ||Y - Xw - b||^2 + l2_penalty * ||w||^2 subject to box bounds.
+
+    The intercept is not penalised, so it is profiled out by centring X and Y
+    and the ridge term becomes sqrt(l2_penalty) rows stacked under the design.
+    The bounds apply to z with w = transform @ z (identity by default); a
+    coordinate whose lower and upper bound meet is held at that value.
+    Returns (w, b).
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float).ravel()
+    n = X.shape[1]
+    T = np.eye(n) if transform is None else np.asarray(transform, dtype=float)
+    lower = np.full(n, -np.inf) if lower is None else np.asarray(lower, dtype=float)
+    upper = np.full(n, np.inf) if upper is None else np.asarray(upper, dtype=float)
+
+    x_mean = X.mean(axis=0)
+    y_mean = Y.mean()
+    A = (X - x_mean) @ T
+    target = Y - y_mean
+    if l2_penalty:
+        A = np.vstack([A, np.sqrt(l2_penalty) * T])
+        target = np.concatenate([target, np.zeros(n)])
+
+    z = np.where(lower >= upper, lower, 0.0)
+    free = lower < upper
+    target = target - A[:, ~free] @ z[~free]
+    if free.any():
+        A_free, lo, hi = A[:, free], lower[free], upper[free]
+        if np.isneginf(lo).all() and np.isposinf(hi).all():
+            z[free] = np.linalg.lstsq(A_free, target, rcond=None)[0]
+        else:
+            z[free] = lsq_linear(A_free, target, bounds=(lo, hi), method="bvls").x
+    w = T @ z
+    return w, float(y_mean - x_mean @ w)
+
+
+def _sign_bounds(n, negative_indices, positive_indices):
+    """Box bounds for per-coefficient sign constraints."""
+    lower = np.full(n, -np.inf)
+    upper = np.full(n, np.inf)
+    upper[list(negative_indices)] = 0.0
+    lower[list(positive_indices)] = 0.0
+    return lower, upper
+
+
+def _stack_transform(n, negative_constraint_map, positive_constraint_map):
+    """
+    Rewrite base + interaction sign constraints as box bounds.
+
+    Each constrained interaction coefficient is replaced by the sum
+    z_k = w_base + w_k, so w_k = z_k - z_base and the constraint becomes a sign
+    bound on z_k. Returns (transform, lower, upper), or None when an
+    interaction is shared between bases or a base is itself constrained as an
+    interaction, which this substitution cannot express.
+    """
+    T = np.eye(n)
+    lower = np.full(n, -np.inf)
+    upper = np.full(n, np.inf)
+    bases = set(negative_constraint_map) | set(positive_constraint_map)
+    if set(negative_constraint_map) & set(positive_constraint_map):
+        return None
+    seen = set()
+    for sign, constraint_map in ((-1, negative_constraint_map), (1, positive_constraint_map)):
+        for base_idx, interaction_indices in constraint_map.items():
+            for inter_idx in interaction_indices:
+                if inter_idx in seen or inter_idx in bases:
+                    return None
+                seen.add(inter_idx)
+                T[inter_idx, base_idx] = -1.0
+                if sign < 0:
+                    upper[inter_idx] = 0.0
+                else:
+                    lower[inter_idx] = 0.0
+    return T, lower, upper
+
+
 # -----------------------
 # CUSTOM CLASSES
 # -----------------------
 class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
     def __init__(self, l2_penalty=0.1, learning_rate=0.001, iterations=10000,
                  adam=False, beta1=0.9, beta2=0.999, epsilon=1e-8, 
-                 negative_constraints=None, positive_constraints=None):
+                 negative_constraints=None, positive_constraints=None, solver="bounded"):
         self.learning_rate = learning_rate
         self.iterations = iterations
         self.l2_penalty = l2_penalty
@@ -18,6 +102,7 @@ class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
         self.epsilon = epsilon
         self.negative_constraints = negative_constraints or []
         self.positive_constraints = positive_constraints or []
+        self.solver = solver
 
     def fit(self, X, Y, feature_names):
         self.m, self.n = X.shape
@@ -72,8 +157,36 @@ class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
         # Debug logging (reduced for performance)
         if self.negative_constraints or self.positive_constraints:
             print(f"🔍 CustomConstrainedRidge - Constraints applied - Negative: {len(self.negative_indices)}, Positive: {len(self.positive_indices)}")
-            print(f"🔍 Using Projected Gradient Descent for constraint enforcement")
+            method = "Projected Gradient Descent" if self.solver == "gradient" else "bounded least squares"
+            print(f"🔍 Using {method} for constraint enforcement")
+
+        if self.solver == "gradient":
+            self._fit_projected_gradient()
+        else:
+            self._fit_bounded_least_squares()
+
+        # Final constraint validation
+        if not self.validate_constraints():
+            violations = self.get_constraint_violations()
+            print(f"⚠️ CustomConstrainedRidge constraint violations detected: {violations['total_violations']} violations")
+            if violations['negative_violations']:
+                print(f"   Negative constraint violations: {violations['negative_violations']}")
+            if violations['positive_violations']:
+                print(f"   Positive constraint violations: {violations['positive_violations']}")
+        else:
+            print(f"✅ CustomConstrainedRidge constraints satisfied")
 
+        self.intercept_ = self.b
+        self.coef_ = self.W
+        return self
+
+    def _fit_bounded_least_squares(self):
+        """Exact constrained solution: sign constraints become bounds on the coefficients."""
+        lower, upper = _sign_bounds(self.n, self.negative_indices, self.positive_indices)
+        self.W, self.b = solve_bounded_least_squares(self.X, self.Y, self.l2_penalty, lower=lower, upper=upper)
+
+    def _fit_projected_gradient(self):
+        """Original projected gradient descent loop (solver="gradient")."""
         if self.adam:
             self.m_W = np.zeros(self.n)
             self.v_W = np.zeros(self.n)
@@ -88,7 +201,7 @@ class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
 
         for iteration in range(self.iterations):
             self.update_weights()
-            
+
             # Check convergence every 100 iterations
             if iteration % 100 == 0 and iteration > 0:
                 weight_change = np.linalg.norm(self.W - prev_W)
@@ -97,25 +210,10 @@ class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
                     converged = True
                     break
                 prev_W = np.copy(self.W)
-        
+
         if not converged:
             print(f"🔍 CustomConstrainedRidge completed {self.iterations} iterations without convergence")
 
-        # Final constraint validation
-        if not self.validate_constraints():
-            violations = self.get_constraint_violations()
-            print(f"⚠️ CustomConstrainedRidge constraint violations detected: {violations['total_violations']} violations")
-            if violations['negative_violations']:
-                print(f"   Negative constraint violations: {violations['negative_violations']}")
-            if violations['positive_violations']:
-                print(f"   Positive constraint violations: {violations['positive_violations']}")
-        else:
-            print(f"✅ CustomConstrainedRidge constraints satisfied")
-
-        self.intercept_ = self.b
-        self.coef_ = self.W
-        return self
-
     def project_onto_constraints(self, W):
         """
         Project weights onto the constraint set using projected gradient descent.
@@ -225,14 +323,15 @@ class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
             beta2=self.beta2,
             epsilon=self.epsilon,
             negative_constraints=self.negative_constraints.copy() if self.negative_constraints else [],
-            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else []
+            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else [],
+            solver=self.solver
         )
 
 
 class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
     def __init__(self, learning_rate=0.01, iterations=10000,
                  adam=False, beta1=0.9, beta2=0.999, epsilon=1e-8,
-                 negative_constraints=None, positive_constraints=None):
+                 negative_constraints=None, positive_constraints=None, solver="bounded"):
         self.learning_rate = learning_rate
         self.iterations = iterations
         self.adam = adam
@@ -241,6 +340,7 @@ class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
         self.epsilon = epsilon
         self.negative_constraints = negative_constraints or []
         self.positive_constraints = positive_constraints or []
+        self.solver = solver
 
     def fit(self, X, Y, feature_names):
         self.m, self.n = X.shape
@@ -295,8 +395,36 @@ class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
         # Debug logging (reduced for performance)
         if self.negative_constraints or self.positive_constraints:
             print(f"🔍 ConstrainedLinearRegression - Constraints applied - Negative: {len(self.negative_indices)}, Positive: {len(self.positive_indices)}")
-            print(f"🔍 Using Projected Gradient Descent for constraint enforcement")
+            method = "Projected Gradient Descent" if self.solver == "gradient" else "bounded least squares"
+            print(f"🔍 Using {method} for constraint enforcement")
+
+        if self.solver == "gradient":
+            self._fit_projected_gradient()
+        else:
+            self._fit_bounded_least_squares()
 
+        # Final constraint validation
+        if not self.validate_constraints():
+            violations = self.get_constraint_violations()
+            print(f"⚠️ ConstrainedLinearRegression constraint violations detected: {violations['total_violations']} violations")
+            if violations['negative_violations']:
+                print(f"   Negative constraint violations: {violations['negative_violations']}")
+            if violations['positive_violations']:
+                print(f"   Positive constraint violations: {violations['positive_violations']}")
+        else:
+            print(f"✅ ConstrainedLinearRegression constraints satisfied")
+
+        self.intercept_ = self.b
+        self.coef_ = self.W
+        return self
+
+    def _fit_bounded_least_squares(self):
+        """Exact constrained solution: sign constraints become bounds on the coefficients."""
+        lower, upper = _sign_bounds(self.n, self.negative_indices, self.positive_indices)
+        self.W, self.b = solve_bounded_least_squares(self.X, self.Y, 0.0, lower=lower, upper=upper)
+
+    def _fit_projected_gradient(self):
+        """Original projected gradient descent loop (solver="gradient")."""
         if self.adam:
             self.m_W = np.zeros(self.n)
             self.v_W = np.zeros(self.n)
@@ -311,7 +439,7 @@ class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
 
         for iteration in range(self.iterations):
             self.update_weights()
-            
+
             # Check convergence every 100 iterations
             if iteration % 100 == 0 and iteration > 0:
                 weight_change = np.linalg.norm(self.W - prev_W)
@@ -320,25 +448,10 @@ class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
                     converged = True
                     break
                 prev_W = np.copy(self.W)
-        
+
         if not converged:
             print(f"🔍 ConstrainedLinearRegression completed {self.iterations} iterations without convergence")
 
-        # Final constraint validation
-        if not self.validate_constraints():
-            violations = self.get_constraint_violations()
-            print(f"⚠️ ConstrainedLinearRegression constraint violations detected: {violations['total_violations']} violations")
-            if violations['negative_violations']:
-                print(f"   Negative constraint violations: {violations['negative_violations']}")
-            if violations['positive_violations']:
-                print(f"   Positive constraint violations: {violations['positive_violations']}")
-        else:
-            print(f"✅ ConstrainedLinearRegression constraints satisfied")
-
-        self.intercept_ = self.b
-        self.coef_ = self.W
-        return self
-
     def project_onto_constraints(self, W):
         """
         Project weights onto the constraint set using projected gradient descent.
@@ -444,7 +557,8 @@ class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
             beta2=self.beta2,
             epsilon=self.epsilon,
             negative_constraints=self.negative_constraints.copy() if self.negative_constraints else [],
-            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else []
+            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else [],
+            solver=self.solver
         )
 
 
@@ -462,7 +576,7 @@ class StackConstrainedRidge(BaseEstimator, RegressorMixin):
     """
     def __init__(self, l2_penalty=0.1, learning_rate=0.001, iterations=10000,
                  adam=False, beta1=0.9, beta2=0.999, epsilon=1e-8, 
-                 negative_constraints=None, positive_constraints=None):
+                 negative_constraints=None, positive_constraints=None, solver="bounded"):
         self.l2_penalty = l2_penalty
         self.learning_rate = learning_rate
         self.iterations = iterations
@@ -472,6 +586,7 @@ class StackConstrainedRidge(BaseEstimator, RegressorMixin):
         self.epsilon = epsilon
         self.negative_constraints = negative_constraints or []
         self.positive_constraints = positive_constraints or []
+        self.solver = solver
 
     def fit(self, X, Y, feature_names):
         self.m, self.n = X.shape
@@ -501,7 +616,30 @@ class StackConstrainedRidge(BaseEstimator, RegressorMixin):
                 self.positive_constraint_map[base_idx] = interaction_indices
                 print(f"🔍 Positive constraint: {var_name} -> base_idx: {base_idx}, interactions: {interaction_indices}")
         
-        # Initialize Adam if needed
+        if self.solver == "gradient":
+            self._fit_projected_gradient()
+        else:
+            self._fit_bounded_least_squares()
+
+        self.intercept_ = self.b
+        self.coef_ = self.W
+        return self
+
+    def _fit_bounded_least_squares(self):
+        """Solve the combination-constrained problem exactly via _stack_transform."""
+        reparametrised = _stack_transform(self.n, self.negative_constraint_map, self.positive_constraint_map)
+        if reparametrised is None:
+            print("⚠️ StackConstrainedRidge constraints overlap - falling back to projected gradient descent")
+            self._fit_projected_gradient()
+            return
+        transform, lower, upper = reparametrised
+        self.W, self.b = solve_bounded_least_squares(
+            self.X, self.Y, self.l2_penalty, lower=lower, upper=upper, transform=transform
+        )
+        print("🔍 StackConstrainedRidge solved with bounded least squares")
+
+    def _fit_projected_gradient(self):
+        """Original projected gradient descent loop (solver="gradient")."""
         if self.adam:
             self.m_W = np.zeros(self.n)
             self.v_W = np.zeros(self.n)
@@ -513,7 +651,7 @@ class StackConstrainedRidge(BaseEstimator, RegressorMixin):
         prev_loss = float('inf')
         for iteration in range(self.iterations):
             self.update_weights()
-            
+
             # Check convergence every 100 iterations
             if iteration % 100 == 0:
                 current_loss = self._calculate_loss()
@@ -522,10 +660,6 @@ class StackConstrainedRidge(BaseEstimator, RegressorMixin):
                     break
                 prev_loss = current_loss
 
-        self.intercept_ = self.b
-        self.coef_ = self.W
-        return self
-
     def _find_feature_index(self, var_name, feature_type='base'):
         """Find the index of a base feature in the feature names"""
         for i, name in enumerate(self.feature_names):
@@ -623,7 +757,8 @@ class StackConstrainedRidge(BaseEstimator, RegressorMixin):
             beta2=self.beta2,
             epsilon=self.epsilon,
             negative_constraints=self.negative_constraints.copy() if self.negative_constraints else [],
-            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else []
+            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else [],
+            solver=self.solver
         )
 
 
@@ -636,7 +771,7 @@ class StackConstrainedLinearRegression(BaseEstimator, RegressorMixin):
     """
     def __init__(self, learning_rate=0.001, iterations=10000,
                  adam=False, beta1=0.9, beta2=0.999, epsilon=1e-8, 
-                 negative_constraints=None, positive_constraints=None):
+                 negative_constraints=None, positive_constraints=None, solver="bounded"):
         self.learning_rate = learning_rate
         self.iterations = iterations
         self.adam = adam
@@ -645,6 +780,7 @@ class StackConstrainedLinearRegression(BaseEstimator, RegressorMixin):
         self.epsilon = epsilon
         self.negative_constraints = negative_constraints or []
         self.positive_constraints = positive_constraints or []
+        self.solver = solver
 
     def fit(self, X, Y, feature_names):
         self.m, self.n = X.shape
@@ -674,7 +810,30 @@ class StackConstrainedLinearRegression(BaseEstimator, RegressorMixin):
                 self.positive_constraint_map[base_idx] = interaction_indices
                 print(f"🔍 Positive constraint: {var_name} -> base_idx: {base_idx}, interactions: {interaction_indices}")
         
-        # Initialize Adam if needed
+        if self.solver == "gradient":
+            self._fit_projected_gradient()
+        else:
+            self._fit_bounded_least_squares()
+
+        self.intercept_ = self.b
+        self.coef_ = self.W
+        return self
+
+    def _fit_bounded_least_squares(self):
+        """Solve the combination-constrained problem exactly via _stack_transform."""
+        reparametrised = _stack_transform(self.n, self.negative_constraint_map, self.positive_constraint_map)
+        if reparametrised is None:
+            print("⚠️ StackConstrainedLinearRegression constraints overlap - falling back to projected gradient descent")
+            self._fit_projected_gradient()
+            return
+        transform, lower, upper = reparametrised
+        self.W, self.b = solve_bounded_least_squares(
+            self.X, self.Y, 0.0, lower=lower, upper=upper, transform=transform
+        )
+        print("🔍 StackConstrainedLinearRegression solved with bounded least squares")
+
+    def _fit_projected_gradient(self):
+        """Original projected gradient descent loop (solver="gradient")."""
         if self.adam:
             self.m_W = np.zeros(self.n)
             self.v_W = np.zeros(self.n)
@@ -686,7 +845,7 @@ class StackConstrainedLinearRegression(BaseEstimator, RegressorMixin):
         prev_loss = float('inf')
         for iteration in range(self.iterations):
             self.update_weights()
-            
+
             # Check convergence every 100 iterations
             if iteration % 100 == 0:
                 current_loss = self._calculate_loss()
@@ -695,10 +854,6 @@ class StackConstrainedLinearRegression(BaseEstimator, RegressorMixin):
                     break
                 prev_loss = current_loss
 
-        self.intercept_ = self.b
-        self.coef_ = self.W
-        return self
-
     def _find_feature_index(self, var_name, feature_type='base'):
         """Find the index of a base feature in the feature names"""
         for i, name in enumerate(self.feature_names):
@@ -790,7 +945,8 @@ class StackConstrainedLinearRegression(BaseEstimator, RegressorMixin):
             beta2=self.beta2,
             epsilon=self.epsilon,
             negative_constraints=self.negative_constraints.copy() if self.negative_constraints else [],
-            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else []
+            positive_constraints=self.positive_constraints.copy() if self.positive_constraints else [],
+            solver=self.solver
         )
 
 
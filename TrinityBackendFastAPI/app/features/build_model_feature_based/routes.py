@@ -19,7 +19,7 @@ from .database import (
     get_scope_combinations,
     fetch_scope_by_id,
     get_scope_set_with_columns,
-    train_models_for_combination_enhanced,  # Use enhanced version
+    read_training_frame,
     save_model_results_enhanced, export_results_to_csv_and_minio, get_csv_from_minio ,save_marketing_model_results,
 )
 
@@ -106,6 +106,7 @@ from .schemas import (
     StandardizationMethod
 )
 from .stack_model_data import StackModelDataProcessor
+from . import training_pool
 
 # Elasticity and contribution imports - removed unused imports since we're using direct calculation
 
@@ -549,6 +550,25 @@ async def get_training_progress(run_id: str):
     
     return training_progress[run_id]
 
+@router.post("/training-progress/{run_id}/cancel", tags=["Model Training"])
+async def cancel_training(run_id: str):
+    """
+    Cancel a running train-models-direct run.
+    Combinations that have not started are skipped and fits waiting on a
+    worker are abandoned; combinations already saved stay saved.
+    """
+    if run_id not in training_progress:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Training progress for run_id '{run_id}' not found"
+        )
+    if training_progress[run_id]["status"] != "running":
+        return training_progress[run_id]
+    abandoned = training_pool.request_cancel(run_id)
+    training_progress[run_id]["status"] = "cancelling"
+    logger.info(f"🛑 Cancel requested for run {run_id}; abandoned {abandoned} queued fits")
+    return training_progress[run_id]
+
 @router.get("/pool-identifiers/{scope_id}", tags=["Pool Regression"])
 async def get_pool_identifiers(scope_id: str):
     """
@@ -722,7 +742,6 @@ async def train_models_direct(request: dict):
         except Exception as debug_error:
             logger.warning(f"Bucket listing failed: {debug_error}")
         
-        combination_results = []
         total_saved = 0
         all_variable_stats = {}
         
@@ -742,14 +761,15 @@ async def train_models_direct(request: dict):
             "current_combination": "",
             "current_model": "",
             "completed_combinations": 0,
-            "total_combinations": total_combinations
+            "total_combinations": total_combinations,
+            "combination_status": {combination: "queued" for combination in combinations},
+            "workers": training_pool.configured_workers()
         }
         
-        for combination_index, combination in enumerate(combinations):
+        async def process_combination(combination):
+            nonlocal total_saved
             # Update progress - starting combination
             training_progress[run_id]["current_combination"] = combination
-            training_progress[run_id]["current"] = combination_index * total_models
-            training_progress[run_id]["percentage"] = int((training_progress[run_id]["current"] / training_progress[run_id]["total"]) * 100)
             
             # Search for the file in MinIO
             target_file_key = None
@@ -791,31 +811,12 @@ async def train_models_direct(request: dict):
                     
                     # Read the file to get columns and validate variables
                     try:
-                        response = minio_client.get_object(bucket_name, target_file_key)
-                        file_data = response.read()
-                        response.close()
-                        response.release_conn()
-                        
-                        # Read file into DataFrame
-                        if target_file_key.endswith('.arrow'):
-                            try:
-                                import pyarrow as pa
-                                import pyarrow.ipc as ipc
-                                reader = ipc.RecordBatchFileReader(pa.BufferReader(file_data))
-                                df = reader.read_all().to_pandas()
-                            except Exception as arrow_error:
-                                logger.error(f"Error reading Arrow file: {arrow_error}")
-                                continue
-                        elif target_file_key.endswith('.csv'):
-                            df = pd.read_csv(io.BytesIO(file_data))
-                        else:
+                        if not target_file_key.endswith(('.arrow', '.csv')):
                             logger.warning(f"Unsupported file format: {target_file_key}")
-                            continue
-                        
-                        # Convert all column names to lowercase for consistent matching
-                        original_columns = df.columns.tolist()
-                        df.columns = df.columns.str.lower()
-                        logger.info(f"Converted columns to lowercase: {original_columns} -> {df.columns.tolist()}")
+                            return None
+                        # Decoded once through the shared dataset cache; the
+                        # training call below reuses the same table.
+                        df = read_training_frame(bucket_name, target_file_key)
                         
                         # Update progress - validating variables
                         training_progress[run_id]["current_model"] = "Validating variables..."
@@ -838,11 +839,11 @@ async def train_models_direct(request: dict):
                         
                         if missing_vars:
                             logger.warning(f"Variables not found in {target_file_key}: {missing_vars}")
-                            continue
+                            return None
                         
                     except Exception as file_error:
                         logger.error(f"Error reading file {target_file_key}: {file_error}")
-                        continue
+                        return None
                     
                     # Update progress - starting model training for this combination
                     training_progress[run_id]["current_combination"] = combination
@@ -857,7 +858,9 @@ async def train_models_direct(request: dict):
                     
                     if individual_modeling and individual_models_to_run:
                         logger.info(f"Training individual models for combination {combination}")
-                        model_results, variable_data = await train_models_for_combination_enhanced(
+                        model_results, variable_data = await training_pool.train_combination(
+                            df,
+                            run_id=run_id,
                             file_key=target_file_key,
                             x_variables=x_variables_lower,  # Use lowercase variables
                             y_variable=y_variable_lower,    # Use lowercase variable
@@ -1010,28 +1013,63 @@ async def train_models_direct(request: dict):
                     
 
                     
-                    combination_results.append({
+                    # Update progress - combination completed
+                    training_progress[run_id]["completed_combinations"] += 1
+                    
+                    return {
                         "combination_id": combination,
                         "file_key": target_file_key,
                         "total_records": len(df),
                         "model_results": model_results
-                    })
-                    
-                    # Update progress - combination completed
-                    training_progress[run_id]["completed_combinations"] += 1
+                    }
                     
                 else:
                     logger.warning(f"Could not find file for combination: {combination}")
-                    continue
+                    return None
                     
             except Exception as e:
                 logger.error(f"Error processing combination {combination}: {e}")
-                continue
+                training_progress[run_id]["combination_status"][combination] = "failed"
+                return None
+
+        async def run_combination(combination):
+            status = training_progress[run_id]["combination_status"]
+            async with combination_slots:
+                if training_pool.is_cancelled(run_id):
+                    status[combination] = "cancelled"
+                    return None
+                status[combination] = "running"
+                try:
+                    result = await process_combination(combination)
+                except asyncio.CancelledError:
+                    if not training_pool.is_cancelled(run_id):
+                        raise
+                    status[combination] = "cancelled"
+                    return None
+            if result is None:
+                if status[combination] == "running":
+                    status[combination] = "skipped"
+                # Count the combination anyway so the percentage still reaches 100.
+                if individual_modeling and individual_models_to_run:
+                    training_progress[run_id]["current"] += individual_models_count
+                    training_progress[run_id]["percentage"] = int((training_progress[run_id]["current"] / training_progress[run_id]["total"]) * 100)
+            else:
+                status[combination] = "completed"
+            return result
+
+        # Combinations train concurrently on the training pool; at most
+        # max_inflight() of them hold a loaded frame at once.
+        combination_slots = asyncio.Semaphore(training_pool.max_inflight())
+        outcomes = await asyncio.gather(
+            *(run_combination(combination) for combination in combinations)
+        )
+        combination_results = [outcome for outcome in outcomes if outcome is not None]
+        cancelled = training_pool.is_cancelled(run_id)
         
 
         
         # Add stack modeling results if requested (even if individual models failed)
-        if stack_modeling:
+        if stack_modeling and not cancelled:
             try:     
                 # Import StackModelTrainer
                 from .stack_model_training import StackModelTrainer
@@ -1211,7 +1249,7 @@ async def train_models_direct(request: dict):
                 })
         
         # Check if we have any results (individual or stack)
-        if not combination_results:
+        if not combination_results and not cancelled:
             raise HTTPException(
                 status_code=404,
                 detail=f"No valid combinations found for scope {scope_number}. Individual models failed and stack modeling {'failed' if stack_modeling else 'not requested'}"
@@ -1424,9 +1462,12 @@ async def train_models_direct(request: dict):
 
         
         # Update final progress
-        training_progress[run_id]["status"] = "completed"
-        training_progress[run_id]["current"] = training_progress[run_id]["total"]
-        training_progress[run_id]["percentage"] = 100
+        if cancelled:
+            training_progress[run_id]["status"] = "cancelled"
+        else:
+            training_progress[run_id]["status"] = "completed"
+            training_progress[run_id]["current"] = training_progress[run_id]["total"]
+            training_progress[run_id]["percentage"] = 100
         training_progress[run_id]["current_combination"] = ""
         training_progress[run_id]["current_model"] = ""
         
@@ -1614,6 +1655,8 @@ async def train_models_direct(request: dict):
             training_progress[run_id]["status"] = "error"
         logger.error(f"Error in direct model training: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        training_pool.forget_run(run_id)
 
 # @router.post("/train-models", response_model=ModelTrainingResponse, tags=["Model Training"])
 # async def train_models(request: ModelTrainingRequest):
@@ -0,0 +1,120 @@
+"""Combination-level model training on a persistent process pool.
+
+``train_models_direct`` used to await ``train_models_for_combination_enhanced``
+once per combination.  The coroutine never yields while sklearn fits, so a
+200-combination scope trained serially and blocked the API worker's event
+loop for the whole run.
+
+:func:`train_combination` hands the CPU part (``train_models_for_frame``) to a
+:class:`~concurrent.futures.ProcessPoolExecutor` that is created on first use
+and kept for the lifetime of the process.  The route runs its per-combination
+coroutines concurrently; :func:`max_inflight` bounds how many of them hold a
+loaded frame at once, so memory stays flat however many combinations a scope
+has.  Results are saved and progress is published as each combination
+completes, in whatever order the workers finish.
+
+Cancellation is cooperative: :func:`request_cancel` stops combinations that
+have not started and abandons the ones waiting on a worker.  A fit that is
+already running finishes in its worker, but its result is discarded.
+
+Configuration:
+
+* ``BUILD_MODEL_TRAIN_WORKERS`` - pool size (see
+  :func:`~app.DataStorageRetrieval.env_config.pool_workers`); ``0`` trains in
+  the event loop, one combination at a time, as before;
+* ``BUILD_MODEL_TRAIN_INFLIGHT`` - combinations in flight at once, defaults to
+  twice the pool size so a worker never waits for the next frame.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from app.DataStorageRetrieval.env_config import ProcessPool, env_int
+
+logger = logging.getLogger(__name__)
+
+_pool = ProcessPool("BUILD_MODEL_TRAIN_WORKERS", "BUILD-POOL")
+_cancelled: Set[str] = set()
+_inflight: Dict[str, Set[asyncio.Future]] = {}
+
+
+def configured_workers() -> int:
+    return _pool.workers()
+
+
+def enabled() -> bool:
+    """``False`` when ``BUILD_MODEL_TRAIN_WORKERS=0`` selects in-loop training."""
+    return configured_workers() > 0
+
+
+def max_inflight() -> int:
+    workers = configured_workers()
+    if workers == 0:
+        return 1
+    return max(env_int("BUILD_MODEL_TRAIN_INFLIGHT", 2 * workers), 1)
+
+
+def shutdown() -> None:
+    """Stop the pool; the next training request starts a new one."""
+    _pool.shutdown()
+
+
+def request_cancel(run_id: str) -> int:
+    """Mark ``run_id`` cancelled and abandon its queued fits. Returns how many were abandoned."""
+    _cancelled.add(run_id)
+    abandoned = 0
+    for future in list(_inflight.get(run_id, ())):
+        if future.cancel():
+            abandoned += 1
+    return abandoned
+
+
+def is_cancelled(run_id: str) -> bool:
+    return run_id in _cancelled
+
+
+def forget_run(run_id: str) -> None:
+    _cancelled.discard(run_id)
+    _inflight.pop(run_id, None)
+
+
+async def train_combination(
+    df: pd.DataFrame, run_id: Optional[str] = None, **kwargs: Any
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Train the models of one combination.
+
+    ``kwargs`` are the arguments of ``train_models_for_combination_enhanced``;
+    ``df`` is the frame the route already loaded for that file, which the
+    worker trains on instead of reading it again.  Raises
+    :class:`asyncio.CancelledError` when ``run_id`` is cancelled while the
+    fit waits on or runs in a worker.
+    """
+    from .database import train_models_for_combination_enhanced, train_models_for_frame
+
+    if not enabled():
+        return await train_models_for_combination_enhanced(**kwargs)
+
+    kwargs.pop("bucket_name", None)
+    call = functools.partial(train_models_for_frame, df, **kwargs)
+    executor = _pool.get()
+    future = asyncio.get_running_loop().run_in_executor(executor, call)
+    if run_id is not None:
+        _inflight.setdefault(run_id, set()).add(future)
+    try:
+        return await future
+    except BrokenProcessPool as exc:
+        logger.warning(
+            "⚠️ [BUILD-POOL] Training pool broke (%s); training %s in-process", exc, kwargs.get("file_key")
+        )
+        _pool.discard(executor)
+        return await asyncio.to_thread(call)
+    finally:
+        if run_id is not None:
+            _inflight.get(run_id, set()).discard(future)
@@ -20,6 +20,7 @@ import pyarrow.ipc as ipc
 import time
 from datetime import datetime
 
+from app.DataStorageRetrieval.dataset_cache import load_pandas
 from app.DataStorageRetrieval.db import  fetch_client_app_project
 from app.core.feature_cache import feature_cache
 from app.core.utils import get_env_vars
@@ -133,7 +134,7 @@ async def check_bucket_and_file(file_path: str) -> dict:
 
 async def load_csv_from_minio(file_path: str) -> pd.DataFrame:
     """
-    Load data from MinIO using full path
+    Load data from MinIO using full path through the shared dataset cache
     Supports CSV, Parquet, and Arrow/Feather files
     Example: "dataformodel/rpi.csv" or "dataformodel/data.arrow"
     """
@@ -146,32 +147,8 @@ async def load_csv_from_minio(file_path: str) -> pd.DataFrame:
         raise HTTPException(404, f"Bucket '{bucket_name}' not found")
     
     try:
-        # Get object from MinIO
-        response = minio_client.get_object(bucket_name, object_path)
-        
-        # Read the data into bytes
-        file_bytes = response.read()
-        response.close()
-        response.release_conn()
-        
-        # Detect file type and read accordingly
-        file_extension = object_path.lower()
-        
-        if file_extension.endswith('.parquet'):
-            df = pd.read_parquet(io.BytesIO(file_bytes))
-        elif file_extension.endswith(('.arrow', '.feather')):
-            df = pd.read_feather(io.BytesIO(file_bytes))
-        elif file_extension.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(file_bytes))
-        else:
-            # Try to read as Parquet first, then fall back to Arrow if that fails
-            try:
-                df = pd.read_parquet(io.BytesIO(file_bytes))
-            except Exception as e:
-                df = pd.read_feather(io.BytesIO(file_bytes))
-        
-        return df
-        
+        # Decoded once per object version and shared with the other atoms
+        return load_pandas(minio_client, bucket_name, object_path, feature="clustering")
     except S3Error as e:
         if e.code == "NoSuchKey":
             raise HTTPException(404, f"File '{object_path}' not found in bucket '{bucket_name}'")
@@ -1,12 +1,15 @@
 import asyncio
-import io
 import os
+from typing import Any, Dict
 
 import pandas as pd
 from minio import Minio
+from minio.error import S3Error
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.DataStorageRetrieval.arrow_client import download_dataframe
+from app.DataStorageRetrieval.arrow_results import arrow_result_name, save_arrow_result
+from app.DataStorageRetrieval.dataset_cache import UnsupportedDatasetFormat, load_pandas
 from app.DataStorageRetrieval.db import fetch_client_app_project
 from app.core.feature_cache import feature_cache
 from app.core.redis import get_redis_settings
@@ -154,73 +157,32 @@ def get_concat_results_collection():
 
 def load_dataframe(object_name: str) -> pd.DataFrame:
     """
-    Try to load a dataframe using Arrow Flight first, then fallback to Redis, then MinIO.
+    Load a dataframe through the shared dataset cache, falling back to Arrow Flight.
     Now handles both filenames and full paths robustly.
     """
     # Resolve the file path robustly
     resolved_path = resolve_file_path(object_name)
     filename_only = object_name.split("/")[-1] if "/" in object_name else object_name
-    
-    # Try Redis cache first using the resolved path
-    content = redis_client.get(resolved_path)
-    if content is not None:
-        if filename_only.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-        elif filename_only.endswith((".xls", ".xlsx")):
-            df = pd.read_excel(io.BytesIO(content))
-        elif filename_only.endswith(".arrow"):
-            import pyarrow as pa
-            import pyarrow.ipc as ipc
-            reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-            df = reader.read_all().to_pandas()
-        else:
-            raise ValueError(f"Unsupported file format: {filename_only}")
-        df.columns = df.columns.str.lower()
-        return df
-    
-    # Try Arrow Flight
+
     try:
+        df = load_pandas(minio_client, MINIO_BUCKET, resolved_path, feature="concat")
+    except UnsupportedDatasetFormat:
+        raise ValueError(f"Unsupported file format: {filename_only}")
+    except Exception:
         # For Arrow Flight, we need just the filename without extension
         flight_path = filename_only.replace('.arrow', '').replace('.csv', '').replace('.xlsx', '')
-        df = download_dataframe(flight_path)
-        return df
-    except Exception as e:
-        # Fallback to MinIO using the resolved path
-        try:
-            response = minio_client.get_object(MINIO_BUCKET, resolved_path)
-            content = response.read()
-            # Cache in Redis for 1 hour using the resolved path
-            redis_client.setex(resolved_path, 3600, content)
-            
-            if filename_only.endswith(".csv"):
-                df = pd.read_csv(io.BytesIO(content))
-            elif filename_only.endswith((".xls", ".xlsx")):
-                df = pd.read_excel(io.BytesIO(content))
-            elif filename_only.endswith(".arrow"):
-                import pyarrow as pa
-                import pyarrow.ipc as ipc
-                reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-                df = reader.read_all().to_pandas()
-            else:
-                raise ValueError(f"Unsupported file format: {filename_only}")
-            
-            df.columns = df.columns.str.lower()
-            return df
-            
-        except Exception as minio_error:
-            raise minio_error
+        return download_dataframe(flight_path)
+
+    df.columns = df.columns.str.lower()
+    return df
 
-def save_concat_result_to_minio(key: str, df: pd.DataFrame):
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
-    minio_client.put_object(
-        MINIO_BUCKET,
-        key,
-        data=io.BytesIO(csv_bytes),
-        length=len(csv_bytes),
-        content_type="text/csv",
-    )
+def save_concat_result_to_minio(key: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """Persist a concat result as Arrow IPC; returns what ``save_arrow_result`` does."""
+    key = arrow_result_name(key)
+    saved = save_arrow_result(minio_client, MINIO_BUCKET, key, df)
     # Cache result in Redis for 1 hour
-    redis_client.setex(key, 3600, csv_bytes)
+    redis_client.setex(key, 3600, saved["payload"])
+    return saved
 
 async def save_concat_metadata_to_mongo(collection, metadata: dict):
     """Insert metadata when collection is available; otherwise silently skip."""
@@ -231,20 +193,9 @@ async def save_concat_metadata_to_mongo(collection, metadata: dict):
 
 def get_minio_df(bucket: str, file_key: str) -> pd.DataFrame:
     try:
-        response = minio_client.get_object(bucket, file_key)
-        content = response.read()
-        if file_key.endswith(".csv"):
-            df = pd.read_csv(BytesIO(content))
-        elif file_key.endswith(".xlsx"):
-            df = pd.read_excel(BytesIO(content))
-        elif file_key.endswith(".arrow"):
-            import pyarrow as pa
-            import pyarrow.ipc as ipc
-            reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-            df = reader.read_all().to_pandas()
-        else:
-            raise ValueError("Unsupported file type")
-        return df
+        return load_pandas(minio_client, bucket, file_key, feature="concat")
+    except UnsupportedDatasetFormat:
+        raise RuntimeError("Failed to fetch file from MinIO: Unsupported file type")
     except S3Error as e:
         raise RuntimeError(f"MinIO S3 error: {e}")
     except Exception as e:
@@ -547,8 +547,6 @@ async def save_concat_dataframe(
 ):
     """Save a concatenated dataframe (CSV) to MinIO as Arrow file and return file info."""
     import pandas as pd
-    import pyarrow as pa
-    import pyarrow.ipc as ipc
     import io
     import datetime
     import uuid
@@ -614,24 +612,9 @@ async def save_concat_dataframe(
         # Create full path with standard structure
         full_path = f"{prefix}concatenated-data/{filename}"
         
-        # Convert to Arrow
-        table = pa.Table.from_pandas(df)
-        arrow_buffer = pa.BufferOutputStream()
-        with ipc.new_file(arrow_buffer, table.schema) as writer:
-            writer.write_table(table)
-        arrow_bytes = arrow_buffer.getvalue().to_pybytes()
-        
-        # Save to MinIO
-        minio_client.put_object(
-            MINIO_BUCKET,
-            full_path,
-            data=io.BytesIO(arrow_bytes),
-            length=len(arrow_bytes),
-            content_type="application/octet-stream",
-        )
-        
-        # Cache in Redis
-        redis_client.setex(full_path, 3600, arrow_bytes)
+        # Saved as Arrow IPC with its schema, registered for Flight access
+        # and cached in Redis
+        saved = save_concat_result_to_minio(full_path, df)
         
         result_data = {
             "result_file": full_path,
@@ -714,7 +697,7 @@ async def save_concat_dataframe(
                                     "flight_path": full_path,
                                     "file_name": filename,
                                     "file_type": "arrow",
-                                    "size": len(arrow_bytes),
+                                    "size": saved["size"],
                                     "save_as_name": save_as_name,
                                     "is_default_name": is_default_name,
                                     "columns": list(df.columns),
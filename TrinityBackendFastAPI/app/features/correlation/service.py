@@ -14,6 +14,8 @@ from datetime import datetime
 from .database import correlation_coll
 from pymongo.errors import PyMongoError
 
+from app.DataStorageRetrieval.dataset_cache import load_pandas
+
 
 # Initialize MinIO client (only once)
 minio_client = Minio(
@@ -86,7 +88,7 @@ async def check_bucket_and_file(file_path: str) -> dict:
 
 async def load_csv_from_minio(file_path: str) -> pd.DataFrame:
     """
-    Load Arrow or CSV file from MinIO using full path
+    Load Arrow or CSV file from MinIO using full path through the shared dataset cache
     Example: "dataformodel/rpi.csv" or "default_client/default_app/default_project/file.arrow"
     """
     bucket_name, object_path = parse_minio_path(file_path)
@@ -96,42 +98,8 @@ async def load_csv_from_minio(file_path: str) -> pd.DataFrame:
         raise HTTPException(404, f"Bucket '{bucket_name}' not found")
     
     try:
-        # Check if it's an Arrow file
-        if object_path.endswith('.arrow'):
-            # Use same pattern as feature-overview cached_dataframe (which works)
-            try:
-                from app.DataStorageRetrieval.arrow_client import download_dataframe
-                print(f"🛫 correlation download_dataframe for: {file_path}")
-                df = download_dataframe(file_path)
-                print(f"✅ correlation flight success for: {file_path} rows={len(df)}")
-                return df
-            except Exception as exc:
-                print(f"⚠️ correlation flight failed for {file_path}: {exc}")
-                # Direct MinIO fallback (same as cached_dataframe endpoint)
-                print(f"� correlation falling back to direct MinIO for: {file_path}")
-                response = minio_client.get_object(bucket_name, object_path)
-                arrow_data = response.read()
-                response.close()
-                response.release_conn()
-                
-                # Parse Arrow file to DataFrame using pyarrow
-                table = ipc.RecordBatchFileReader(pa.BufferReader(arrow_data)).read_all()
-                df = table.to_pandas()
-                print(f"✅ correlation MinIO fallback success for: {file_path} rows={len(df)}")
-                return df
-        else:
-            # For CSV files, use the existing CSV loading logic
-            response = minio_client.get_object(bucket_name, object_path)
-            
-            # Read the data into pandas DataFrame
-            csv_data = response.read()
-            response.close()
-            response.release_conn()
-            
-            # Convert bytes to DataFrame
-            df = pd.read_csv(io.BytesIO(csv_data))
-            return df
-        
+        # Arrow and CSV files are decoded once and shared with the other atoms
+        return load_pandas(minio_client, bucket_name, object_path, feature="correlation")
     except S3Error as e:
         if e.code == "NoSuchKey":
             raise HTTPException(404, f"File '{object_path}' not found in bucket '{bucket_name}'")
@@ -296,7 +264,17 @@ def apply_measure_filters(df: pd.DataFrame, measure_filters: List[MeasureFilter]
 
 async def get_unique_values(file_path: str, column: str, limit: int = 100) -> List[Any]:
     """Get unique values for a specific column"""
-    df = await load_csv_from_minio(file_path)
+    df = None
+    if file_path.endswith(".arrow"):
+        # Only the requested column is needed, so push the projection down to
+        # the Flight server instead of transferring the whole table.
+        try:
+            from app.DataStorageRetrieval.arrow_client import download_dataframe
+            df = download_dataframe(file_path, columns=[column])
+        except Exception as exc:
+            print(f"⚠️ correlation column projection failed for {file_path}: {exc}")
+    if df is None:
+        df = await load_csv_from_minio(file_path)
     
     if column not in df.columns:
         raise HTTPException(404, f"Column '{column}' not found")
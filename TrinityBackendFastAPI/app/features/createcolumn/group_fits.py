@@ -0,0 +1,386 @@
+"""Group-wise statsmodels fits of createcolumn, spread over a process pool.
+
+``residual``, ``stl_outlier`` and ``detrend`` / ``deseasonalize`` /
+``detrend_deseasonalize`` fit one model per identifier group.  Through
+``group_apply`` the fits ran one after the other in the request thread and
+then concatenated thousands of small frames, which dominated the latency of
+requests with many SKU x market combinations.
+
+:func:`run_group_fits` fits the groups in chunks on a module-level
+:class:`~concurrent.futures.ProcessPoolExecutor`, started on first use and
+kept until :func:`shutdown`:
+
+* the input columns, the row positions of every group and the group offsets
+  are copied once into :mod:`multiprocessing.shared_memory`; a task only
+  carries the range of groups it fits, so no frame is pickled per group;
+* each chunk returns the fitted values of its rows, written straight back to
+  the positions they came from, so the caller keeps its row order;
+* completed groups are published through ``task_result_store`` when the
+  request carries a ``run_id``.
+
+The per-group computations are the ones of the pandas branches, so the
+serial path (few groups, a single worker, or a daemonic process such as a
+Celery prefork worker, which may not start children) gives the same numbers.
+
+Configuration:
+
+* ``CREATECOLUMN_FIT_WORKERS`` - pool size (see
+  :func:`~app.DataStorageRetrieval.env_config.pool_workers`); ``1`` fits
+  in-process and ``0`` keeps the original ``group_apply`` code;
+* ``CREATECOLUMN_FIT_MIN_GROUPS`` - fewer groups are fitted in-process
+  (default 16, below that the pool start-up costs more than it saves);
+* ``CREATECOLUMN_FIT_CHUNKS_PER_WORKER`` - chunks queued per worker, 4.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.DataStorageRetrieval.env_config import ProcessPool, env_int
+from app.features.shared.task_progress import TaskProgress
+
+logger = logging.getLogger("app.features.createcolumn.group_fits")
+
+RESIDUAL = "residual"
+STL_OUTLIER = "stl_outlier"
+STL_COMPONENTS = "stl_components"
+
+DEFAULT_MIN_GROUPS = 16
+DEFAULT_CHUNKS_PER_WORKER = 4
+
+_pool = ProcessPool("CREATECOLUMN_FIT_WORKERS", "CREATE-FIT")
+
+
+def configured_workers() -> int:
+    return _pool.workers()
+
+
+def enabled() -> bool:
+    """``False`` when ``CREATECOLUMN_FIT_WORKERS=0`` selects the original code."""
+    return configured_workers() > 0
+
+
+def _can_fork_workers() -> bool:
+    # Celery prefork children are daemonic and may not start processes of
+    # their own ("daemonic processes are not allowed to have children").
+    return not multiprocessing.current_process().daemon
+
+
+def shutdown() -> None:
+    """Stop the pool; the next pooled fit starts a new one."""
+    _pool.shutdown()
+
+
+@dataclass
+class GroupLayout:
+    """Rows of every group: ``order[offsets[g]:offsets[g + 1]]`` in frame order."""
+
+    order: np.ndarray
+    offsets: np.ndarray
+
+    @property
+    def groups(self) -> int:
+        return len(self.offsets) - 1
+
+
+def group_layout(df: pd.DataFrame, identifiers: Sequence[str]) -> Optional[GroupLayout]:
+    """Layout of ``df.groupby(identifiers)`` or ``None`` if it would drop or reorder rows.
+
+    ``group_apply`` drops rows with missing identifiers and ends with
+    ``sort_index``; both are only reproduced for complete identifiers and a
+    unique index.
+    """
+    identifiers = list(identifiers)
+    if not identifiers or not df.index.is_unique or not df.columns.is_unique:
+        return None
+    if any(name not in df.columns for name in identifiers):
+        return None
+    if df[identifiers].isna().any().any():
+        return None
+    codes = df.groupby(identifiers, sort=False).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable").astype(np.int64)
+    counts = np.bincount(codes)
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    return GroupLayout(order=order, offsets=offsets)
+
+
+def numeric_columns(df: pd.DataFrame, columns: Sequence[str]) -> bool:
+    return all(
+        name in df.columns
+        and pd.api.types.is_numeric_dtype(df[name])
+        and not pd.api.types.is_bool_dtype(df[name])
+        for name in columns
+    )
+
+
+# ----------------------------------------------------------------------
+# per-group fits - same computations as the pandas branches
+# ----------------------------------------------------------------------
+def _fit_residual(values: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    from .create.base import calculate_residuals
+
+    y_var, x_vars = params["y"], params["x"]
+    out = np.full((len(values), 1), np.nan)
+    if len(values) < 2:
+        return out
+    subdf = pd.DataFrame(values, columns=[y_var, *x_vars])
+    if x_vars and subdf[x_vars].std().min() == 0:
+        return out
+    residuals, _ = calculate_residuals(subdf, y_var, x_vars)
+    out[residuals.index.to_numpy(), 0] = residuals.to_numpy()
+    return out
+
+
+def _fit_stl_outlier(values: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    from statsmodels.tsa.seasonal import STL
+
+    out = np.zeros((len(values), 1))
+    if len(values) < 14:
+        return out
+    residual = STL(values[:, 0], seasonal=13, period=13).fit().resid
+    z_score = (residual - residual.mean()) / residual.std(ddof=1)
+    out[:, 0] = np.abs(z_score) > 3
+    return out
+
+
+def _fit_stl_components(values: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    from statsmodels.tsa.seasonal import STL
+
+    op, period = params["op"], params["period"]
+    out = np.empty_like(values, dtype=np.float64)
+    for column in range(values.shape[1]):
+        res = STL(values[:, column], period=period, robust=True).fit()
+        if op == "detrend":
+            out[:, column] = res.resid + res.seasonal
+        elif op == "deseasonalize":
+            out[:, column] = res.resid + res.trend
+        else:
+            out[:, column] = res.resid
+    return out
+
+
+_FITS = {
+    RESIDUAL: _fit_residual,
+    STL_OUTLIER: _fit_stl_outlier,
+    STL_COMPONENTS: _fit_stl_components,
+}
+
+
+def _fit_range(
+    kind: str,
+    params: Dict[str, Any],
+    values: np.ndarray,
+    order: np.ndarray,
+    offsets: np.ndarray,
+    first: int,
+    last: int,
+) -> np.ndarray:
+    """Fitted values of the rows of groups ``first`` to ``last - 1``, in layout order."""
+    fit = _FITS[kind]
+    base = offsets[first]
+    block = np.empty((offsets[last] - base, _output_width(kind, values)), dtype=np.float64)
+    for group in range(first, last):
+        start, stop = offsets[group], offsets[group + 1]
+        block[start - base : stop - base] = fit(values[order[start:stop]], params)
+    return block
+
+
+def _output_width(kind: str, values: np.ndarray) -> int:
+    return values.shape[1] if kind == STL_COMPONENTS else 1
+
+
+# ----------------------------------------------------------------------
+# shared memory
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class _SharedArray:
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class _SharedArrays:
+    """Copies arrays into shared memory blocks owned by the calling process."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.specs: Dict[str, _SharedArray] = {}
+        try:
+            for key, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.specs[key] = _SharedArray(block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+
+def _fit_shared_chunk(
+    kind: str, params: Dict[str, Any], specs: Dict[str, _SharedArray], first: int, last: int
+) -> Tuple[int, int, np.ndarray]:
+    blocks = []
+    try:
+        arrays = {}
+        for key, spec in specs.items():
+            block = shared_memory.SharedMemory(name=spec.name)
+            blocks.append(block)
+            arrays[key] = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=block.buf)
+        block_values = _fit_range(
+            kind, params, arrays["values"], arrays["order"], arrays["offsets"], first, last
+        )
+        # Drop the views before closing the mappings they point into.
+        arrays.clear()
+        return first, last, block_values
+    finally:
+        for block in blocks:
+            block.close()
+
+
+# ----------------------------------------------------------------------
+# progress
+# ----------------------------------------------------------------------
+class GroupFitProgress(TaskProgress):
+    """Publishes fitted groups of a createcolumn request through ``task_result_store``.
+
+    Clients pass ``run_id`` with ``/perform`` and poll
+    ``GET /api/task-queue/{run_id}``; ``metadata.fits`` holds the groups fitted
+    per operation.
+    """
+
+    task_name = "createcolumn.perform"
+    label = "createcolumn"
+
+    def __init__(self, run_id: str, store: Any = None):
+        self.fits: Dict[str, Dict[str, int]] = {}
+        super().__init__(run_id, store)
+
+    def metadata(self) -> Dict[str, Any]:
+        return {"fits": self.fits}
+
+    def fit_progress(self, label: str, done: int, total: int) -> None:
+        self.fits[label] = {"groups_done": done, "groups_total": total}
+        self._publish()
+
+
+# ----------------------------------------------------------------------
+# entry point
+# ----------------------------------------------------------------------
+def _chunks(groups: int, workers: int, per_worker: int) -> Iterator[Tuple[int, int]]:
+    size = max(1, math.ceil(groups / max(workers * per_worker, 1)))
+    for first in range(0, groups, size):
+        yield first, min(first + size, groups)
+
+
+def _run_serial(kind, params, values, layout, report) -> np.ndarray:
+    out = np.empty((len(values), _output_width(kind, values)), dtype=np.float64)
+    done = 0
+    for first, last in _chunks(layout.groups, 1, DEFAULT_CHUNKS_PER_WORKER):
+        block = _fit_range(kind, params, values, layout.order, layout.offsets, first, last)
+        out[layout.order[layout.offsets[first] : layout.offsets[last]]] = block
+        done += last - first
+        report(done)
+    return out
+
+
+def _run_pool(kind, params, values, layout, workers, report) -> np.ndarray:
+    out = np.empty((len(values), _output_width(kind, values)), dtype=np.float64)
+    shared = _SharedArrays({"values": values, "order": layout.order, "offsets": layout.offsets})
+    try:
+        per_worker = max(env_int("CREATECOLUMN_FIT_CHUNKS_PER_WORKER", DEFAULT_CHUNKS_PER_WORKER), 1)
+        executor = _pool.get()
+        try:
+            futures = [
+                executor.submit(_fit_shared_chunk, kind, params, shared.specs, first, last)
+                for first, last in _chunks(layout.groups, workers, per_worker)
+            ]
+        except BrokenProcessPool:
+            _pool.discard(executor)
+            raise
+        done = 0
+        try:
+            for future in as_completed(futures):
+                first, last, block = future.result()
+                out[layout.order[layout.offsets[first] : layout.offsets[last]]] = block
+                done += last - first
+                report(done)
+        except BrokenProcessPool:
+            _pool.discard(executor)
+            raise
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    finally:
+        shared.close()
+    return out
+
+
+def run_group_fits(
+    kind: str,
+    values: np.ndarray,
+    layout: GroupLayout,
+    params: Optional[Dict[str, Any]] = None,
+    *,
+    label: Optional[str] = None,
+    progress: Optional[GroupFitProgress] = None,
+) -> np.ndarray:
+    """Fit every group of ``layout`` on the rows of ``values``.
+
+    Returns an array with one row per row of ``values`` (same positions) and
+    one column per fitted output.  Errors raised by a fit propagate as they
+    would from the pandas branch.
+    """
+    params = dict(params or {})
+    values = np.asarray(values, dtype=np.float64)
+    label = label or kind
+    total = layout.groups
+
+    def report(done: int) -> None:
+        if progress is not None:
+            progress.fit_progress(label, done, total)
+
+    workers = min(configured_workers(), total)
+    min_groups = env_int("CREATECOLUMN_FIT_MIN_GROUPS", DEFAULT_MIN_GROUPS)
+    if workers > 1 and total >= min_groups and _can_fork_workers():
+        try:
+            result = _run_pool(kind, params, values, layout, workers, report)
+            logger.info("🧮 [CREATE-FIT] %s: %d groups on %d workers", label, total, workers)
+            return result
+        except (BrokenProcessPool, OSError) as exc:
+            logger.warning("⚠️ [CREATE-FIT] Process pool unavailable for %s, fitting in-process: %s", label, exc)
+    return _run_serial(kind, params, values, layout, report)
+
+
+__all__ = [
+    "GroupFitProgress",
+    "GroupLayout",
+    "RESIDUAL",
+    "STL_COMPONENTS",
+    "STL_OUTLIER",
+    "configured_workers",
+    "enabled",
+    "group_layout",
+    "numeric_columns",
+    "run_group_fits",
+    "shutdown",
+]
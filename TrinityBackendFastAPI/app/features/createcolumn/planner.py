@@ -0,0 +1,546 @@
+"""Fused Polars execution of createcolumn operations.
+
+``perform_createcolumn_task`` applies operations one by one through a long
+``if/elif`` chain of pandas code.  Every time-series operation re-parses the
+date column, re-sorts the whole frame and loops over the identifier groups in
+Python (``group_apply``), and the fiscal mappings call a lambda per row.  On
+frames with many combinations the group loops dominate the request.
+
+:class:`OperationPlanner` compiles the operations it understands into Polars
+expressions and keeps them pending; consecutive planned operations run as one
+lazy plan when :meth:`OperationPlanner.flush` is called:
+
+* element-wise operations (``add`` ... ``pct_change``, ``abs``, ``power``,
+  ``log``, ``sqrt``, ``exp``, ``dummy``) become column expressions;
+* ``datetime``, ``fiscal_mapping`` and ``is_weekend`` / ``is_month_end`` /
+  ``is_qtr_end`` use the vectorised ``dt`` namespace, each source column is
+  parsed once per plan;
+* ``lag``, ``lead``, ``diff``, ``growth_rate``, ``rolling_*`` and
+  ``cumulative_sum`` sort by the date and evaluate per identifier group with
+  ``over()`` instead of a Python loop.
+
+The plan reproduces the pandas chain exactly, including its row order: an
+ungrouped time-series operation leaves the frame sorted by date, a grouped one
+(and ``exp`` with identifiers) restores the index order.  Both engines sort
+stably, so rows sharing a date keep their relative order.  Anything the
+planner cannot reproduce - statsmodels / sklearn operations, row filters,
+renames, frequency based growth rates, non-numeric inputs, identifiers with
+missing values - returns ``None`` from :meth:`OperationPlanner.plan`; the
+caller flushes the pending plan and runs the operation on pandas.
+
+``CREATECOLUMN_ENGINE=pandas`` disables the planner.
+"""
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+logger = logging.getLogger("app.features.createcolumn.planner")
+
+ENGINES = ("polars", "pandas")
+
+NUMBER = "number"
+DATETIME = "datetime"
+TEXT = "text"
+BOOL = "bool"
+OTHER = "other"
+
+ELEMENTWISE_OPS = {
+    "add",
+    "subtract",
+    "multiply",
+    "divide",
+    "pct_change",
+    "abs",
+    "power",
+    "log",
+    "sqrt",
+    "exp",
+    "dummy",
+}
+DATE_OPS = {"datetime", "fiscal_mapping", "is_weekend", "is_month_end", "is_qtr_end"}
+WINDOW_OPS = {
+    "lag",
+    "lead",
+    "diff",
+    "growth_rate",
+    "rolling_mean",
+    "rolling_sum",
+    "rolling_min",
+    "rolling_max",
+    "cumulative_sum",
+}
+PLANNED_OPS = ELEMENTWISE_OPS | DATE_OPS | WINDOW_OPS
+
+# Frequencies for which growth_rate aggregates per period (kept on pandas).
+# The service looks them up with ``frequency.lower()``, so the single letter
+# codes never match; they are listed to mirror its mapping.
+_GROWTH_FREQUENCIES = {
+    "daily", "weekly", "monthly", "quarterly", "yearly", "D", "W", "M", "Q", "Y",
+}
+
+_ROW = "__planner_row__"
+_ORDER = "__planner_order__"
+_DATE_PREFIX = "__planner_date__"
+
+_ROLLING_ARG = (
+    "min_samples"
+    if "min_samples" in inspect.signature(pl.Expr.rolling_mean).parameters
+    else "min_periods"
+)
+
+Param = Callable[..., Optional[str]]
+
+
+def configured_engine() -> str:
+    """Engine selected through ``CREATECOLUMN_ENGINE``; ``polars`` by default."""
+    value = (os.getenv("CREATECOLUMN_ENGINE") or "polars").strip().lower()
+    return value if value in ENGINES else "polars"
+
+
+def column_kind(dtype) -> str:
+    """Coarse kind of a pandas dtype; ``other`` columns are never planned."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return BOOL
+    if pd.api.types.is_numeric_dtype(dtype):
+        return NUMBER
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DATETIME
+    if isinstance(dtype, pd.StringDtype):
+        # object columns may mix types, only proper string columns qualify.
+        return TEXT
+    return OTHER
+
+
+@dataclass
+class PlannedStep:
+    """One operation compiled to Polars expressions."""
+
+    op: str
+    outputs: List[Tuple[str, pl.Expr]]
+    inputs: Set[str]
+    # Names appended to ``new_cols_total``; the pandas chain is not uniform here.
+    reported: Optional[List[str]] = None
+    kinds: Dict[str, str] = field(default_factory=dict)
+    dates: Set[str] = field(default_factory=set)
+    sort_date: Optional[str] = None
+    grouped: bool = False
+    restore_order: bool = False
+
+
+def _date(name: str) -> pl.Expr:
+    return pl.col(f"{_DATE_PREFIX}{name}")
+
+
+def _rolling(expr: pl.Expr, method: str, window: int) -> pl.Expr:
+    return getattr(expr, method)(window_size=window, **{_ROLLING_ARG: 1})
+
+
+def _two_digits(value: pl.Expr) -> pl.Expr:
+    return (value % 100).cast(pl.Utf8).str.zfill(2)
+
+
+def _fiscal_expr(date: pl.Expr, param: str, start_month: int) -> pl.Expr:
+    year = date.dt.year().cast(pl.Int64)
+    month = date.dt.month().cast(pl.Int64)
+    fiscal_year = year + (month >= start_month).cast(pl.Int64)
+    fiscal_month = (month - start_month + 12) % 12 + 1
+    if param == "fiscal_year":
+        return pl.concat_str([pl.lit("FY"), _two_digits(fiscal_year)])
+    if param == "fiscal_quarter":
+        quarter = (fiscal_month - 1) // 3 + 1
+        return pl.concat_str(
+            [pl.lit("FY"), _two_digits(fiscal_year), pl.lit("-Q"), quarter.cast(pl.Utf8)]
+        )
+    if param == "fiscal_month":
+        return pl.concat_str(
+            [
+                pl.lit("FY"),
+                _two_digits(fiscal_year),
+                pl.lit("-M"),
+                fiscal_month.cast(pl.Utf8).str.zfill(2),
+            ]
+        )
+    if param == "fiscal_year_full":
+        return pl.concat_str([pl.lit("FY"), fiscal_year.cast(pl.Utf8)])
+    raise ValueError(f"Invalid fiscal_mapping param: {param}")
+
+
+def _datetime_expr(date: pl.Expr, param: str) -> Tuple[str, pl.Expr, str]:
+    if param == "to_year":
+        return "year", date.dt.year().cast(pl.Int32), NUMBER
+    if param == "to_month":
+        return "month", date.dt.month().cast(pl.Int32), NUMBER
+    if param == "to_week":
+        return "week", date.dt.week().cast(pl.UInt32), NUMBER
+    if param == "to_day":
+        return "day", date.dt.day().cast(pl.Int32), NUMBER
+    if param == "to_day_name":
+        return "day_name", date.dt.strftime("%A"), TEXT
+    if param == "to_month_name":
+        return "month_name", date.dt.strftime("%B"), TEXT
+    raise ValueError(f"Invalid datetime param: {param}")
+
+
+def _growth_period(op: str, op_idx: Optional[str], param: Param) -> Optional[int]:
+    """Period of a simple growth rate, ``None`` when a frequency is requested."""
+    raw = param(f"{op}_{op_idx}_param")
+    period = 1
+    frequency = None
+    if raw:
+        try:
+            parsed = json.loads(raw) if isinstance(raw, str) else raw
+            if isinstance(parsed, dict):
+                period = int(parsed.get("period", 1))
+                frequency = parsed.get("frequency")
+            else:
+                period = int(raw)
+        except (json.JSONDecodeError, ValueError, TypeError):
+            period = int(raw)
+    frequency = param(f"{op}_{op_idx}_frequency") or frequency
+    if frequency and frequency.lower() in _GROWTH_FREQUENCIES:
+        return None
+    if period < 1:
+        raise ValueError("Period must be at least 1 for growth_rate operation")
+    return period
+
+
+class OperationPlanner:
+    """Accumulates createcolumn operations into one lazy Polars plan.
+
+    ``param`` is the form lookup (``FormPayload.get``) and ``identifiers`` the
+    grouping columns ``group_apply`` would loop over.
+    """
+
+    def __init__(self, identifiers: Sequence[str], param: Param):
+        self.identifiers = list(identifiers)
+        self.param = param
+        self.pending: List[PlannedStep] = []
+        self._kinds: Dict[str, str] = {}
+        self._base: Set[str] = set()
+        self._written: Set[str] = set()
+        self._groupable: Optional[bool] = None
+        self._order: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # planning
+    # ------------------------------------------------------------------
+    def _sync(self, df: pd.DataFrame) -> None:
+        self._kinds = {col: column_kind(dtype) for col, dtype in df.dtypes.items()}
+        self._base = set(df.columns)
+        self._written = set()
+        self._groupable = None
+        self._order = None
+
+    def _can_group(self, df: pd.DataFrame) -> bool:
+        """Whether ``group_apply`` keeps every row and ends in index order."""
+        if self._groupable is None:
+            ok = (
+                df.columns.is_unique
+                and df.index.is_unique
+                and all(name in self._base for name in self.identifiers)
+                and not df[self.identifiers].isna().any().any()
+            )
+            if ok:
+                try:
+                    order = np.empty(len(df), dtype=np.int64)
+                    order[df.index.argsort()] = np.arange(len(df))
+                    self._order = order
+                except TypeError:
+                    ok = False
+            self._groupable = bool(ok)
+        return self._groupable
+
+    def _source(self, name: str) -> bool:
+        """``name`` is an unmodified column of the frame the plan starts from."""
+        return name in self._base and name not in self._written
+
+    def _numeric(self, columns: Sequence[str]) -> bool:
+        return all(self._kinds.get(col) == NUMBER for col in columns)
+
+    def plan(
+        self,
+        df: pd.DataFrame,
+        op: str,
+        columns: List[str],
+        rename_val: Optional[str],
+        op_idx: Optional[str],
+    ) -> Optional[List[str]]:
+        """Queue ``op`` and return its new column names, or ``None`` if unsupported.
+
+        ``df`` must be the frame as of the last :meth:`flush`.  Validation
+        errors are raised with the same messages as the pandas chain.
+        """
+        if op not in PLANNED_OPS or df.empty or not df.columns.is_unique:
+            return None
+        if not self.pending:
+            self._sync(df)
+        if op in ELEMENTWISE_OPS:
+            step = self._elementwise(df, op, columns, rename_val, op_idx)
+        elif op in DATE_OPS:
+            step = self._date_step(op, columns, rename_val, op_idx)
+        else:
+            step = self._window(df, op, columns, rename_val, op_idx)
+        if step is None:
+            return None
+        return self._queue(step)
+
+    def _queue(self, step: PlannedStep) -> Optional[List[str]]:
+        names = [name for name, _ in step.outputs]
+        if any(name in self.identifiers or name.startswith("__planner_") for name in names):
+            return None
+        # Inputs still holding their original values are read from the frame.
+        step.inputs = {col for col in step.inputs if self._source(col)}
+        for name in names:
+            self._kinds[name] = step.kinds.get(name, NUMBER)
+            self._written.add(name)
+        self.pending.append(step)
+        return step.reported if step.reported is not None else names
+
+    def _elementwise(self, df, op, columns, rename_val, op_idx) -> Optional[PlannedStep]:
+        restore = False
+        reported: Optional[List[str]] = None
+        if op in {"add", "subtract", "multiply", "divide"}:
+            if not self._numeric(columns):
+                return None
+            joiner = {"add": "_plus_", "subtract": "_minus_", "multiply": "_x_", "divide": "_div_"}[op]
+            new_col = rename_val or joiner.join(columns)
+            if op == "add":
+                expr = pl.sum_horizontal([pl.col(col) for col in columns])
+            else:
+                expr = pl.col(columns[0])
+                for col in columns[1:]:
+                    if op == "subtract":
+                        expr = expr - pl.col(col)
+                    elif op == "multiply":
+                        expr = expr * pl.col(col)
+                    else:
+                        expr = expr / pl.col(col)
+            outputs = [(new_col, expr)]
+        elif op == "pct_change":
+            if len(columns) != 2:
+                raise ValueError("pct_change requires exactly 2 columns")
+            col1, col2 = columns
+            if col1 not in self._kinds or col2 not in self._kinds:
+                raise ValueError(f"Columns '{col1}' or '{col2}' not found for pct_change operation")
+            if not self._numeric(columns):
+                return None
+            denominator = pl.when(pl.col(col1) == 0).then(None).otherwise(pl.col(col1))
+            expr = (pl.col(col2) - pl.col(col1)).cast(pl.Float64) / denominator * 100
+            outputs = [(rename_val or f"{col2}_pct_change_from_{col1}", expr)]
+        elif op == "abs":
+            for col in columns:
+                if col not in self._kinds:
+                    raise ValueError(f"Column '{col}' not found for abs operation")
+            if not self._numeric(columns):
+                return None
+            outputs = [(rename_val or f"{col}_abs", pl.col(col).abs()) for col in columns]
+            reported = [name for name, _ in outputs]
+        elif op == "power":
+            param = self.param(f"{op}_{op_idx}_param")
+            if param is None:
+                raise ValueError("Missing `param` for power operation")
+            exponent = float(param)
+            if not self._numeric(columns):
+                return None
+            outputs = [
+                (rename_val or f"{col}_power{param}", pl.col(col).cast(pl.Float64).pow(exponent))
+                for col in columns
+            ]
+            reported = [name for name, _ in outputs]
+        elif op in {"log", "sqrt"}:
+            if not self._numeric(columns):
+                return None
+            outputs = []
+            for col in columns:
+                value = pl.col(col).cast(pl.Float64)
+                outputs.append((rename_val or f"{col}_{op}", value.log() if op == "log" else value.sqrt()))
+            reported = [name for name, _ in outputs]
+        elif op == "exp":
+            if not self._numeric(columns):
+                return None
+            if self.identifiers:
+                if not self._can_group(df):
+                    return None
+                restore = True
+            outputs = [(rename_val or f"{col}_exp", pl.col(col).cast(pl.Float64).exp()) for col in columns]
+            reported = [rename_val] if rename_val else [f"{col}_exp" for col in columns]
+        else:  # dummy
+            for col in columns:
+                if col not in self._kinds:
+                    raise ValueError(f"Column '{col}' not found for dummy operation")
+            if any(self._kinds[col] not in (NUMBER, TEXT, DATETIME, BOOL) for col in columns):
+                return None
+            outputs = [
+                (rename_val or f"{col}_dummy", (pl.col(col).rank("dense") - 1).cast(pl.Int64).fill_null(-1))
+                for col in columns
+            ]
+            reported = [name for name, _ in outputs]
+        return PlannedStep(op, outputs, set(columns), reported=reported, restore_order=restore)
+
+    def _check_new(self, name: str) -> None:
+        if name in self._kinds:
+            raise ValueError(
+                f"Column name '{name}' already exists in the uploaded file. Please provide a unique name."
+            )
+
+    def _date_step(self, op, columns, rename_val, op_idx) -> Optional[PlannedStep]:
+        date_col = columns[0]
+        if date_col not in self._kinds:
+            raise ValueError(f"Column '{date_col}' not found for {op} operation")
+        if op == "datetime":
+            param = self.param(f"{op}_{op_idx}_param")
+            if param is None:
+                raise ValueError("Missing `param` for datetime operation")
+            suffix, expr, kind = _datetime_expr(_date(date_col), param)
+            new_col = rename_val or f"{date_col}_{suffix}"
+        elif op == "fiscal_mapping":
+            param = self.param(f"{op}_{op_idx}_param")
+            start_month = int(self.param(f"{op}_{op_idx}_fiscal_start_month", 1))
+            if param is None:
+                raise ValueError("Missing `param` for fiscal_mapping operation")
+            expr = _fiscal_expr(_date(date_col), param, start_month)
+            new_col = rename_val or f"{date_col}_{param}"
+            self._check_new(new_col)
+            kind = TEXT
+        else:
+            date = _date(date_col)
+            if op == "is_weekend":
+                expr = date.dt.weekday().is_in([6, 7])
+            else:
+                expr = date.dt.day() == date.dt.month_end().dt.day()
+                if op == "is_qtr_end":
+                    expr = expr & date.dt.month().is_in([3, 6, 9, 12])
+            expr = expr.fill_null(False)
+            new_col = rename_val or f"{date_col}_{op}"
+            self._check_new(new_col)
+            kind = BOOL
+        if not self._source(date_col):
+            return None
+        return PlannedStep(op, [(new_col, expr)], set(), kinds={new_col: kind}, dates={date_col})
+
+    def _window(self, df, op, columns, rename_val, op_idx) -> Optional[PlannedStep]:
+        date_col = next((c for c in self._kinds if c.strip().lower() == "date"), None)
+        if not date_col:
+            raise ValueError(f"No date column found for {op} operation")
+        if op == "growth_rate":
+            period = _growth_period(op, op_idx, self.param)
+            if period is None:
+                return None
+        elif op != "cumulative_sum":
+            param = self.param(f"{op}_{op_idx}_param")
+            if param is None:
+                raise ValueError(f"Missing `param` for {op} operation")
+            period = int(param)
+            if period < 1:
+                label = "Window" if op.startswith("rolling_") else "Period"
+                raise ValueError(f"{label} must be at least 1 for {op} operation")
+        if not self._source(date_col) or not self._numeric(columns):
+            return None
+        grouped = bool(self.identifiers)
+        if grouped and not self._can_group(df):
+            return None
+
+        outputs = []
+        for col in columns:
+            value = pl.col(col)
+            if op == "cumulative_sum":
+                expr = value.cum_sum()
+            else:
+                value = value.cast(pl.Float64)
+                if op == "lag":
+                    expr = value.shift(period)
+                elif op == "lead":
+                    expr = value.shift(-period)
+                elif op == "diff":
+                    expr = value - value.shift(period)
+                elif op == "growth_rate":
+                    lagged = value.shift(period)
+                    expr = (value - lagged) / lagged * 100
+                else:
+                    expr = _rolling(value, op, period)
+            if grouped:
+                expr = expr.over(self.identifiers)
+            outputs.append((rename_val or f"{col}_{op}", expr))
+        return PlannedStep(
+            op,
+            outputs,
+            set(columns),
+            reported=[rename_val] if rename_val else [f"{col}_{op}" for col in columns],
+            dates={date_col},
+            sort_date=date_col,
+            grouped=grouped,
+            restore_order=grouped,
+        )
+
+    # ------------------------------------------------------------------
+    # execution
+    # ------------------------------------------------------------------
+    def flush(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Run the pending operations on ``df`` as one plan and return the result."""
+        if not self.pending:
+            return df
+        steps, self.pending = self.pending, []
+        inputs: Dict[str, None] = {}
+        dates: Dict[str, None] = {}
+        grouped = False
+        for step in steps:
+            inputs.update(dict.fromkeys(sorted(step.inputs)))
+            dates.update(dict.fromkeys(step.dates))
+            grouped = grouped or step.grouped or step.restore_order
+        if grouped:
+            inputs.update(dict.fromkeys(self.identifiers))
+
+        series = [pl.from_pandas(df[name], nan_to_null=True).alias(name) for name in inputs]
+        for name in dates:
+            parsed = pd.to_datetime(df[name], errors="coerce")
+            series.append(pl.from_pandas(parsed).alias(f"{_DATE_PREFIX}{name}"))
+        series.append(pl.Series(_ROW, np.arange(len(df), dtype=np.int64)))
+        if grouped:
+            series.append(pl.Series(_ORDER, self._order))
+        frame = pl.DataFrame(series)
+
+        lazy = frame.lazy()
+        produced: Dict[str, None] = {}
+        for step in steps:
+            if step.sort_date:
+                lazy = lazy.sort(
+                    f"{_DATE_PREFIX}{step.sort_date}", nulls_last=True, maintain_order=True
+                )
+            for name, expr in step.outputs:
+                lazy = lazy.with_columns(expr.alias(name))
+                produced[name] = None
+            if step.restore_order:
+                lazy = lazy.sort(_ORDER)
+        result = lazy.select([_ROW, *produced]).collect()
+
+        positions = result[_ROW].to_numpy()
+        if not np.array_equal(positions, np.arange(len(df))):
+            df = df.iloc[positions]
+        values = result.drop(_ROW).to_pandas()
+        values.index = df.index
+        df = df.assign(**{name: values[name] for name in produced})
+        logger.info(
+            "⚡ [CREATE-PLAN] Ran %d operations as one Polars plan: %s",
+            len(steps),
+            ", ".join(step.op for step in steps),
+        )
+        return df
+
+
+__all__ = [
+    "ENGINES",
+    "OperationPlanner",
+    "PLANNED_OPS",
+    "PlannedStep",
+    "column_kind",
+    "configured_engine",
+]
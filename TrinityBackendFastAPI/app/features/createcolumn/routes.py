@@ -150,6 +150,7 @@ async def perform_create(
     client_name: str = Form(""),
     app_name: str = Form(""),
     project_name: str = Form(""),
+    run_id: str = Form(None),
 ):
     form_data = await request.form()
     form_items = [(key, value) for key, value in form_data.multi_items()]
@@ -168,6 +169,7 @@ async def perform_create(
         client_name=client_name,
         app_name=app_name,
         project_name=project_name,
+        run_id=run_id,
     )
 
     if submission.status == "failure":
@@ -18,6 +18,8 @@ from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from statsmodels.tsa.seasonal import STL
 
 from .create.base import calculate_residuals, compute_rpi
+from . import group_fits
+from .planner import OperationPlanner, configured_engine
 from .deps import (
     MINIO_BUCKET,
     get_minio_df,
@@ -320,6 +322,49 @@ def perform_createcolumn_task(
     client_name: str = "",
     app_name: str = "",
     project_name: str = "",
+    run_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Apply the create/transform operations of ``form_items`` to the object.
+
+    With ``run_id`` the progress of group-wise fits is published through
+    ``task_result_store`` under that id.
+    """
+    progress: Optional[group_fits.GroupFitProgress] = None
+    if run_id:
+        progress = group_fits.GroupFitProgress(run_id)
+        progress.start({"atom": "createcolumn", "object_name": object_name})
+    try:
+        result = _perform_createcolumn(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            object_prefix=object_prefix,
+            identifiers=identifiers,
+            form_items=form_items,
+            client_name=client_name,
+            app_name=app_name,
+            project_name=project_name,
+            progress=progress,
+        )
+    except Exception as exc:
+        if progress is not None:
+            progress.finish("failure", str(exc))
+        raise
+    if progress is not None:
+        progress.finish()
+    return result
+
+
+def _perform_createcolumn(
+    *,
+    bucket_name: str,
+    object_name: str,
+    object_prefix: str,
+    identifiers: Optional[str],
+    form_items: Sequence[Tuple[str, str]],
+    client_name: str,
+    app_name: str,
+    project_name: str,
+    progress: Optional[group_fits.GroupFitProgress],
 ) -> Dict[str, Any]:
     logger.info("🔵 [CREATE-PERFORM] Starting perform operation")
     logger.info("📂 [CREATE-PERFORM] Input file: %s", object_name)
@@ -402,7 +447,8 @@ def perform_createcolumn_task(
     # 🔧 CRITICAL FIX: Skip environment context fields and other non-operation fields
     legacy_skipped = {
         "options", "object_names", "bucket_name", "identifiers",
-        "client_name", "app_name", "project_name"  # Environment context fields
+        "client_name", "app_name", "project_name",  # Environment context fields
+        "run_id",  # Progress record of group-wise fits
     }
     for key, value in form_payload.multi_items():
         # Skip if it's in the skipped list, matches the operation pattern, or is a parameter field
@@ -435,11 +481,31 @@ def perform_createcolumn_task(
 
     new_cols_total: List[str] = []
 
+    def fit_layout(value_columns: List[str]) -> Optional[group_fits.GroupLayout]:
+        # Group-wise fits run on the process pool unless the pandas code is selected.
+        if not group_fits.enabled() or not group_fits.numeric_columns(df, value_columns):
+            return None
+        return group_fits.group_layout(df, identifiers_list)
+
+    # Consecutive supported operations run as one Polars plan; see planner.py.
+    planner = (
+        OperationPlanner(identifiers_list, form_payload.get)
+        if configured_engine() == "polars"
+        else None
+    )
+
     for op, columns, rename_val, op_idx in operations:
         # filter_percentile doesn't require columns - it only needs metric_col parameter
         if not columns and op != "filter_percentile":
             raise ValueError(f"No columns provided for operation {op}")
 
+        if planner is not None:
+            planned = planner.plan(df, op, columns, rename_val, op_idx)
+            if planned is not None:
+                new_cols_total.extend(planned)
+                continue
+            df = planner.flush(df)
+
         if op == "add":
             new_col = rename_val or "_plus_".join(columns)
             df[new_col] = df[columns].sum(axis=1)
@@ -496,7 +562,20 @@ def perform_createcolumn_task(
                 subdf[new_col] = residuals
                 return subdf
 
-            df = group_apply(df, residual_func)
+            layout = fit_layout(columns) if len(set(columns)) == len(columns) else None
+            if layout is not None:
+                fitted = group_fits.run_group_fits(
+                    group_fits.RESIDUAL,
+                    df[columns].to_numpy(dtype=np.float64),
+                    layout,
+                    {"y": y_var, "x": x_vars},
+                    label=f"{op}_{op_idx}" if op_idx else op,
+                    progress=progress,
+                )
+                df[rename_val or f"Res_{y_var}"] = fitted[:, 0]
+                df = df.sort_index()
+            else:
+                df = group_apply(df, residual_func)
             new_cols_total.append(rename_val or f"Res_{y_var}")
         elif op == "stl_outlier":
             date_col = next((c for c in df.columns if c.strip().lower() == "date"), None)
@@ -509,11 +588,11 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
 
             def stl_outlier_func(subdf: pd.DataFrame) -> pd.DataFrame:
                 working = subdf.copy()
-                working = working.sort_values(by=temp_date_col)
+                working = working.sort_values(by=temp_date_col, kind="stable")
                 new_col = rename_val or "is_outlier"
                 working[new_col] = 0
                 if len(working) < 14:
@@ -527,7 +606,21 @@ def perform_createcolumn_task(
                 working[new_col] = (np.abs(z_score) > 3).astype(int)
                 return working
 
-            df = group_apply(df, stl_outlier_func)
+            volume_col = next((c for c in df.columns if c.strip().lower() == "volume"), None)
+            layout = fit_layout([volume_col]) if volume_col else None
+            if layout is not None:
+                # Rows of each group are already in date order after the sort above.
+                fitted = group_fits.run_group_fits(
+                    group_fits.STL_OUTLIER,
+                    df[[volume_col]].to_numpy(dtype=np.float64),
+                    layout,
+                    label=f"{op}_{op_idx}" if op_idx else op,
+                    progress=progress,
+                )
+                df[rename_val or "is_outlier"] = fitted[:, 0].astype(int)
+                df = df.sort_index()
+            else:
+                df = group_apply(df, stl_outlier_func)
             
             # Restore original date column values and remove temporary column
             df[date_col] = original_date_values
@@ -795,10 +888,7 @@ def perform_createcolumn_task(
                     
                     # Clamp the result date to stay within the same month
                     # If result_date is beyond the month, use the last day of the month
-                    df[new_col] = pd.Series([
-                        min(rd, nm) if pd.notna(rd) and pd.notna(nm) else rd
-                        for rd, nm in zip(result_date, next_month)
-                    ])
+                    df[new_col] = result_date.mask(result_date > next_month, next_month).to_numpy()
                 else:
                     # Default mode: Build from year + month + day
                     month_col = second_col
@@ -1029,7 +1119,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             period_param = form_payload.get(f"{op}_{op_idx}_period")
             if period_param is not None:
@@ -1096,7 +1186,26 @@ def perform_createcolumn_task(
                         subdf[new_col_inner] = res.resid
                 return subdf
 
-            df = group_apply(df, stl_transform)
+            layout = fit_layout(columns)
+            if layout is not None:
+                fitted = group_fits.run_group_fits(
+                    group_fits.STL_COMPONENTS,
+                    df[columns].to_numpy(dtype=np.float64),
+                    layout,
+                    {"op": op, "period": period},
+                    label=f"{op}_{op_idx}" if op_idx else op,
+                    progress=progress,
+                )
+                suffix = {
+                    "detrend": "detrended",
+                    "deseasonalize": "deseasonalized",
+                    "detrend_deseasonalize": "detrend_deseasonalized",
+                }[op]
+                for position, col in enumerate(columns):
+                    df[rename_val or f"{col}_{suffix}"] = fitted[:, position]
+                df = df.sort_index()
+            else:
+                df = group_apply(df, stl_transform)
             
             # Restore original date column values and remove temporary column
             df[date_col] = original_date_values
@@ -1141,7 +1250,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             param = form_payload.get(f"{op}_{op_idx}_param")
             if param is None:
@@ -1177,7 +1286,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             param = form_payload.get(f"{op}_{op_idx}_param")
             if param is None:
@@ -1213,7 +1322,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             param = form_payload.get(f"{op}_{op_idx}_param")
             if param is None:
@@ -1250,7 +1359,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             # Parse parameters - can be JSON string or simple period number
             param = form_payload.get(f"{op}_{op_idx}_param")
@@ -1396,7 +1505,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             param = form_payload.get(f"{op}_{op_idx}_param")
             if param is None:
@@ -1449,7 +1558,7 @@ def perform_createcolumn_task(
             # Create temporary datetime column for calculations (don't modify original)
             temp_date_col = f"__temp_{date_col}__"
             df[temp_date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df.sort_values(by=temp_date_col, inplace=True)
+            df.sort_values(by=temp_date_col, kind="stable", inplace=True)
             
             def cumulative_sum_func(subdf: pd.DataFrame) -> pd.DataFrame:
                 for col in columns:
@@ -2240,6 +2349,9 @@ def perform_createcolumn_task(
         else:
             raise ValueError(f"Unsupported operation: {op}")
 
+    if planner is not None:
+        df = planner.flush(df)
+
     if not new_cols_total:
         raise ValueError("No new columns were created")
 
@@ -21,6 +21,7 @@ def submit_perform_task(
     client_name: str,
     app_name: str,
     project_name: str,
+    run_id: Optional[str] = None,
 ) -> TaskSubmission:
     return celery_task_client.submit_callable(
         name="createcolumn.perform",
@@ -34,6 +35,7 @@ def submit_perform_task(
             "client_name": client_name,
             "app_name": app_name,
             "project_name": project_name,
+            "run_id": run_id,
         },
         metadata={
             "atom": "createcolumn",
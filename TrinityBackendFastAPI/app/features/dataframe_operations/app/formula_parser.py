@@ -4,11 +4,17 @@ import ast
 import json
 import math
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Mapping
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from types import CodeType
+from typing import Any, Callable, Dict, Hashable, Iterable, Mapping, Tuple
 
 import numpy as np
 import pandas as pd
+import polars as pl
+
+from app.DataStorageRetrieval.env_config import env_int
 
 
 class FormulaEvaluationError(Exception):
@@ -544,6 +550,447 @@ class _FunctionRegistry:
         return series.where(~mask, replacement_series)
 
 
+DEFAULT_PLAN_CACHE_SIZE = 512
+_MISSING = object()
+
+
+@dataclass
+class FormulaPlanCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    max_entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+class FormulaPlanCache:
+    """Thread-safe LRU of compiled formula plans.
+
+    Keys combine the normalised expression with the names and dtypes of the
+    columns it can reference, so the same formula replayed on a frame of the
+    same shape skips sanitising, parsing and validation entirely.  Failed
+    compilations are not cached.
+    """
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        if max_entries is None:
+            max_entries = env_int("FORMULA_PLAN_CACHE_SIZE", DEFAULT_PLAN_CACHE_SIZE)
+        self.max_entries = max(int(max_entries), 0)
+        self._lock = threading.Lock()
+        self._plans: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._stats = FormulaPlanCacheStats(max_entries=self.max_entries)
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        with self._lock:
+            plan = self._plans.get(key, _MISSING)
+            if plan is not _MISSING:
+                self._plans.move_to_end(key)
+                self._stats.hits += 1
+                return plan
+            self._stats.misses += 1
+        plan = builder()
+        if not self.max_entries:
+            return plan
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+                self._stats.evictions += 1
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._stats.entries = len(self._plans)
+            return self._stats.to_dict()
+
+
+formula_plan_cache = FormulaPlanCache()
+
+
+class _UnsupportedInPolars(Exception):
+    """Raised while compiling when a construct has no native Polars lowering."""
+
+
+_QUARTER_CODES = {1: "JFM", 2: "JFM", 3: "JFM", 4: "AMJ", 5: "AMJ", 6: "AMJ",
+                  7: "JAS", 8: "JAS", 9: "JAS", 10: "OND", 11: "OND", 12: "OND"}
+
+
+class _PolarsFormulaCompiler:
+    """Lower a validated formula AST to a single ``pl.Expr``.
+
+    The lowering mirrors the semantics of :class:`_FunctionRegistry` (missing
+    values skipped by aggregations, ``DIV`` ignoring zero denominators, ``LOG``
+    and ``SQRT`` returning null outside their domain, ...).  Constructs that
+    cannot be expressed natively raise :class:`_UnsupportedInPolars` so the
+    caller can fall back to the pandas evaluator.
+    """
+
+    _bin_ops = {
+        ast.Add: lambda a, b: a + b,
+        ast.Sub: lambda a, b: a - b,
+        ast.Mult: lambda a, b: a * b,
+        ast.Div: lambda a, b: a / b,
+        ast.Pow: lambda a, b: a ** b,
+        ast.Mod: lambda a, b: a % b,
+    }
+    # pandas compares missing values as NaN: only ``!=`` holds for them.
+    _compare_ops = {
+        ast.Eq: lambda a, b: (a == b).fill_null(False),
+        ast.NotEq: lambda a, b: (a != b).fill_null(True),
+        ast.Lt: lambda a, b: (a < b).fill_null(False),
+        ast.LtE: lambda a, b: (a <= b).fill_null(False),
+        ast.Gt: lambda a, b: (a > b).fill_null(False),
+        ast.GtE: lambda a, b: (a >= b).fill_null(False),
+    }
+    _constants = {"PI": math.pi, "E": math.e}
+
+    def __init__(self, column_mapping: Dict[str, str], schema: Mapping[str, pl.DataType]) -> None:
+        self.columns = {safe: original for original, safe in column_mapping.items()}
+        self.schema = schema
+
+    # ------------------------------------------------------------------ Nodes
+    def compile(self, node: ast.AST) -> pl.Expr:
+        method = getattr(self, "_compile_" + node.__class__.__name__, None)
+        if method is None:
+            raise _UnsupportedInPolars(node.__class__.__name__)
+        return method(node)
+
+    def _compile_Expression(self, node: ast.Expression) -> pl.Expr:
+        return self.compile(node.body)
+
+    def _compile_Constant(self, node: ast.Constant) -> pl.Expr:
+        return pl.lit(node.value)
+
+    def _compile_Name(self, node: ast.Name) -> pl.Expr:
+        if node.id in self.columns:
+            return pl.col(self.columns[node.id])
+        if node.id in self._constants:
+            return pl.lit(self._constants[node.id])
+        raise _UnsupportedInPolars(node.id)
+
+    def _compile_BinOp(self, node: ast.BinOp) -> pl.Expr:
+        op = self._bin_ops.get(type(node.op))
+        if op is None:
+            raise _UnsupportedInPolars(type(node.op).__name__)
+        return op(self.compile(node.left), self.compile(node.right))
+
+    def _compile_UnaryOp(self, node: ast.UnaryOp) -> pl.Expr:
+        operand = self.compile(node.operand)
+        if isinstance(node.op, ast.USub):
+            return -operand
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise _UnsupportedInPolars(type(node.op).__name__)
+
+    def _compile_Compare(self, node: ast.Compare) -> pl.Expr:
+        left = self.compile(node.left)
+        result = None
+        for op_node, comparator in zip(node.ops, node.comparators):
+            op = self._compare_ops.get(type(op_node))
+            if op is None:
+                raise _UnsupportedInPolars(type(op_node).__name__)
+            right = self.compile(comparator)
+            cond = op(left, right)
+            result = cond if result is None else result & cond
+            left = right
+        return result
+
+    def _compile_BoolOp(self, node: ast.BoolOp) -> pl.Expr:
+        values = [self.compile(v) for v in node.values]
+        combined = values[0]
+        for value in values[1:]:
+            combined = combined & value if isinstance(node.op, ast.And) else combined | value
+        return combined
+
+    def _compile_Call(self, node: ast.Call) -> pl.Expr:
+        if node.keywords:
+            raise _UnsupportedInPolars("keyword arguments")
+        name = FormulaEngine._function_aliases.get(node.func.id, node.func.id)
+        handler = getattr(self, "_fn_" + name.lower(), None)
+        if handler is None:
+            raise _UnsupportedInPolars(name)
+        return handler(*node.args)
+
+    # ------------------------------------------------------------------ Helpers
+    def _dtype(self, node: ast.AST) -> pl.DataType | None:
+        if isinstance(node, ast.Name) and node.id in self.columns:
+            return self.schema.get(self.columns[node.id])
+        return None
+
+    def _is_series(self, node: ast.AST) -> bool:
+        # Anything derived from a column evaluates to a ``pd.Series`` in the
+        # pandas engine, which is what switches SUM/AVG/MAX/MIN to aggregates.
+        return any(isinstance(n, ast.Name) and n.id in self.columns for n in ast.walk(node))
+
+    def _numeric(self, node: ast.AST) -> pl.Expr:
+        # Equivalent of ``pd.to_numeric(errors="coerce")`` with NaN treated as missing.
+        return self.compile(node).cast(pl.Float64, strict=False).fill_nan(None)
+
+    def _temporal(self, node: ast.AST) -> pl.Expr:
+        dtype = self._dtype(node)
+        if dtype is None or not dtype.is_temporal():
+            raise _UnsupportedInPolars("date parsing of non-temporal column")
+        return self.compile(node)
+
+    @staticmethod
+    def _literal(node: ast.AST) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.operand, ast.Constant):
+            value = node.operand.value
+            return -value if isinstance(node.op, ast.USub) else value
+        raise _UnsupportedInPolars("non-literal argument")
+
+    def _int_literal(self, node: ast.AST, label: str) -> int:
+        try:
+            return int(float(self._literal(node)))
+        except (TypeError, ValueError) as exc:
+            raise FormulaEvaluationError(f"{label} must be an integer.") from exc
+
+    def _is_missing(self, node: ast.AST) -> pl.Expr:
+        expr = self.compile(node)
+        missing = expr.is_null()
+        dtype = self._dtype(node)
+        if dtype is not None and dtype.is_float():
+            missing = missing | expr.is_nan()
+        return missing
+
+    def _is_blank(self, node: ast.AST) -> pl.Expr:
+        text = self.compile(node).cast(pl.String, strict=False)
+        return self._is_missing(node) | text.str.strip_chars().eq("").fill_null(False)
+
+    # ------------------------------------------------------------------ Aggregations / arithmetic
+    def _fn_sum(self, *args: ast.AST) -> pl.Expr:
+        if not args:
+            raise FormulaEvaluationError("SUM requires at least one argument.")
+        if len(args) == 1:
+            if self._is_series(args[0]):
+                return self._numeric(args[0]).sum()
+            return self.compile(args[0])
+        values = [self._numeric(a) for a in args]
+        return pl.when(pl.all_horizontal([v.is_null() for v in values])).then(None).otherwise(
+            pl.sum_horizontal(values)
+        )
+
+    def _fn_avg(self, *args: ast.AST) -> pl.Expr:
+        if not args:
+            raise FormulaEvaluationError("AVG requires at least one argument.")
+        if len(args) == 1:
+            if self._is_series(args[0]):
+                return self._numeric(args[0]).mean()
+            return self.compile(args[0])
+        total = self._numeric(args[0])
+        for arg in args[1:]:
+            total = total + self._numeric(arg)
+        return total / len(args)
+
+    def _extreme(self, label: str, args: tuple, horizontal, reduce) -> pl.Expr:
+        if not args:
+            raise FormulaEvaluationError(f"{label} requires at least one argument.")
+        if len(args) == 1:
+            if self._is_series(args[0]):
+                return reduce(self.compile(args[0]))
+            return self.compile(args[0])
+        return horizontal([self.compile(a) for a in args])
+
+    def _fn_max(self, *args: ast.AST) -> pl.Expr:
+        return self._extreme("MAX", args, pl.max_horizontal, lambda e: e.max())
+
+    def _fn_min(self, *args: ast.AST) -> pl.Expr:
+        return self._extreme("MIN", args, pl.min_horizontal, lambda e: e.min())
+
+    def _fn_prod(self, *args: ast.AST) -> pl.Expr:
+        if not args:
+            raise FormulaEvaluationError("PROD requires at least one argument.")
+        result = self._numeric(args[0])
+        for arg in args[1:]:
+            result = result * self._numeric(arg)
+        return result
+
+    def _fn_div(self, *args: ast.AST) -> pl.Expr:
+        if not args:
+            raise FormulaEvaluationError("DIV requires at least one argument.")
+        result = self._numeric(args[0])
+        for arg in args[1:]:
+            if isinstance(arg, ast.Constant):
+                if arg.value == 0:
+                    continue
+                result = result / float(arg.value)
+            else:
+                denominator = self._numeric(arg)
+                # A zero denominator leaves the value as is; a null one gives null.
+                result = result / (
+                    pl.when(denominator.is_null()).then(None).when(denominator != 0).then(denominator).otherwise(1.0)
+                )
+        return result
+
+    def _fn_abs(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).abs()
+
+    def _fn_floor(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).floor()
+
+    def _fn_ceil(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).ceil()
+
+    def _fn_exp(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).exp()
+
+    def _fn_log(self, value: ast.AST) -> pl.Expr:
+        numeric = self._numeric(value)
+        return pl.when(numeric > 0).then(numeric).otherwise(None).log()
+
+    def _fn_sqrt(self, value: ast.AST) -> pl.Expr:
+        numeric = self._numeric(value)
+        return pl.when(numeric >= 0).then(numeric).otherwise(None).sqrt()
+
+    def _fn_round(self, value: ast.AST, digits: ast.AST | None = None) -> pl.Expr:
+        precision = 0 if digits is None else self._int_literal(digits, "ROUND digits argument")
+        return self._numeric(value).round(precision)
+
+    # ------------------------------------------------------------------ Statistics
+    def _fn_median(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).median()
+
+    def _fn_percentile(self, value: ast.AST, quantile: ast.AST) -> pl.Expr:
+        try:
+            q = float(self._literal(quantile))
+        except (TypeError, ValueError) as exc:
+            raise FormulaEvaluationError("PERCENTILE quantile must be numeric.") from exc
+        if q < 0 or q > 1:
+            raise FormulaEvaluationError("PERCENTILE quantile must be between 0 and 1.")
+        return self._numeric(value).quantile(q, interpolation="linear")
+
+    def _fn_std(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).std(ddof=0)
+
+    def _fn_var(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).var(ddof=0)
+
+    def _fn_cov(self, left: ast.AST, right: ast.AST) -> pl.Expr:
+        return pl.cov(self._numeric(left), self._numeric(right))
+
+    def _fn_corr(self, left: ast.AST, right: ast.AST) -> pl.Expr:
+        a, b = self._numeric(left), self._numeric(right)
+        # pandas correlates pairwise-complete observations only.
+        both = a.is_not_null() & b.is_not_null()
+        return pl.corr(a.filter(both), b.filter(both))
+
+    def _fn_count(self, value: ast.AST) -> pl.Expr:
+        return (~self._is_missing(value)).sum()
+
+    def _fn_zscore(self, value: ast.AST) -> pl.Expr:
+        numeric = self._numeric(value)
+        std = numeric.std(ddof=0)
+        return (
+            pl.when(std.is_null() | (std.abs() <= 1e-8))
+            .then(pl.when(numeric.is_null()).then(None).otherwise(0.0))
+            .otherwise((numeric - numeric.mean()) / std)
+        )
+
+    _fn_norm = _fn_zscore
+
+    # ------------------------------------------------------------------ Window functions
+    def _fn_cumsum(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).cum_sum()
+
+    def _fn_cumprod(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).cum_prod()
+
+    def _fn_cummax(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).cum_max()
+
+    def _fn_cummin(self, value: ast.AST) -> pl.Expr:
+        return self._numeric(value).cum_min()
+
+    def _fn_diff(self, value: ast.AST, periods: ast.AST | None = None) -> pl.Expr:
+        lag = 1 if periods is None else self._int_literal(periods, "DIFF periods")
+        return self._numeric(value).diff(lag)
+
+    def _fn_lag(self, value: ast.AST, periods: ast.AST | None = None) -> pl.Expr:
+        lag = 1 if periods is None else self._int_literal(periods, "LAG periods")
+        return self.compile(value).shift(lag)
+
+    def _fn_rollingsum(self, value: ast.AST, window: ast.AST) -> pl.Expr:
+        size = self._int_literal(window, "ROLLINGSUM window")
+        if size < 1:
+            raise FormulaEvaluationError("ROLLINGSUM window must be >= 1.")
+        return self._numeric(value).rolling_sum(window_size=size, min_samples=size)
+
+    # ------------------------------------------------------------------ Conditionals / nulls
+    def _fn_if(self, condition: ast.AST, true_value: ast.AST, false_value: ast.AST) -> pl.Expr:
+        return pl.when(self.compile(condition)).then(self.compile(true_value)).otherwise(
+            self.compile(false_value)
+        )
+
+    def _fn_isnull(self, value: ast.AST) -> pl.Expr:
+        return self._is_blank(value)
+
+    def _fn_fillna(self, value: ast.AST, replacement: ast.AST) -> pl.Expr:
+        return pl.when(self._is_missing(value)).then(self.compile(replacement)).otherwise(
+            self.compile(value)
+        )
+
+    def _fn_fillblank(self, value: ast.AST, replacement: ast.AST) -> pl.Expr:
+        return pl.when(self._is_blank(value)).then(self.compile(replacement)).otherwise(
+            self.compile(value)
+        )
+
+    # ------------------------------------------------------------------ Strings
+    def _text(self, value: ast.AST) -> pl.Expr:
+        return self.compile(value).cast(pl.String, strict=False)
+
+    def _fn_lower(self, value: ast.AST) -> pl.Expr:
+        return self._text(value).str.to_lowercase()
+
+    def _fn_upper(self, value: ast.AST) -> pl.Expr:
+        return self._text(value).str.to_uppercase()
+
+    def _fn_len(self, value: ast.AST) -> pl.Expr:
+        return self._text(value).str.len_chars().fill_null(0)
+
+    def _fn_substr(self, value: ast.AST, start: ast.AST, end: ast.AST | None = None) -> pl.Expr:
+        start_idx = self._int_literal(start, "SUBSTR start")
+        end_idx = None if end is None else self._int_literal(end, "SUBSTR end")
+        if start_idx < 0 or (end_idx is not None and end_idx < 0):
+            raise _UnsupportedInPolars("negative SUBSTR bounds")
+        length = None if end_idx is None else max(end_idx - start_idx, 0)
+        return self._text(value).str.slice(start_idx, length)
+
+    # ------------------------------------------------------------------ Dates
+    def _fn_year(self, value: ast.AST) -> pl.Expr:
+        return self._temporal(value).dt.year()
+
+    def _fn_month(self, value: ast.AST) -> pl.Expr:
+        return self._temporal(value).dt.month()
+
+    def _fn_day(self, value: ast.AST) -> pl.Expr:
+        return self._temporal(value).dt.day()
+
+    def _fn_weekday(self, value: ast.AST) -> pl.Expr:
+        return self._temporal(value).dt.strftime("%A")
+
+    def _fn_quarter(self, value: ast.AST) -> pl.Expr:
+        return self._temporal(value).dt.month().replace_strict(_QUARTER_CODES, default=None)
+
+    def _fn_date_diff(self, end_value: ast.AST, start_value: ast.AST) -> pl.Expr:
+        delta = self._temporal(end_value).cast(pl.Datetime) - self._temporal(start_value).cast(pl.Datetime)
+        return delta.dt.total_days()
+
+
 class FormulaEngine:
     """Parse and evaluate Excel-style formulas against a pandas DataFrame."""
 
@@ -601,6 +1048,9 @@ class FormulaEngine:
 
     _string_pattern = re.compile(r'("([^"\\]|\\.)*"|\'([^\'\\]|\\.)*\')')
 
+    def __init__(self, cache: FormulaPlanCache | None = None) -> None:
+        self.cache = formula_plan_cache if cache is None else cache
+
     def evaluate(self, expression: str, frame: pd.DataFrame) -> pd.Series:
         if frame.empty:
             raise FormulaEvaluationError("Cannot apply formulas to an empty dataframe.")
@@ -609,20 +1059,17 @@ class FormulaEngine:
         if not expr:
             raise FormulaEvaluationError("Formula cannot be empty.")
 
-        sanitised = self._sanitise_expression(expr, frame.columns.tolist())
+        columns = self._referenced_columns(expr, frame.columns.tolist())
+        sanitised, code = self.cache.get_or_build(
+            ("pandas", expr, columns),
+            lambda: self._build_pandas_plan(expr, list(columns)),
+        )
 
         registry = _FunctionRegistry(frame)
         env = self._build_environment(registry, sanitised.column_mapping, frame)
 
-        parsed = ast.parse(sanitised.expression, mode="eval")
-        validator = _FormulaAstValidator(
-            allowed_names=set(sanitised.column_mapping.values()),
-            allowed_functions=set(env.keys()) - set(sanitised.column_mapping.values()),
-        )
-        validator.visit(parsed)
-
         try:
-            result = eval(compile(parsed, "<formula>", "eval"), {"__builtins__": {}}, env)
+            result = eval(code, {"__builtins__": {}}, env)
         except FormulaEvaluationError:
             raise
         except Exception as exc:  # pragma: no cover - safety net
@@ -630,6 +1077,54 @@ class FormulaEngine:
 
         return self._finalise_result(result, frame.index)
 
+    def compile_polars(self, expression: str, schema: Mapping[str, pl.DataType]) -> pl.Expr | None:
+        """Compile ``expression`` into a Polars expression for ``schema``.
+
+        The expression goes through the same sanitisation and AST validation
+        as :meth:`evaluate`.  ``None`` is returned when the formula uses a
+        function without a native lowering (e.g. ``MAP``, ``BIN``,
+        ``STR_REPLACE``) so the caller can use the pandas evaluator instead.
+        Plans are cached per expression and referenced column dtypes.
+        """
+        expr = expression.strip()
+        if not expr:
+            raise FormulaEvaluationError("Formula cannot be empty.")
+
+        columns = self._referenced_columns(expr, list(schema.keys()))
+        relevant = tuple((name, schema[name]) for name in columns)
+        return self.cache.get_or_build(
+            ("polars", expr, relevant),
+            lambda: self._build_polars_plan(expr, dict(relevant)),
+        )
+
+    # ------------------------------------------------------------------ Plans
+    def _referenced_columns(self, expression: str, columns: list[str]) -> Tuple[str, ...]:
+        # Only columns whose name occurs in the expression can be matched by
+        # ``_sanitise_expression``, so these alone determine the plan.
+        return tuple(col for col in columns if col and col in expression)
+
+    def _parse(self, expression: str, columns: list[str]) -> Tuple[_SanitisedExpression, ast.Expression]:
+        sanitised = self._sanitise_expression(expression, columns)
+        parsed = ast.parse(sanitised.expression, mode="eval")
+        validator = _FormulaAstValidator(
+            allowed_names=set(sanitised.column_mapping.values()),
+            allowed_functions=set(self._function_aliases) | {"PI", "E"},
+        )
+        validator.visit(parsed)
+        return sanitised, parsed
+
+    def _build_pandas_plan(self, expression: str, columns: list[str]) -> Tuple[_SanitisedExpression, CodeType]:
+        sanitised, parsed = self._parse(expression, columns)
+        return sanitised, compile(parsed, "<formula>", "eval")
+
+    def _build_polars_plan(self, expression: str, schema: Dict[str, pl.DataType]) -> pl.Expr | None:
+        sanitised, parsed = self._parse(expression, list(schema.keys()))
+        compiler = _PolarsFormulaCompiler(sanitised.column_mapping, schema)
+        try:
+            return compiler.compile(parsed)
+        except _UnsupportedInPolars:
+            return None
+
     # ------------------------------------------------------------------ Helpers
     def _sanitise_expression(self, expression: str, columns: list[str]) -> _SanitisedExpression:
         placeholders: Dict[str, str] = {}
@@ -779,3 +1274,33 @@ def evaluate_formula(expression: str, frame: pd.DataFrame) -> pd.Series:
     engine = FormulaEngine()
     return engine.evaluate(expression, frame)
 
+
+def compile_formula(expression: str, schema: Mapping[str, pl.DataType]) -> pl.Expr | None:
+    """Compile a formula to a ``pl.Expr``; ``None`` means use :func:`evaluate_formula`."""
+
+    engine = FormulaEngine()
+    return engine.compile_polars(expression, schema)
+
+
+def formula_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the process-wide formula plan cache."""
+
+    return formula_plan_cache.stats()
+
+
+def finalise_polars_result(values: pl.Series) -> pl.Series:
+    """Make a formula result JSON-safe the way the pandas path does.
+
+    Numeric (and boolean) results become ``Float64`` with NaN/inf replaced by
+    null and floats rounded to 15 decimals to avoid representation artefacts.
+    """
+
+    dtype = values.dtype
+    if not (dtype.is_numeric() or dtype == pl.Boolean):
+        return values
+    numeric = values.cast(pl.Float64)
+    cleaned = pl.select(
+        pl.when(numeric.is_finite()).then(numeric.round(15)).otherwise(None).alias(values.name)
+    ).to_series()
+    return cleaned
+
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Response, Body, HTTPException, UploadFile, File
 import base64
+import json
 import os
 import logging
 from minio import Minio
@@ -18,11 +19,19 @@ from numbers import Real
 from pydantic import BaseModel
 from app.DataStorageRetrieval.arrow_client import download_table_bytes
 from app.features.data_upload_validate.app.routes import get_object_prefix
-from .formula_parser import FormulaEvaluationError, evaluate_formula
+from .formula_parser import (
+    FormulaEvaluationError,
+    compile_formula,
+    evaluate_formula,
+    finalise_polars_result,
+    formula_cache_stats,
+)
 from app.core.task_queue import celery_task_client, format_task_response
 from app.features.dataframe_operations.service import (
     SESSIONS,
-    dataframe_payload as _df_payload,
+    dataframe_payload,
+    dataframe_window,
+    normalize_viewport,
     filter_dataframe,
     get_session_dataframe as _get_df,
     load_dataframe_from_base64,
@@ -480,10 +489,49 @@ def _fetch_df_from_object(object_name: str) -> pl.DataFrame:
         logger.error(f"❌ [FETCH] {error_msg}")
         raise HTTPException(status_code=404, detail=error_msg) from e
 
+def _df_payload(df: pl.DataFrame, df_id: str, viewport: Optional[Dict[str, Any]] = None):
+    """Return the session payload, windowed when the client sent a viewport.
+
+    Viewports with ``format="arrow"`` get the visible window as an Arrow IPC
+    stream body with the shape/dtype metadata in the ``X-Dataframe-Meta``
+    header; every other request gets the JSON payload.
+    """
+    try:
+        window_spec = normalize_viewport(viewport, df)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if window_spec is None or window_spec["format"] != "arrow":
+        return dataframe_payload(df, df_id, window_spec)
+    window = dataframe_window(df, window_spec)
+    meta = {
+        "df_id": df_id,
+        "headers": df.columns,
+        "types": {col: str(dtype) for col, dtype in zip(df.columns, df.dtypes)},
+        "row_count": df.height,
+        "column_count": df.width,
+        "window": {**window_spec, "row_count": window.height},
+    }
+    buf = io.BytesIO()
+    window.write_ipc_stream(buf)
+    return Response(
+        content=buf.getvalue(),
+        media_type="application/vnd.apache.arrow.stream",
+        headers={
+            "X-Dataframe-Meta": json.dumps(meta, default=str),
+            "Access-Control-Expose-Headers": "X-Dataframe-Meta",
+        },
+    )
+
+
 @router.get("/test_alive")
 async def test_alive():
     return {"status": "alive"}
 
+@router.get("/formula_cache_stats")
+async def get_formula_cache_stats():
+    """Hit rate of the compiled formula plan cache used by ``/apply_formula``."""
+    return formula_cache_stats()
+
 @router.get("/cached_dataframe")
 async def cached_dataframe(object_name: str):
     df = _fetch_df_from_object(object_name)
@@ -496,7 +544,8 @@ async def cached_dataframe(object_name: str):
 async def load_cached_dataframe(
     object_name: str = Body(..., embed=True),
     atom_id: Optional[str] = Body(None),
-    project_id: Optional[str] = Body(None)
+    project_id: Optional[str] = Body(None),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     """Load a cached dataframe by object key and create a session."""
     import logging
@@ -556,7 +605,7 @@ async def load_cached_dataframe(
     
     logger.info(f"✅ [LOAD] DataFrame cached in session: {df_id}")
     
-    return _df_payload(df, df_id)
+    return _df_payload(df, df_id, viewport)
 
 
 class LoadFileDetailsRequest(BaseModel):
@@ -962,11 +1011,12 @@ async def filter_rows(
     df_id: str = Body(...),
     column: str = Body(...),
     value: Any = Body(...),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     submission = celery_task_client.submit_callable(
         name="dataframe_operations.filter_rows",
         dotted_path="app.features.dataframe_operations.service.filter_dataframe",
-        kwargs={"df_id": df_id, "column": column, "value": value},
+        kwargs={"df_id": df_id, "column": column, "value": value, "viewport": viewport},
         metadata={
             "feature": "dataframe_operations",
             "operation": "filter_rows",
@@ -984,11 +1034,12 @@ async def sort_dataframe(
     df_id: str = Body(...),
     column: str = Body(...),
     direction: str = Body("asc"),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     submission = celery_task_client.submit_callable(
         name="dataframe_operations.sort",
         dotted_path="app.features.dataframe_operations.service.sort_dataframe",
-        kwargs={"df_id": df_id, "column": column, "direction": direction},
+        kwargs={"df_id": df_id, "column": column, "direction": direction, "viewport": viewport},
         metadata={
             "feature": "dataframe_operations",
             "operation": "sort",
@@ -1007,6 +1058,7 @@ async def insert_row(
     df_id: str = Body(...),
     index: int = Body(...),
     direction: str = Body("below"),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     df = _get_df(df_id)
     empty = {col: None for col in df.columns}
@@ -1016,24 +1068,24 @@ async def insert_row(
     lower = df.slice(insert_at, df.height - insert_at)
     df = pl.concat([upper, pl.DataFrame([empty], schema=df.schema), lower])
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/delete_row")
-async def delete_row(df_id: str = Body(...), index: int = Body(...)):
+async def delete_row(df_id: str = Body(...), index: int = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         df = df.with_row_count().filter(pl.col("row_nr") != index).drop("row_nr")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/delete_rows_bulk")
-async def delete_rows_bulk(df_id: str = Body(...), indices: list = Body(...)):
+async def delete_rows_bulk(df_id: str = Body(...), indices: list = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         # Convert indices to a list of row numbers to exclude
@@ -1041,7 +1093,7 @@ async def delete_rows_bulk(df_id: str = Body(...), indices: list = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
@@ -1051,6 +1103,7 @@ async def insert_column(
     index: Optional[int] = Body(None),
     name: str = Body(...),
     default: Any = Body(None),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     df = _get_df(df_id)
     
@@ -1074,24 +1127,24 @@ async def insert_column(
     df = df.select(cols)
     
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/delete_column")
-async def delete_column(df_id: str = Body(...), name: str = Body(...)):
+async def delete_column(df_id: str = Body(...), name: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         df = df.drop(name)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/edit_cell")
-async def edit_cell(df_id: str = Body(...), row: int = Body(...), column: str = Body(...), value: Any = Body(...)):
+async def edit_cell(df_id: str = Body(...), row: int = Body(...), column: str = Body(...), value: Any = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         df = df.with_row_count().with_columns(
@@ -1103,15 +1156,40 @@ async def edit_cell(df_id: str = Body(...), row: int = Body(...), column: str =
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
+def _compiled_formula_column(df: pl.DataFrame, expr_body: str, target_column: str) -> Optional[pl.Series]:
+    """Evaluate ``expr_body`` as a native Polars expression when possible.
+
+    Returns ``None`` when the formula needs the pandas engine (unsupported
+    function, syntax the compiler rejects, or a Polars runtime error) so that
+    the caller reports errors exactly as before.
+    """
+    try:
+        compiled = compile_formula(expr_body, df.schema)
+    except (FormulaEvaluationError, SyntaxError):
+        return None
+    if compiled is None:
+        return None
+    if df.height == 0:
+        raise HTTPException(status_code=400, detail="Cannot apply formulas to an empty dataframe.")
+    try:
+        # ``with_columns`` broadcasts scalar aggregates such as SUM(col).
+        values = df.with_columns(compiled.alias(target_column)).get_column(target_column)
+    except pl.exceptions.PolarsError as exc:
+        logger.info(f"↩️ [APPLY_FORMULA] Polars evaluation failed ({exc}); using pandas engine")
+        return None
+    return finalise_polars_result(values)
+
+
 @router.post("/apply_formula")
 async def apply_formula(
     df_id: str = Body(...),
     target_column: str = Body(...),
     formula: str = Body(...),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     """Apply an Excel-like formula to one column using the vectorised engine."""
     df = _get_df(df_id)
@@ -1125,6 +1203,14 @@ async def apply_formula(
         expr_body = expr[1:].strip()
         if not expr_body:
             raise HTTPException(status_code=400, detail="Formula cannot be empty.")
+
+        compiled = _compiled_formula_column(df, expr_body, target_column)
+        if compiled is not None:
+            df = df.with_columns(compiled)
+            logger.info(f"⚡ [APPLY_FORMULA] Evaluated natively in Polars, column '{target_column}' dtype {compiled.dtype}")
+            SESSIONS[df_id] = df
+            return _df_payload(df, df_id, viewport)
+
         try:
             try:
                 pandas_frame = df.to_pandas(use_pyarrow_extension_array=True)  # Polars >=0.17
@@ -1189,8 +1275,8 @@ async def apply_formula(
     
     logger.info(f"✅ [APPLY_FORMULA] Formula applied successfully, new DataFrame shape: {df.shape}")
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
-    logger.info(f"🎉 [APPLY_FORMULA] Operation completed, returning result with df_id: {result.get('df_id')}")
+    result = _df_payload(df, df_id, viewport)
+    logger.info(f"🎉 [APPLY_FORMULA] Operation completed, returning result with df_id: {df_id}")
     return result
 
 @router.post("/apply_udf")
@@ -1199,6 +1285,7 @@ async def apply_udf(
     column: str = Body(...),
     udf_code: str = Body(...),
     new_column: str | None = Body(None),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     """Apply a custom scalar UDF using Polars with a Numba-compiled function."""
     df = _get_df(df_id)
@@ -1211,11 +1298,11 @@ async def apply_udf(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    return _df_payload(df, df_id)
+    return _df_payload(df, df_id, viewport)
 
 
 @router.post("/rename_column")
-async def rename_column(df_id: str = Body(...), old_name: str = Body(...), new_name: str = Body(...)):
+async def rename_column(df_id: str = Body(...), old_name: str = Body(...), new_name: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     import logging
     logger = logging.getLogger("dataframe_operations.rename")
     
@@ -1306,12 +1393,12 @@ async def rename_column(df_id: str = Body(...), old_name: str = Body(...), new_n
         import traceback
         logger.warning(f"⚠️ [RENAME] Traceback: {traceback.format_exc()}")
     
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/duplicate_row")
-async def duplicate_row(df_id: str = Body(...), index: int = Body(...)):
+async def duplicate_row(df_id: str = Body(...), index: int = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         row = df.slice(index, 1)
@@ -1319,12 +1406,12 @@ async def duplicate_row(df_id: str = Body(...), index: int = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/duplicate_column")
-async def duplicate_column(df_id: str = Body(...), name: str = Body(...), new_name: str = Body(...)):
+async def duplicate_column(df_id: str = Body(...), name: str = Body(...), new_name: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     """Duplicate a column and place it right after the original column."""
     df = _get_df(df_id)
     
@@ -1358,12 +1445,12 @@ async def duplicate_column(df_id: str = Body(...), name: str = Body(...), new_na
         raise HTTPException(status_code=400, detail=f"Duplicate column operation failed: {str(e)}")
     
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/move_column")
-async def move_column(df_id: str = Body(...), from_col: str = Body(..., alias="from"), to_index: int = Body(...)):
+async def move_column(df_id: str = Body(...), from_col: str = Body(..., alias="from"), to_index: int = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         cols = df.columns
@@ -1391,12 +1478,12 @@ async def move_column(df_id: str = Body(...), from_col: str = Body(..., alias="f
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Move column operation failed: {str(e)}")
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/retype_column")
-async def retype_column(df_id: str = Body(...), name: str = Body(...), new_type: str = Body(...)):
+async def retype_column(df_id: str = Body(...), name: str = Body(...), new_type: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     try:
         if new_type == "number":
@@ -1408,12 +1495,12 @@ async def retype_column(df_id: str = Body(...), name: str = Body(...), new_type:
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/round_column")
-async def round_column(df_id: str = Body(...), name: str = Body(...), decimal_places: int = Body(...)):
+async def round_column(df_id: str = Body(...), name: str = Body(...), decimal_places: int = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     
     # Validate column exists
@@ -1450,12 +1537,12 @@ async def round_column(df_id: str = Body(...), name: str = Body(...), decimal_pl
         raise HTTPException(status_code=400, detail=f"Failed to round column '{name}': {str(e)}")
     
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/transform_column_case")
-async def transform_column_case(df_id: str = Body(...), column: str = Body(...), case_type: str = Body(...)):
+async def transform_column_case(df_id: str = Body(...), column: str = Body(...), case_type: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     """Transform the case of text values in a column with various case styles."""
     df = _get_df(df_id)
     
@@ -1535,12 +1622,12 @@ async def transform_column_case(df_id: str = Body(...), column: str = Body(...),
         raise HTTPException(status_code=400, detail=str(e))
     
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/convert_to_percentage")
-async def convert_to_percentage(df_id: str = Body(...), column: str = Body(...)):
+async def convert_to_percentage(df_id: str = Body(...), column: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     """Mark column for percentage display (no data modification - display only)."""
     df = _get_df(df_id)
     
@@ -1549,12 +1636,12 @@ async def convert_to_percentage(df_id: str = Body(...), column: str = Body(...))
     
     # No data modification - percentage is display-only
     # Frontend will handle multiplying by 100 for display
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
 @router.post("/convert_from_percentage")
-async def convert_from_percentage(df_id: str = Body(...), column: str = Body(...)):
+async def convert_from_percentage(df_id: str = Body(...), column: str = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     """Remove percentage display format (no data modification - display only)."""
     df = _get_df(df_id)
     
@@ -1563,7 +1650,7 @@ async def convert_from_percentage(df_id: str = Body(...), column: str = Body(...
     
     # No data modification - percentage is display-only
     # Frontend will handle removing the percentage display format
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 
@@ -1686,7 +1773,7 @@ async def describe_column(df_id: str = Body(...), column: str = Body(...)):
 
 
 @router.post("/ai/execute_operations")
-async def ai_execute(df_id: str = Body(...), operations: List[Dict[str, Any]] = Body(...)):
+async def ai_execute(df_id: str = Body(...), operations: List[Dict[str, Any]] = Body(...), viewport: Optional[Dict[str, Any]] = Body(None)):
     df = _get_df(df_id)
     for op in operations:
         name = op.get("op")
@@ -1712,7 +1799,7 @@ async def ai_execute(df_id: str = Body(...), operations: List[Dict[str, Any]] =
                 .alias(params.get("column"))
             ).drop("row_nr")
     SESSIONS[df_id] = df
-    return _df_payload(SESSIONS[df_id], df_id)
+    return _df_payload(df, df_id, viewport)
 
 @router.post("/find_and_replace")
 async def find_and_replace(
@@ -1721,7 +1808,8 @@ async def find_and_replace(
     replace_text: str = Body(...),
     replace_all: bool = Body(False),
     case_sensitive: bool = Body(False),
-    columns: Optional[List[str]] = Body(None)
+    columns: Optional[List[str]] = Body(None),
+    viewport: Optional[Dict[str, Any]] = Body(None),
 ):
     df = _get_df(df_id)
     try:
@@ -1865,7 +1953,7 @@ async def find_and_replace(
         raise HTTPException(status_code=400, detail=str(e))
     
     SESSIONS[df_id] = df
-    result = _df_payload(df, df_id)
+    result = _df_payload(df, df_id, viewport)
     return result
 
 @router.post("/count_matches")
@@ -5,17 +5,20 @@ import io
 import logging
 import os
 import uuid
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import pandas as pd
 import polars as pl
 
+from app.features.shared.session_store import create_session_store
+
 UPLOAD_DIR = "./uploaded_dataframes"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 logger = logging.getLogger("app.features.dataframe_operations.service")
 
-SESSIONS: Dict[str, pl.DataFrame] = {}
+# Memory-bounded store of active DataFrames (see shared/session_store.py)
+SESSIONS = create_session_store("dataframe")
 
 
 def save_upload_file_tmp(upload_file) -> Tuple[str, str]:
@@ -58,15 +61,80 @@ def get_session_dataframe(df_id: str) -> pl.DataFrame:
         raise KeyError("DataFrame not found") from exc
 
 
-def dataframe_payload(df: pl.DataFrame, df_id: str) -> Dict[str, Any]:
-    return {
+VIEWPORT_FORMATS = ("rows", "columnar", "arrow")
+DEFAULT_VIEWPORT_LIMIT = 200
+
+
+def normalize_viewport(viewport: Optional[Mapping[str, Any]], df: pl.DataFrame) -> Optional[Dict[str, Any]]:
+    """Validate an optional ``{offset, limit, columns, format}`` viewport.
+
+    Returns ``None`` when no viewport was requested so callers fall back to
+    the full-frame payload.
+    """
+    if not viewport:
+        return None
+    try:
+        offset = max(int(viewport.get("offset") or 0), 0)
+        limit = viewport.get("limit")
+        limit = DEFAULT_VIEWPORT_LIMIT if limit is None else max(int(limit), 0)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid viewport: {exc}") from exc
+    fmt = str(viewport.get("format") or "rows").lower()
+    if fmt not in VIEWPORT_FORMATS:
+        raise ValueError(f"Unsupported viewport format '{fmt}'")
+    columns = viewport.get("columns")
+    if columns:
+        columns = [col for col in columns if col in df.columns]
+    else:
+        columns = list(df.columns)
+    return {"offset": offset, "limit": limit, "columns": columns, "format": fmt}
+
+
+def dataframe_window(df: pl.DataFrame, viewport: Mapping[str, Any]) -> pl.DataFrame:
+    """Return the visible slice of ``df`` for a normalised viewport."""
+    return df.slice(viewport["offset"], viewport["limit"]).select(viewport["columns"])
+
+
+def dataframe_payload(
+    df: pl.DataFrame,
+    df_id: str,
+    viewport: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Serialise a session frame for the frontend.
+
+    Without a viewport every row is returned.  With a viewport only the
+    requested window is serialised (as row dicts, or as a ``{column: values}``
+    mapping for the ``columnar`` format) alongside full-frame shape and
+    dtype metadata, so the cost is proportional to the window size.
+    """
+    payload: Dict[str, Any] = {
         "df_id": df_id,
         "headers": df.columns,
-        "rows": df.to_dicts(),
         "types": {col: str(dtype) for col, dtype in zip(df.columns, df.dtypes)},
         "row_count": df.height,
         "column_count": df.width,
     }
+    window_spec = normalize_viewport(viewport, df)
+    if window_spec is None:
+        payload["rows"] = df.to_dicts()
+        return payload
+
+    window = dataframe_window(df, window_spec)
+    payload["window"] = {
+        "offset": window_spec["offset"],
+        "limit": window_spec["limit"],
+        "row_count": window.height,
+        "columns": window_spec["columns"],
+        "format": window_spec["format"],
+    }
+    if window_spec["format"] == "rows":
+        payload["rows"] = window.to_dicts()
+    else:
+        # Arrow bodies are produced by the routes layer; task results fall
+        # back to the JSON-friendly columnar layout.
+        payload["window"]["format"] = "columnar"
+        payload["columns"] = window.to_dict(as_series=False)
+    return payload
 
 
 def load_dataframe_from_base64(content_b64: str, *, filename: str | None = None) -> Dict[str, Any]:
@@ -88,7 +156,12 @@ def load_dataframe_from_base64(content_b64: str, *, filename: str | None = None)
     return payload
 
 
-def filter_dataframe(df_id: str, column: str, value: Any) -> Dict[str, Any]:
+def filter_dataframe(
+    df_id: str,
+    column: str,
+    value: Any,
+    viewport: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
     df = get_session_dataframe(df_id)
     filter_logger = logging.getLogger("dataframe_operations.filter")
     filter_logger.info(
@@ -129,10 +202,15 @@ def filter_dataframe(df_id: str, column: str, value: Any) -> Dict[str, Any]:
     filter_logger.info("✅ [FILTER] Filter operation successful")
 
     SESSIONS[df_id] = df
-    return dataframe_payload(df, df_id)
+    return dataframe_payload(df, df_id, viewport)
 
 
-def sort_dataframe(df_id: str, column: str, direction: str = "asc") -> Dict[str, Any]:
+def sort_dataframe(
+    df_id: str,
+    column: str,
+    direction: str = "asc",
+    viewport: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
     df = get_session_dataframe(df_id)
     try:
         descending = str(direction).lower() not in {"asc", "ascending"}
@@ -142,7 +220,7 @@ def sort_dataframe(df_id: str, column: str, direction: str = "asc") -> Dict[str,
         raise ValueError(str(exc))
 
     SESSIONS[df_id] = df
-    return dataframe_payload(df, df_id)
+    return dataframe_payload(df, df_id, viewport)
 
 
 __all__ = [
@@ -152,6 +230,8 @@ __all__ = [
     "save_dataframe",
     "get_session_dataframe",
     "dataframe_payload",
+    "dataframe_window",
+    "normalize_viewport",
     "load_dataframe_from_base64",
     "filter_dataframe",
     "sort_dataframe",
@@ -2,7 +2,7 @@ from minio import Minio
 from minio.error import S3Error
 import logging
 import os
-from fastapi import APIRouter, Form, HTTPException
+from fastapi import APIRouter, Form, HTTPException, Query
 from urllib.parse import unquote, quote
 from fastapi.responses import JSONResponse, Response
 import pandas as pd
@@ -334,8 +334,17 @@ async def cached_dataframe(object_name: str):
 
 
 @router.get("/flight_table")
-async def flight_table(object_name: str):
-    """Return the Arrow IPC file for the given object via Arrow Flight."""
+async def flight_table(
+    object_name: str,
+    columns: str | None = Query(None, description="Comma separated columns to return"),
+    limit: int | None = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+):
+    """Return the Arrow IPC file for the given object via Arrow Flight.
+
+    ``columns``, ``limit`` and ``offset`` are evaluated on the Flight server so
+    previews only transfer the requested slice.
+    """
     # Handle both URL-encoded and non-URL-encoded object_names
     if '%' in object_name:
         # URL-encoded, decode it
@@ -363,8 +372,9 @@ async def flight_table(object_name: str):
     if not flight_path:
         print(f"[WARNING] flight path not found for {object_name}; using object name")
         flight_path = object_name
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
     try:
-        data = download_table_bytes(flight_path)
+        data = download_table_bytes(flight_path, columns=selected, limit=limit, offset=offset)
         return Response(data, media_type="application/vnd.apache.arrow.file")
     except Exception as e:
         print(f"[WARNING] flight_table error for {object_name}: {e}")
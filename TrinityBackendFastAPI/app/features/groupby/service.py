@@ -9,12 +9,12 @@ from typing import Any, Dict, Iterable, List, Mapping, MutableMapping
 
 import numpy as np
 import pandas as pd
-import pyarrow as pa
-import pyarrow.ipc as ipc
 from minio import Minio
 from minio.error import S3Error
 
 from app.core.feature_cache import feature_cache
+from app.DataStorageRetrieval.arrow_results import arrow_result_name, save_arrow_result
+from app.DataStorageRetrieval.dataset_cache import load_pandas, load_table
 from app.features.column_classifier.database import get_classifier_config_from_mongo
 from app.features.groupby_weighted_avg.groupby.base import perform_groupby as _perform_groupby
 from app.features.groupby.year_utils import _ensure_year_identifier
@@ -43,35 +43,12 @@ def _get_minio_client() -> Minio:
     return _minio_client
 
 
-def _read_object(bucket_name: str, object_name: str) -> bytes:
-    client = _get_minio_client()
+def load_dataframe(bucket_name: str, object_name: str) -> pd.DataFrame:
     try:
-        response = client.get_object(bucket_name, object_name)
+        frame = load_pandas(_get_minio_client(), bucket_name, object_name, feature="groupby")
     except S3Error as exc:  # pragma: no cover - depends on MinIO connectivity
         logger.exception("groupby.minio_get_failed bucket=%s object=%s", bucket_name, object_name)
         raise RuntimeError(f"Failed to fetch object '{object_name}' from bucket '{bucket_name}': {exc}")
-    try:
-        return response.read()
-    finally:
-        response.close()
-        response.release_conn()
-
-
-def _frame_from_bytes(object_name: str, payload: bytes) -> pd.DataFrame:
-    if object_name.endswith(".csv"):
-        return pd.read_csv(io.BytesIO(payload))
-    if object_name.endswith((".xls", ".xlsx")):
-        return pd.read_excel(io.BytesIO(payload))
-    if object_name.endswith(".arrow"):
-        reader = ipc.RecordBatchFileReader(pa.BufferReader(payload))
-        table = reader.read_all()
-        return table.to_pandas()
-    raise ValueError(f"Unsupported file type for object '{object_name}'")
-
-
-def load_dataframe(bucket_name: str, object_name: str) -> pd.DataFrame:
-    payload = _read_object(bucket_name, object_name)
-    frame = _frame_from_bytes(object_name, payload)
     return clean_columns(frame)
 
 
@@ -167,15 +144,10 @@ def perform_groupby_task(
     grouped = _perform_groupby(frame, list(normalized_identifiers), dict(aggregations))
     grouped = grouped.reset_index(drop=True)
 
-    csv_bytes = grouped.to_csv(index=False).encode("utf-8")
-    client = _get_minio_client()
-    client.put_object(
-        bucket_name=bucket_name,
-        object_name=result_filename,
-        data=io.BytesIO(csv_bytes),
-        length=len(csv_bytes),
-        content_type="text/csv",
-    )
+    # Persist as Arrow so chained atoms read back the same dtypes; CSV is
+    # only produced by the export endpoints.
+    result_filename = arrow_result_name(result_filename)
+    save_arrow_result(_get_minio_client(), bucket_name, result_filename, grouped)
 
     return {
         "status": "SUCCESS",
@@ -206,24 +178,17 @@ def load_cached_dataframe_page(
     if page_size < 1:
         raise ValueError("page_size must be >= 1")
 
-    cached = _redis_client.get(object_name)
-    if cached is None:
-        payload = _read_object(bucket_name, object_name)
-        _redis_client.setex(object_name, 3600, payload)
-    else:
-        payload = cached
-
-    if object_name.endswith(".arrow"):
-        reader = ipc.RecordBatchFileReader(pa.BufferReader(payload))
-        table = reader.read_all()
-        frame = table.to_pandas()
-    else:
-        frame = pd.read_csv(io.BytesIO(payload))
-
-    total_rows = len(frame)
+    try:
+        table = load_table(_get_minio_client(), bucket_name, object_name, feature="groupby")
+    except S3Error as exc:  # pragma: no cover - depends on MinIO connectivity
+        logger.exception("groupby.minio_get_failed bucket=%s object=%s", bucket_name, object_name)
+        raise RuntimeError(f"Failed to fetch object '{object_name}' from bucket '{bucket_name}': {exc}")
+
+    # Only the requested page is converted to pandas.
+    total_rows = table.num_rows
     start_idx = (page - 1) * page_size
     end_idx = min(start_idx + page_size, total_rows)
-    page_frame = frame.iloc[start_idx:end_idx]
+    page_frame = table.slice(start_idx, max(end_idx - start_idx, 0)).to_pandas()
 
     csv_data = page_frame.to_csv(index=False)
     return {
@@ -311,27 +276,14 @@ def save_groupby_dataframe_task(
     prefix = object_prefix.rstrip("/")
     object_name = f"{prefix}/groupby/{filename}" if prefix else f"groupby/{filename}"
 
-    table = pa.Table.from_pandas(frame)
-    buffer = pa.BufferOutputStream()
-    with ipc.new_file(buffer, table.schema) as writer:
-        writer.write_table(table)
-    payload = buffer.getvalue().to_pybytes()
-
-    client = _get_minio_client()
-    client.put_object(
-        bucket_name=bucket_name,
-        object_name=object_name,
-        data=io.BytesIO(payload),
-        length=len(payload),
-        content_type="application/octet-stream",
-    )
-    _redis_client.setex(object_name, 3600, payload)
+    saved = save_arrow_result(_get_minio_client(), bucket_name, object_name, frame)
+    _redis_client.setex(object_name, 3600, saved["payload"])
 
     return {
         "status": "SUCCESS",
         "message": "DataFrame saved successfully",
         "filename": object_name,
-        "size_bytes": len(payload),
+        "size_bytes": saved["size"],
     }
 
 
@@ -377,7 +329,7 @@ def initialize_groupby(
 
 def build_result_filename(validator_atom_id: str, file_key: str) -> str:
     safe_file_key = file_key.replace("/", "_")
-    return f"{validator_atom_id}_{safe_file_key}_grouped.csv"
+    return f"{validator_atom_id}_{safe_file_key}_grouped.arrow"
 
 
 __all__ = [
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Form, HTTPException, Query, Response, Body
 from typing import Dict, List, Any
 from .deps import get_minio_df, get_validator_atoms_collection, fetch_dimensions_dict, get_column_classifications_collection, fetch_measures_list, fetch_identifiers_and_measures, minio_client, MINIO_BUCKET, redis_client
 from app.features.data_upload_validate.app.routes import get_object_prefix
+from app.DataStorageRetrieval.arrow_results import save_arrow_result
 import io
 import json
 import pandas as pd
@@ -360,15 +361,8 @@ async def perform_groupby_route(
         
         grouped = groupby_base_func(df, identifiers, aggregations)
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        new_filename = f"{validator_atom_id}_{file_key}_grouped.csv"
-        csv_bytes = grouped.to_csv(index=False).encode("utf-8")
-        minio_client.put_object(
-            bucket_name=bucket_name,
-            object_name=new_filename,
-            data=io.BytesIO(csv_bytes),
-            length=len(csv_bytes),
-            content_type="text/csv"
-        )
+        new_filename = f"{validator_atom_id}_{file_key}_grouped.arrow"
+        save_arrow_result(minio_client, bucket_name, new_filename, grouped)
         
         # 🔧 CRITICAL FIX: Return the actual grouped data for immediate frontend display
         # Convert grouped DataFrame to list of dictionaries for JSON serialization
@@ -396,8 +390,6 @@ async def save_groupby_dataframe(
     """Save grouped DataFrame CSV to MinIO bucket and return saved filename"""
     import uuid
     import pandas as pd
-    import pyarrow as pa
-    import pyarrow.ipc as ipc
     try:
         # ============================================================
         # 🔧 DTYPE PRESERVATION FIX
@@ -461,27 +453,16 @@ async def save_groupby_dataframe(
         # print(f"🔍 GroupBy Save: prefix={prefix}, final filename={filename}")
         
         # Save to MinIO as Arrow file
-        table = pa.Table.from_pandas(df)
-        arrow_buffer = pa.BufferOutputStream()
-        with ipc.new_file(arrow_buffer, table.schema) as writer:
-            writer.write_table(table)
-        arrow_bytes = arrow_buffer.getvalue().to_pybytes()
-        minio_client.put_object(
-            bucket_name=MINIO_BUCKET,
-            object_name=filename,
-            data=io.BytesIO(arrow_bytes),
-            length=len(arrow_bytes),
-            content_type="application/octet-stream"
-        )
+        saved = save_arrow_result(minio_client, MINIO_BUCKET, filename, df)
         
         # Cache in Redis for 1 hour
-        redis_client.setex(filename, 3600, arrow_bytes)
+        redis_client.setex(filename, 3600, saved["payload"])
         
         return {
             "status": "SUCCESS",
             "message": "DataFrame saved successfully",
             "filename": filename,
-            "size_bytes": len(arrow_bytes)
+            "size_bytes": saved["size"]
         }
     except Exception as e:
         print(f"⚠️ groupby save error: {e}")
@@ -496,9 +477,12 @@ async def get_latest_groupby_result_from_minio(
     bucket_name: str = Query(...),
 ):
     try:
-        key = f"{validator_atom_id}_{file_key}_grouped.csv"
-        group_obj = minio_client.get_object(bucket_name, key)
-        grouped_df = pd.read_csv(io.BytesIO(group_obj.read()))
+        key = f"{validator_atom_id}_{file_key}_grouped.arrow"
+        try:
+            grouped_df = get_minio_df(bucket=bucket_name, file_key=key)
+        except RuntimeError:
+            # Results written before the switch to Arrow
+            grouped_df = get_minio_df(bucket=bucket_name, file_key=key[: -len(".arrow")] + ".csv")
         return {
             "status": "SUCCESS",
             "row_count": len(grouped_df),
@@ -12,6 +12,7 @@ from ..data_upload_validate.app.routes import get_object_prefix
 from app.features.project_state.routes import get_atom_list_configuration
 from .merge.base import get_common_columns, merge_dataframes
 from .deps import get_minio_df, get_minio_content_with_flight_fallback, minio_client, MINIO_BUCKET, redis_client
+from app.DataStorageRetrieval.arrow_results import save_arrow_result
 from app.features.pipeline.service import record_atom_execution
 import logging
 
@@ -505,23 +506,11 @@ async def save_merged_dataframe(
         full_path = f"{prefix}merged-data/{filename}"
         
         # Convert to Arrow format
-        table = pa.Table.from_pandas(df)
-        arrow_buffer = pa.BufferOutputStream()
-        with ipc.new_file(arrow_buffer, table.schema) as writer:
-            writer.write_table(table)
-        arrow_bytes = arrow_buffer.getvalue().to_pybytes()
-        
-        # Upload to MinIO
-        minio_client.put_object(
-            MINIO_BUCKET,
-            full_path,
-            data=io.BytesIO(arrow_bytes),
-            length=len(arrow_bytes),
-            content_type="application/octet-stream",
-        )
+        # Saved as Arrow IPC with its schema and registered for Flight access
+        saved = save_arrow_result(minio_client, MINIO_BUCKET, full_path, df)
         
         # Cache in Redis
-        redis_client.setex(full_path, 3600, arrow_bytes)
+        redis_client.setex(full_path, 3600, saved["payload"])
         
         # Record save operation in pipeline (if atom_id is provided)
         if validator_atom_id:
@@ -597,7 +586,7 @@ async def save_merged_dataframe(
                                     "flight_path": full_path,
                                     "file_name": filename,
                                     "file_type": "arrow",
-                                    "size": len(arrow_bytes),
+                                    "size": saved["size"],
                                     "save_as_name": save_as_name,
                                     "is_default_name": is_default_name,
                                     "columns": list(df.columns),
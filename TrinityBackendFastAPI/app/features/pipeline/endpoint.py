@@ -13,8 +13,19 @@ from .schemas import (
     RunPipelineResponse,
     PipelineExecutionDocument,
 )
-from .service import save_pipeline_execution, get_pipeline_execution, record_atom_execution, get_pipeline_collection, save_column_operations, record_column_operations_execution, remove_pipeline_steps_by_card_id
+from .service import save_pipeline_execution, get_pipeline_execution, record_atom_execution, get_pipeline_collection, save_column_operations, record_column_operations_execution, remove_pipeline_steps_by_card_id, get_step_memos, save_step_memo
 from .atom_executors import execute_atom_step, get_atom_executor
+from .memo import REUSE, StepDecision, plan_steps, root_input_files
+from .scheduler import (
+    PipelineRunProgress,
+    build_step_dependencies,
+    default_max_concurrency,
+    execution_waves,
+    normalize_file_key,
+    run_dag,
+    step_input_files,
+    step_output_files,
+)
 from app.features.project_state.routes import get_atom_list_configuration
 from app.features.data_upload_validate.app.routes import _background_auto_classify_files, get_object_prefix
 
@@ -138,6 +149,68 @@ async def save_column_operations_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _stat_objects(object_names: List[str]) -> Dict[str, Optional[str]]:
+    """Return the ETag of each MinIO object, ``None`` for missing ones."""
+    from app.DataStorageRetrieval.minio_utils import get_client
+
+    minio_client = get_client()
+    bucket = os.getenv("MINIO_BUCKET", "trinity")
+    etags: Dict[str, Optional[str]] = {}
+    for name in object_names:
+        try:
+            etags[name] = minio_client.stat_object(bucket, name).etag
+        except Exception:
+            etags[name] = None
+    return etags
+
+
+async def _plan_incremental_run(
+    request: RunPipelineRequest,
+    execution_graph: List[Dict[str, Any]],
+    column_operations: List[Dict[str, Any]],
+    file_replacements: Dict[str, str],
+    dependencies: List[set],
+    memos: Dict[str, Dict[str, Any]],
+) -> List[StepDecision]:
+    """Hash every step and compare it with the memos of the previous run."""
+    from app.features.dataframe_operations.app.routes import get_object_prefix as get_df_prefix
+
+    prefix = await get_df_prefix(
+        client_name=request.client_name,
+        app_name=request.app_name,
+        project_name=request.project_name
+    )
+    normalized_replacements = {
+        normalize_file_key(original): replacement for original, replacement in file_replacements.items()
+    }
+    input_files = [
+        sorted(normalized_replacements.get(f, f) for f in step_input_files(step))
+        for step in execution_graph
+    ]
+    roots = root_input_files(execution_graph, input_files, column_operations)
+    outputs = (
+        set().union(*(step_output_files(step, column_operations) for step in execution_graph))
+        if execution_graph
+        else set()
+    )
+
+    def _object_name(file_key: str) -> str:
+        key = normalize_file_key(file_key)
+        return key if not prefix or key.startswith(prefix) else f"{prefix}{key}"
+
+    etags = await asyncio.to_thread(_stat_objects, sorted({_object_name(f) for f in roots | outputs}))
+    return plan_steps(
+        execution_graph,
+        input_files,
+        dependencies,
+        root_digests={f: etags.get(_object_name(f)) for f in roots},
+        memos=memos,
+        output_exists=lambda f: etags.get(_object_name(f)) is not None,
+        column_operations=column_operations,
+        incremental=request.incremental,
+    )
+
+
 @router.post("/run", response_model=RunPipelineResponse)
 async def run_pipeline(
     request: RunPipelineRequest = Body(..., description="Pipeline execution request")
@@ -148,8 +221,12 @@ async def run_pipeline(
     1. Retrieves the saved pipeline execution data
     2. Clears the pipeline_execution collection for this project
     3. Applies root file replacements if specified
-    4. Re-executes all atoms in order
-    5. Returns execution results
+    4. Re-executes all atoms, running independent branches of the execution
+       graph concurrently (see ``scheduler``) and publishing per-step progress
+    5. Reuses the outputs of steps whose configuration and input contents are
+       unchanged since the previous run (see ``memo``); ``dry_run`` only
+       reports that plan
+    6. Returns execution results
     """
     try:
         # Build document ID for consistency
@@ -207,6 +284,38 @@ async def run_pipeline(
                 failed_atoms=0
             )
         
+        if request.dry_run:
+            # Report the incremental plan without touching MinIO objects or the
+            # stored pipeline document.
+            dry_run_replacements = {
+                repl.original_file: repl.replacement_file
+                for repl in request.file_replacements
+                if not repl.keep_original and repl.replacement_file
+            }
+            decisions = await _plan_incremental_run(
+                request,
+                execution_graph,
+                column_operations,
+                dry_run_replacements,
+                build_step_dependencies(execution_graph, column_operations),
+                await get_step_memos(
+                    request.client_name, request.app_name, request.project_name, request.mode
+                ),
+            )
+            recompute = sum(1 for d in decisions if d.action != REUSE)
+            return RunPipelineResponse(
+                status="success",
+                message=(
+                    f"Dry run: {recompute} of {len(decisions)} atoms would be recomputed, "
+                    f"{len(decisions) - recompute} reused."
+                ),
+                executed_atoms=0,
+                successful_atoms=0,
+                failed_atoms=0,
+                dry_run=True,
+                plan=[d.to_dict() for d in decisions],
+            )
+
         # Clear pipeline_execution collection for this project AFTER we've retrieved the data
         # This ensures new executions replace the old data
         # NOTE: We clear it here so that as atoms execute, they create fresh execution records
@@ -258,7 +367,6 @@ async def run_pipeline(
         if file_replacements and column_operations:
             from app.features.createcolumn.deps import get_minio_df, minio_client, MINIO_BUCKET
             from app.features.dataframe_operations.app.routes import get_object_prefix as get_df_prefix
-            import pandas as pd
             import pyarrow as pa
             import pyarrow.ipc as ipc
             import io
@@ -1125,7 +1233,17 @@ async def run_pipeline(
             else:
                 return config_value
         
-        for step in execution_graph:
+        step_logs: Dict[int, List[Dict[str, Any]]] = {}
+        # Auto-classification lists and classifies every project file; one
+        # run at a time is enough even when several steps finish together.
+        classification_lock = asyncio.Lock()
+
+        async def _run_step(step_position: int) -> Dict[str, Any]:
+            nonlocal executed_count, success_count, failed_count
+            step = execution_graph[step_position]
+            # Entries for this step (and the deferred column operations it
+            # triggers) are collected locally and merged in step order below.
+            execution_log: List[Dict[str, Any]] = []
             executed_count += 1
             atom_instance_id = step.get("atom_instance_id")
             card_id = step.get("card_id")
@@ -1483,9 +1601,7 @@ async def run_pipeline(
                                         try:
                                             from minio import Minio
                                             from minio.error import S3Error
-                                            import io
                                             import pandas as pd
-                                            import pyarrow as pa
                                             import pyarrow.parquet as pq
                                             
                                             # Load the result file from MinIO (it should be the transformed data)
@@ -1851,7 +1967,6 @@ async def run_pipeline(
                     # For groupby/merge/concat/pivot/table atoms, this preserves the full sequence of operations
                     if atom_type in ["groupby-wtg-avg", "merge", "concat", "pivot-table", "table"] or atom_type.startswith("groupby"):
                         try:
-                            from datetime import datetime
                             from .service import record_atom_execution
                             
                             # Build output files from execution result and step outputs
@@ -1949,89 +2064,231 @@ async def run_pipeline(
                 # logger.error(f"❌ Error executing atom {atom_type} ({atom_instance_id}): {e}")
             
             execution_log.append(log_entry)
+            step_logs[step_position] = execution_log
             
             # Trigger auto-classification after each atom execution
             # This ensures new files created by atoms get classified immediately
-            try:
-                prefix, env, env_source = await get_object_prefix(
-                    client_name=request.client_name,
-                    app_name=request.app_name,
-                    project_name=request.project_name,
-                    include_env=True,
-                )
+            async with classification_lock:
+                try:
+                    classify_prefix, env, env_source = await get_object_prefix(
+                        client_name=request.client_name,
+                        app_name=request.app_name,
+                        project_name=request.project_name,
+                        include_env=True,
+                    )
                 
-                # Get list of files for auto-classification
-                from app.DataStorageRetrieval.minio_utils import get_client
-                from pathlib import Path
-                from minio.error import S3Error
-                import os
+                    # Get list of files for auto-classification
+                    from app.DataStorageRetrieval.minio_utils import get_client
+                    from pathlib import Path
+                    from minio.error import S3Error
                 
-                minio_client = get_client()
-                MINIO_BUCKET = os.getenv("MINIO_BUCKET", "trinity")
+                    minio_client = get_client()
                 
-                try:
-                    objects = list(
-                        minio_client.list_objects(
-                            MINIO_BUCKET, prefix=prefix, recursive=True
+                    try:
+                        objects = list(
+                            minio_client.list_objects(
+                                MINIO_BUCKET, prefix=classify_prefix, recursive=True
+                            )
                         )
-                    )
-                    tmp_prefix = prefix + "tmp/"
-                    files = []
-                    for obj in sorted(objects, key=lambda o: o.object_name):
-                        if not obj.object_name.endswith(".arrow"):
-                            continue
-                        if obj.object_name.startswith(tmp_prefix):
-                            continue
-                        last_modified = getattr(obj, "last_modified", None)
-                        if last_modified is not None:
-                            try:
-                                modified_iso = last_modified.isoformat()
-                            except Exception:
+                        tmp_prefix = classify_prefix + "tmp/"
+                        files = []
+                        for obj in sorted(objects, key=lambda o: o.object_name):
+                            if not obj.object_name.endswith(".arrow"):
+                                continue
+                            if obj.object_name.startswith(tmp_prefix):
+                                continue
+                            last_modified = getattr(obj, "last_modified", None)
+                            if last_modified is not None:
+                                try:
+                                    modified_iso = last_modified.isoformat()
+                                except Exception:
+                                    modified_iso = None
+                            else:
                                 modified_iso = None
-                        else:
-                            modified_iso = None
-                        entry = {
-                            "object_name": obj.object_name,
-                            "arrow_name": Path(obj.object_name).name,
-                            "csv_name": Path(obj.object_name).name,
-                        }
-                        if modified_iso:
-                            entry["last_modified"] = modified_iso
-                        size = getattr(obj, "size", None)
-                        if isinstance(size, int):
-                            entry["size"] = size
-                        files.append(entry)
+                            entry = {
+                                "object_name": obj.object_name,
+                                "arrow_name": Path(obj.object_name).name,
+                                "csv_name": Path(obj.object_name).name,
+                            }
+                            if modified_iso:
+                                entry["last_modified"] = modified_iso
+                            size = getattr(obj, "size", None)
+                            if isinstance(size, int):
+                                entry["size"] = size
+                            files.append(entry)
                     
-                    # Wait for auto-classification to complete before proceeding to next atom
-                    # This ensures classification is available when next atom's /init runs
-                    # logger.info(f"🔄 Starting auto-classification after atom {atom_type} ({atom_instance_id})")
-                    await _background_auto_classify_files(
-                        files=files,
-                        env=env,
-                        client_name=request.client_name,
-                        app_name=request.app_name,
-                        project_name=request.project_name,
-                    )
-                    # logger.info(f"✅ Auto-classification completed after atom {atom_type} ({atom_instance_id})")
-                except S3Error as e:
-                    logger.warning(f"⚠️ MinIO error during auto-classification trigger: {e}")
+                        # Wait for auto-classification to complete before proceeding to next atom
+                        # This ensures classification is available when next atom's /init runs
+                        # logger.info(f"🔄 Starting auto-classification after atom {atom_type} ({atom_instance_id})")
+                        await _background_auto_classify_files(
+                            files=files,
+                            env=env,
+                            client_name=request.client_name,
+                            app_name=request.app_name,
+                            project_name=request.project_name,
+                        )
+                        # logger.info(f"✅ Auto-classification completed after atom {atom_type} ({atom_instance_id})")
+                    except S3Error as e:
+                        logger.warning(f"⚠️ MinIO error during auto-classification trigger: {e}")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Failed to trigger auto-classification: {e}")
                 except Exception as e:
-                    logger.warning(f"⚠️ Failed to trigger auto-classification: {e}")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to get object prefix for auto-classification: {e}")
+                    logger.warning(f"⚠️ Failed to get object prefix for auto-classification: {e}")
             
             # logger.info(
             #     f"🔄 Executed atom {atom_type} ({atom_instance_id}) in card {card_id} "
             #     f"- Status: {log_entry['status']}"
             # )
-        
+            return log_entry
+
+        # Run independent branches of the execution graph concurrently; a step
+        # starts once every step producing (or reading) the files it touches
+        # has finished.
+        dependencies = build_step_dependencies(execution_graph, column_operations)
+        # Decide which steps can reuse the outputs of the previous run. Root
+        # file digests are taken after the column operations above ran.
+        memos = await get_step_memos(
+            request.client_name, request.app_name, request.project_name, request.mode
+        )
+        decisions = await _plan_incremental_run(
+            request,
+            execution_graph,
+            column_operations,
+            file_replacements,
+            dependencies,
+            memos,
+        )
+        reused_count = 0
+        max_concurrency = request.max_concurrency or default_max_concurrency()
+        waves = execution_waves(dependencies)
+        progress = PipelineRunProgress(request.run_id, execution_graph)
+        progress.start({"doc_id": doc_id, "max_concurrency": max_concurrency})
+        logger.info(
+            f"🧭 Running {len(execution_graph)} atoms for {doc_id} with concurrency {max_concurrency} "
+            f"(critical path {len(waves)} steps, "
+            f"{sum(1 for d in decisions if d.action == REUSE)} reusable)"
+        )
+
+        async def _reuse_step(step_position: int) -> Dict[str, Any]:
+            nonlocal executed_count, success_count, reused_count
+            step = execution_graph[step_position]
+            memo = memos_by_step[step_position]
+            executed_count += 1
+            updated_input_files = [file_replacements.get(f.get("file_key"), f.get("file_key")) for f in step.get("inputs", [])]
+            updated_config = replace_file_in_config(step.get("configuration", {}), file_replacements)
+            api_calls = replace_file_in_config(step.get("api_calls", []), file_replacements)
+            log_entry = {
+                **(memo.get("log_entry") or {}),
+                "step_index": step.get("step_index"),
+                "atom_instance_id": step.get("atom_instance_id"),
+                "atom_type": step.get("atom_type"),
+                "atom_title": step.get("atom_title"),
+                "card_id": step.get("card_id"),
+                "input_files": updated_input_files,
+                "configuration": updated_config,
+                "api_calls": api_calls,
+                "status": "success",
+                "message": "Reused result of previous run (inputs and configuration unchanged)",
+                "cached": True,
+            }
+            # The pipeline document was cleared above; record the step again
+            # so the project keeps its full execution graph.
+            now = datetime.utcnow()
+            await record_atom_execution(
+                client_name=request.client_name,
+                app_name=request.app_name,
+                project_name=request.project_name,
+                atom_instance_id=step.get("atom_instance_id"),
+                card_id=step.get("card_id"),
+                atom_type=step.get("atom_type"),
+                atom_title=step.get("atom_title"),
+                input_files=updated_input_files,
+                configuration=updated_config,
+                api_calls=api_calls,
+                output_files=step.get("outputs", []),
+                execution_started_at=now,
+                execution_completed_at=now,
+                execution_status="success",
+                user_id=os.getenv("USER_ID", "unknown"),
+                mode=request.mode,
+                canvas_position=step.get("canvas_position", 0)
+            )
+            success_count += 1
+            reused_count += 1
+            step_logs[step_position] = [log_entry]
+            return log_entry
+
+        memos_by_step = {
+            d.step_position: memos.get(str(d.atom_instance_id)) or {}
+            for d in decisions
+            if d.action == REUSE
+        }
+
+        async def _run_and_report(step_position: int) -> Dict[str, Any]:
+            decision = decisions[step_position]
+            try:
+                if decision.action == REUSE:
+                    log_entry = await _reuse_step(step_position)
+                else:
+                    log_entry = await _run_step(step_position)
+            except Exception as exc:
+                progress.step_finished(step_position, "failed", str(exc))
+                raise
+            progress.step_finished(step_position, log_entry["status"], log_entry.get("message", ""))
+            if decision.action != REUSE and log_entry["status"] == "success":
+                step = execution_graph[step_position]
+                outputs = step_output_files(step)
+                if log_entry.get("result_file"):
+                    outputs.add(normalize_file_key(log_entry["result_file"]))
+                memo_entry = {
+                    k: v for k, v in log_entry.items()
+                    if k not in ("configuration", "api_calls", "input_files")
+                }
+                await save_step_memo(
+                    request.client_name,
+                    request.app_name,
+                    request.project_name,
+                    str(step.get("atom_instance_id")),
+                    decision.memo_key,
+                    sorted(outputs),
+                    memo_entry,
+                    mode=request.mode,
+                )
+            return log_entry
+
+        step_results = await run_dag(
+            dependencies,
+            _run_and_report,
+            max_concurrency,
+            on_start=progress.step_started,
+        )
+        for step_position, result in enumerate(step_results):
+            if isinstance(result, BaseException):
+                step = execution_graph[step_position]
+                logger.warning(f"⚠️ Step {step_position} ({step.get('atom_type')}) aborted: {result}")
+                failed_count += 1
+                step_logs.setdefault(step_position, []).append({
+                    "step_index": step.get("step_index"),
+                    "atom_instance_id": step.get("atom_instance_id"),
+                    "atom_type": step.get("atom_type"),
+                    "card_id": step.get("card_id"),
+                    "status": "failed",
+                    "message": str(result),
+                })
+        for step_position in sorted(step_logs):
+            execution_log.extend(step_logs[step_position])
+        progress.finish("failure" if failed_count else "success")
+
         return RunPipelineResponse(
             status="success",
             message=f"Pipeline execution initiated. {executed_count} atoms queued for execution.",
             executed_atoms=executed_count,
             successful_atoms=success_count,
             failed_atoms=failed_count,
-            execution_log=execution_log
+            execution_log=execution_log,
+            run_id=progress.run_id,
+            reused_atoms=reused_count,
+            plan=[d.to_dict() for d in decisions],
         )
         
     except Exception as e:
@@ -0,0 +1,167 @@
+"""Content-hash memoization of pipeline steps.
+
+Every atom step gets a key hashed from its atom type, its stored
+configuration and API call parameters, and a digest for each input file:
+
+* root files (not produced by an earlier step) use the MinIO ETag, i.e. the
+  digest of the object content;
+* derived files use the key of the step that produces them, so a change in a
+  root file invalidates every step downstream of it;
+* files saved by a save-as column operation replayed inside a step use that
+  step's key plus a hash of the column operation.
+
+``plan_steps`` compares those keys with the memos written by the previous
+run and decides which steps can reuse their prior output objects and which
+have to be recomputed.  The same plan is returned by ``/run`` in dry-run
+mode.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from .scheduler import column_operation_outputs, normalize_file_key, step_output_files
+
+REUSE = "reuse"
+RECOMPUTE = "recompute"
+
+# Keys of an API call record that describe what was requested; responses and
+# timestamps differ between runs and must not influence the hash.
+_API_CALL_FIELDS = ("endpoint", "method", "params")
+# Keys of a stored column operation that decide its result; ``saved_at`` and
+# ``execution_order`` change on every save or run.
+_COLUMN_OPERATION_FIELDS = ("operations", "identifiers", "overwrite_original")
+
+
+@dataclass
+class StepDecision:
+    step_position: int
+    atom_instance_id: Optional[str]
+    atom_type: Optional[str]
+    memo_key: str
+    action: str
+    reason: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+
+
+def step_memo_key(
+    step: Mapping[str, Any],
+    input_files: List[str],
+    input_digests: Mapping[str, Optional[str]],
+) -> str:
+    """Hash of atom type, configuration, API call params and input digests."""
+    api_calls = [
+        {field: call.get(field) for field in _API_CALL_FIELDS}
+        for call in step.get("api_calls", []) or []
+    ]
+    payload = {
+        "atom_type": step.get("atom_type"),
+        "configuration": step.get("configuration", {}),
+        "api_calls": api_calls,
+        "inputs": [[normalize_file_key(f), input_digests.get(normalize_file_key(f))] for f in input_files],
+    }
+    return hashlib.sha256(_canonical(payload).encode("utf-8")).hexdigest()
+
+
+def column_operation_digest(step_key: str, col_op: Mapping[str, Any]) -> str:
+    """Digest of a file saved by ``col_op`` when replayed inside the step hashed to ``step_key``."""
+    config = {field: col_op.get(field) for field in _COLUMN_OPERATION_FIELDS}
+    return f"step:{step_key}:{hashlib.sha256(_canonical(config).encode('utf-8')).hexdigest()}"
+
+
+def root_input_files(
+    steps: List[Mapping[str, Any]],
+    input_files: List[List[str]],
+    column_operations: Iterable[Mapping[str, Any]] = (),
+) -> Set[str]:
+    """Normalised input files that no earlier step produces."""
+    produced: Set[str] = set()
+    roots: Set[str] = set()
+    for step, files in zip(steps, input_files):
+        for file_key in files:
+            normalized = normalize_file_key(file_key)
+            if normalized and normalized not in produced:
+                roots.add(normalized)
+        produced.update(step_output_files(step, column_operations))
+    return roots
+
+
+def plan_steps(
+    steps: List[Mapping[str, Any]],
+    input_files: List[List[str]],
+    dependencies: List[Set[int]],
+    root_digests: Mapping[str, Optional[str]],
+    memos: Mapping[str, Mapping[str, Any]],
+    output_exists: Callable[[str], bool],
+    column_operations: Iterable[Mapping[str, Any]] = (),
+    incremental: bool = True,
+) -> List[StepDecision]:
+    """Decide for every step whether its previous result can be reused.
+
+    ``input_files`` holds the input file keys of each step after root file
+    replacements.  A step is reused only when its key matches the memo of
+    the previous run, none of its dependencies is recomputed, it produced at
+    least one file and all of those files still exist.  Steps whose outputs
+    feed column operations are always recomputed so that the column
+    operations are replayed and recorded as well.
+    """
+    column_operations = list(column_operations or ())
+    col_op_files = {
+        normalize_file_key(col_op.get(field))
+        for col_op in column_operations
+        for field in ("input_file", "original_input_file")
+    }
+    col_op_files.discard("")
+    produced: Dict[str, str] = {}
+    decisions: List[StepDecision] = []
+    for position, step in enumerate(steps):
+        digests: Dict[str, Optional[str]] = {}
+        for file_key in input_files[position]:
+            normalized = normalize_file_key(file_key)
+            if normalized in produced:
+                digests[normalized] = produced[normalized]
+            else:
+                digests[normalized] = root_digests.get(normalized)
+        key = step_memo_key(step, input_files[position], digests)
+        outputs = step_output_files(step)
+        for file_key in outputs:
+            produced[file_key] = f"step:{key}"
+        for file_key, col_op in column_operation_outputs(outputs, column_operations).items():
+            produced[file_key] = column_operation_digest(key, col_op)
+
+        memo = memos.get(str(step.get("atom_instance_id")))
+        if not incremental:
+            reason = "full re-run requested"
+        elif memo is None:
+            reason = "no previous result"
+        elif memo.get("memo_key") != key:
+            reason = "configuration or input files changed"
+        elif any(decisions[d].action == RECOMPUTE for d in dependencies[position]):
+            reason = "upstream step recomputed"
+        elif not outputs:
+            reason = "step has no output files"
+        elif outputs & col_op_files:
+            reason = "outputs feed column operations"
+        elif not all(output_exists(f) for f in outputs):
+            reason = "previous output missing"
+        else:
+            reason = ""
+        decisions.append(
+            StepDecision(
+                step_position=position,
+                atom_instance_id=step.get("atom_instance_id"),
+                atom_type=step.get("atom_type"),
+                memo_key=key,
+                action=RECOMPUTE if reason else REUSE,
+                reason=reason or "inputs and configuration unchanged",
+            )
+        )
+    return decisions
@@ -0,0 +1,227 @@
+"""Dependency-aware scheduling of pipeline steps.
+
+``run_pipeline`` used to await every step of ``execution_graph`` one after
+the other.  The helpers here derive a DAG from the files each step reads and
+writes and run the steps with bounded concurrency, so independent branches
+(cards built on different root files) execute side by side and a re-run is
+bounded by the critical path of the project.
+
+Edges are added for:
+
+* read-after-write - a step reading a file waits for the latest earlier step
+  that produced it;
+* write-after-read / write-after-write - a step producing a file waits for
+  earlier steps that read or produced the same file, which keeps overwrites in
+  their recorded order.
+
+A deferred column operation is replayed inside the step that produces its
+input file; when it saves its result as a new ``output_file`` that file
+counts as an output of the same step.
+
+Steps whose inputs are not produced by any earlier step only depend on the
+root files and can start immediately.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from app.DataStorageRetrieval.env_config import env_int
+from app.features.shared.task_progress import TaskProgress
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+def default_max_concurrency() -> int:
+    return max(env_int("PIPELINE_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY), 1)
+
+
+def normalize_file_key(path: Optional[str]) -> str:
+    if not path:
+        return ""
+    return str(path).strip().replace("\\", "/").strip("/")
+
+
+def step_input_files(step: Dict[str, Any]) -> Set[str]:
+    """File keys a step reads, including per-API-call file params."""
+    files = {normalize_file_key(i.get("file_key")) for i in step.get("inputs", []) or []}
+    for api_call in step.get("api_calls", []) or []:
+        params = api_call.get("params") or {}
+        for key in (
+            "object_names", "file_key", "object_name", "source_object", "data_source",
+            "input_file", "input_files", "file1", "file2", "left_file", "right_file",
+        ):
+            value = params.get(key)
+            values = value if isinstance(value, list) else [value]
+            files.update(normalize_file_key(v) for v in values if isinstance(v, str))
+    files.discard("")
+    return files
+
+
+def column_operation_outputs(
+    step_outputs: Set[str], column_operations: Iterable[Mapping[str, Any]]
+) -> Dict[str, Mapping[str, Any]]:
+    """Save-as column operations replayed on ``step_outputs``, keyed by the file they write.
+
+    Operations without an ``output_file`` save under a name chosen at run
+    time and cannot be tracked here.
+    """
+    produced: Dict[str, Mapping[str, Any]] = {}
+    for col_op in column_operations or ():
+        output = normalize_file_key(col_op.get("output_file"))
+        if not output or col_op.get("overwrite_original", False):
+            continue
+        sources = {normalize_file_key(col_op.get(k)) for k in ("input_file", "original_input_file")}
+        if sources & step_outputs:
+            produced[output] = col_op
+    return produced
+
+
+def step_output_files(
+    step: Dict[str, Any], column_operations: Iterable[Mapping[str, Any]] = ()
+) -> Set[str]:
+    """File keys a step writes: recorded outputs, files saved via ``/save`` calls
+    and the ``output_file`` of save-as column operations replayed on them."""
+    files = {normalize_file_key(o.get("file_key")) for o in step.get("outputs", []) or []}
+    for api_call in step.get("api_calls", []) or []:
+        response = api_call.get("response_data") or {}
+        if "/save" in api_call.get("endpoint", "") and isinstance(response, dict):
+            files.add(normalize_file_key(response.get("filename")))
+    files.discard("")
+    files.update(column_operation_outputs(files, column_operations))
+    return files
+
+
+def build_step_dependencies(
+    steps: List[Dict[str, Any]], column_operations: Iterable[Mapping[str, Any]] = ()
+) -> List[Set[int]]:
+    """Return, for every step, the indices of earlier steps it must wait for."""
+    column_operations = list(column_operations or ())
+    last_writer: Dict[str, int] = {}
+    readers: Dict[str, List[int]] = {}
+    dependencies: List[Set[int]] = []
+    for index, step in enumerate(steps):
+        inputs = step_input_files(step)
+        outputs = step_output_files(step, column_operations)
+        deps: Set[int] = set()
+        for file_key in inputs:
+            if file_key in last_writer:
+                deps.add(last_writer[file_key])
+        for file_key in outputs:
+            if file_key in last_writer:
+                deps.add(last_writer[file_key])
+            deps.update(readers.get(file_key, []))
+        deps.discard(index)
+        dependencies.append(deps)
+        for file_key in inputs:
+            readers.setdefault(file_key, []).append(index)
+        for file_key in outputs:
+            last_writer[file_key] = index
+            readers[file_key] = []
+    return dependencies
+
+
+def execution_waves(dependencies: List[Set[int]]) -> List[List[int]]:
+    """Group steps by dependency depth; steps in one wave can run concurrently."""
+    depth: List[int] = []
+    for deps in dependencies:
+        depth.append(1 + max((depth[d] for d in deps), default=0))
+    waves: Dict[int, List[int]] = {}
+    for index, level in enumerate(depth):
+        waves.setdefault(level, []).append(index)
+    return [waves[level] for level in sorted(waves)]
+
+
+class PipelineRunProgress(TaskProgress):
+    """Publishes per-step progress of a run through ``task_result_store``.
+
+    Clients poll ``GET /api/task-queue/{run_id}`` while ``/run`` is in
+    flight; ``metadata.steps`` holds the status of every step.
+    """
+
+    task_name = "pipeline.run"
+    label = "pipeline"
+
+    def __init__(self, run_id: Optional[str], steps: List[Dict[str, Any]], store: Any = None):
+        self.total = len(steps)
+        self.completed = 0
+        self.steps: Dict[str, Dict[str, Any]] = {
+            str(i): {
+                "atom_instance_id": step.get("atom_instance_id"),
+                "atom_type": step.get("atom_type"),
+                "status": "pending",
+            }
+            for i, step in enumerate(steps)
+        }
+        super().__init__(run_id or f"pipeline-run-{uuid.uuid4().hex}", store)
+
+    def metadata(self) -> Dict[str, Any]:
+        return {"total": self.total, "completed": self.completed, "steps": self.steps}
+
+    def step_started(self, index: int) -> None:
+        self.steps[str(index)].update(status="running", started_at=time.time())
+        self._publish()
+
+    def step_finished(self, index: int, status: str, message: str = "") -> None:
+        entry = self.steps[str(index)]
+        entry.update(status=status, finished_at=time.time())
+        if message:
+            entry["message"] = message
+        self.completed += 1
+        self._publish()
+
+
+async def run_dag(
+    dependencies: List[Set[int]],
+    run_step: Callable[[int], Awaitable[Any]],
+    max_concurrency: int,
+    on_start: Optional[Callable[[int], None]] = None,
+) -> List[Any]:
+    """Run ``run_step(i)`` for every node once its dependencies have finished.
+
+    At most ``max_concurrency`` steps run at once; ready steps are started in
+    index order so ``max_concurrency=1`` reproduces the serial order.  A
+    failing step does not stop its dependents (matching the serial runner,
+    which kept going after failures); its exception is returned in place of
+    its result.
+    """
+    total = len(dependencies)
+    results: List[Any] = [None] * total
+    if not total:
+        return results
+    dependents: Dict[int, List[int]] = {i: [] for i in range(total)}
+    remaining = [len(deps) for deps in dependencies]
+    for index, deps in enumerate(dependencies):
+        for dep in deps:
+            dependents[dep].append(index)
+
+    ready: List[int] = [i for i in range(total) if remaining[i] == 0]
+    running: Dict[asyncio.Task, int] = {}
+    limit = max(int(max_concurrency), 1)
+
+    async def _guarded(index: int) -> Any:
+        if on_start is not None:
+            on_start(index)
+        return await run_step(index)
+
+    while ready or running:
+        ready.sort()
+        while ready and len(running) < limit:
+            index = ready.pop(0)
+            running[asyncio.ensure_future(_guarded(index))] = index
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            index = running.pop(task)
+            exc = task.exception()
+            results[index] = exc if exc is not None else task.result()
+            for child in dependents[index]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+    return results
+
@@ -179,6 +179,23 @@ class RunPipelineRequest(BaseModel):
         default_factory=list,
         description="Root file replacements (empty to keep all originals)"
     )
+    max_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Maximum atoms executed at once (defaults to PIPELINE_MAX_CONCURRENCY; 1 runs serially)"
+    )
+    run_id: Optional[str] = Field(
+        None,
+        description="Progress id to poll via /api/task-queue/{run_id}; generated when omitted"
+    )
+    incremental: bool = Field(
+        True,
+        description="Reuse outputs of steps whose configuration and input contents are unchanged"
+    )
+    dry_run: bool = Field(
+        False,
+        description="Only report which steps would be recomputed; nothing is executed"
+    )
 
 
 class RunPipelineResponse(BaseModel):
@@ -189,3 +206,10 @@ class RunPipelineResponse(BaseModel):
     successful_atoms: int = Field(0, description="Number of successful executions")
     failed_atoms: int = Field(0, description="Number of failed executions")
     execution_log: List[Dict[str, Any]] = Field(default_factory=list, description="Detailed execution log")
+    run_id: Optional[str] = Field(None, description="Id of the per-step progress record")
+    reused_atoms: int = Field(0, description="Number of atoms whose previous outputs were reused")
+    dry_run: bool = Field(False, description="True when nothing was executed")
+    plan: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Per-step reuse/recompute decision with its reason"
+    )
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import inspect
+import json
 import logging
 import os
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
 
@@ -32,6 +36,32 @@ else:
 MONGO_DB = os.getenv("MONGO_DB", "trinity_db")
 
 
+_document_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _serialised_per_document(func: Callable) -> Callable:
+    """Serialise read-modify-write updates of one project's pipeline document.
+
+    ``run_pipeline`` executes independent atoms concurrently and each of them
+    records its execution by reading, patching and writing back the same
+    document; without this lock concurrent recordings would drop each
+    other's changes.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind_partial(*args, **kwargs)
+        doc_id = "/".join(
+            str(bound.arguments.get(name)) for name in ("client_name", "app_name", "project_name")
+        )
+        lock = _document_locks.setdefault(doc_id, asyncio.Lock())
+        async with lock:
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
 async def get_pipeline_collection() -> AsyncIOMotorCollection:
     """Get MongoDB collection for pipeline execution data."""
     client = AsyncIOMotorClient(MONGO_URI)
@@ -360,6 +390,7 @@ def _build_output_file(
     }
 
 
+@_serialised_per_document
 async def record_atom_execution(
     client_name: str,
     app_name: str,
@@ -1088,6 +1119,7 @@ async def record_atom_execution(
         }
 
 
+@_serialised_per_document
 async def record_column_operations_execution(
     client_name: str,
     app_name: str,
@@ -1669,3 +1701,66 @@ async def remove_pipeline_steps_by_card_id(
             "error": str(e),
             "removed_steps": 0
         }
+
+
+async def get_step_memo_collection() -> AsyncIOMotorCollection:
+    """Get MongoDB collection holding memoized pipeline step results.
+
+    Memos live outside ``pipeline_execution`` because ``/run`` clears that
+    document before re-executing the atoms.
+    """
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[MONGO_DB]
+    return db["pipeline_step_memo"]
+
+
+async def get_step_memos(
+    client_name: str,
+    app_name: str,
+    project_name: str,
+    mode: str = "laboratory"
+) -> Dict[str, Dict[str, Any]]:
+    """Return the memo of every step of a project keyed by atom_instance_id."""
+    pipeline_id = f"{client_name}/{app_name}/{project_name}/{mode}"
+    try:
+        coll = await get_step_memo_collection()
+        memos: Dict[str, Dict[str, Any]] = {}
+        async for memo in coll.find({"pipeline_id": pipeline_id}):
+            memos[str(memo.get("atom_instance_id"))] = memo
+        return memos
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to load pipeline step memos for {pipeline_id}: {e}")
+        return {}
+
+
+async def save_step_memo(
+    client_name: str,
+    app_name: str,
+    project_name: str,
+    atom_instance_id: str,
+    memo_key: str,
+    output_files: List[str],
+    log_entry: Dict[str, Any],
+    mode: str = "laboratory"
+) -> None:
+    """Store the memo key, output files and log entry of a successful step."""
+    pipeline_id = f"{client_name}/{app_name}/{project_name}/{mode}"
+    try:
+        coll = await get_step_memo_collection()
+        # Round-trip through JSON so numpy scalars and datetimes in task
+        # responses are stored as plain BSON values.
+        entry = json.loads(json.dumps(log_entry, default=str))
+        await coll.replace_one(
+            {"_id": f"{pipeline_id}/{atom_instance_id}"},
+            {
+                "pipeline_id": pipeline_id,
+                "atom_instance_id": atom_instance_id,
+                "memo_key": memo_key,
+                "output_files": output_files,
+                "log_entry": entry,
+                "updated_at": datetime.utcnow(),
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to save memo for step {atom_instance_id} of {pipeline_id}: {e}")
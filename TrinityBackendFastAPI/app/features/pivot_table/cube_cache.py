@@ -0,0 +1,228 @@
+"""In-process cache of pivot cubes and filtered frames.
+
+Most ``compute_pivot`` / ``refresh_pivot`` calls only change how an existing
+pivot is presented: sorting, the grand totals mode, the row limit or which
+hierarchy level is expanded.  Each of them used to reload, re-filter and
+re-aggregate the whole dataset.
+
+Two layers are cached, both keyed on the ETag of the source object so that an
+overwritten dataset is never served stale:
+
+* filtered frames, keyed by ``(dataset version, filters)``, kept as Arrow
+  tables in a byte-budgeted :class:`TableCache`.  Changing the fields or the
+  aggregations of a pivot reuses the filtered rows;
+* pivot cubes, keyed by ``(dataset version, filters, fields, aggregations,
+  dropna, fill_value)``.  A cube holds the pivot computed with margins and
+  memoises the per-level aggregates of the row hierarchy, so presentation
+  changes are answered without touching the rows again.
+
+The outcome of each lookup is stored with the pivot status and reported by
+``get_pivot_status``.
+
+Configuration:
+
+* ``PIVOT_CUBE_CACHE_ENTRIES`` - cubes kept per process, defaults to 64;
+* ``PIVOT_FILTER_CACHE_MAX_BYTES`` - budget of filtered frames, 256 MiB;
+* ``PIVOT_CUBE_CACHE_ENABLED`` - set to ``0`` to recompute every pivot.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import polars as pl
+
+from app.DataStorageRetrieval.env_config import env_bool, env_int
+from app.DataStorageRetrieval.table_cache import TableCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CUBES = 64
+DEFAULT_FILTER_MAX_BYTES = 256 * 1024**2
+
+HIT = "hit"
+MISS = "miss"
+DISABLED = "disabled"
+
+
+def _digest(payload: Dict[str, Any]) -> str:
+    text = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def filter_key(version: str, filters: Sequence[Dict[str, Any]]) -> str:
+    return _digest({"version": version, "filters": list(filters)})
+
+
+def cube_key(
+    version: str,
+    filters: Sequence[Dict[str, Any]],
+    row_fields: Sequence[str],
+    column_fields: Sequence[str],
+    values: Sequence[Tuple[str, str, Optional[str]]],
+    *,
+    dropna: bool,
+    fill_value: Optional[float],
+    margins: bool,
+) -> str:
+    """Key of the cube for ``values`` given as ``(field, aggregation, weight)``."""
+    return _digest(
+        {
+            "version": version,
+            "filters": list(filters),
+            "rows": list(row_fields),
+            "columns": list(column_fields),
+            "values": [list(value) for value in values],
+            "dropna": dropna,
+            "fill_value": fill_value,
+            "margins": margins,
+        }
+    )
+
+
+@dataclass
+class PivotCube:
+    """Pivot of one configuration plus the memoised hierarchy aggregates."""
+
+    key: str
+    pivot: pd.DataFrame
+    aggregates: Dict[Tuple[str, ...], pd.DataFrame] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def pivot_frame(self) -> pd.DataFrame:
+        # compute_pivot adds total columns and flattens labels in place.
+        return self.pivot.copy()
+
+    def aggregator(
+        self, compute: Callable[[List[str]], pd.DataFrame]
+    ) -> Callable[[List[str]], pd.DataFrame]:
+        """Wrap ``compute`` so each group-by level is evaluated once per cube."""
+
+        def aggregate(fields: List[str]) -> pd.DataFrame:
+            key = tuple(fields)
+            with self._lock:
+                cached = self.aggregates.get(key)
+            if cached is None:
+                cached = compute(list(fields))
+                with self._lock:
+                    self.aggregates[key] = cached
+            return cached.copy()
+
+        return aggregate
+
+
+@dataclass
+class PivotCacheStats:
+    cube_hits: int = 0
+    cube_misses: int = 0
+    filter_hits: int = 0
+    filter_misses: int = 0
+    cube_evictions: int = 0
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class PivotCubeCache:
+    """LRU of :class:`PivotCube` entries and budgeted cache of filtered frames."""
+
+    def __init__(
+        self,
+        max_cubes: Optional[int] = None,
+        max_filter_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        if max_cubes is None:
+            max_cubes = env_int("PIVOT_CUBE_CACHE_ENTRIES", DEFAULT_MAX_CUBES)
+        if max_filter_bytes is None:
+            max_filter_bytes = env_int("PIVOT_FILTER_CACHE_MAX_BYTES", DEFAULT_FILTER_MAX_BYTES)
+        if enabled is None:
+            enabled = env_bool("PIVOT_CUBE_CACHE_ENABLED", True)
+        self.enabled = enabled and max_cubes > 0
+        self.max_cubes = max(int(max_cubes), 0)
+        self._filtered = TableCache(max_bytes=max_filter_bytes, policy="lru")
+        self._cubes: "OrderedDict[str, PivotCube]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = PivotCacheStats()
+
+    def filtered(
+        self,
+        version: Optional[str],
+        filters: Sequence[Dict[str, Any]],
+        apply: Callable[[], pl.DataFrame],
+    ) -> Tuple[pl.DataFrame, str]:
+        """Return the filtered frame for ``filters`` and the cache outcome."""
+        if not self.enabled or not version:
+            return apply(), DISABLED
+        key = filter_key(version, filters)
+        table = self._filtered.get(key)
+        if table is not None:
+            with self._lock:
+                self._stats.filter_hits += 1
+            return pl.from_arrow(table), HIT
+        frame = apply()
+        self._filtered.put(key, frame.to_arrow())
+        with self._lock:
+            self._stats.filter_misses += 1
+        return frame, MISS
+
+    def get(self, key: Optional[str]) -> Optional[PivotCube]:
+        if not self.enabled or not key:
+            return None
+        with self._lock:
+            cube = self._cubes.get(key)
+            if cube is None:
+                self._stats.cube_misses += 1
+                return None
+            self._cubes.move_to_end(key)
+            self._stats.cube_hits += 1
+            return cube
+
+    def put(self, key: Optional[str], pivot: pd.DataFrame) -> PivotCube:
+        """Store ``pivot`` as a new cube; uncached cubes are returned all the same."""
+        cube = PivotCube(key=key or "", pivot=pivot)
+        if not self.enabled or not key:
+            return cube
+        with self._lock:
+            self._cubes[key] = cube
+            self._cubes.move_to_end(key)
+            while len(self._cubes) > self.max_cubes:
+                self._cubes.popitem(last=False)
+                self._stats.cube_evictions += 1
+        return cube
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cubes.clear()
+            self._stats = PivotCacheStats()
+        self._filtered.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            data = self._stats.to_dict()
+            data["cubes"] = len(self._cubes)
+        data["enabled"] = self.enabled
+        data["filtered_frames"] = self._filtered.stats()
+        return data
+
+
+pivot_cube_cache = PivotCubeCache()
+
+
+__all__ = [
+    "DISABLED",
+    "HIT",
+    "MISS",
+    "PivotCacheStats",
+    "PivotCube",
+    "PivotCubeCache",
+    "cube_key",
+    "filter_key",
+    "pivot_cube_cache",
+]
@@ -0,0 +1,285 @@
+"""Polars engine behind :func:`service.compute_pivot`.
+
+``pd.pivot_table`` with ``margins=True`` groups the data once for the cells
+and again for each margin, and weighted averages ran as Python callables per
+group.  On multi-million row datasets that dominated the pivot latency.
+
+The engine builds one lazy plan per grouping set - ``rows + columns`` for the
+cells, ``rows`` and ``columns`` for the margins and ``()`` for the grand
+total - and collects them together with :func:`polars.collect_all`, so the
+source is scanned in parallel and the weighted average becomes the native
+expression ``sum(v * w) / sum(w)``.  The small aggregated frames are then laid
+out exactly like ``pd.pivot_table`` lays out its result (column order,
+``margins_name`` keys, ``dropna`` and ``fill_value`` handling), so everything
+downstream of the pivot call is unchanged.
+
+Cases pandas handles differently from a plain group-by (``dropna=False``,
+pivots without row fields, categorical keys, sums of text columns) are
+reported by :func:`unsupported_reason` and stay on the pandas path.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+ENGINES = ("polars", "pandas")
+_NUMERIC_AGGREGATIONS = {"sum", "mean", "median", "weighted_average"}
+
+
+def configured_engine() -> str:
+    """Engine selected through ``PIVOT_ENGINE``; ``polars`` by default."""
+    value = (os.getenv("PIVOT_ENGINE") or "polars").strip().lower()
+    return value if value in ENGINES else "polars"
+
+
+@dataclass(frozen=True)
+class ValueSpec:
+    """One measure of the pivot: ``aggregation`` of ``field``."""
+
+    field: str
+    aggregation: str
+    weight: Optional[str] = None
+
+
+def value_specs(agg_map: Dict[str, Any], weights: Dict[str, str]) -> List[ValueSpec]:
+    """Translate the ``agg_map`` built by ``compute_pivot`` into specs."""
+    specs: List[ValueSpec] = []
+    for field, aggregation in agg_map.items():
+        if aggregation == "weighted_average":
+            specs.append(ValueSpec(field, "weighted_average", weights[field]))
+        else:
+            specs.append(ValueSpec(field, str(aggregation)))
+    return specs
+
+
+def is_numeric_dtype(dtype: pl.DataType) -> bool:
+    return dtype.is_numeric() or dtype == pl.Boolean
+
+
+def unsupported_reason(
+    frame: pl.DataFrame,
+    row_fields: Sequence[str],
+    column_fields: Sequence[str],
+    specs: Sequence[ValueSpec],
+    dropna: bool = True,
+) -> Optional[str]:
+    """Why the pivot has to run on pandas, or ``None`` if the engine can run it."""
+    if not row_fields:
+        return "pivot without row fields"
+    if not dropna:
+        return "dropna=False"
+    schema = frame.schema
+    for field in list(row_fields) + list(column_fields):
+        dtype = schema[field]
+        if dtype in (pl.Categorical, pl.Enum, pl.Object) or dtype.is_nested():
+            return f"key column '{field}' has dtype {dtype}"
+    for spec in specs:
+        if spec.aggregation in _NUMERIC_AGGREGATIONS and not is_numeric_dtype(schema[spec.field]):
+            return f"{spec.aggregation} of non-numeric column '{spec.field}'"
+        if spec.weight is not None and not is_numeric_dtype(schema[spec.weight]):
+            return f"non-numeric weight column '{spec.weight}'"
+    return None
+
+
+def text_mask(series: pl.Series, texts: Iterable[str]) -> pl.Series:
+    """Rows of ``series`` whose pandas ``astype(str)`` form is in ``texts``.
+
+    Only the distinct values are converted, so filters keep the semantics of
+    the pandas implementation (``"1.0"`` for integers with nulls, matching of
+    missing values) without stringifying the whole column.
+    """
+    wanted = set(texts)
+    uniques = series.unique()
+    matches = uniques.to_pandas().astype(str).isin(wanted).to_numpy()
+    matched = uniques.filter(pl.Series(matches))
+    mask = series.is_in(matched.drop_nulls().to_list())
+    if matched.null_count():
+        mask = mask | series.is_null()
+    return mask.fill_null(False)
+
+
+def _column(frame_schema: Dict[str, pl.DataType], name: str) -> pl.Expr:
+    expr = pl.col(name)
+    if frame_schema[name].is_float():
+        # pandas treats NaN as missing in keys and aggregations alike.
+        expr = expr.fill_nan(None)
+    return expr
+
+
+def _prepare(frame: pl.DataFrame, fields: Sequence[str]) -> pl.LazyFrame:
+    schema = frame.schema
+    return frame.lazy().select([_column(schema, name) for name in dict.fromkeys(fields)])
+
+
+def _agg_expr(spec: ValueSpec) -> pl.Expr:
+    value = pl.col(spec.field)
+    if spec.aggregation == "weighted_average":
+        value = value.cast(pl.Float64)
+        weight = pl.col(spec.weight).cast(pl.Float64)
+        mask = value.is_not_null() & weight.is_not_null() & (weight > 0)
+        numerator = (value * weight).filter(mask).sum()
+        denominator = weight.filter(mask).sum()
+        expr = pl.when(denominator > 0).then(numerator / denominator).otherwise(None)
+    elif spec.aggregation == "count":
+        expr = value.count()
+    elif spec.aggregation == "mean":
+        expr = value.mean()
+    elif spec.aggregation == "median":
+        expr = value.median()
+    elif spec.aggregation in ("sum", "min", "max"):
+        expr = getattr(value, spec.aggregation)()
+    else:
+        raise ValueError(f"Unsupported aggregation '{spec.aggregation}'")
+    return expr.alias(spec.field)
+
+
+def _needed(keys: Sequence[str], specs: Sequence[ValueSpec]) -> List[str]:
+    fields = list(keys) + [spec.field for spec in specs]
+    fields += [spec.weight for spec in specs if spec.weight]
+    return fields
+
+
+def _not_null(fields: Sequence[str]) -> pl.Expr:
+    return pl.all_horizontal([pl.col(name).is_not_null() for name in fields])
+
+
+def _group(lazy: pl.LazyFrame, keys: Sequence[str], specs: Sequence[ValueSpec]) -> pl.LazyFrame:
+    exprs = [_agg_expr(spec) for spec in specs]
+    if not keys:
+        return lazy.select(exprs)
+    return lazy.group_by(list(keys)).agg(exprs).sort(list(keys), nulls_last=True)
+
+
+def _to_pandas(result: pl.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+    frame = result.to_pandas()
+    return frame.set_index(list(keys)) if keys else frame
+
+
+def aggregate(
+    frame: pl.DataFrame,
+    group_fields: Sequence[str],
+    specs: Sequence[ValueSpec],
+) -> pd.DataFrame:
+    """``df.groupby(group_fields, dropna=False).agg(...).reset_index()`` in polars."""
+    lazy = _prepare(frame, _needed(group_fields, specs))
+    return _group(lazy, group_fields, specs).collect().to_pandas()
+
+
+def _check_margin_name(table: pd.DataFrame, margins_name: str) -> None:
+    levels = [table.index.get_level_values(level) for level in range(table.index.nlevels)]
+    if isinstance(table.columns, pd.MultiIndex):
+        levels += [table.columns.get_level_values(level) for level in range(1, table.columns.nlevels)]
+    if any(margins_name in values for values in levels):
+        raise ValueError(f"Conflicting name '{margins_name}' in margins")
+
+
+def _row_margin_series(
+    by_columns: pd.DataFrame, names: Sequence[str]
+) -> pd.Series:
+    entries: Dict[tuple, Any] = {}
+    for name in names:
+        for key, value in by_columns[name].items():
+            key = key if isinstance(key, tuple) else (key,)
+            entries[(name,) + key] = value
+    return pd.Series(entries) if entries else pd.Series(dtype=float)
+
+
+def pivot_table(
+    frame: pl.DataFrame,
+    row_fields: Sequence[str],
+    column_fields: Sequence[str],
+    specs: Sequence[ValueSpec],
+    *,
+    fill_value: Optional[float] = None,
+    margins: bool = False,
+    margins_name: str = "All",
+) -> pd.DataFrame:
+    """Equivalent of ``pd.pivot_table(..., dropna=True)`` for supported inputs."""
+    rows, cols = list(row_fields), list(column_fields)
+    keys = rows + cols
+    names = [spec.field for spec in specs]
+    lazy = _prepare(frame, _needed(keys, specs))
+
+    plans = [_group(lazy.filter(_not_null(keys)), keys, specs)]
+    if margins:
+        # pandas computes every margin from the rows without any missing key or value.
+        margin_data = lazy.filter(_not_null(keys + names))
+        plans.append(_group(margin_data, [], specs))
+        if cols:
+            plans.append(_group(margin_data, rows, specs))
+            plans.append(_group(margin_data, cols, specs))
+    results = pl.collect_all(plans)
+
+    table = _to_pandas(results[0], keys).dropna(how="all")
+    if cols:
+        table = table.unstack(cols, fill_value=fill_value)
+    table = table.sort_index(axis=1)
+    if fill_value is not None:
+        table = table.fillna(fill_value)
+
+    if margins:
+        table = _add_margins(table, results[1:], rows, cols, names, fill_value, margins_name)
+
+    return table.dropna(how="all", axis=1)
+
+
+def _add_margins(
+    table: pd.DataFrame,
+    margin_results: List[pl.DataFrame],
+    rows: List[str],
+    cols: List[str],
+    names: List[str],
+    fill_value: Optional[float],
+    margins_name: str,
+) -> pd.DataFrame:
+    _check_margin_name(table, margins_name)
+    grand = margin_results[0].row(0, named=True) if margin_results[0].height else {}
+    key: Any = (margins_name,) + ("",) * (len(rows) - 1) if len(rows) > 1 else margins_name
+
+    if cols:
+        by_rows = _to_pandas(margin_results[1], rows)
+        by_columns = _to_pandas(margin_results[2], cols)
+        padding = ("",) * (len(cols) - 1)
+        pieces = []
+        margin_keys: List[Any] = []
+        for name, piece in table.T.groupby(level=0):
+            piece = piece.T
+            all_key = (name, margins_name) + padding
+            piece[all_key] = by_rows[name]
+            pieces.append(piece)
+            margin_keys.append(all_key)
+        result = pd.concat(pieces, axis=1) if pieces else table
+        row_margin = _row_margin_series(by_columns, names)
+    else:
+        result = table
+        margin_keys = list(table.columns)
+        row_margin = pd.Series(np.nan, index=result.columns)
+
+    row_margin = row_margin.reindex(result.columns, fill_value=fill_value)
+    for margin_key in margin_keys:
+        name = margin_key if isinstance(margin_key, str) else margin_key[0]
+        value = grand.get(name)
+        row_margin[margin_key] = np.nan if value is None else value
+
+    margin_row = pd.DataFrame(row_margin, columns=pd.Index([key])).T
+    margin_row.index.names = result.index.names
+    margin_row = margin_row.infer_objects()
+    return pd.concat([result, margin_row])
+
+
+__all__ = [
+    "ENGINES",
+    "ValueSpec",
+    "aggregate",
+    "configured_engine",
+    "is_numeric_dtype",
+    "pivot_table",
+    "text_mask",
+    "unsupported_reason",
+    "value_specs",
+]
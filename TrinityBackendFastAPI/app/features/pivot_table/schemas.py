@@ -122,6 +122,10 @@ class PivotStatusResponse(BaseModel):
     updated_at: Optional[datetime] = None
     message: Optional[str] = None
     rows: Optional[int] = None
+    cache: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Dataset version and cache outcome (hit/miss/disabled) of the filtered frame and pivot cube",
+    )
 
 
 class PivotRefreshResponse(BaseModel):
@@ -4,19 +4,24 @@ import json
 import logging
 import re
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import polars as pl
 import pyarrow as pa
 import pyarrow.ipc as ipc
 from fastapi import HTTPException
+from minio.error import S3Error
 
 from app.DataStorageRetrieval.arrow_client import download_dataframe
-from app.DataStorageRetrieval.minio_utils import ensure_minio_bucket, upload_to_minio
+from app.DataStorageRetrieval.dataset_cache import dataset_version, load_polars, table_from_pandas
+from app.DataStorageRetrieval.minio_utils import MINIO_BUCKET, ensure_minio_bucket, get_client, upload_to_minio
 from app.features.data_upload_validate.app.routes import get_object_prefix
 from app.core.feature_cache import feature_cache
 
+from . import engine as pivot_engine
+from .cube_cache import DISABLED, HIT, MISS, cube_key, pivot_cube_cache
 from .schemas import (
     PivotComputeRequest,
     PivotComputeResponse,
@@ -111,7 +116,7 @@ def _ensure_column_mapping(columns: Iterable[str]) -> Dict[str, str]:
     return {col.lower(): col for col in columns}
 
 
-def _resolve_columns(df: pd.DataFrame, requested: List[str]) -> List[str]:
+def _resolve_columns(df: Union[pd.DataFrame, pl.DataFrame], requested: List[str]) -> List[str]:
     if not requested:
         return []
     mapping = _ensure_column_mapping(df.columns)
@@ -129,11 +134,11 @@ def _resolve_columns(df: pd.DataFrame, requested: List[str]) -> List[str]:
     return resolved
 
 
-def _apply_filters(df: pd.DataFrame, filters: List[Dict[str, Any]]) -> pd.DataFrame:
+def _apply_filters(df: pl.DataFrame, filters: List[Dict[str, Any]]) -> pl.DataFrame:
     if not filters:
         return df
 
-    result = df.copy()
+    result = df
     mapping = _ensure_column_mapping(result.columns)
 
     for entry in filters:
@@ -147,13 +152,12 @@ def _apply_filters(df: pd.DataFrame, filters: List[Dict[str, Any]]) -> pd.DataFr
         if not resolved:
             raise HTTPException(status_code=404, detail=f"Filter column '{field}' not found")
 
-        as_text = result[resolved].astype(str)
         if include_values:
             include_set = {str(v) for v in include_values}
-            result = result[as_text.isin(include_set)]
+            result = result.filter(pivot_engine.text_mask(result[resolved], include_set))
         if exclude_values:
             exclude_set = {str(v) for v in exclude_values}
-            result = result[~as_text.isin(exclude_set)]
+            result = result.filter(~pivot_engine.text_mask(result[resolved], exclude_set))
 
     return result
 
@@ -412,10 +416,15 @@ def _build_hierarchy_nodes(
     column_meta: Dict[str, Dict[str, Any]],
     include_grand_total: bool = False,
     grand_total_values: Optional[Dict[str, Any]] = None,
+    aggregate: Optional[Callable[[List[str]], pd.DataFrame]] = None,
 ) -> List[Dict[str, Any]]:
     if not row_fields:
         return []
 
+    if aggregate is None:
+        def aggregate(fields: List[str]) -> pd.DataFrame:
+            return df.groupby(fields, dropna=False).agg(agg_map).reset_index()
+
     nodes: List[Dict[str, Any]] = []
 
     has_column_fields = (
@@ -444,11 +453,7 @@ def _build_hierarchy_nodes(
         )
 
         try:
-            grouped = (
-                df.groupby(aggregate_fields, dropna=False)
-                .agg(agg_map)
-                .reset_index()
-            )
+            grouped = aggregate(aggregate_fields)
         except Exception as exc:  # pragma: no cover - defensive
             logger.exception(
                 "Failed to build hierarchy for fields %s: %s", aggregate_fields, exc
@@ -467,9 +472,7 @@ def _build_hierarchy_nodes(
                 grouped_iter = [(tuple(), grouped)]
 
             try:
-                totals_grouped = (
-                    df.groupby(group_fields, dropna=False).agg(agg_map).reset_index()
-                )
+                totals_grouped = aggregate(group_fields)
             except Exception:  # pragma: no cover - defensive
                 totals_grouped = pd.DataFrame()
 
@@ -874,7 +877,13 @@ def _apply_sorting(
     return result_df
 
 
-def _store_status(config_id: str, status: str, message: Optional[str], rows: Optional[int]) -> None:
+def _store_status(
+    config_id: str,
+    status: str,
+    message: Optional[str],
+    rows: Optional[int],
+    cache: Optional[Dict[str, Any]] = None,
+) -> None:
     payload = {
         "config_id": config_id,
         "status": status,
@@ -884,6 +893,8 @@ def _store_status(config_id: str, status: str, message: Optional[str], rows: Opt
         payload["message"] = message
     if rows is not None:
         payload["rows"] = rows
+    if cache is not None:
+        payload["cache"] = cache
 
     # Pass parts separately so cache router can normalize them properly
     # The cache router already adds the feature name, so we just need config_id and suffix
@@ -935,9 +946,20 @@ def _load_status(config_id: str) -> PivotStatusResponse:
         updated_at=updated_at,
         message=data.get("message"),
         rows=data.get("rows"),
+        cache=data.get("cache"),
     )
 
 
+def _load_source_frame(resolved_path: str) -> Tuple[pl.DataFrame, Optional[str]]:
+    """Load the dataset and the version (ETag) it was read at, when known."""
+    try:
+        frame = load_polars(get_client(), MINIO_BUCKET, resolved_path, feature="pivot_table")
+        return frame, dataset_version(MINIO_BUCKET, resolved_path)
+    except S3Error:
+        # Not under the resolved key; let the Flight client search for it.
+        return pl.from_arrow(table_from_pandas(download_dataframe(resolved_path))), None
+
+
 async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotComputeResponse:
     logger.info("Pivot compute requested for %s", config_id)
     logger.info("Pivot compute payload - sorting: %s, rows: %s, columns: %s", payload.sorting, payload.rows, payload.columns)
@@ -945,7 +967,7 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
 
     try:
         resolved_path = await _resolve_object_path(payload.data_source)
-        df = download_dataframe(resolved_path)
+        df, version = _load_source_frame(resolved_path)
     except HTTPException:
         raise
     except Exception as exc:  # pragma: no cover - external service
@@ -953,17 +975,20 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
         _store_status(config_id, "failed", f"Unable to load dataset: {exc}", None)
         raise HTTPException(status_code=500, detail=f"Unable to load dataset: {exc}")
 
-    if df.empty:
+    if df.is_empty():
         message = "Dataset is empty."
         _store_status(config_id, "failed", message, 0)
         raise HTTPException(status_code=400, detail=message)
 
-    df_columns = df.columns.tolist()
+    df_columns = list(df.columns)
     logger.debug("Pivot dataset columns: %s", df_columns)
 
-    filtered_df = _apply_filters(df, [f.dict() for f in payload.filters])
+    filters = [f.dict() for f in payload.filters]
+    filtered_df, filter_status = pivot_cube_cache.filtered(
+        version, filters, lambda: _apply_filters(df, filters)
+    )
 
-    if filtered_df.empty:
+    if filtered_df.is_empty():
         message = "No rows remain after applying filters."
         _store_status(config_id, "failed", message, 0)
         raise HTTPException(status_code=400, detail=message)
@@ -996,7 +1021,7 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
             weight_col = weight_col_resolved[0]
             
             # Validate weight column is numeric
-            if not pd.api.types.is_numeric_dtype(filtered_df[weight_col]):
+            if not pivot_engine.is_numeric_dtype(filtered_df.schema[weight_col]):
                 message = f"Weight column '{weight_col}' must contain numeric values"
                 _store_status(config_id, "failed", message, None)
                 raise HTTPException(status_code=400, detail=message)
@@ -1031,18 +1056,58 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
         if not agg_name:
             _store_status(config_id, "failed", f"Unsupported aggregation {value_cfg.aggregation}", None)
             raise HTTPException(status_code=400, detail=f"Unsupported aggregation '{value_cfg.aggregation}'")
-        
-        if agg_name == "weighted_average":
-            # Create custom weighted average function for this column
-            weight_col = weight_column_map[col]
-            agg_map[col] = make_weighted_avg_func(weight_col, filtered_df)
-        else:
-            agg_map[col] = agg_name
+        agg_map[col] = agg_name
 
-    try:
-        include_margins = payload.grand_totals != "off"
+    value_specs = pivot_engine.value_specs(agg_map, weight_column_map)
+    use_polars = pivot_engine.configured_engine() == "polars"
+    if use_polars:
+        reason = pivot_engine.unsupported_reason(
+            filtered_df, row_fields, column_fields, value_specs, dropna=payload.dropna
+        )
+        if reason:
+            logger.info("Pivot %s uses the pandas engine: %s", config_id, reason)
+            use_polars = False
+
+    pandas_sources: List[Tuple[pd.DataFrame, Dict[str, Any]]] = []
+
+    def pandas_source() -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Filtered rows as pandas with the aggfuncs bound to them, built once."""
+        if not pandas_sources:
+            frame = filtered_df.to_pandas()
+            aggfuncs = {
+                # Create custom weighted average function for this column
+                col: make_weighted_avg_func(weight_column_map[col], frame) if agg == "weighted_average" else agg
+                for col, agg in agg_map.items()
+            }
+            pandas_sources.append((frame, aggfuncs))
+        return pandas_sources[0]
+
+    def aggregate_hierarchy(fields: List[str]) -> pd.DataFrame:
+        if use_polars:
+            return pivot_engine.aggregate(filtered_df, fields, value_specs)
+        frame, aggfuncs = pandas_source()
+        return frame.groupby(fields, dropna=False).agg(aggfuncs).reset_index()
+
+    include_margins = payload.grand_totals != "off"
+    # Cubes keep their margins so that toggling grand totals is served from
+    # the cache; they are dropped below when not requested.
+    cube_margins = include_margins or bool(row_fields)
+    key = None
+    if version:
+        key = cube_key(
+            version,
+            filters,
+            row_fields,
+            column_fields,
+            [(spec.field, spec.aggregation, spec.weight) for spec in value_specs],
+            dropna=payload.dropna,
+            fill_value=payload.fill_value,
+            margins=cube_margins,
+        )
+    cube = pivot_cube_cache.get(key)
+    cube_status = HIT if cube is not None else (MISS if key and pivot_cube_cache.enabled else DISABLED)
 
-        # Create pivot table with margins
+    def build_pivot(margins: bool) -> pd.DataFrame:
         # When margins=True, pandas calculates grand totals by applying the aggregation
         # function to the ENTIRE dataset (not to the aggregated group values):
         # - For 'min': grand total = min(all values in dataset) = overall minimum (CORRECT)
@@ -1051,23 +1116,47 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
         # - For 'mean': grand total = mean(all values in dataset) = overall mean (CORRECT)
         # - For 'count': grand total = count(all values in dataset) = overall count (CORRECT)
         # This ensures grand totals accurately represent the aggregation across all data
-        pivot_df = pd.pivot_table(
-            filtered_df,
+        if use_polars:
+            return pivot_engine.pivot_table(
+                filtered_df,
+                row_fields,
+                column_fields,
+                value_specs,
+                fill_value=payload.fill_value,
+                margins=margins,
+                margins_name="Grand Total",
+            )
+        frame, aggfuncs = pandas_source()
+        return pd.pivot_table(
+            frame,
             index=row_fields if row_fields else None,
             columns=column_fields if column_fields else None,
-            values=list(agg_map.keys()),
-            aggfunc=agg_map,
+            values=list(aggfuncs.keys()),
+            aggfunc=aggfuncs,
             dropna=payload.dropna,
             fill_value=payload.fill_value,
-            margins=include_margins,
+            margins=margins,
             margins_name="Grand Total",
         )
+
+    try:
+        if cube is None:
+            try:
+                cube = pivot_cube_cache.put(key, build_pivot(cube_margins))
+            except ValueError:
+                if include_margins:
+                    raise
+                # A row or column labelled "Grand Total" conflicts with the
+                # margins; build this pivot without them and do not cache it.
+                cube_margins = False
+                cube = pivot_cube_cache.put(None, build_pivot(False))
+        pivot_df = cube.pivot_frame()
     except Exception as exc:
         logger.exception("Pivot computation failed for %s", config_id)
         _store_status(config_id, "failed", f"Pivot computation failed: {exc}", None)
         raise HTTPException(status_code=400, detail=f"Pivot computation failed: {exc}")
 
-    if include_margins:
+    if cube_margins:
         if payload.grand_totals in ("columns", "off") and row_fields:
             pivot_df = _drop_margin_rows(pivot_df)
         if payload.grand_totals in ("rows", "off"):
@@ -1354,6 +1443,7 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
         column_leaf_meta,
         include_grand_total=include_grand_total_row,
         grand_total_values=grand_total_values,
+        aggregate=cube.aggregator(aggregate_hierarchy),
     )
     
     # Apply hierarchical sorting if sorting is configured
@@ -1410,7 +1500,13 @@ async def compute_pivot(config_id: str, payload: PivotComputeRequest) -> PivotCo
         config_to_save["pivot_last_saved_at"] = existing_config.get("pivot_last_saved_at")
     _store_config(config_id, config_to_save)
 
-    _store_status(config_id, "success", None, len(records))
+    cache_info = {
+        "dataset_version": version,
+        "filtered_frame": filter_status,
+        "cube": cube_status,
+    }
+    logger.info("Pivot %s cache: %s", config_id, cache_info)
+    _store_status(config_id, "success", None, len(records), cache=cache_info)
 
     return PivotComputeResponse(
         config_id=config_id,
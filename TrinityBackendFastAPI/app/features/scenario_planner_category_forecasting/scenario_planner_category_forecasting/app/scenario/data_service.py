@@ -26,6 +26,7 @@ from ..config import (
     db
 )
 from ..utils.file_loader import FileLoader
+from .slice_cache import IdentifierIndex, decode_frame, encode_frame, find_missing_clusters, is_arrow_blob
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,13 @@ logger = logging.getLogger(__name__)
 # Redis helpers                                                              #
 # ─────────────────────────────────────────────────────────────────────────── #
 def _redis_set(key: str, obj, ttl: int = 6 * 60 * 60) -> None:  # 6 hours default TTL
+    if isinstance(obj, pd.DataFrame):
+        # DataFrames go in as Arrow IPC; pickle only if Arrow cannot hold the frame
+        try:
+            cache.set(key, encode_frame(obj), ex=ttl)
+            return
+        except Exception as e:
+            logger.debug("Arrow encoding failed for key=%s, pickling instead: %s", key, e)
     try:
         cache.set(key, pickle.dumps(obj), ex=ttl)
     except Exception:
@@ -48,6 +56,8 @@ def _redis_get(key: str):
         blob = cache.get(key)
         if not blob:
             return None
+        if is_arrow_blob(blob):
+            return decode_frame(blob)
         # try pickle first
         try:
             return pickle.loads(blob)
@@ -437,21 +447,27 @@ class DataService:
 
     # ----------  IDENTIFIER-VALUE SLICES  ----------------------------------
     @classmethod
-    def _cache_identifier_slice(cls, d0_key: str, col: str, value, df_full: pd.DataFrame) -> None:
-        """Cache and upload the 1-dim slice where df_full[col] == value (normalizing strings)."""
+    def _cache_identifier_slice(
+        cls, d0_key: str, col: str, value, df_full: pd.DataFrame, index: Optional[IdentifierIndex] = None
+    ) -> None:
+        """Cache and upload the 1-dim slice where df_full[col] == value (normalizing strings).
+
+        Pass the ``IdentifierIndex`` of ``df_full`` when caching several values so
+        the column is normalised once instead of once per value.
+        """
         if col not in df_full.columns:
             return
 
-        series = df_full[col].astype(str).str.strip().str.lower()
-        target = str(value).strip().lower()
-        mask = series == target
-        if not mask.any():
+        if index is None:
+            index = IdentifierIndex(df_full, [col])
+        rows = index.positions(col, value)
+        if not len(rows):
             return
 
-        df_slice = df_full.loc[mask].copy()
         slice_key = f"d0:{d0_key}:ident:{col}:{_hash_str(str(value))}"
 
         if not cache.exists(slice_key):
+            df_slice = index.take(rows)
             _redis_set(slice_key, df_slice)
             safe_value = str(value).replace('/', '_').replace(' ', '_')
             out_key = f"cache/{d0_key}/ident_{col}_{safe_value}.parquet"
@@ -518,6 +534,9 @@ class DataService:
                 if col in covered_values:
                     covered_values[col].add(val)
 
+        # Normalise every identifier column once; slices are row lookups from here on
+        index = IdentifierIndex(df_full, ident_cols)
+
         # 3) compute missing_id_values: values present in D0 but not covered by models
         missing_id_values: Dict[str, List] = {}
         for col in ident_cols:
@@ -527,56 +546,30 @@ class DataService:
                 missing_id_values[col] = uncovered
                 for val in uncovered:
                     try:
-                        cls._cache_identifier_slice(d0_key, col, val, df_full)
+                        cls._cache_identifier_slice(d0_key, col, val, df_full, index=index)
                     except Exception as e:
                         logger.debug("Failed to cache identifier slice for %s=%s: %s", col, val, e)
 
-        # 4) build unique identifier tuples from D0 (for the ident_cols)
-        df_id = df_full[ident_cols].fillna("").astype(str).applymap(lambda x: x.strip())
-        df_unique = df_id.drop_duplicates().reset_index(drop=True)
-
+        # 4) unique identifier tuples from D0 that no model matches (a model matches
+        #    if ALL its id keys match the tuple), with their rows from the index
         missing_clusters: List[Dict] = []
         cached_cluster_cnt = 0
 
-        for _, row in df_unique.iterrows():
-            row_map = {col: row[col].strip() for col in ident_cols}
-            row_norm = {col: row_map[col].lower() for col in ident_cols}
-
-            # Check if any model matches this row (model matches if ALL its id keys match row)
-            match_found = False
-            for mid in model_ident_list:
-                if not mid:
-                    continue
-                ok = True
-                for mk, mv in mid.items():
-                    if mk not in row_norm or row_norm[mk] != (mv or "").lower():
-                        ok = False
-                        break
-                if ok:
-                    match_found = True
-                    break
-
-            if match_found:
-                continue  # covered by an existing model
-
+        for identifiers, rows in find_missing_clusters(index, model_ident_list):
             # No model matched -> this is a missing cluster
             missing_entry = {
-                "identifiers": {col: row_map[col] for col in ident_cols},
+                "identifiers": identifiers,
                 "reason": "no_matching_model"
             }
 
-            # Cache the slice for this missing cluster (filter D0)
+            # Cache the slice for this missing cluster
             try:
-                mask = pd.Series(True, index=df_full.index)
-                for col in ident_cols:
-                    mask &= (df_full[col].astype(str).str.strip().str.lower() == row_norm[col])
-
-                df_slice = df_full.loc[mask].copy()
-                if df_slice is None or getattr(df_slice, "empty", False):
+                if rows is None or not len(rows):
                     missing_entry["reason"] = "no_rows_after_mask"
                     missing_entry["rows"] = 0
                     logger.warning("Derived unique row but mask produced 0 rows for identifiers: %s", missing_entry["identifiers"])
                 else:
+                    df_slice = index.take(rows)
                     chash = _cluster_hash(missing_entry["identifiers"])
                     rkey = f"d0:{d0_key}:cluster:{chash}"
                     _redis_set(rkey, df_slice)
@@ -758,6 +751,9 @@ class DataService:
                 except Exception as e:
                     logger.warning("Failed to delete ident keys: %s", e)
 
+        from .scenario_matrix import invalidate
+        invalidate(d0_key)
+
         logger.info("Cleared all cache entries for dataset: %s", d0_key)
 
     @classmethod
@@ -0,0 +1,300 @@
+"""
+Batched scenario evaluation for a whole model set.
+
+``ScenarioService.run_scenario`` used to walk the selected models one by one:
+build a ``TransformService`` of pandas lambdas, transform one-row frames for
+the reference and the scenario, map the coefficients and sum contributions.
+With thousands of models a single what-if took minutes.
+
+``ModelMatrix`` compiles the model set once into arrays over the union of
+x-variables:
+
+  • ``coef`` / ``member`` (models × features) and ``intercept`` (models)
+  • the transformation steps per (model, feature) as op codes + parameters
+  • the target inverse per model
+
+so transforms, tweaks and predictions for every model are a handful of NumPy
+operations.  The reference-value matrix (one row per model) is computed once
+per (model set, dataset, reference window) and kept in a small TTL cache keyed
+on the models' content, so repeated tweaks on the same model set only
+re-evaluate the arrays.
+
+Configuration (environment):
+  • ``SCENARIO_MATRIX_CACHE_SIZE`` – model sets kept (default 8, 0 disables)
+  • ``SCENARIO_MATRIX_TTL``        – seconds an entry stays valid (default 900)
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.DataStorageRetrieval.env_config import env_int
+
+logger = logging.getLogger(__name__)
+
+# Transformation op codes (see TransformService)
+OP_NONE, OP_AFFINE, OP_LOG, OP_EXP = 0, 1, 2, 3
+# Target inverse codes
+INV_NONE, INV_EXP, INV_LOG = 0, 1, 2
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Tweak specs                                                                #
+# ─────────────────────────────────────────────────────────────────────────── #
+def parse_tweak(feat: str, spec: Any) -> Optional[Tuple[str, float]]:
+    """Validate one scenario tweak; returns ``(type, value)`` or ``None`` (logged)."""
+    # Extract type and value from spec (handle both Pydantic models and dicts)
+    if hasattr(spec, 'type'):
+        spec_type = spec.type
+        spec_value = spec.value
+    else:
+        spec_type = spec.get("type")
+        spec_value = spec.get("value")
+
+    # Validate spec
+    if spec_type is None or spec_value is None:
+        logger.warning(f"Invalid spec for feature '{feat}': missing type or value")
+        return None
+
+    # Validate spec_type
+    if spec_type not in ["pct", "abs"]:
+        logger.warning(f"Invalid spec_type '{spec_type}' for feature '{feat}', expected 'pct' or 'abs'")
+        return None
+
+    # Validate spec_value is numeric
+    try:
+        spec_value = float(spec_value)
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid spec_value '{spec_value}' for feature '{feat}', must be numeric")
+        return None
+
+    return spec_type, spec_value
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Model matrix                                                               #
+# ─────────────────────────────────────────────────────────────────────────── #
+class ModelMatrix:
+    """Coefficients, transforms and intercepts of a model set as arrays."""
+
+    def __init__(self, models: Sequence[Dict[str, Any]]):
+        self.models = list(models)
+        features: Dict[str, int] = {}
+        for meta in self.models:
+            for x_var in meta["x_variables"]:
+                features.setdefault(x_var, len(features))
+        self.features = list(features)
+        self.feature_index = features
+        # Column positions of each model's x_variables, in the model's order
+        self.columns = [
+            np.array([features[x] for x in meta["x_variables"]], dtype=np.intp) for meta in self.models
+        ]
+
+        n, m = len(self.models), len(self.features)
+        self.member = np.zeros((n, m), dtype=bool)
+        self.coef = np.zeros((n, m))
+        self.intercept = np.zeros(n)
+        self.y_inverse = np.full(n, INV_NONE, dtype=np.int8)
+        steps: List[List[Tuple[int, int, float, float]]] = []
+
+        for i, meta in enumerate(self.models):
+            self.member[i, self.columns[i]] = True
+            self.intercept[i] = meta["intercept"]
+            coefficients = meta["coefficients"]
+            for x_var in meta["x_variables"]:
+                # Handle the mismatch between x_variables and coefficient names (Beta_ prefix)
+                beta_key = f"Beta_{x_var}"
+                if beta_key in coefficients:
+                    value = coefficients[beta_key]
+                elif x_var in coefficients:
+                    value = coefficients[x_var]
+                else:
+                    logger.warning(f"Could not find coefficient for variable: {x_var}")
+                    value = 0.0
+                self.coef[i, features[x_var]] = value
+            steps.append(self._compile_transforms(i, meta.get("transformations") or {}))
+
+        # Steps are applied per (model, feature) in order: level d holds each
+        # chain's d-th step, padded to the deepest chain with no-ops
+        levels = [Counter(j for _, j, _, _ in model_steps) for model_steps in steps]
+        depth = max((max(level.values(), default=0) for level in levels), default=0)
+        self.ops = np.zeros((depth, n, m), dtype=np.int8)
+        self.shift = np.zeros((depth, n, m))
+        self.scale = np.ones((depth, n, m))
+        for i, model_steps in enumerate(steps):
+            level: Dict[int, int] = {}
+            for op, j, shift, scale in model_steps:
+                d = level.get(j, 0)
+                level[j] = d + 1
+                self.ops[d, i, j] = op
+                self.shift[d, i, j] = shift
+                self.scale[d, i, j] = scale
+
+        logger.info("🧮 Scenario matrix: %d models × %d features, %d transform levels", n, m, depth)
+
+    def _compile_transforms(self, i: int, trans_meta: Dict[str, Any]) -> List[Tuple[int, int, float, float]]:
+        """Model i's TransformService steps as (op, feature column, shift, scale)."""
+        steps = []
+        for feat, spec in trans_meta.items():
+            if feat == "target_inverse":
+                method = spec.get("method") if isinstance(spec, dict) else None
+                if method == "log":
+                    self.y_inverse[i] = INV_EXP
+                elif method == "exp":
+                    self.y_inverse[i] = INV_LOG
+                continue
+            for m in spec.values():
+                method = m["method"]
+                params = m.get("params", {})
+                if method not in ("standard_scaler", "minmax_scaler", "log", "exp"):
+                    continue
+                j = self.feature_index.get(feat)
+                if j is None or not self.member[i, j]:
+                    # TransformService would fail looking the column up
+                    raise KeyError(feat)
+                if method == "standard_scaler":
+                    steps.append((OP_AFFINE, j, params["mean"], params["std"]))
+                elif method == "minmax_scaler":
+                    steps.append((OP_AFFINE, j, params["min"], params["max"] - params["min"]))
+                elif method == "log":
+                    steps.append((OP_LOG, j, 0.0, 1.0))
+                else:
+                    steps.append((OP_EXP, j, 0.0, 1.0))
+        return steps
+
+    # ------------------------------------------------------------------ #
+    def reference_matrix(self, refs: Sequence[Dict[str, float]]) -> np.ndarray:
+        """Stack per-model reference dicts into a (models × features) array."""
+        reference = np.full(self.member.shape, np.nan)
+        for i, ref_vals in enumerate(refs):
+            for feat, value in ref_vals.items():
+                j = self.feature_index.get(feat)
+                if j is not None and self.member[i, j] and value is not None:
+                    reference[i, j] = value
+        return reference
+
+    def apply_tweaks(self, reference: np.ndarray, local_defs: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """``apply_tweaks`` for every model: ``local_defs[i]`` holds model i's cluster tweaks."""
+        factor = np.ones_like(reference)
+        absolute = np.full_like(reference, np.nan)
+        override = np.zeros(reference.shape, dtype=bool)
+        for i, defs in enumerate(local_defs):
+            if not defs:
+                continue
+            for feat, spec in defs.items():
+                j = self.feature_index.get(feat)
+                if j is None or not self.member[i, j]:
+                    logger.warning(f"Feature '{feat}' not found in reference values, skipping")
+                    continue
+                parsed = parse_tweak(feat, spec)
+                if parsed is None:
+                    continue
+                spec_type, spec_value = parsed
+                if spec_type == "pct":
+                    factor[i, j] = 1 + spec_value / 100.0
+                else:
+                    absolute[i, j] = spec_value
+                    override[i, j] = True
+        return np.where(override, absolute, reference * factor)
+
+    def transform(self, values: np.ndarray) -> np.ndarray:
+        out = values.astype(float, copy=True)
+        with np.errstate(all="ignore"):
+            for d in range(self.ops.shape[0]):
+                ops = self.ops[d]
+                out = np.where(ops == OP_AFFINE, (out - self.shift[d]) / self.scale[d], out)
+                out = np.where(ops == OP_LOG, np.log(np.clip(out, 1e-9, None)), out)
+                out = np.where(ops == OP_EXP, np.exp(out), out)
+        return out
+
+    def predict(self, transformed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-feature contributions and predictions (after the target inverse)."""
+        contrib = np.where(self.member, transformed * self.coef, 0.0)
+        # Missing reference values drop out of the sum, as pandas' Series.sum does
+        linear = np.nansum(contrib, axis=1) + self.intercept
+        with np.errstate(all="ignore"):
+            y = np.where(self.y_inverse == INV_EXP, np.exp(linear), linear)
+            y = np.where(self.y_inverse == INV_LOG, np.log(linear), y)
+        return contrib, y
+
+    def evaluate(self, reference: np.ndarray, scenario: np.ndarray) -> Dict[str, np.ndarray]:
+        """Baseline vs. scenario for every model."""
+        ref_t = self.transform(reference)
+        scen_t = self.transform(scenario)
+        contrib_ref, y_ref = self.predict(ref_t)
+        contrib_scen, y_scen = self.predict(scen_t)
+        delta_feat = contrib_scen - contrib_ref
+        delta_pred = y_scen - y_ref
+        with np.errstate(all="ignore"):
+            pct_feat = np.where(contrib_ref != 0, delta_feat / contrib_ref * 100, 0.0)
+            pct_pred = np.where(y_ref != 0, delta_pred / y_ref * 100, 0.0)
+        return {
+            "reference_transformed": ref_t,
+            "scenario_transformed": scen_t,
+            "contrib_ref": contrib_ref,
+            "contrib_scen": contrib_scen,
+            "delta_feat": delta_feat,
+            "pct_feat": pct_feat,
+            "y_ref": y_ref,
+            "y_scen": y_scen,
+            "delta_pred": delta_pred,
+            "pct_pred": pct_pred,
+        }
+
+    def row(self, i: int, values: np.ndarray) -> Dict[str, float]:
+        """Model i's features of ``values`` as a dict in its x_variables order."""
+        names = self.models[i]["x_variables"]
+        return dict(zip(names, values[i, self.columns[i]].tolist()))
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Cache                                                                      #
+# ─────────────────────────────────────────────────────────────────────────── #
+_cache: "OrderedDict[tuple, Tuple[float, ModelMatrix, np.ndarray]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def cache_key(models: Sequence[Dict[str, Any]], d0_key: str, stat: str, start: Any, end: Any) -> tuple:
+    """Key on the models' content, so re-selected or retrained models never hit a stale entry."""
+    fingerprint = hashlib.sha256(
+        json.dumps(list(models), sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return (fingerprint, d0_key, stat, str(start), str(end))
+
+
+def lookup(key: tuple) -> Optional[Tuple[ModelMatrix, np.ndarray]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires, matrix, reference = entry
+        if expires < time.monotonic():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return matrix, reference
+
+
+def store(key: tuple, matrix: ModelMatrix, reference: np.ndarray) -> None:
+    size = env_int("SCENARIO_MATRIX_CACHE_SIZE", 8)
+    if size <= 0:
+        return
+    expires = time.monotonic() + env_int("SCENARIO_MATRIX_TTL", 900)
+    with _cache_lock:
+        _cache[key] = (expires, matrix, reference)
+        _cache.move_to_end(key)
+        while len(_cache) > size:
+            _cache.popitem(last=False)
+
+
+def invalidate(d0_key: Optional[str] = None) -> None:
+    """Drop cached model sets, all of them or those built on ``d0_key``."""
+    with _cache_lock:
+        for key in [k for k in _cache if d0_key is None or k[1] == d0_key]:
+            del _cache[key]
@@ -9,7 +9,8 @@ import asyncio
 from io import BytesIO
 
 from ..scenario.data_service import DataService
-from ..scenario.transform_service import TransformService
+from ..scenario import scenario_matrix
+from ..scenario.scenario_matrix import ModelMatrix, parse_tweak
 from ..config import saved_predictions_collection, minio_client, MINIO_OUTPUT_BUCKET
 
 logger = logging.getLogger(__name__)
@@ -56,30 +57,10 @@ def apply_tweaks(ref_vals: Dict[str, float],
             logger.warning(f"Feature '{feat}' not found in reference values, skipping")
             continue
             
-        # Extract type and value from spec (handle both Pydantic models and dicts)
-        if hasattr(spec, 'type'):
-            spec_type = spec.type
-            spec_value = spec.value
-        else:
-            spec_type = spec.get("type")
-            spec_value = spec.get("value")
-            
-        # Validate spec
-        if spec_type is None or spec_value is None:
-            logger.warning(f"Invalid spec for feature '{feat}': missing type or value")
-            continue
-            
-        # Validate spec_type
-        if spec_type not in ["pct", "abs"]:
-            logger.warning(f"Invalid spec_type '{spec_type}' for feature '{feat}', expected 'pct' or 'abs'")
-            continue
-            
-        # Validate spec_value is numeric
-        try:
-            spec_value = float(spec_value)
-        except (ValueError, TypeError):
-            logger.warning(f"Invalid spec_value '{spec_value}' for feature '{feat}', must be numeric")
+        parsed = parse_tweak(feat, spec)
+        if parsed is None:
             continue
+        spec_type, spec_value = parsed
             
         # Apply the tweak based on type
         if spec_type == "pct":
@@ -209,101 +190,68 @@ class ScenarioService:
         upload_to_minio: bool = True
     ) -> List[Dict[str, Any]]:
 
+        # 1️⃣ Coefficient / transform / reference matrices, reused across tweaks
         models = await DataService.fetch_selected_models(payload.model_id)
-        results: List[Dict[str, Any]] = []
-
-        for meta in models:
-            ident = meta["identifiers"]
-            combination = meta.get("combination")
-            logger.info("Processing scenario for combination: %s", combination)
-            df_slice = DataService.get_cluster_dataframe(d0_key, ident, combination=combination)
-
-            # 1️⃣ Reference
-            ref_vals = cls._calc_reference(
-                df_slice,
-                meta["x_variables"],
-                payload.stat,  # Changed from payload["stat"] to payload.stat
-                payload.start_date,  # Changed from payload["start_date"] to payload.start_date
-                payload.end_date,  # Changed from payload["end_date"] to payload.end_date
-            )
-
-            # 2️⃣ Cluster-specific Tweaks (Local Changes Only)
-            local_defs = {}
-            for cl in getattr(payload, "clusters", []):
-                # Handle both Pydantic model and dict access
-                if hasattr(cl, 'combination_id'):
-                    cl_combination_id = cl.combination_id
-                    cl_scenario_defs = getattr(cl, 'scenario_defs', {})
-                else:
-                    cl_combination_id = cl["combination_id"]
-                    cl_scenario_defs = cl.get("scenario_defs", {})
-                    
-                # Match by combination_id instead of identifiers
-                if cl_combination_id == combination:
-                    local_defs = cl_scenario_defs
-                    # Convert Pydantic models to dict if needed
-                    if hasattr(local_defs, 'dict'):
-                        local_defs = local_defs.dict()
-                    elif isinstance(local_defs, dict):
-                        # Convert any nested Pydantic models to dicts
-                        local_defs = {
-                            k: v.dict() if hasattr(v, 'dict') else v
-                            for k, v in local_defs.items()
-                        }
-                    break
-
-            scen_vals = apply_tweaks(ref_vals, local_defs)
-
-            # 3️⃣ Transform
-            transf = TransformService(meta["transformations"])
-            X_ref_t = transf.transform(pd.DataFrame([ref_vals])).iloc[0]
-            X_scen_t = transf.transform(pd.DataFrame([scen_vals])).iloc[0]
-
-            ref_trans_values = X_ref_t.to_dict()
-            scen_trans_values = X_scen_t.to_dict()
-
-            # Create coefficient mapping: x_variable -> coefficient
-            # Handle the mismatch between x_variables and coefficient names (Beta_ prefix)
-            coeff_mapping = {}
-            for x_var in meta["x_variables"]:
-                # Try to find coefficient with Beta_ prefix
-                beta_key = f"Beta_{x_var}"
-                if beta_key in meta["coefficients"]:
-                    coeff_mapping[x_var] = meta["coefficients"][beta_key]
-                else:
-                    # Fallback: try without prefix
-                    if x_var in meta["coefficients"]:
-                        coeff_mapping[x_var] = meta["coefficients"][x_var]
-                    else:
-                        logger.warning(f"Could not find coefficient for variable: {x_var}")
-                        coeff_mapping[x_var] = 0.0
-            
-            coeff = pd.Series(coeff_mapping)
-            intercept = meta["intercept"]
-            
-            logger.info(f"Original coefficients keys: {list(meta['coefficients'].keys())}")
-            logger.info(f"X variables: {meta['x_variables']}")
-            logger.info(f"Mapped coefficients: {coeff.to_dict()}")
-            logger.info(f"Intercept: {intercept}")
-
-            contrib_ref = X_ref_t * coeff
-            contrib_scen = X_scen_t * coeff
-
-            y_ref = transf.inverse_y(contrib_ref.sum() + intercept)
-            y_scen = transf.inverse_y(contrib_scen.sum() + intercept)
+        matrix_key = scenario_matrix.cache_key(models, d0_key, payload.stat, payload.start_date, payload.end_date)
+        cached = scenario_matrix.lookup(matrix_key)
+        if cached is not None:
+            matrix, reference = cached
+            logger.info("♻️ Reusing scenario matrices for %d models", len(matrix.models))
+        else:
+            matrix = ModelMatrix(models)
+            refs = []
+            for meta in models:
+                combination = meta.get("combination")
+                logger.info("Processing scenario for combination: %s", combination)
+                df_slice = DataService.get_cluster_dataframe(d0_key, meta["identifiers"], combination=combination)
+                refs.append(cls._calc_reference(
+                    df_slice,
+                    meta["x_variables"],
+                    payload.stat,
+                    payload.start_date,
+                    payload.end_date,
+                ))
+            reference = matrix.reference_matrix(refs)
+            if models:
+                scenario_matrix.store(matrix_key, matrix, reference)
+
+        # 2️⃣ Cluster-specific Tweaks (Local Changes Only), matched by combination_id
+        defs_by_combination: Dict[Any, Dict[str, Any]] = {}
+        for cl in getattr(payload, "clusters", []) or []:
+            # Handle both Pydantic model and dict access
+            if hasattr(cl, 'combination_id'):
+                cl_combination_id = cl.combination_id
+                cl_scenario_defs = getattr(cl, 'scenario_defs', {})
+            else:
+                cl_combination_id = cl["combination_id"]
+                cl_scenario_defs = cl.get("scenario_defs", {})
+            if cl_combination_id in defs_by_combination:
+                continue  # first matching cluster wins
+            # Convert Pydantic models to dict if needed
+            if hasattr(cl_scenario_defs, 'dict'):
+                cl_scenario_defs = cl_scenario_defs.dict()
+            elif isinstance(cl_scenario_defs, dict):
+                cl_scenario_defs = {
+                    k: v.dict() if hasattr(v, 'dict') else v
+                    for k, v in cl_scenario_defs.items()
+                }
+            defs_by_combination[cl_combination_id] = cl_scenario_defs
 
-            delta_pred = float(y_scen - y_ref)
-            pct_up_pred = float((delta_pred / y_ref * 100) if y_ref else 0.0)  # Convert to percentage and regular float
+        local_defs_per_model = [
+            defs_by_combination.get(meta.get("combination"), {}) for meta in matrix.models
+        ]
 
-            delta_feat = (contrib_scen - contrib_ref).to_dict()
-            pct_up_feat = {
-                f: float(((delta_feat[f] / contrib_ref[f] * 100) if contrib_ref[f] else 0.0))  # Convert to percentage and regular float
-                for f in contrib_ref.index
-            }
+        # 3️⃣ Transform + predict every model at once
+        scenario = matrix.apply_tweaks(reference, local_defs_per_model)
+        ev = matrix.evaluate(reference, scenario)
 
+        results: List[Dict[str, Any]] = []
+        documents: List[Dict[str, Any]] = []
+        created_at = datetime.utcnow()
+        for i, meta in enumerate(matrix.models):
+            local_defs = local_defs_per_model[i]
             # Ensure local_defs is a plain dictionary for MongoDB storage
             if isinstance(local_defs, dict):
-                # Convert any remaining Pydantic models to dicts
                 local_defs_for_storage = {
                     k: v.dict() if hasattr(v, 'dict') else v
                     for k, v in local_defs.items()
@@ -312,25 +260,27 @@ class ScenarioService:
                 local_defs_for_storage = {}
 
             result_obj = {
-                "identifiers": ident,
+                "identifiers": meta["identifiers"],
                 "run_id": run_id,
-                "created_at": datetime.utcnow(),
-                "baseline": { "prediction": float(y_ref), "features": contrib_ref.to_dict() },
-                "scenario": { "prediction": float(y_scen), "features": contrib_scen.to_dict() },
-                "delta":    { "prediction": delta_pred, "features": delta_feat },
-                "pct_uplift": { "prediction": pct_up_pred, "features": pct_up_feat },
-                "intercept": intercept,
-                "reference": { "raw": ref_vals, "transformed": ref_trans_values },
-                "scenario_values": { "raw": scen_vals, "transformed": scen_trans_values },
+                "created_at": created_at,
+                "baseline": { "prediction": float(ev["y_ref"][i]), "features": matrix.row(i, ev["contrib_ref"]) },
+                "scenario": { "prediction": float(ev["y_scen"][i]), "features": matrix.row(i, ev["contrib_scen"]) },
+                "delta":    { "prediction": float(ev["delta_pred"][i]), "features": matrix.row(i, ev["delta_feat"]) },
+                "pct_uplift": { "prediction": float(ev["pct_pred"][i]), "features": matrix.row(i, ev["pct_feat"]) },
+                "intercept": meta["intercept"],
+                "reference": { "raw": matrix.row(i, reference), "transformed": matrix.row(i, ev["reference_transformed"]) },
+                "scenario_values": { "raw": matrix.row(i, scenario), "transformed": matrix.row(i, ev["scenario_transformed"]) },
                 "scenario_changes": { "scenario_defs": local_defs_for_storage },  # Cluster-specific changes only
             }
-
-            await saved_predictions_collection.insert_one(result_obj.copy())
+            documents.append(result_obj.copy())
             for key in ("reference", "scenario_values", "scenario_changes"):
                 result_obj.pop(key, None)
-            result_obj.pop("_id", None)
             results.append(result_obj)
 
+        if documents:
+            await saved_predictions_collection.insert_many(documents)
+        logger.info("✅ ScenarioService: evaluated %d models", len(results))
+
         # ☆☆☆ Prepare CSV dataframe for local or MinIO usage ☆☆☆
         df_csv = cls._prepare_results_dataframe(results)
 
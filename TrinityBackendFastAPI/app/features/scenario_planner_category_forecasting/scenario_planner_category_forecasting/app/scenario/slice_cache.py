@@ -0,0 +1,157 @@
+"""
+Columnar helpers for the D0 / cluster slice cache.
+
+Slices used to be pickled DataFrames in Redis, and every identifier value or
+missing cluster re-normalised the full D0 frame
+(``astype(str).str.strip().str.lower()``) to build its mask, so warming the
+cache grew with values × rows.
+
+  • ``encode_frame`` / ``decode_frame`` store frames as Arrow IPC streams
+    behind a short magic prefix: no pickle, and reads wrap the Redis bytes
+    without copying them.  Blobs without the prefix are left to the legacy
+    pickle / JSON decoding.
+  • ``IdentifierIndex`` normalises each identifier column once into
+    dictionary codes and keeps the row positions of every (column, value)
+    and of every combination of values.
+  • ``find_missing_clusters`` matches the unique identifier tuples of D0
+    against the models' identifiers with set lookups instead of a scan over
+    every model for every tuple.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ARROW_MAGIC = b"TRNARROW1:"
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Arrow IPC                                                                  #
+# ─────────────────────────────────────────────────────────────────────────── #
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """Serialise ``df`` as a prefixed Arrow IPC stream (index preserved)."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return ARROW_MAGIC + sink.getvalue().to_pybytes()
+
+
+def is_arrow_blob(blob: Any) -> bool:
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[: len(ARROW_MAGIC)]) == ARROW_MAGIC
+
+
+def decode_frame(blob: bytes) -> pd.DataFrame:
+    import pyarrow as pa
+
+    buffer = pa.py_buffer(blob)[len(ARROW_MAGIC):]
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Identifier index                                                           #
+# ─────────────────────────────────────────────────────────────────────────── #
+def normalise(series: pd.Series) -> pd.Series:
+    """The matching key the slice cache has always used for identifier values."""
+    return series.astype(str).str.strip().str.lower()
+
+
+class IdentifierIndex:
+    """Row positions of D0 per normalised identifier value, built once per frame."""
+
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str]):
+        self.df = df
+        self.columns = [c for c in columns if c in df.columns]
+        self.codes: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, pd.Index] = {}
+        self._positions: Dict[str, Dict[str, np.ndarray]] = {}
+        for col in self.columns:
+            codes, uniques = pd.factorize(normalise(df[col]))
+            self.codes[col] = codes
+            self.values[col] = pd.Index(uniques)
+
+    def positions(self, col: str, value: Any) -> np.ndarray:
+        """Rows where ``normalise(df[col]) == normalise(value)``."""
+        if col not in self.codes:
+            return np.empty(0, dtype=np.intp)
+        groups = self._positions.get(col)
+        if groups is None:
+            codes = self.codes[col]
+            # Missing values (code -1) never match any value
+            order = np.argsort(codes, kind="stable")
+            order = order[codes[order] >= 0]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.values[col]))
+            bounds = np.cumsum(counts)[:-1]
+            groups = {
+                value_: rows
+                for value_, rows in zip(self.values[col], np.split(order, bounds))
+            }
+            self._positions[col] = groups
+        return groups.get(str(value).strip().lower(), np.empty(0, dtype=np.intp))
+
+    def combinations(self, cols: Sequence[str]) -> Dict[Tuple[str, ...], np.ndarray]:
+        """Rows per combination of normalised values over ``cols``."""
+        if not cols:
+            return {}
+        frame = pd.DataFrame({col: self.codes[col] for col in cols})
+        # Rows with a missing value in any column match no combination
+        frame = frame[(frame.to_numpy() >= 0).all(axis=1)]
+        out = {}
+        for key, labels in frame.groupby(list(cols), sort=False).indices.items():
+            rows = frame.index.to_numpy()[labels]
+            key = key if isinstance(key, tuple) else (key,)
+            out[tuple(self.values[col][code] for col, code in zip(cols, key))] = rows
+        return out
+
+    def take(self, rows: np.ndarray) -> pd.DataFrame:
+        return self.df.iloc[rows].copy()
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Missing clusters                                                           #
+# ─────────────────────────────────────────────────────────────────────────── #
+def find_missing_clusters(
+    index: IdentifierIndex, model_idents: Sequence[Dict[str, str]]
+) -> List[Tuple[Dict[str, str], Optional[np.ndarray]]]:
+    """
+    Unique identifier tuples of D0 that no model covers.
+
+    ``model_idents`` are the models' identifiers, normalised (stripped and
+    lower-cased).  A model covers a tuple when all of its key/value pairs
+    match.  Returns ``(identifiers, rows)`` per uncovered tuple in order of
+    first appearance; ``identifiers`` keep the data's spelling and ``rows`` is
+    ``None`` when no row matches the normalised tuple.
+    """
+    cols = index.columns
+    df = index.df
+    display = pd.DataFrame({col: df[col].fillna("").astype(str).str.strip() for col in cols})
+    unique = display.drop_duplicates()
+
+    # Models grouped by the identifier columns they constrain
+    patterns: Dict[Tuple[str, ...], Set[Tuple[str, ...]]] = {}
+    for ident in model_idents:
+        if not ident:
+            continue
+        keys = tuple(sorted(ident))
+        patterns.setdefault(keys, set()).add(tuple((ident[k] or "").lower() for k in keys))
+
+    position = {col: i for i, col in enumerate(cols)}
+    groups = index.combinations(cols)
+    missing = []
+    for row in unique.itertuples(index=False, name=None):
+        row_norm = tuple(value.lower() for value in row)
+        covered = False
+        for keys, values in patterns.items():
+            if all(k in position for k in keys) and tuple(row_norm[position[k]] for k in keys) in values:
+                covered = True
+                break
+        if covered:
+            continue
+        missing.append((dict(zip(cols, row)), groups.get(row_norm)))
+    return missing
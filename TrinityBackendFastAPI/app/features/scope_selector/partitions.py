@@ -0,0 +1,228 @@
+"""Partitioned materialisation of multi-filter scopes.
+
+``create_multi_filtered_scope`` used to build a boolean mask over the whole
+frame for every identifier combination, check the criteria on the slice,
+resolve the object prefix again and upload the file before moving on to the
+next one, so a 1,000-combination scope cost O(combinations x rows) plus a
+thousand blocking ``put_object`` calls on the event loop.
+
+The helpers here do the same work in three steps per filter set:
+
+* :func:`split_partitions` groups the frame by the identifier columns once and
+  keeps the requested combinations, in request order;
+* :func:`criteria_mask` evaluates ``CriteriaSettings`` for all partitions at
+  once from group sizes and a grouped quantile;
+* :func:`upload_partitions` serialises and uploads the partitions on a thread
+  pool, reporting each completed upload.
+
+:class:`ScopeProgress` publishes per-set upload progress through
+``task_result_store`` when the request carries a ``run_id``.
+
+Configuration:
+
+* ``SCOPE_UPLOAD_WORKERS`` - concurrent uploads, defaults to 8; ``0`` uploads
+  one file at a time on the request coroutine.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.DataStorageRetrieval.env_config import pool_workers
+from app.features.shared.task_progress import TaskProgress
+
+logger = logging.getLogger(__name__)
+
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.file"
+
+Partition = Tuple[Tuple[Any, ...], np.ndarray]
+
+
+def upload_workers() -> int:
+    return pool_workers("SCOPE_UPLOAD_WORKERS", 8)
+
+
+def split_partitions(
+    df: pd.DataFrame, identifier_names: List[str], combinations: Sequence[Tuple[Any, ...]]
+) -> List[Partition]:
+    """
+    Return ``(combination, row positions)`` for every non-empty combination.
+
+    Rows are matched with ``==`` semantics, like the per-combination masks
+    this replaces: rows with a missing identifier never match, and positions
+    are in frame order so ``df.iloc[positions]`` equals the masked frame.
+    """
+    if df.empty or not combinations:
+        return []
+    if not identifier_names:
+        return [(tuple(combinations[0]), np.arange(len(df)))]
+
+    grouped = df.groupby(identifier_names, sort=False, observed=True, dropna=True)
+    indices = {}
+    for key, positions in grouped.indices.items():
+        indices[key if isinstance(key, tuple) else (key,)] = positions
+
+    partitions = []
+    for combination in combinations:
+        positions = indices.get(tuple(combination))
+        if positions is not None and len(positions):
+            partitions.append((tuple(combination), positions))
+    return partitions
+
+
+def criteria_mask(
+    df: pd.DataFrame,
+    partitions: Sequence[Partition],
+    criteria: Any,
+    original_df: pd.DataFrame,
+) -> np.ndarray:
+    """
+    Vectorised ``check_combination_criteria`` over ``partitions`` of ``df``.
+
+    Returns a boolean array, ``True`` where the partition is kept.  Failures
+    of the percentile check keep the partition, as the scalar check does.
+    """
+    keep = np.ones(len(partitions), dtype=bool)
+    if not criteria or not partitions:
+        return keep
+
+    sizes = np.fromiter((len(positions) for _, positions in partitions), dtype=np.int64, count=len(partitions))
+    if criteria.min_datapoints_enabled:
+        keep &= sizes >= criteria.min_datapoints
+
+    column = criteria.pct_column
+    if criteria.pct90_enabled and column:
+        if column not in df.columns:
+            logger.warning(f"Percentile column '{column}' not found in combination data")
+            return keep
+        try:
+            labels = np.repeat(np.arange(len(partitions)), sizes)
+            values = df[column].to_numpy()[np.concatenate([positions for _, positions in partitions])]
+            percentile_values = (
+                pd.Series(values).groupby(labels).quantile(criteria.pct_percentile / 100).to_numpy()
+            )
+
+            if criteria.pct_base == "max":
+                base_value = original_df[column].max()
+            elif criteria.pct_base == "min":
+                base_value = original_df[column].min()
+            elif criteria.pct_base == "mean":
+                base_value = original_df[column].mean()
+            elif criteria.pct_base == "dist":
+                base_value = original_df[column].sum()
+            else:
+                logger.warning(f"Unknown pct_base: {criteria.pct_base}, using max")
+                base_value = original_df[column].max()
+
+            if base_value != 0:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    percentage = percentile_values.astype(float) / base_value * 100
+                # NaN percentages compare False and keep the partition.
+                keep &= ~(percentage <= criteria.pct_threshold)
+            else:
+                logger.warning(f"Base value is 0 for column {column}, skipping percentile check")
+        except Exception as e:
+            logger.error(f"Error checking percentile criteria: {str(e)}")
+
+    logger.info(f"Criteria kept {int(keep.sum())} of {len(partitions)} combinations")
+    return keep
+
+
+def encode_partition(frame: pd.DataFrame) -> BytesIO:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    buffer = BytesIO()
+    feather.write_feather(pa.Table.from_pandas(frame), buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _upload(minio_client: Any, bucket: str, file_key: str, frame: pd.DataFrame) -> None:
+    buffer = encode_partition(frame)
+    minio_client.put_object(
+        bucket,
+        file_key,
+        buffer,
+        length=buffer.getbuffer().nbytes,
+        content_type=ARROW_CONTENT_TYPE,
+    )
+
+
+async def upload_partitions(
+    minio_client: Any,
+    bucket: str,
+    uploads: Sequence[Tuple[str, pd.DataFrame]],
+    on_done: Optional[Callable[[bool], None]] = None,
+) -> List[bool]:
+    """
+    Upload ``(file_key, frame)`` pairs as Arrow files.
+
+    Returns one flag per upload; a failed upload is logged and reported as
+    ``False`` without stopping the others.  ``on_done`` is called with the
+    flag as each upload finishes.
+    """
+    results = [False] * len(uploads)
+
+    def finished(index: int, error: Optional[BaseException]) -> None:
+        if error is not None:
+            logger.error(f"Error saving combination file {uploads[index][0]}: {str(error)}")
+        results[index] = error is None
+        if on_done is not None:
+            on_done(error is None)
+
+    workers = upload_workers()
+    if workers == 0:
+        for index, (file_key, frame) in enumerate(uploads):
+            try:
+                _upload(minio_client, bucket, file_key, frame)
+                finished(index, None)
+            except Exception as e:
+                finished(index, e)
+        return results
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=min(workers, max(len(uploads), 1))) as executor:
+        futures = {
+            loop.run_in_executor(executor, _upload, minio_client, bucket, file_key, frame): index
+            for index, (file_key, frame) in enumerate(uploads)
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                finished(futures[future], future.exception())
+    return results
+
+
+class ScopeProgress(TaskProgress):
+    """Publishes per-set progress of a multi-filter scope through ``task_result_store``.
+
+    Clients pass ``run_id`` with ``create-multi-filtered-scope`` and poll
+    ``GET /api/task-queue/{run_id}``; ``metadata.sets`` holds, per filter set,
+    the combinations requested and the partitions kept, uploaded and failed.
+    """
+
+    task_name = "scope_selector.create_multi_filtered_scope"
+    label = "scope"
+
+    def __init__(self, run_id: str, store: Any = None):
+        self.sets: Dict[str, Dict[str, int]] = {}
+        super().__init__(run_id, store)
+
+    def metadata(self) -> Dict[str, Any]:
+        return {"sets": self.sets}
+
+    def set_planned(self, set_name: str, combinations: int, partitions: int) -> None:
+        self.sets[set_name] = {"combinations": combinations, "partitions": partitions, "uploaded": 0, "failed": 0}
+        self._publish()
+
+    def uploaded(self, set_name: str, ok: bool) -> None:
+        self.sets[set_name]["uploaded" if ok else "failed"] += 1
+        self._publish()
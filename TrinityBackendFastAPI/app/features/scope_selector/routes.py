@@ -43,6 +43,7 @@ from .deps import (
 )
 from .database import ValidatorAtomRepository
 from .mongodb_saver import save_scope_config, get_scope_config_from_mongo
+from .partitions import ScopeProgress, criteria_mask, split_partitions, upload_partitions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -810,16 +811,24 @@ def validate_identifier_filters_lowercase(
 async def create_multi_filtered_scope(
     scope_id: str,
     request: MultiFilterScopeRequest,
-    settings: Settings = Depends(get_settings)
+    settings: Settings = Depends(get_settings),
+    run_id: Optional[str] = Query(None, description="Publish per-set progress under this task id")
 ):
     """
     Create multiple filtered scopes with different identifier and optional time combinations.
     Time filtering is now optional - works with or without date ranges.
     
+    Each filter set is split into its combinations with one group-by and the
+    combination files are uploaded concurrently (see ``partitions``).  With
+    ``run_id`` the per-set progress can be polled at ``/api/task-queue/{run_id}``.
+    
     Example: POST /scopes/heinz_validated_20241218_123045/create-multi-filtered-scope
     """
     client = None
     minio_client = None
+    progress = ScopeProgress(run_id) if run_id else None
+    if progress:
+        progress.start({"file_key": request.file_key})
     
     try:
         # Connect to MinIO (MongoDB access temporarily disabled)
@@ -965,6 +974,19 @@ async def create_multi_filtered_scope(
         filter_set_results = []
         overall_filtered_records = 0
         
+        # Get the standard prefix using get_object_prefix with client/app/project names
+        # Extract client, app, project from file_key for proper prefix resolution
+        file_key_parts = request.file_key.split('/')
+        if len(file_key_parts) >= 3:
+            prefix = await get_object_prefix(
+                client_name=file_key_parts[0],
+                app_name=file_key_parts[1],
+                project_name=file_key_parts[2]
+            )
+        else:
+            # Fallback to default prefix if file_key structure is unexpected
+            prefix = await get_object_prefix()
+        
         # Process each filter set
         for filter_set in filter_sets:
             set_name = filter_set['set_name']
@@ -986,7 +1008,7 @@ async def create_multi_filtered_scope(
                 )
             
             # Start with full dataframe
-            working_df = df.copy()
+            working_df = df
             
             # Apply time filtering if dates are provided
             if has_time_filter:
@@ -1009,33 +1031,22 @@ async def create_multi_filtered_scope(
             identifier_value_lists = list(mapped_identifier_filters.values())
             combinations = list(product(*identifier_value_lists))
             
-            # Create combination files for this filter set
-            set_combination_files = []
-            set_filtered_records = 0
-
-
-            for combination in combinations:
+            # Split the frame once and check the criteria for every combination together
+            partitions = split_partitions(working_df, identifier_names, combinations)
+            keep = criteria_mask(working_df, partitions, request.criteria, df)
+            kept = [partition for partition, keep_it in zip(partitions, keep) if keep_it]
+            logger.info(
+                f"Set '{set_name}': {len(combinations)} combinations, {len(partitions)} with data, "
+                f"{len(kept)} meet the criteria"
+            )
+            if progress:
+                progress.set_planned(set_name, len(combinations), len(kept))
+            
+            planned_files = []
+            uploads = []
+            for combination, positions in kept:
                 combination_filter = dict(zip(identifier_names, combination))
-                
-                # Filter for this specific combination
-                combination_df = working_df.copy()
-                for col_name, value in combination_filter.items():
-                    combination_df = combination_df[combination_df[col_name] == value]
-                
-                if len(combination_df) == 0:
-                    continue
-                
-                logger.info(f"Processing combination: {combination_filter} with {len(combination_df)} records")
-                
-                # Check criteria before saving
-                criteria_result = check_combination_criteria(combination_df, request.criteria, df)
-                logger.info(f"Criteria check result for {combination_filter}: {criteria_result}")
-                
-                if not criteria_result:
-                    logger.info(f"Skipping combination {combination_filter} - does not meet criteria")
-                    continue
-                
-                logger.info(f"Saving combination {combination_filter} - meets all criteria")
+                combination_df = working_df.iloc[positions]
                 
                 # Generate filename for this combination
                 combination_name_parts = []
@@ -1044,58 +1055,28 @@ async def create_multi_filtered_scope(
                     combination_name_parts.append(clean_value)
 
                 combination_filename = f"{set_name}_{'_'.join(combination_name_parts)}"
-
-                # Get the standard prefix using get_object_prefix with client/app/project names
-                # Extract client, app, project from file_key for proper prefix resolution
-                file_key_parts = request.file_key.split('/')
-                if len(file_key_parts) >= 3:
-                    client_name = file_key_parts[0]
-                    app_name = file_key_parts[1]
-                    project_name = file_key_parts[2]
-                    prefix = await get_object_prefix(
-                        client_name=client_name,
-                        app_name=app_name,
-                        project_name=project_name
-                    )
-                else:
-                    # Fallback to default prefix if file_key structure is unexpected
-                    prefix = await get_object_prefix()
                 
                 # Construct the full path with the standard structure
                 combination_file_key = f"{prefix}filtered-data/{new_scope_id}/{combination_filename}_{timestamp}.arrow"
-
-                # Save combination file to MinIO as Arrow
-                try:
-                    import pyarrow as pa
-                    import pyarrow.feather as feather
-
-                    arrow_buffer = BytesIO()
-                    table = pa.Table.from_pandas(combination_df)
-                    feather.write_feather(table, arrow_buffer)
-                    arrow_buffer.seek(0)
-
-                    minio_client.put_object(
-                        settings.minio_bucket,
-                        combination_file_key,
-                        arrow_buffer,
-                        length=arrow_buffer.getbuffer().nbytes,
-                        content_type='application/vnd.apache.arrow.file'
-                    )
-                    
-                    # Track this file
-                    set_combination_files.append(CombinationFileInfo(
-                        combination=combination_filter,
-                        file_key=combination_file_key,
-                        filename=f"{combination_filename}_{timestamp}.arrow",
-                        record_count=len(combination_df),
-                        low_data_warning=len(combination_df) < 12 
-                    ))
-                    
-                    set_filtered_records += len(combination_df)
-                    
-                except Exception as e:
-                    logger.error(f"Error saving combination file: {str(e)}")
-                    continue
+                
+                planned_files.append(CombinationFileInfo(
+                    combination=combination_filter,
+                    file_key=combination_file_key,
+                    filename=f"{combination_filename}_{timestamp}.arrow",
+                    record_count=len(combination_df),
+                    low_data_warning=len(combination_df) < 12 
+                ))
+                uploads.append((combination_file_key, combination_df))
+            
+            # Save combination files to MinIO as Arrow, concurrently
+            uploaded = await upload_partitions(
+                minio_client,
+                settings.minio_bucket,
+                uploads,
+                on_done=(lambda ok, name=set_name: progress.uploaded(name, ok)) if progress else None,
+            )
+            set_combination_files = [info for info, ok in zip(planned_files, uploaded) if ok]
+            set_filtered_records = sum(info.record_count for info in set_combination_files)
             
             # Add this filter set's results
             if set_combination_files:
@@ -1169,6 +1150,9 @@ async def create_multi_filtered_scope(
             logger.error(f"❌ Error saving scope configuration to MongoDB: {str(e)}")
             # Don't fail the entire request if MongoDB save fails
 
+        if progress:
+            progress.finish()
+
         return MultiFilterScopeResponse(
             success=True,
             scope_id=new_scope_id,
@@ -1181,10 +1165,14 @@ async def create_multi_filtered_scope(
         )
 
         
-    except HTTPException:
+    except HTTPException as e:
+        if progress:
+            progress.finish("failure", error=str(e.detail))
         raise
     except Exception as e:
         logger.error(f"Error creating multi-filter scope: {str(e)}")
+        if progress:
+            progress.finish("failure", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to create multi-filter scope: {str(e)}")
     finally:
         if client:
@@ -1,12 +1,11 @@
-import io
 import logging
 import os
-from io import BytesIO
 
 import pandas as pd
 from minio import Minio
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from app.DataStorageRetrieval.dataset_cache import UnsupportedDatasetFormat, load_pandas
 from app.core.feature_cache import feature_cache
 from app.core.mongo import build_host_mongo_uri
 from app.core.redis import get_redis_settings
@@ -131,20 +130,10 @@ except Exception as e:
     client, db, scopes_collection, select_configs_collection = None, None, None, None
 
 def get_minio_df(bucket: str, file_key: str) -> pd.DataFrame:
-    response = minio_client.get_object(bucket, file_key)
-    content = response.read()
-    if file_key.endswith(".csv"):
-        df = pd.read_csv(BytesIO(content))
-    elif file_key.endswith(".xlsx"):
-        df = pd.read_excel(BytesIO(content))
-    elif file_key.endswith(".arrow"):
-        import pyarrow as pa
-        import pyarrow.ipc as ipc
-        reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-        df = reader.read_all().to_pandas()
-    else:
+    try:
+        return load_pandas(minio_client, bucket, file_key, feature="select_models")
+    except UnsupportedDatasetFormat:
         raise ValueError("Unsupported file type")
-    return df
 
 def get_select_configs_collection():
     """Get the select_configs collection dynamically, ensuring connection is established."""
@@ -0,0 +1,210 @@
+"""Columnar, ETag-versioned index over a model results file.
+
+Every filter, range, contribution and performance request of the Select
+Models atom used to download the results file again and walk it with
+``iterrows``.  :class:`ModelIndex` decodes a file once and keeps, per column:
+
+* numeric values as ``float64`` arrays (unparseable cells become ``NaN``);
+* row positions grouped by value, stored as one ``order`` array plus
+  ``offsets`` so a combination's rows are a slice.
+
+Filters then run as NumPy masks over those arrays.  Indexes are kept in a
+small LRU keyed by the file key and validated against the object's ETag, so
+an overwritten file is rebuilt on its next access.
+
+Configuration:
+
+* ``SELECT_MODEL_INDEX_CACHE_SIZE`` - files kept (default 16, ``0`` disables
+  the cache and rebuilds the index on every request).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.DataStorageRetrieval.env_config import env_int
+
+logger = logging.getLogger("app.features.select_models_feature_based.model_index")
+
+
+def _stripped_text(value: Any) -> Optional[str]:
+    """Stripped ``str`` of a cell, ``None`` for missing or blank cells."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(value).strip() or None
+
+
+def numeric_values(series: pd.Series) -> np.ndarray:
+    """``series`` as ``float64``; cells that are not numbers become ``NaN``."""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    if pd.api.types.is_string_dtype(series):
+        # Strip first: numbers stored as text often carry padding
+        series = series.where(series.isna(), series.astype(str).str.strip())
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def range_mask(values: np.ndarray, minimum: Optional[float], maximum: Optional[float]) -> np.ndarray:
+    """``minimum <= values <= maximum``; ``NaN`` fails any bound like a pandas comparison."""
+    mask = np.ones(values.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if minimum is not None:
+            mask &= values >= minimum
+        if maximum is not None:
+            mask &= values <= maximum
+    return mask
+
+
+class ModelIndex:
+    """Decoded model results with per-column numeric arrays and row groups."""
+
+    def __init__(self, frame: pd.DataFrame, etag: str = ""):
+        self.frame = frame
+        self.etag = etag
+        self.size = len(frame)
+        # Lower-cased name -> column; the last duplicate wins, like a dict comprehension
+        self.lookup: Dict[str, str] = {str(column).lower(): column for column in frame.columns}
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._groups: Dict[Tuple[str, bool], Tuple[Dict[Any, int], np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        # Per-row artefacts built by the service (parsed records, column layout)
+        self.memo: Dict[Any, Any] = {}
+
+    def column(self, name: str) -> Optional[str]:
+        """Case-insensitive column lookup."""
+        return self.lookup.get(name.lower())
+
+    def numeric(self, column: str) -> np.ndarray:
+        values = self._numeric.get(column)
+        if values is None:
+            values = numeric_values(self.frame[column])
+            values.setflags(write=False)
+            with self._lock:
+                self._numeric[column] = values
+        return values
+
+    def _group(self, column: str, stripped: bool) -> Tuple[Dict[Any, int], np.ndarray, np.ndarray]:
+        key = (column, stripped)
+        group = self._groups.get(key)
+        if group is not None:
+            return group
+        series = self.frame[column]
+        if stripped:
+            series = pd.Series([_stripped_text(value) for value in series], dtype=object)
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        # Rows sorted by value code; rows of value k are order[offsets[k]:offsets[k + 1]]
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        offsets = np.zeros(len(uniques) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(codes[codes >= 0], minlength=len(uniques)), out=offsets[1:])
+        slots = {value: slot for slot, value in enumerate(uniques.tolist())}
+        group = (slots, order, offsets)
+        with self._lock:
+            self._groups[key] = group
+        return group
+
+    def values(self, column: str, stripped: bool = False) -> list:
+        """Distinct non-missing values of ``column`` in order of first appearance."""
+        return list(self._group(column, stripped)[0])
+
+    def positions(self, column: str, value: Any, stripped: bool = False) -> np.ndarray:
+        """Rows where ``column == value``, in row order.
+
+        With ``stripped`` the cells are compared as stripped text; ``value``
+        itself is matched as given.
+        """
+        slots, order, offsets = self._group(column, stripped)
+        slot = slots.get(value)
+        if slot is None:
+            return np.empty(0, dtype=np.intp)
+        return order[offsets[slot]:offsets[slot + 1]]
+
+    def non_missing(self, column: str, stripped: bool = False) -> np.ndarray:
+        """Rows with a (non-blank, when ``stripped``) value in ``column``, in row order."""
+        _, order, _ = self._group(column, stripped)
+        return np.sort(order)
+
+    def cells(self, column: str) -> np.ndarray:
+        """Raw cells of ``column`` as an object array."""
+        key = ("cells", column)
+        cells = self.memo.get(key)
+        if cells is None:
+            cells = self.frame[column].to_numpy(dtype=object)
+            with self._lock:
+                self.memo[key] = cells
+        return cells
+
+    def mask(self, rows: Optional[Iterable[int]] = None) -> np.ndarray:
+        """Boolean row mask, all rows or only ``rows``."""
+        if rows is None:
+            return np.ones(self.size, dtype=bool)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[np.asarray(rows, dtype=np.intp)] = True
+        return mask
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Cache                                                                      #
+# ─────────────────────────────────────────────────────────────────────────── #
+_cache: "OrderedDict[str, ModelIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_index(
+    client: Any,
+    bucket: str,
+    file_key: str,
+    loader: Callable[[str], Optional[pd.DataFrame]],
+) -> Optional[ModelIndex]:
+    """Index of ``bucket/file_key``, rebuilt when the object's ETag changed.
+
+    ``loader`` decodes the file and returns ``None`` when it cannot be read;
+    errors of the ETag lookup propagate to the caller.
+    """
+    size = env_int("SELECT_MODEL_INDEX_CACHE_SIZE", 16)
+    if size <= 0:
+        frame = loader(file_key)
+        return None if frame is None else ModelIndex(frame)
+
+    etag = str(client.stat_object(bucket, file_key).etag or "").strip('"')
+    with _cache_lock:
+        index = _cache.get(file_key)
+        if index is not None and index.etag == etag:
+            _cache.move_to_end(file_key)
+            return index
+
+    frame = loader(file_key)
+    if frame is None:
+        return None
+    index = ModelIndex(frame, etag)
+    logger.info("🗂️ Indexed %s (%d models, %d columns)", file_key, index.size, len(frame.columns))
+    with _cache_lock:
+        _cache[file_key] = index
+        _cache.move_to_end(file_key)
+        while len(_cache) > size:
+            _cache.popitem(last=False)
+    return index
+
+
+def invalidate(file_key: Optional[str] = None) -> None:
+    """Drop the index of ``file_key`` (all indexes when ``None``)."""
+    with _cache_lock:
+        if file_key is None:
+            _cache.clear()
+        else:
+            _cache.pop(file_key, None)
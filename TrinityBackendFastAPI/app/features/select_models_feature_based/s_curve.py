@@ -4,7 +4,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 from bson import ObjectId
-import io
+from app.DataStorageRetrieval.dataset_cache import UnsupportedDatasetFormat, load_pandas
+from . import s_curve_kernels as kernels
 from .database import client
 
 logger = logging.getLogger(__name__)
@@ -22,15 +23,9 @@ def generate_scaled_media_series(recent_series: List[float], x_range: List[float
     Returns:
         Tuple of (scaled_series_list, percent_changes)
     """
-    scaled_series_list = []
-    percent_changes = []
-    for x in x_range:
-        # Convert percentage to decimal for scaling (e.g., 170 -> 1.7, -170 -> -1.7)
-        decimal_change = x / 100.0
-        new_series = [v * (1 + decimal_change) for v in recent_series]
-        scaled_series_list.append(new_series)
-        percent_changes.append(x) 
-    return scaled_series_list, percent_changes
+    # Percentages scale the series by (1 + x / 100), e.g. 170 -> 2.7, -170 -> -0.7
+    scaled = kernels.scale_media(recent_series, x_range)
+    return scaled.tolist(), list(x_range)
 
 def apply_transformation_steps(series: List[float], transformation_steps: List[Dict[str, Any]]) -> List[float]:
     """
@@ -43,61 +38,7 @@ def apply_transformation_steps(series: List[float], transformation_steps: List[D
     Returns:
         Transformed series
     """
-    current_series = series.copy()
-    
-    for step in transformation_steps:
-        step_type = step.get('step', '')
-
-        if step_type == 'adstock':
-            # Adstock transformation: apply decay rate
-            decay_rate = step.get('decay_rate', 0.4)
-            adstock_series = []
-            for i, value in enumerate(current_series):
-                if i == 0:
-                    adstock_series.append(value)
-                else:
-                    adstock_value = value + decay_rate * adstock_series[i-1]
-                    adstock_series.append(adstock_value)
-            current_series = adstock_series
-            logger.info(f"🔍 Current series after adstock transformation: {current_series}")
-        
-        elif step_type == 'standardization':
-            # Standard scaling: (x - scaler_mean) / scaler_scale
-            scaler_mean = step.get('scaler_mean', 0)
-            scaler_scale = step.get('scaler_scale', 1)
-            logger.info(f"🔍 Standardization: scaler_mean={scaler_mean}, scaler_scale={scaler_scale}")
-            if scaler_scale == 0:
-                current_series = [0.0] * len(current_series)
-            else:
-                current_series = [(x - scaler_mean) / scaler_scale for x in current_series]
-            logger.info(f"🔍 Current series after standardization: {current_series}")
-
-        elif step_type == 'logistic':
-            # Logistic transformation: 1 / (1 + exp(-growth_rate * (x - midpoint)))
-            growth_rate = step.get('growth_rate', 1.0)
-            midpoint = step.get('midpoint', 0.0)
-            carryover = step.get('carryover', 0.0)
-            current_series = [1 / (1 + np.exp(-growth_rate * (x - midpoint)))  for x in current_series]
-        
-            # logger.info(f"current series after logistic transformation: {current_series}")
-        
-        elif step_type == 'minmax':
-            # MinMax scaling: (x - scaler_min) / scaler_scale
-            scaler_min = step.get('scaler_min', 0)
-            scaler_scale = step.get('scaler_scale', 1)
-            if scaler_scale == 0:
-                current_series = [0.0] * len(current_series)
-            else:
-                current_series = [(x - scaler_min) / scaler_scale for x in current_series]
-            # logger.info(f"🔍 Current series after MinMax scaling: {current_series}")
-            # logger.info(f"🔍 Scaler min: {scaler_min}, scaler scale: {scaler_scale}")
-        
- 
-    
-        
-
-    
-    return current_series
+    return kernels.transform(series, transformation_steps).tolist()
 
 def get_last_12_months_data(df: pd.DataFrame, date_column: str, combination_id: str) -> pd.DataFrame:
     """
@@ -351,12 +292,7 @@ def calculate_transformed_means(df: pd.DataFrame, transformation_metadata: Dict[
             adstock_step = next((s for s in transformation_steps if s.get('step') == 'adstock'), None)
             if adstock_step:
                 decay_rate = adstock_step.get('decay_rate', 0.4)
-                adstocked = []
-                for i, v in enumerate(original_series):
-                    if i == 0:
-                        adstocked.append(v)
-                    else:
-                        adstocked.append(v + decay_rate * adstocked[i-1])
+                adstocked = kernels.adstock(original_series, decay_rate)
                 adstock_mean = float(np.mean(adstocked))
                 adstock_std = float(np.std(adstocked))
             else:
@@ -423,7 +359,7 @@ def transform_12month_and_save_parameters(df_12month: pd.DataFrame, transformati
         
         # Apply transformations step by step and save parameters
         transformation_steps = metadata.get('transformation_steps', [])
-        current_series = original_series.copy()
+        current_series = np.asarray(original_series, dtype=float)
         saved_steps = []
         
         # Track adstock stats from original after adstock step
@@ -436,14 +372,7 @@ def transform_12month_and_save_parameters(df_12month: pd.DataFrame, transformati
             if step_type == 'adstock':
                 # Use original decay_rate, apply transformation
                 decay_rate = step.get('decay_rate', 0.1)
-                adstock_series = []
-                for i, value in enumerate(current_series):
-                    if i == 0:
-                        adstock_series.append(value)
-                    else:
-                        adstock_value = value + decay_rate * adstock_series[i-1]
-                        adstock_series.append(adstock_value)
-                current_series = adstock_series
+                current_series = kernels.adstock(current_series, decay_rate)
                 
                 # Save parameters
                 saved_steps.append({
@@ -465,8 +394,9 @@ def transform_12month_and_save_parameters(df_12month: pd.DataFrame, transformati
                 growth_rate = step.get('growth_rate', 1.0)
                 midpoint = step.get('midpoint', 0.0)
                 # Do NOT add carryover at logistic step; carryover is handled via adstock
-                logistic_series = [1 / (1 + np.exp(-growth_rate * (x - midpoint))) for x in current_series]
-                current_series = logistic_series
+                current_series = kernels.transform(
+                    current_series, [{'step': 'logistic', 'growth_rate': growth_rate, 'midpoint': midpoint}]
+                )
                 
                 # Save parameters
                 saved_steps.append({
@@ -483,11 +413,9 @@ def transform_12month_and_save_parameters(df_12month: pd.DataFrame, transformati
                 else:
                     data_mean = np.mean(current_series)
                     data_std = np.std(current_series)
-                if data_std == 0:
-                    standardized_series = [0.0] * len(current_series)
-                else:
-                    standardized_series = [(x - data_mean) / data_std for x in current_series]
-                current_series = standardized_series
+                current_series = kernels.transform(
+                    current_series, [{'step': 'standardization', 'scaler_mean': data_mean, 'scaler_scale': data_std}]
+                )
                 
                 # Save fresh parameters
                 saved_steps.append({
@@ -502,11 +430,9 @@ def transform_12month_and_save_parameters(df_12month: pd.DataFrame, transformati
                 data_min = np.min(current_series)
                 data_max = np.max(current_series)
                 data_scale = data_max - data_min
-                if data_scale == 0:
-                    minmax_series = [0.0] * len(current_series)
-                else:
-                    minmax_series = [(x - data_min) / data_scale for x in current_series]
-                current_series = minmax_series
+                current_series = kernels.transform(
+                    current_series, [{'step': 'minmax', 'scaler_min': data_min, 'scaler_scale': data_scale}]
+                )
                 
                 # Save fresh parameters
                 saved_steps.append({
@@ -530,22 +456,22 @@ def transform_12month_and_save_parameters(df_12month: pd.DataFrame, transformati
     
     return transformed_means, saved_transformation_metadata
 
-def calculate_volume_series(
-    scaled_series: List[float], 
+def calculate_volume_matrix(
+    scaled_series: Any,
     variable_name: str,
     intercept: float,
     betas: Dict[str, float],
     transformed_means: Dict[str, float],
     transformation_metadata: Dict[str, Any]
-) -> List[float]:
+) -> np.ndarray:
     """
-    Calculate volume series using the complete model equation.
+    Calculate volume series for a batch of scaled series using the complete model equation.
     
     The prediction formula is:
     Volume = Intercept + (Target_Variable × Beta_Target) + Σ(Other_Variable_Mean × Beta_Other)
     
     Args:
-        scaled_series: Scaled series for the variable of interest
+        scaled_series: Scaled series for the variable of interest, shape (..., periods)
         variable_name: Name of the variable for which we're calculating volume
         intercept: Model intercept
         betas: Model coefficients (betas)
@@ -553,14 +479,14 @@ def calculate_volume_series(
         transformation_metadata: Transformation metadata
     
     Returns:
-        List of volume values
+        Volume values with the shape of ``scaled_series``
     """
     # Apply transformations to the scaled series
     if variable_name in transformation_metadata:
         transformation_steps = transformation_metadata[variable_name].get('transformation_steps', [])
-        transformed_scaled_series = apply_transformation_steps(scaled_series, transformation_steps)
+        transformed_scaled_series = kernels.transform(scaled_series, transformation_steps)
     else:
-        transformed_scaled_series = scaled_series
+        transformed_scaled_series = np.asarray(scaled_series, dtype=float)
     
     # Find the beta for the variable of interest
     variable_beta = None
@@ -571,12 +497,12 @@ def calculate_volume_series(
             break
     
     if variable_beta is None:
-        logger.warning(f"⚠️ No beta found for variable {variable_name}")
-        return [intercept] * len(transformed_scaled_series)
+        logger.warning("⚠️ No beta found for variable %s", variable_name)
+        return np.full(transformed_scaled_series.shape, float(intercept))
 
     # If the target beta is negative, clamp it to zero as per requirement
     if variable_beta < 0:
-        logger.info(f"🔧 Clamping negative beta for '{variable_name}' from {variable_beta:.4f} to 0.0")
+        logger.info("🔧 Clamping negative beta for '%s' from %.4f to 0.0", variable_name, variable_beta)
         variable_beta = 0.0
     
     # Calculate the constant contribution from all other variables
@@ -588,24 +514,32 @@ def calculate_volume_series(
             # Use transformed mean for this variable
             if actual_var_name in transformed_means:
                 other_variables_contribution += transformed_means[actual_var_name] * beta
-                logger.info(f"🔍 Other variable '{actual_var_name}': mean={transformed_means[actual_var_name]:.4f}, beta={beta:.4f}, contribution={transformed_means[actual_var_name] * beta:.4f}")
             else:
-                logger.warning(f"⚠️ No transformed mean found for other variable '{actual_var_name}'")
+                logger.warning("⚠️ No transformed mean found for other variable '%s'", actual_var_name)
     
-    logger.info(f"🔍 Target variable '{variable_name}': beta={variable_beta:.4f}")
-    logger.info(f"🔍 Other variables total contribution: {other_variables_contribution:.4f}")
+    logger.info("🔍 Target variable '%s': beta=%.4f, other variables total contribution: %.4f",
+                variable_name, variable_beta, other_variables_contribution)
     
-    # Calculate volume for each point using the complete model equation:
     # Volume = Intercept + (Target_Variable × Beta_Target) + Σ(Other_Variable_Mean × Beta_Other)
-    volume_series = []
-    for i, transformed_value in enumerate(transformed_scaled_series):
-        volume = intercept + (transformed_value * variable_beta) + other_variables_contribution
-        volume_series.append(volume)
-        if i == 0:  # Log first calculation for debugging
-            logger.info(f"🔍 First volume calculation: intercept={intercept:.4f} + (target={transformed_value:.4f} × {variable_beta:.4f}) + others={other_variables_contribution:.4f} = {volume:.4f}")
+    return intercept + transformed_scaled_series * variable_beta + other_variables_contribution
 
+def calculate_volume_series(
+    scaled_series: List[float], 
+    variable_name: str,
+    intercept: float,
+    betas: Dict[str, float],
+    transformed_means: Dict[str, float],
+    transformation_metadata: Dict[str, Any]
+) -> List[float]:
+    """
+    Calculate volume series for one scaled series; see :func:`calculate_volume_matrix`.
     
-    return volume_series
+    Returns:
+        List of volume values
+    """
+    return calculate_volume_matrix(
+        scaled_series, variable_name, intercept, betas, transformed_means, transformation_metadata
+    ).tolist()
 
 def find_diminishing_point(media_values: List[float], predictions: List[float]) -> Tuple[float, float]:
     """
@@ -875,30 +809,15 @@ async def get_s_curve_endpoint(
             }
         
         try:
-            response = minio_client.get_object(MINIO_BUCKET, source_file_key)
-            content = response.read()
-            response.close()
-            response.release_conn()
-            logger.info(f"✅ File downloaded successfully, size: {len(content)} bytes")
-            
-            # Read file based on extension
-            logger.info(f"🔍 Reading file with extension: {source_file_key.split('.')[-1]}")
-            if source_file_key.endswith(".csv"):
-                df = pd.read_csv(io.BytesIO(content))
-            elif source_file_key.endswith(".xlsx"):
-                df = pd.read_excel(io.BytesIO(content))
-            elif source_file_key.endswith(".arrow"):
-                import pyarrow as pa
-                import pyarrow.ipc as ipc
-                reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-                df = reader.read_all().to_pandas()
-            else:
-                logger.error(f"❌ Unsupported file type: {source_file_key}")
-                return {
-                    "success": False,
-                    "error": f"Unsupported file type: {source_file_key}",
-                    "s_curves": {}
-                }
+            # Shared dataset cache: S-curves for several models of one request decode the source once
+            df = load_pandas(minio_client, MINIO_BUCKET, source_file_key, feature="s_curve")
+        except UnsupportedDatasetFormat:
+            logger.error(f"❌ Unsupported file type: {source_file_key}")
+            return {
+                "success": False,
+                "error": f"Unsupported file type: {source_file_key}",
+                "s_curves": {}
+            }
 
         except Exception as e:
             logger.error(f"Error reading source file: {str(e)}")
@@ -951,6 +870,11 @@ async def get_s_curve_endpoint(
         # logger.info(f"🔍 Generating S-curves for {len(roi_variables)} ROI variables...")
         s_curves = {}
         
+        # Generate 51 points so that 0 is guaranteed to be included
+        x_range_values = np.linspace(-100, 100, 51).tolist()
+        
+        # Base series of every usable ROI variable, stacked as (variables × periods)
+        media_variables = []
         for variable in roi_variables:
             variable = variable.lower()
             if variable not in df_last_12_months.columns:
@@ -963,39 +887,35 @@ async def get_s_curve_endpoint(
             if not original_series or all(v == 0 for v in original_series):
                 logger.warning(f"No valid data for variable {variable}")
                 continue
-            
-            # Generate 51 points so that 0 is guaranteed to be included
-            x_range_values = np.linspace(-100, 100, 51).tolist()
-            
-
-            scaled_series_list, percent_changes = generate_scaled_media_series(original_series, x_range_values)
-            
-            # Calculate volume series for each scaled series
-            volume_series_list = []
-            for scaled_series in scaled_series_list:
-                volume_series = calculate_volume_series(
-                    scaled_series, 
-                    variable, 
-                    intercept, 
-                    betas, 
-                    transformed_means, 
-                    saved_transformation_metadata
-                )
-                volume_series_list.append(volume_series)
+            media_variables.append((variable, original_series))
+        
+        # All percentage-change scenarios of all variables at once: (variables × scenarios × periods)
+        scaled_batch = (
+            kernels.scale_media([series for _, series in media_variables], x_range_values)
+            if media_variables else []
+        )
+        percent_changes = list(x_range_values)
+        
+        for (variable, original_series), scaled in zip(media_variables, scaled_batch):
+            # Volume series for every scaled series in one pass: (scenarios × periods)
+            volumes = calculate_volume_matrix(
+                scaled,
+                variable,
+                intercept,
+                betas,
+                transformed_means,
+                saved_transformation_metadata
+            )
+            scaled_series_list = scaled.tolist()
+            volume_series_list = volumes.tolist()
             
             # Calculate total volume for each scaled series (sum of all points)
-            total_volumes = [sum(volume_series) for volume_series in volume_series_list]
-            logger.info(f"🔍 Total volumes: {total_volumes}")
+            total_volumes = kernels.sequential_sum(volumes).tolist()
             
             # Find max and min points using the diminishing return analysis
             # We need to use the media values (reach/investment) and predictions separately
             # The media values are the sum of each scaled series (total media investment)
-            media_values = [sum(scaled_series) for scaled_series in scaled_series_list]
-            # Explicit log for media_values (use CRITICAL so it shows while other logs are suppressed)
-            try:
-                logger.critical(f"S-CURVE media_values for {variable}: {media_values}")
-            except Exception:
-                pass
+            media_values = kernels.sequential_sum(scaled).tolist()
             diminishing_point_value, diminishing_point_prediction = find_diminishing_point(media_values, total_volumes)
             start_point_value, start_point_prediction = find_start_point(media_values, total_volumes)
 
@@ -8,7 +8,7 @@ import logging
 import math
 import statistics
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 from itertools import count
 from typing import Any, Dict, Iterable, List, Sequence, Optional
@@ -19,6 +19,7 @@ import numpy as np
 from minio.error import S3Error
 from pydantic import BaseModel, Field
 
+from . import model_index
 from .database import MINIO_BUCKET, get_minio_df, minio_client, client, db
 
 
@@ -192,6 +193,7 @@ def _write_dataframe_to_minio(frame: pd.DataFrame, file_key: str) -> None:
         len(data),
         content_type=content_type,
     )
+    model_index.invalidate(_normalise_file_key(file_key))
 
 
 def _update_selected_models_flag(file_key: str, combination_id: str | None, model_name: str) -> bool:
@@ -266,25 +268,20 @@ def _detect_combination_column(frame: pd.DataFrame) -> str | None:
 
 
 def _combination_ids_from_minio(file_key: str) -> List[str] | None:
-    frame = _load_dataframe(file_key)
-    if frame is None:
+    index = _model_index(file_key)
+    if index is None:
         return None
 
-    column = _detect_combination_column(frame)
+    column = _detect_combination_column(index.frame)
     if column is None:
         logger.warning(
             "Could not determine combination column for file %s (columns=%s)",
             file_key,
-            list(frame.columns[:10]),
+            list(index.frame.columns[:10]),
         )
         return []
 
-    combinations = {
-        str(value).strip()
-        for value in frame[column].dropna().astype(str)
-        if str(value).strip()
-    }
-    return sorted(combinations)
+    return sorted(index.values(column, stripped=True))
 
 
 
@@ -411,115 +408,70 @@ def _parse_str_sequence(value: Any) -> List[str]:
     return []
 
 
-def _row_variable_impacts(row: pd.Series, ignore: set[str], column_lookup: Dict[str, str]) -> Dict[str, float]:
-    impacts = _parse_mapping(_row_value(row, column_lookup, "variable_impacts"))
-    for column in row.index:
-        column_name = str(column)
-        col_lower = column_name.lower()
-        if col_lower in ignore:
-            continue
-        if col_lower in METRIC_KEYS:
-            continue
-        if col_lower.startswith("variable_"):
-            continue
-        if col_lower.endswith("_values") or col_lower.endswith("_series"):
-            continue
-        if col_lower.endswith("_elasticity"):
-            variable = column_name[: -len("_elasticity")]
-        elif col_lower.startswith("elasticity_"):
-            variable = column_name[len("elasticity_"):]
-        elif col_lower.endswith("_impact"):
-            variable = column_name[: -len("_impact")]
-        elif col_lower.startswith("impact_"):
-            variable = column_name[len("impact_"):]
-        elif col_lower.endswith("_beta") and not col_lower.startswith("self_"):
-            variable = column_name[: -len("_beta")]
-        else:
-            continue
-        variable = variable.strip()
-        if not variable:
-            continue
-        value = _coerce_optional_float(row[column])
-        if value is None:
-            continue
-        impacts[variable] = value
-    return impacts
+def _impact_variable(column_name: str, ignore: set[str]) -> str | None:
+    col_lower = column_name.lower()
+    if col_lower in ignore:
+        return None
+    if col_lower in METRIC_KEYS:
+        return None
+    if col_lower.startswith("variable_"):
+        return None
+    if col_lower.endswith("_values") or col_lower.endswith("_series"):
+        return None
+    if col_lower.endswith("_elasticity"):
+        variable = column_name[: -len("_elasticity")]
+    elif col_lower.startswith("elasticity_"):
+        variable = column_name[len("elasticity_"):]
+    elif col_lower.endswith("_impact"):
+        variable = column_name[: -len("_impact")]
+    elif col_lower.startswith("impact_"):
+        variable = column_name[len("impact_"):]
+    elif col_lower.endswith("_beta") and not col_lower.startswith("self_"):
+        variable = column_name[: -len("_beta")]
+    else:
+        return None
+    return variable.strip() or None
 
 
-def _row_variable_averages(row: pd.Series, ignore: set[str], column_lookup: Dict[str, str]) -> Dict[str, float]:
-    averages = _parse_mapping(_row_value(row, column_lookup, "variable_averages"))
-    for column in row.index:
-        column_name = str(column)
-        col_lower = column_name.lower()
-        if col_lower in ignore:
-            continue
-        if col_lower.startswith("variable_"):
-            continue
-        if col_lower.endswith("_average"):
-            variable = column_name[: -len("_average")]
-        elif col_lower.endswith("_avg"):
-            variable = column_name[: -len("_avg")]
-        elif col_lower.startswith("avg_"):
-            variable = column_name[len("avg_"):]
-        else:
-            continue
-        variable = variable.strip()
-        if not variable:
-            continue
-        value = _coerce_optional_float(row[column])
-        if value is None:
-            continue
-        averages[variable] = value
-    return averages
+def _average_variable(column_name: str, ignore: set[str]) -> str | None:
+    col_lower = column_name.lower()
+    if col_lower in ignore:
+        return None
+    if col_lower.startswith("variable_"):
+        return None
+    if col_lower.endswith("_average"):
+        variable = column_name[: -len("_average")]
+    elif col_lower.endswith("_avg"):
+        variable = column_name[: -len("_avg")]
+    elif col_lower.startswith("avg_"):
+        variable = column_name[len("avg_"):]
+    else:
+        return None
+    return variable.strip() or None
 
 
-def _row_rpi_competitors(row: pd.Series, column_lookup: Dict[str, str]) -> Dict[str, float]:
-    competitors = _parse_mapping(_row_value(row, column_lookup, "rpi_competitors"))
-    for column in row.index:
-        column_name = str(column)
-        col_lower = column_name.lower()
-        if not col_lower.startswith("rpi_"):
-            continue
-        competitor = column_name[len("rpi_"):]
-        if not competitor:
-            continue
-        value = _coerce_optional_float(row[column])
-        if value is None:
-            continue
-        competitors[competitor] = value
-    return competitors
-
-
-def _row_combination_metadata(
-    row: pd.Series,
-    combination_column: str,
-    model_column: str,
-    string_like_columns: set[str],
-) -> Dict[str, str]:
-    metadata: Dict[str, str] = {}
-    combo_value = _coerce_optional_str(row.get(combination_column))
-    if combo_value:
-        metadata[combination_column] = combo_value
-    for column in string_like_columns:
-        if column in {combination_column, model_column}:
-            continue
-        col_lower = column.lower()
-        if col_lower in METRIC_KEYS:
-            continue
-        if col_lower.startswith("variable_"):
-            continue
-        if col_lower.startswith("rpi_"):
-            continue
-        if col_lower.endswith("_values") or col_lower.endswith("_series"):
-            continue
-        value = _coerce_optional_str(row.get(column))
-        if not value:
-            continue
-        metadata[column] = value
-    return metadata
+def _rpi_competitor(column_name: str) -> str | None:
+    if not column_name.lower().startswith("rpi_"):
+        return None
+    return column_name[len("rpi_"):] or None
+
+
+def _is_metadata_column(column: str, combination_column: str, model_column: str) -> bool:
+    if column in {combination_column, model_column}:
+        return False
+    col_lower = column.lower()
+    if col_lower in METRIC_KEYS:
+        return False
+    if col_lower.startswith("variable_"):
+        return False
+    if col_lower.startswith("rpi_"):
+        return False
+    if col_lower.endswith("_values") or col_lower.endswith("_series"):
+        return False
+    return True
 
 
-def _build_series_from_row(row: pd.Series, column_lookup: Dict[str, str]) -> ModelSeries:
+def _build_series_from_row(row: Any, column_lookup: Dict[str, str]) -> ModelSeries:
     actual = _parse_float_sequence(_row_value(row, column_lookup, "actual_values"))
     if not actual:
         actual = _parse_float_sequence(_row_value(row, column_lookup, "actual"))
@@ -541,11 +493,54 @@ def _build_series_from_row(row: pd.Series, column_lookup: Dict[str, str]) -> Mod
     return ModelSeries(dates=dates, actual=actual, predicted=predicted)
 
 
-def _models_for_file(file_key: str, combination_id: str | None = None) -> List[ModelRecord]:
-    frame = _load_dataframe(file_key)
-    if frame is None or frame.empty:
-        raise ModelDataUnavailableError(f"Model data not available for file '{file_key}'")
+@dataclass(frozen=True)
+class _RecordLayout:
+    """Which columns of a results file feed which ``ModelRecord`` field."""
+
+    combination_column: str
+    model_column: str
+    impact_columns: List[tuple[str, str]]
+    average_columns: List[tuple[str, str]]
+    rpi_columns: List[tuple[str, str]]
+    metadata_columns: List[str]
+    # Columns parsed per row: JSON mappings and the actual/predicted series
+    cell_columns: List[str]
+
+
+_CELL_KEYS = (
+    "variable_impacts",
+    "variable_averages",
+    "rpi_competitors",
+    "price_variable",
+    "actual_values",
+    "actual",
+    "predicted_values",
+    "predicted",
+    "dates",
+    "periods",
+)
+
+
+def _model_index(file_key: str) -> model_index.ModelIndex | None:
+    normalised = _normalise_file_key(file_key)
+    if not normalised:
+        return None
 
+    try:
+        return model_index.get_index(minio_client, MINIO_BUCKET, normalised, _load_dataframe)
+    except S3Error:
+        logger.warning("Failed to fetch %s from MinIO", normalised, exc_info=True)
+    except Exception:  # pragma: no cover - defensive catch to keep feature usable
+        logger.exception("Unexpected error loading %s from MinIO", normalised)
+    return None
+
+
+def _record_layout(index: model_index.ModelIndex, file_key: str) -> _RecordLayout:
+    layout = index.memo.get("layout")
+    if layout is not None:
+        return layout
+
+    frame = index.frame
     combination_column = _detect_combination_column(frame)
     if combination_column is None:
         raise ModelDataUnavailableError(
@@ -570,69 +565,138 @@ def _models_for_file(file_key: str, combination_id: str | None = None) -> List[M
     }
     ignore_columns.update(METRIC_KEYS)
 
-    string_like_columns = {
-        column
-        for column in frame.columns
-        if pd.api.types.is_string_dtype(frame[column])
-    }
-    column_lookup = {column.lower(): column for column in frame.columns}
-
-    normalised_key = _normalise_file_key(file_key)
-    records: List[ModelRecord] = []
-
-    for _, row in frame.iterrows():
-        combo_value = _coerce_optional_str(row.get(combination_column))
-        if not combo_value:
-            continue
-        if combination_id and combination_id != "all" and combo_value != combination_id:
-            continue
-
-        model_name = _coerce_optional_str(row.get(model_column)) or f"model-{len(records) + 1}"
-        metrics = {
-            key: _coerce_optional_float(_row_value(row, column_lookup, key))
-            for key in METRIC_KEYS
-        }
-        impacts = _row_variable_impacts(row, ignore_columns, column_lookup)
-        averages = _row_variable_averages(row, ignore_columns, column_lookup)
-        competitors = _row_rpi_competitors(row, column_lookup)
-        combination_meta = _row_combination_metadata(
-            row,
-            combination_column,
-            model_column,
-            string_like_columns,
-        )
+    names = [(column, str(column)) for column in frame.columns]
+    layout = _RecordLayout(
+        combination_column=combination_column,
+        model_column=model_column,
+        impact_columns=[
+            (column, variable)
+            for column, name in names
+            if (variable := _impact_variable(name, ignore_columns))
+        ],
+        average_columns=[
+            (column, variable)
+            for column, name in names
+            if (variable := _average_variable(name, ignore_columns))
+        ],
+        rpi_columns=[
+            (column, competitor)
+            for column, name in names
+            if (competitor := _rpi_competitor(name))
+        ],
+        metadata_columns=[
+            column
+            for column in frame.columns
+            if pd.api.types.is_string_dtype(frame[column])
+            and _is_metadata_column(column, combination_column, model_column)
+        ],
+        cell_columns=[index.lookup[key] for key in _CELL_KEYS if key in index.lookup],
+    )
+    index.memo["layout"] = layout
+    return layout
 
-        price_variable = _coerce_optional_str(_row_value(row, column_lookup, "price_variable"))
-        if not price_variable:
-            price_variable = next((name for name in impacts if "price" in name.lower()), "price")
 
-        base_price = _coerce_optional_float(_row_value(row, column_lookup, "base_price")) or 0.0
-        base_volume = _coerce_optional_float(_row_value(row, column_lookup, "base_volume")) or 0.0
-        series = _build_series_from_row(row, column_lookup)
+def _model_rows(
+    file_key: str, combination_id: str | None = None
+) -> tuple[model_index.ModelIndex, _RecordLayout, np.ndarray]:
+    """Rows of the results file holding models of ``combination_id`` (all when ``None``/``"all"``)."""
+    index = _model_index(file_key)
+    if index is None or index.frame.empty:
+        raise ModelDataUnavailableError(f"Model data not available for file '{file_key}'")
 
-        records.append(
-            ModelRecord(
-                file_key=normalised_key,
-                combination_id=combo_value,
-                combination=combination_meta,
-                model_name=model_name,
-                metrics=metrics,
-                variable_impacts=impacts,
-                variable_averages=averages,
-                price_variable=price_variable,
-                base_price=base_price,
-                base_volume=base_volume,
-                rpi_competitors=competitors,
-                series=series,
-            )
-        )
+    layout = _record_layout(index, file_key)
+    if combination_id and combination_id != "all":
+        rows = index.positions(layout.combination_column, combination_id, stripped=True)
+    else:
+        rows = index.non_missing(layout.combination_column, stripped=True)
 
-    if not records:
+    if not len(rows):
         message = f"Model data not available for file '{file_key}'"
         if combination_id and combination_id != "all":
             message += f" and combination '{combination_id}'"
         raise ModelDataUnavailableError(message)
+    return index, layout, rows
+
+
+def _float_or_none(value: float) -> float | None:
+    return None if math.isnan(value) else float(value)
+
 
+def _record_for_row(
+    index: model_index.ModelIndex, layout: _RecordLayout, row: int, normalised_key: str
+) -> ModelRecord:
+    """Parse one row of the index; the model name is ``""`` when the cell is blank."""
+    cells = {column: index.cells(column)[row] for column in layout.cell_columns}
+    column_lookup = index.lookup
+
+    metrics = {
+        key: _float_or_none(index.numeric(column_lookup[key])[row]) if key in column_lookup else None
+        for key in METRIC_KEYS
+    }
+    impacts = _parse_mapping(_row_value(cells, column_lookup, "variable_impacts"))
+    for column, variable in layout.impact_columns:
+        value = index.numeric(column)[row]
+        if not math.isnan(value):
+            impacts[variable] = float(value)
+    averages = _parse_mapping(_row_value(cells, column_lookup, "variable_averages"))
+    for column, variable in layout.average_columns:
+        value = index.numeric(column)[row]
+        if not math.isnan(value):
+            averages[variable] = float(value)
+    competitors = _parse_mapping(_row_value(cells, column_lookup, "rpi_competitors"))
+    for column, competitor in layout.rpi_columns:
+        value = index.numeric(column)[row]
+        if not math.isnan(value):
+            competitors[competitor] = float(value)
+
+    combo_value = _coerce_optional_str(index.cells(layout.combination_column)[row]) or ""
+    combination_meta: Dict[str, str] = {layout.combination_column: combo_value}
+    for column in layout.metadata_columns:
+        value = _coerce_optional_str(index.cells(column)[row])
+        if value:
+            combination_meta[column] = value
+
+    price_variable = _coerce_optional_str(_row_value(cells, column_lookup, "price_variable"))
+    if not price_variable:
+        price_variable = next((name for name in impacts if "price" in name.lower()), "price")
+
+    base_price = base_volume = 0.0
+    if "base_price" in column_lookup:
+        base_price = _float_or_none(index.numeric(column_lookup["base_price"])[row]) or 0.0
+    if "base_volume" in column_lookup:
+        base_volume = _float_or_none(index.numeric(column_lookup["base_volume"])[row]) or 0.0
+
+    return ModelRecord(
+        file_key=normalised_key,
+        combination_id=combo_value,
+        combination=combination_meta,
+        model_name=_coerce_optional_str(index.cells(layout.model_column)[row]) or "",
+        metrics=metrics,
+        variable_impacts=impacts,
+        variable_averages=averages,
+        price_variable=price_variable,
+        base_price=base_price,
+        base_volume=base_volume,
+        rpi_competitors=competitors,
+        series=_build_series_from_row(cells, column_lookup),
+    )
+
+
+def _models_for_file(file_key: str, combination_id: str | None = None) -> List[ModelRecord]:
+    index, layout, rows = _model_rows(file_key, combination_id)
+    normalised_key = _normalise_file_key(file_key)
+
+    # Parsed rows are kept on the index, so later requests on the same file
+    # version only parse rows they have not seen yet
+    parsed: Dict[int, ModelRecord] = index.memo.setdefault("records", {})
+    records: List[ModelRecord] = []
+    for row in rows.tolist():
+        record = parsed.get(row)
+        if record is None:
+            record = parsed[row] = _record_for_row(index, layout, row, normalised_key)
+        if not record.model_name:
+            record = replace(record, model_name=f"model-{len(records) + 1}")
+        records.append(record)
     return records
 
 
@@ -747,14 +811,9 @@ def list_variables(file_key: str, mode: str | None = None) -> Dict[str, Any]:
     }
 
 
-def _collect_metric_values(models: Iterable[ModelRecord], key: str) -> List[float]:
-    values = [record.metrics.get(key) for record in models]
-    return [value for value in values if value is not None]
-
-
 def get_filter_options(file_key: str, combination_id: str | None, variable: str) -> Dict[str, Any]:
     try:
-        models = _models_for_file(file_key, combination_id)
+        index, _, rows = _model_rows(file_key, combination_id)
     except ModelDataUnavailableError as exc:
         return {
             "file_key": file_key,
@@ -775,14 +834,18 @@ def get_filter_options(file_key: str, combination_id: str | None, variable: str)
         "bic",
     ]
     for key in metric_keys:
-        values = _collect_metric_values(models, key)
-        if not values:
+        column = index.column(key)
+        if column is None:
+            continue
+        values = index.numeric(column)[rows]
+        values = values[~np.isnan(values)]
+        if not values.size:
             continue
         available_filters[key] = {
-            "min": min(values),
-            "max": max(values),
-            "current_min": min(values),
-            "current_max": max(values),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "current_min": float(values.min()),
+            "current_max": float(values.max()),
         }
 
     return {
@@ -794,18 +857,118 @@ def get_filter_options(file_key: str, combination_id: str | None, variable: str)
     }
 
 
-def _within_range(value: float | None, minimum: float | None, maximum: float | None) -> bool:
-    if value is None:
-        return True
-    if minimum is not None and value < minimum:
-        return False
-    if maximum is not None and value > maximum:
-        return False
-    return True
+_FILTER_MODEL_COLUMNS = ['model_name', 'Model', 'model', 'MODEL_NAME', 'ModelName', 'model_id', 'Model_Name']
+
+# Metric column spellings seen in results files
+_FILTER_METRIC_COLUMNS = [
+    'MAPE', 'mape', 'Mape',
+    'Test_R2', 'R2', 'r2', 'Test_r2', 'r2_test', 'R2_test', 'R2_Test',
+    'SelfElasticity', 'self_elasticity',
+    'mape_train', 'MAPE_train', 'Mape_train', 'mape_trali',
+    'mape_test', 'MAPE_test', 'Mape_test', 'mape_pe_test',
+    'r2_train', 'R2_train', 'R2_Train',
+    'aic', 'AIC', 'Aic',
+    'bic', 'BIC', 'Bic',
+]
+
+
+def _find_combination_id_column(columns: Iterable[str]) -> str | None:
+    for col in columns:
+        col_lower = col.lower()
+        if (col_lower == 'combination_id' or
+            col_lower == 'combo_id' or
+            col_lower == 'combinationid' or
+            'combination_id' in col_lower or
+            'combo_id' in col_lower or
+            'combination' in col_lower):
+            return col
+    return None
+
+
+def _find_method_column(columns: Sequence[str], variable: str, method_type: str) -> str | None:
+    """Column holding ``variable``'s value for ``method_type`` (``{variable}_{method}``)."""
+    # Handle special case for "average" method which uses "avg" in column names
+    method_suffix = "avg" if method_type.lower() == "average" else method_type.lower()
+
+    # For ROI, try multiple column name patterns
+    if method_type.lower() == "roi":
+        patterns = [
+            f"{variable.lower()}_{method_suffix}",
+            f"{variable.upper()}_ROI",
+            f"ROI_{variable}",
+            f"roi_{variable}",
+            f"{variable}_CPRP_VALUE",
+            f"self_{method_suffix}"
+        ]
+    else:
+        patterns = [f"{variable.lower()}_{method_suffix}"]
+
+    for pattern in patterns:
+        for col in columns:
+            if col.lower() == pattern.lower():
+                return col
+    return None
+
+
+def _find_variable_column(columns: Sequence[str], variable: str, method_suffix: str) -> str | None:
+    """Exact ``{variable}_{method}`` column, else the first abbreviated variant (``tv_reach_a``)."""
+    exact = f"{variable.lower()}_{method_suffix}"
+    for col in columns:
+        if col.lower() == exact:
+            return col
+    for col in columns:
+        col_lower = col.lower()
+        if (variable.lower() in col_lower and
+            (method_suffix in col_lower or
+             (method_suffix == "avg" and col_lower.endswith("_a")) or
+             (method_suffix == "beta" and col_lower.endswith("_b")) or
+             (method_suffix == "elasticity" and (col_lower.endswith("_e") or "elastic" in col_lower)))):
+            return col
+    return None
+
+
+def _find_metric_columns(columns: Sequence[str], exclude: set[str]) -> List[str]:
+    metric_columns: List[str] = []
+    for col in columns:
+        if col in exclude:
+            continue
+        col_lower = col.lower()
+        if (
+            ('mape' in col_lower and ('train' in col_lower or 'trali' in col_lower or 'test' in col_lower))
+            or (('r2' in col_lower or 'r_2' in col_lower) and ('train' in col_lower or 'test' in col_lower))
+            or col_lower in ['aic', 'bic']
+            or col in _FILTER_METRIC_COLUMNS
+        ):
+            metric_columns.append(col)
+    return metric_columns
+
+
+def _first_metric_column(
+    existing: Sequence[str], candidates: Sequence[str], *patterns: Sequence[str]
+) -> str | None:
+    """First of ``candidates`` present, else the first column containing all words of a pattern group."""
+    for col in candidates:
+        if col in existing:
+            return col
+    if patterns:
+        for col in existing:
+            col_lower = col.lower()
+            if all(any(word in col_lower for word in group) for group in patterns):
+                return col
+    return None
+
+
+def _ensemble_rows(index: model_index.ModelIndex, model_column: str) -> np.ndarray:
+    key = ("ensemble", model_column)
+    mask = index.memo.get(key)
+    if mask is None:
+        names = index.frame[model_column].astype(str).str.lower()
+        mask = index.memo[key] = names.str.contains('ensemble', na=False).to_numpy(dtype=bool)
+    return mask
 
 
 def filter_models(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Filter models using a selected variable (column) and metric ranges, reading directly from file"""
+    """Filter models using a selected variable (column) and metric ranges over the file's model index"""
     request = ModelFilterPayload(**payload)
     
     # Handle empty or missing variable - return empty array
@@ -817,419 +980,123 @@ def filter_models(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         raise ValueError("MinIO connection is not available")
     
     try:
-        # Download file from MinIO
-        response = minio_client.get_object(MINIO_BUCKET, request.file_key)
-        content = response.read()
-        response.close()
-        response.release_conn()
-        
-        # Read file based on extension
-        if request.file_key.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-        elif request.file_key.endswith(".xlsx"):
-            df = pd.read_excel(io.BytesIO(content))
-        elif request.file_key.endswith(".arrow"):
-            import pyarrow as pa
-            import pyarrow.ipc as ipc
-            reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-            df = reader.read_all().to_pandas()
-        else:
-            raise ValueError(f"Unsupported file type: {request.file_key}")
+        index = _model_index(request.file_key)
+        if index is None:
+            raise ModelDataUnavailableError(f"Model data not available for file '{request.file_key}'")
+        columns = list(index.frame.columns)
         
         # Find the method column for the selected variable
-        method_column = None
         method_type = request.method or "elasticity"
-        
-        # Look for method column with pattern: {variable}_{method}
-        # Handle special case for "average" method which uses "avg" in column names
         method_suffix = "avg" if method_type.lower() == "average" else method_type.lower()
-        
-        # For ROI, try multiple column name patterns
-        if method_type.lower() == "roi":
-            roi_patterns = [
-                f"{request.variable.lower()}_{method_suffix}",
-                f"{request.variable.upper()}_ROI",
-                f"ROI_{request.variable}",
-                f"roi_{request.variable}",
-                f"{request.variable}_CPRP_VALUE",
-                f"self_{method_suffix}"
-            ]
-            
-            for pattern in roi_patterns:
-                for col in df.columns:
-                    if col.lower() == pattern.lower():
-                        method_column = col
-                        break
-                if method_column:
-                    break
-        else:
-            for col in df.columns:
-                if col.lower() == f"{request.variable.lower()}_{method_suffix}":
-                    method_column = col
-                    break
+        method_column = _find_method_column(columns, request.variable, method_type)
         
         # If method column not found, return empty array instead of raising error
         # This handles cases where variable is deselected or doesn't exist
         if not method_column:
             expected_column = f"{request.variable}_{method_suffix}"
-            logger.warning(f"No {method_type} column found for variable '{request.variable}'. Expected column: '{expected_column}'. Available columns: {list(df.columns)[:20]}...")
+            logger.warning(f"No {method_type} column found for variable '{request.variable}'. Expected column: '{expected_column}'. Available columns: {columns[:20]}...")
             return []
         
         # Check for model column with flexible naming
-        model_column = None
-        possible_model_columns = ['model_name', 'Model', 'model', 'MODEL_NAME', 'ModelName', 'model_id', 'Model_Name']
-        
-        for col_name in possible_model_columns:
-            if col_name in df.columns:
-                model_column = col_name
-                break
-        
+        model_column = next((col for col in _FILTER_MODEL_COLUMNS if col in columns), None)
         if not model_column:
-            raise ValueError(f"No model identifier column found. Expected one of: {possible_model_columns}")
+            raise ValueError(f"No model identifier column found. Expected one of: {_FILTER_MODEL_COLUMNS}")
         
-        # Prepare a DataFrame with model column and the method column
-        columns_to_select = [model_column, method_column]
-        
-        # Add combination_id column if filtering by combination
+        # Filter by combination_id if specified
+        mask = index.mask()
         combination_id_column = None
         if request.combination_id:
-            # Find combination_id column
-            for col in df.columns:
-                col_lower = col.lower()
-                if (col_lower == 'combination_id' or 
-                    col_lower == 'combo_id' or 
-                    col_lower == 'combinationid' or
-                    'combination_id' in col_lower or 
-                    'combo_id' in col_lower or 
-                    'combination' in col_lower):
-                    combination_id_column = col
-                    break
-            
+            combination_id_column = _find_combination_id_column(columns)
             if combination_id_column:
-                columns_to_select.append(combination_id_column)
-        
-        # Add metric columns if they exist - include variations to match actual file column names
-        # Based on actual file: mape_trali (mape_train), mape_pe_test (mape_test), etc.
-        metric_columns = [
-            'MAPE', 'mape', 'Mape',
-            'Test_R2', 'R2', 'r2', 'Test_r2', 'r2_test', 'R2_test', 'R2_Test',
-            'SelfElasticity', 'self_elasticity',
-            'mape_train', 'MAPE_train', 'Mape_train', 'mape_trali', 'mape_train',  # Handle variations
-            'mape_test', 'MAPE_test', 'Mape_test', 'mape_pe_test',  # Handle variations
-            'r2_train', 'R2_train', 'R2_Train',
-            'r2_test', 'R2_test', 'R2_Test',
-            'aic', 'AIC', 'Aic',
-            'bic', 'BIC', 'Bic'
-        ]
-        existing_metric_columns = []
-        
-        # Check all columns in dataframe for metric patterns (case-insensitive)
-        for col in df.columns:
-            col_lower = col.lower()
-            # Check for mape variations
-            if 'mape' in col_lower and ('train' in col_lower or 'trali' in col_lower):
-                if col not in columns_to_select:
-                    columns_to_select.append(col)
-                    existing_metric_columns.append(col)
-            elif 'mape' in col_lower and ('test' in col_lower or 'pe_test' in col_lower):
-                if col not in columns_to_select:
-                    columns_to_select.append(col)
-                    existing_metric_columns.append(col)
-            # Check for r2 variations
-            elif ('r2' in col_lower or 'r_2' in col_lower) and ('train' in col_lower or 'test' in col_lower):
-                if col not in columns_to_select:
-                    columns_to_select.append(col)
-                    existing_metric_columns.append(col)
-            # Check for aic/bic
-            elif col_lower in ['aic', 'bic']:
-                if col not in columns_to_select:
-                    columns_to_select.append(col)
-                    existing_metric_columns.append(col)
-            # Check exact matches from metric_columns list
-            elif col in metric_columns:
-                if col not in columns_to_select:
-                    columns_to_select.append(col)
-                    existing_metric_columns.append(col)
-        
-        # Select only the columns we need
-        filtered = df[columns_to_select].copy()
+                mask = index.mask(index.positions(combination_id_column, request.combination_id))
         
-        # Filter by combination_id if specified
-        if request.combination_id and combination_id_column:
-            filtered = filtered[filtered[combination_id_column] == request.combination_id]
+        # Metric columns present in the file - include variations like mape_trali (mape_train), mape_pe_test (mape_test)
+        existing_metric_columns = _find_metric_columns(
+            columns, {model_column, method_column, combination_id_column}
+        )
+        selected = index.numeric(method_column)
         
-        # Rename columns for consistent processing
-        filtered = filtered.rename(columns={
-            model_column: 'model_name',
-            method_column: 'selected_variable_value'
-        })
+        def _apply(column: str | None, minimum: float | None, maximum: float | None) -> None:
+            nonlocal mask
+            if column:
+                mask &= model_index.range_mask(index.numeric(column), minimum, maximum)
         
         # Apply metric filters
-        # MAPE filtering
-        mape_col = None
-        for col in ['MAPE', 'mape', 'Mape']:
-            if col in existing_metric_columns:
-                mape_col = col
-                break
-        
-        if mape_col and mape_col in filtered.columns:
-            if request.min_mape is not None:
-                filtered = filtered[filtered[mape_col] >= request.min_mape]
-            if request.max_mape is not None:
-                filtered = filtered[filtered[mape_col] <= request.max_mape]
-        
-        # R2 filtering
-        r2_col = None
-        for col in ['Test_R2', 'R2', 'r2', 'Test_r2']:
-            if col in existing_metric_columns:
-                r2_col = col
-                break
-                
-        if r2_col and r2_col in filtered.columns:
-            if request.min_r2 is not None:
-                filtered = filtered[filtered[r2_col] >= request.min_r2]
-            if request.max_r2 is not None:
-                filtered = filtered[filtered[r2_col] <= request.max_r2]
+        _apply(_first_metric_column(existing_metric_columns, ['MAPE', 'mape', 'Mape']), request.min_mape, request.max_mape)
+        _apply(_first_metric_column(existing_metric_columns, ['Test_R2', 'R2', 'r2', 'Test_r2']), request.min_r2, request.max_r2)
         
         # Filter by the selected variable's values
-        if request.min_self_elasticity is not None:
-            filtered = filtered[filtered['selected_variable_value'] >= request.min_self_elasticity]
-        if request.max_self_elasticity is not None:
-            filtered = filtered[filtered['selected_variable_value'] <= request.max_self_elasticity]
-        
-        # MAPE Train filtering - handle variations like mape_trali
-        mape_train_col = None
-        # First try exact matches
-        for col in ['mape_train', 'MAPE_train', 'Mape_train']:
-            if col in existing_metric_columns:
-                mape_train_col = col
-                break
-        # If not found, try pattern matching for variations
-        if not mape_train_col:
-            for col in existing_metric_columns:
-                col_lower = col.lower()
-                if 'mape' in col_lower and ('train' in col_lower or 'trali' in col_lower):
-                    mape_train_col = col
-                    break
+        mask &= model_index.range_mask(selected, request.min_self_elasticity, request.max_self_elasticity)
         
-        if mape_train_col and mape_train_col in filtered.columns:
-            if request.min_mape_train is not None:
-                filtered = filtered[filtered[mape_train_col] >= request.min_mape_train]
-            if request.max_mape_train is not None:
-                filtered = filtered[filtered[mape_train_col] <= request.max_mape_train]
-        
-        # MAPE Test filtering - handle variations like mape_pe_test
-        mape_test_col = None
-        # First try exact matches
-        for col in ['mape_test', 'MAPE_test', 'Mape_test']:
-            if col in existing_metric_columns:
-                mape_test_col = col
-                break
-        # If not found, try pattern matching for variations
-        if not mape_test_col:
-            for col in existing_metric_columns:
-                col_lower = col.lower()
-                if 'mape' in col_lower and ('test' in col_lower or 'pe_test' in col_lower):
-                    mape_test_col = col
-                    break
-        
-        if mape_test_col and mape_test_col in filtered.columns:
-            if request.min_mape_test is not None:
-                filtered = filtered[filtered[mape_test_col] >= request.min_mape_test]
-            if request.max_mape_test is not None:
-                filtered = filtered[filtered[mape_test_col] <= request.max_mape_test]
-        
-        # R2 Train filtering
-        r2_train_col = None
-        for col in ['r2_train', 'R2_train', 'R2_Train']:
-            if col in existing_metric_columns:
-                r2_train_col = col
-                break
-        
-        if r2_train_col and r2_train_col in filtered.columns:
-            if request.min_r2_train is not None:
-                filtered = filtered[filtered[r2_train_col] >= request.min_r2_train]
-            if request.max_r2_train is not None:
-                filtered = filtered[filtered[r2_train_col] <= request.max_r2_train]
-        
-        # R2 Test filtering
-        r2_test_col = None
-        for col in ['r2_test', 'R2_test', 'R2_Test']:
-            if col in existing_metric_columns:
-                r2_test_col = col
-                break
-        
-        if r2_test_col and r2_test_col in filtered.columns:
-            if request.min_r2_test is not None:
-                filtered = filtered[filtered[r2_test_col] >= request.min_r2_test]
-            if request.max_r2_test is not None:
-                filtered = filtered[filtered[r2_test_col] <= request.max_r2_test]
-        
-        # AIC filtering
-        aic_col = None
-        for col in ['aic', 'AIC', 'Aic']:
-            if col in existing_metric_columns:
-                aic_col = col
-                break
-        
-        if aic_col and aic_col in filtered.columns:
-            if request.min_aic is not None:
-                filtered = filtered[filtered[aic_col] >= request.min_aic]
-            if request.max_aic is not None:
-                filtered = filtered[filtered[aic_col] <= request.max_aic]
-        
-        # BIC filtering
-        bic_col = None
-        for col in ['bic', 'BIC', 'Bic']:
-            if col in existing_metric_columns:
-                bic_col = col
-                break
-        
-        if bic_col and bic_col in filtered.columns:
-            if request.min_bic is not None:
-                filtered = filtered[filtered[bic_col] >= request.min_bic]
-            if request.max_bic is not None:
-                filtered = filtered[filtered[bic_col] <= request.max_bic]
+        _apply(
+            _first_metric_column(existing_metric_columns, ['mape_train', 'MAPE_train', 'Mape_train'], ['mape'], ['train', 'trali']),
+            request.min_mape_train,
+            request.max_mape_train,
+        )
+        _apply(
+            _first_metric_column(existing_metric_columns, ['mape_test', 'MAPE_test', 'Mape_test'], ['mape'], ['test']),
+            request.min_mape_test,
+            request.max_mape_test,
+        )
+        _apply(_first_metric_column(existing_metric_columns, ['r2_train', 'R2_train', 'R2_Train']), request.min_r2_train, request.max_r2_train)
+        _apply(_first_metric_column(existing_metric_columns, ['r2_test', 'R2_test', 'R2_Test']), request.min_r2_test, request.max_r2_test)
+        _apply(_first_metric_column(existing_metric_columns, ['aic', 'AIC', 'Aic']), request.min_aic, request.max_aic)
+        _apply(_first_metric_column(existing_metric_columns, ['bic', 'BIC', 'Bic']), request.min_bic, request.max_bic)
         
         # Per-variable filtering for multiple variables
-        # First, we need to add variable columns to columns_to_select if they're not already there
-        if request.variable_filters:
-            # Add variable columns to the dataframe before filtering
-            for variable_name, variable_filter in request.variable_filters.items():
-                if variable_name.lower() != request.variable.lower():
-                    # This is a different variable, need to find its specific column
-                    method_suffix_var = "avg" if method_type.lower() == "average" else method_type.lower()
-                    
-                    # Try to find the variable column for this method
-                    var_method_column = None
-                    for col in df.columns:
-                        col_lower = col.lower()
-                        # Try exact match: {variable}_{method}
-                        if col_lower == f"{variable_name.lower()}_{method_suffix_var}":
-                            var_method_column = col
-                            break
-                        # Try partial match (handle variations like tv_reach_a for tv_reach_avg)
-                        elif (variable_name.lower() in col_lower and 
-                              (method_suffix_var in col_lower or 
-                               (method_suffix_var == "avg" and col_lower.endswith("_a")) or
-                               (method_suffix_var == "beta" and col_lower.endswith("_b")) or
-                               (method_suffix_var == "elasticity" and (col_lower.endswith("_e") or "elastic" in col_lower)))):
-                            var_method_column = col
-                            break
-                    
-                    # Add the variable column to columns_to_select if found and not already added
-                    if var_method_column and var_method_column not in columns_to_select:
-                        columns_to_select.append(var_method_column)
-                        # Re-select columns to include the new variable column
-                        filtered = df[columns_to_select].copy()
-                        # Re-apply combination_id filter if needed
-                        if request.combination_id and combination_id_column:
-                            filtered = filtered[filtered[combination_id_column] == request.combination_id]
-                        # Re-rename columns
-                        filtered = filtered.rename(columns={
-                            model_column: 'model_name',
-                            method_column: 'selected_variable_value'
-                        })
-        
-        # Now apply variable filters
-        if request.variable_filters:
-            for variable_name, variable_filter in request.variable_filters.items():
-                # Use current_min and current_max (user-selected range) instead of min/max (full range)
-                min_val = variable_filter.get('current_min') or variable_filter.get('min')
-                max_val = variable_filter.get('current_max') or variable_filter.get('max')
-                
-                # For the current variable being processed, filter by selected_variable_value
-                if variable_name.lower() == request.variable.lower():
-                    
-                    if min_val is not None:
-                        filtered = filtered[filtered['selected_variable_value'] >= min_val]
-                    if max_val is not None:
-                        filtered = filtered[filtered['selected_variable_value'] <= max_val]
-                else:
-                    # This is a different variable, need to find its specific column
-                    var_method_column = None
-                    method_suffix_var = "avg" if method_type.lower() == "average" else method_type.lower()
-                    
-                    # First, try to find the column in the original dataframe (more reliable)
-                    # Try exact match first
-                    for col in df.columns:
-                        col_lower = col.lower()
-                        if col_lower == f"{variable_name.lower()}_{method_suffix_var}":
-                            var_method_column = col
-                            break
-                    
-                    # If not found, try partial match with variations
-                    if not var_method_column:
-                        for col in df.columns:
-                            col_lower = col.lower()
-                            if (variable_name.lower() in col_lower and 
-                                (method_suffix_var in col_lower or 
-                                 (method_suffix_var == "avg" and col_lower.endswith("_a")) or
-                                 (method_suffix_var == "beta" and col_lower.endswith("_b")) or
-                                 (method_suffix_var == "elasticity" and (col_lower.endswith("_e") or "elastic" in col_lower)))):
-                                var_method_column = col
-                                break
-                    
-                    # If column found, make sure it's in the filtered dataframe
-                    if var_method_column:
-                        # If column not in filtered, add it
-                        if var_method_column not in filtered.columns:
-                            # Re-select columns to include the variable column
-                            if var_method_column not in columns_to_select:
-                                columns_to_select.append(var_method_column)
-                            filtered = df[columns_to_select].copy()
-                            # Re-apply combination_id filter if needed
-                            if request.combination_id and combination_id_column:
-                                filtered = filtered[filtered[combination_id_column] == request.combination_id]
-                            # Re-rename columns
-                            filtered = filtered.rename(columns={
-                                model_column: 'model_name',
-                                method_column: 'selected_variable_value'
-                            })
-                        
-                        # Now apply the filter using current_min/current_max (already extracted above)
-                        if var_method_column in filtered.columns:
-                            if min_val is not None:
-                                filtered = filtered[filtered[var_method_column] >= min_val]
-                            if max_val is not None:
-                                filtered = filtered[filtered[var_method_column] <= max_val]
+        for variable_name, variable_filter in (request.variable_filters or {}).items():
+            # Use current_min and current_max (user-selected range) instead of min/max (full range)
+            min_val = variable_filter.get('current_min') or variable_filter.get('min')
+            max_val = variable_filter.get('current_max') or variable_filter.get('max')
+            
+            # For the current variable being processed, filter by the selected variable's values
+            if variable_name.lower() == request.variable.lower():
+                mask &= model_index.range_mask(selected, min_val, max_val)
+            else:
+                # This is a different variable, filter on its own column
+                _apply(_find_variable_column(columns, variable_name, method_suffix), min_val, max_val)
         
         # Remove rows with NaN values in critical columns
-        filtered = filtered.dropna(subset=['model_name', 'selected_variable_value'])
+        mask &= index.frame[model_column].notna().to_numpy(dtype=bool) & ~np.isnan(selected)
         
         # Filter out ensemble models
-        filtered = filtered[~filtered['model_name'].astype(str).str.lower().str.contains('ensemble', na=False)]
+        mask &= ~_ensemble_rows(index, model_column)
+        
+        # Sort by the selected variable value (descending), keeping file order for ties
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(-selected[rows], kind="stable")]
         
         # Prepare response
+        names = index.cells(model_column)
+        combos = index.cells(combination_id_column) if combination_id_column else None
         results = []
-        for _, row in filtered.iterrows():
+        for row in rows.tolist():
+            value = float(selected[row])
             model_data = {
-                "model_name": str(row["model_name"]),
-                "self_elasticity": float(row["selected_variable_value"])
+                "model_name": str(names[row]),
+                "self_elasticity": value
             }
             
             # Add method-specific field based on the method type
             if method_type == "beta":
-                model_data["self_beta"] = float(row["selected_variable_value"])
+                model_data["self_beta"] = value
             elif method_type == "average":
-                model_data["self_avg"] = float(row["selected_variable_value"])
+                model_data["self_avg"] = value
             elif method_type == "roi":
-                model_data["self_roi"] = float(row["selected_variable_value"])
+                model_data["self_roi"] = value
             
             # Add combination_id if available
-            if combination_id_column and combination_id_column in row.index:
-                model_data["combination_id"] = str(row[combination_id_column])
+            if combos is not None:
+                model_data["combination_id"] = str(combos[row])
             
             results.append(model_data)
         
         # If no results found, return empty array instead of raising error
         # This handles cases where filters are too restrictive or variable doesn't match any models
         if not results:
-            logger.info(f"No models found matching the criteria. Total models: {len(df)}, After filtering: {len(filtered)}")
+            logger.info(f"No models found matching the criteria. Total models: {index.size}, After filtering: 0")
             return []
         
-        # Sort by the selected variable value (descending)
-        results.sort(key=lambda item: item.get("self_elasticity", 0), reverse=True)
         return results
         
     except Exception as e:
@@ -1252,66 +1119,36 @@ def get_variable_ranges(file_key: str, combination_id: str | None, variables: It
     method_suffix = "avg" if method_type == "average" else method_type
     
     try:
-        # Download file from MinIO to read column values directly
-        response = minio_client.get_object(MINIO_BUCKET, file_key)
-        content = response.read()
-        response.close()
-        response.release_conn()
-        
-        # Read file based on extension
-        if file_key.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-        elif file_key.endswith(".xlsx"):
-            df = pd.read_excel(io.BytesIO(content))
-        elif file_key.endswith(".arrow"):
-            import pyarrow as pa
-            import pyarrow.ipc as ipc
-            reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-            df = reader.read_all().to_pandas()
-        else:
-            raise ValueError(f"Unsupported file type: {file_key}")
+        index = _model_index(file_key)
+        if index is None:
+            raise ModelDataUnavailableError(f"Model data not available for file '{file_key}'")
+        columns = list(index.frame.columns)
         
         # Filter by combination_id if specified
+        rows: np.ndarray | slice = slice(None)
         if combination_id:
-            combination_id_column = None
-            for col in df.columns:
-                col_lower = col.lower()
-                if (col_lower == 'combination_id' or 
-                    col_lower == 'combo_id' or 
-                    col_lower == 'combinationid' or
-                    'combination_id' in col_lower or 
-                    'combo_id' in col_lower or 
-                    'combination' in col_lower):
-                    combination_id_column = col
-                    break
-            
+            combination_id_column = _find_combination_id_column(columns)
             if combination_id_column:
-                df = df[df[combination_id_column] == combination_id]
+                rows = index.positions(combination_id_column, combination_id)
         
         ranges: Dict[str, Dict[str, float]] = {}
         
         for variable in variables:
-            # Find the column for this variable and method
-            var_method_column = None
+            # Find the column for this variable and method: {variable}_{method}
+            expected = f"{variable.lower()}_{method_suffix}"
+            var_method_column = next((col for col in columns if col.lower() == expected), None)
+            if not var_method_column:
+                continue
             
-            # Try exact match: {variable}_{method}
-            for col in df.columns:
-                col_lower = col.lower()
-                if col_lower == f"{variable.lower()}_{method_suffix}":
-                    var_method_column = col
-                    break
-                
-            if var_method_column and var_method_column in df.columns:
-                values = df[var_method_column].dropna()
-                values = [float(v) for v in values if pd.notna(v) and np.isfinite(v)]
-                
-                if values:
-                    ranges[variable] = {
-                        "min": min(values),
-                        "max": max(values),
-                        "current_min": min(values),
-                        "current_max": max(values),
-                    }
+            values = index.numeric(var_method_column)[rows]
+            values = values[np.isfinite(values)]
+            if values.size:
+                ranges[variable] = {
+                    "min": float(values.min()),
+                    "max": float(values.max()),
+                    "current_min": float(values.min()),
+                    "current_max": float(values.max()),
+                }
         
         return {
             "file_key": file_key,
@@ -1467,24 +1304,11 @@ def get_model_contribution(file_key: str, combination_id: str, model_name: str)
         raise ValueError("MinIO connection is not available")
     
     try:
-        # Download file from MinIO
-        response = minio_client.get_object(MINIO_BUCKET, file_key)
-        content = response.read()
-        response.close()
-        response.release_conn()
-        
-        # Read file based on extension
-        if file_key.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-        elif file_key.endswith(".xlsx"):
-            df = pd.read_excel(io.BytesIO(content))
-        elif file_key.endswith(".arrow"):
-            import pyarrow as pa
-            import pyarrow.ipc as ipc
-            reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-            df = reader.read_all().to_pandas()
-        else:
-            raise ValueError(f"Unsupported file type: {file_key}")
+        # Shared, read-only frame of the file's model index
+        index = _model_index(file_key)
+        if index is None:
+            raise ValueError(f"Model data not available for file '{file_key}'")
+        df = index.frame
         
             # Find combination_id column
         combination_id_column = None
@@ -1565,24 +1389,11 @@ def get_model_performance(file_key: str, combination_id: str, model_name: str) -
         raise ValueError("MinIO connection is not available")
     
     try:
-        # Download file from MinIO
-        response = minio_client.get_object(MINIO_BUCKET, file_key)
-        content = response.read()
-        response.close()
-        response.release_conn()
-        
-        # Read file based on extension
-        if file_key.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-        elif file_key.endswith(".xlsx"):
-            df = pd.read_excel(io.BytesIO(content))
-        elif file_key.endswith(".arrow"):
-            import pyarrow as pa
-            import pyarrow.ipc as ipc
-            reader = ipc.RecordBatchFileReader(pa.BufferReader(content))
-            df = reader.read_all().to_pandas()
-        else:
-            raise ValueError(f"Unsupported file type: {file_key}")
+        # Shared, read-only frame of the file's model index
+        index = _model_index(file_key)
+        if index is None:
+            raise ValueError(f"Model data not available for file '{file_key}'")
+        df = index.frame
         
         # Find combination_id column
         combination_id_column = None
@@ -10,6 +10,7 @@ from typing import Dict, Optional, List, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.mongo import build_host_mongo_uri
+from app.features.shared.session_store import touch_session
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +140,7 @@ async def update_session_access_time(session_id: str, session_type: str) -> bool
         )
         
         client.close()
+        touch_session(session_type, session_id)
         return True
     except Exception as e:
         logger.error(f"❌ [SESSION] Failed to update access time for {session_id}: {e}")
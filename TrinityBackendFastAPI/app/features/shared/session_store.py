@@ -0,0 +1,372 @@
+"""
+Memory-bounded session stores for the table and dataframe-operations atoms.
+
+Both atoms keep the active ``pl.DataFrame`` of every open session in a
+module-level ``SESSIONS`` mapping.  :func:`create_session_store` returns a
+``MutableMapping`` so that existing ``SESSIONS[df_id] = df`` style code keeps
+working while the backing store enforces a memory budget:
+
+* ``memory`` - plain in-process dict (previous behaviour).
+* ``spill`` (default) - least recently used sessions are written to Arrow IPC
+  files once the budget is exceeded and memory-mapped back on the next access.
+  Idle sessions expire after ``SESSION_STORE_TTL_SECONDS``; the idle clock is
+  reset on every access and whenever ``update_session_access_time`` stamps the
+  Mongo session document.
+
+With ``SESSION_STORE_SHARED=1`` every write goes straight to the spill
+directory, which should then point at a volume shared by all uvicorn workers
+so any worker can serve the same ``df_id``.  Readers reload a session when the
+file on disk is newer than their in-memory copy.  The idle clock then lives on
+the volume too: every access by any worker stamps a ``<df_id>.access`` file
+next to the spill file, and expiry goes by the newer of the two mtimes.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, MutableMapping, Optional, Tuple
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from app.DataStorageRetrieval.env_config import env_bool, env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+DEFAULT_TTL_SECONDS = 24 * 3600
+EXPIRY_SWEEP_INTERVAL = 60.0
+
+_STORES: Dict[str, "SessionStore"] = {}
+
+
+class SessionStore(MutableMapping):
+    """Base class for session stores keyed by session id."""
+
+    name: str = ""
+
+    def touch(self, session_id: str) -> None:
+        """Reset the idle clock of ``session_id``."""
+
+    def expire(self) -> int:
+        """Drop sessions that have been idle for longer than the TTL."""
+        return 0
+
+    def stats(self) -> Dict[str, object]:
+        return {"name": self.name, "sessions": len(self)}
+
+
+class MemorySessionStore(SessionStore):
+    """Unbounded in-process store; keeps the historical ``dict`` semantics."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._data: Dict[str, pl.DataFrame] = {}
+
+    def __getitem__(self, session_id: str) -> pl.DataFrame:
+        return self._data[session_id]
+
+    def __setitem__(self, session_id: str, df: pl.DataFrame) -> None:
+        self._data[session_id] = df
+
+    def __delitem__(self, session_id: str) -> None:
+        del self._data[session_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SpillSessionStore(SessionStore):
+    """LRU store that spills sessions to memory-mapped Arrow IPC files."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        spill_dir: Optional[str] = None,
+        shared: bool = False,
+    ):
+        self.name = name
+        self.max_bytes = max(int(max_bytes), 0)
+        self.ttl_seconds = max(int(ttl_seconds), 0)
+        self.shared = shared
+        base = spill_dir or os.path.join(tempfile.gettempdir(), "trinity_sessions")
+        self.spill_dir = Path(base) / name
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, pl.DataFrame]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._versions: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._last_access: Dict[str, float] = {}
+        self._bytes = 0
+        self._spills = 0
+        self._reloads = 0
+        self._expired = 0
+        self._last_sweep = time.time()
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+    def __getitem__(self, session_id: str) -> pl.DataFrame:
+        with self._lock:
+            spill = self._spill_path(session_id)
+            df = self._memory.get(session_id)
+            if df is not None and self.shared and self._disk_version(spill) != self._versions.get(session_id):
+                # Another worker wrote a newer version of this session.
+                self._drop_memory(session_id)
+                df = None
+            if df is None:
+                if not spill.exists():
+                    raise KeyError(session_id)
+                df = self._read_spill(spill)
+                self._reloads += 1
+                self._remember(session_id, df, self._disk_version(spill))
+            else:
+                self._memory.move_to_end(session_id)
+            self._record_access(session_id)
+            return df
+
+    def __setitem__(self, session_id: str, df: pl.DataFrame) -> None:
+        with self._lock:
+            version = None
+            if self.shared:
+                version = self._write_spill(session_id, df)
+            else:
+                # An older spill file would otherwise be resurrected after
+                # this version is evicted.
+                self._spill_path(session_id).unlink(missing_ok=True)
+            self._drop_memory(session_id)
+            self._remember(session_id, df, version)
+            self._record_access(session_id)
+            self._evict_to_budget(exclude=session_id)
+        self._maybe_expire()
+
+    def __delitem__(self, session_id: str) -> None:
+        with self._lock:
+            spill = self._spill_path(session_id)
+            if session_id not in self._memory and not spill.exists():
+                raise KeyError(session_id)
+            self._drop_memory(session_id)
+            self._last_access.pop(session_id, None)
+            spill.unlink(missing_ok=True)
+            self._stamp_path(session_id).unlink(missing_ok=True)
+
+    def __contains__(self, session_id: object) -> bool:
+        if not isinstance(session_id, str):
+            return False
+        with self._lock:
+            if self.shared:
+                # Every write reaches the volume; another worker may have
+                # deleted or expired the session this worker still holds.
+                return self._spill_path(session_id).exists()
+            return session_id in self._memory or self._spill_path(session_id).exists()
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            on_disk = [self._session_id(p) for p in self.spill_dir.glob("*.arrow")]
+            if self.shared:
+                return iter(on_disk)
+            ids = list(self._memory)
+            ids.extend(session_id for session_id in on_disk if session_id not in self._memory)
+        return iter(ids)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def touch(self, session_id: str) -> None:
+        with self._lock:
+            spill = self._spill_path(session_id)
+            if self.shared:
+                if spill.exists():
+                    self._record_access(session_id)
+                return
+            self._last_access[session_id] = time.time()
+            if spill.exists():
+                os.utime(spill, None)
+                if session_id in self._versions:
+                    self._versions[session_id] = self._disk_version(spill)
+
+    def expire(self) -> int:
+        if not self.ttl_seconds:
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            for session_id in list(self):
+                if self.shared:
+                    last = self._shared_last_access(session_id)
+                else:
+                    last = self._last_access.get(session_id)
+                if last is None:
+                    spill = self._spill_path(session_id)
+                    last = spill.stat().st_mtime if spill.exists() else time.time()
+                if last < cutoff:
+                    self.pop(session_id, None)
+                    removed += 1
+            self._expired += removed
+        if removed:
+            logger.info("🧹 [SESSION] expired %d idle %s sessions", removed, self.name)
+        return removed
+
+    def _maybe_expire(self) -> None:
+        now = time.time()
+        if now - self._last_sweep < EXPIRY_SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        self.expire()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "sessions": len(self),
+                "in_memory": len(self._memory),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "spills": self._spills,
+                "reloads": self._reloads,
+                "expired": self._expired,
+                "shared": self.shared,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _spill_path(self, session_id: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+        return self.spill_dir / f"{safe}.arrow"
+
+    def _stamp_path(self, session_id: str) -> Path:
+        return self._spill_path(session_id).with_suffix(".access")
+
+    @staticmethod
+    def _session_id(path: Path) -> str:
+        return path.stem
+
+    def _record_access(self, session_id: str) -> None:
+        now = time.time()
+        self._last_access[session_id] = now
+        if self.shared:
+            # A separate file, so stamping does not change the spill file's
+            # version and make the other workers reload the frame.
+            stamp = self._stamp_path(session_id)
+            stamp.touch()
+            os.utime(stamp, (now, now))
+
+    def _shared_last_access(self, session_id: str) -> Optional[float]:
+        stamps = []
+        for path in (self._stamp_path(session_id), self._spill_path(session_id)):
+            try:
+                stamps.append(path.stat().st_mtime)
+            except FileNotFoundError:
+                pass
+        return max(stamps) if stamps else None
+
+    @staticmethod
+    def _disk_version(path: Path) -> Optional[Tuple[int, int, int]]:
+        # Writes go through ``os.replace`` so the inode changes even when two
+        # writes land within the filesystem's mtime resolution.
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _read_spill(spill: Path) -> pl.DataFrame:
+        # Arrow buffers reference the mapped pages, so only the parts of the
+        # frame that are actually touched are paged into memory.
+        table = ipc.open_file(pa.memory_map(str(spill), "r")).read_all()
+        return pl.from_arrow(table)
+
+    def _write_spill(self, session_id: str, df: pl.DataFrame) -> Optional[Tuple[int, int, int]]:
+        spill = self._spill_path(session_id)
+        tmp = spill.with_name(f".{spill.name}.{os.getpid()}.{threading.get_ident()}.part")
+        # Uncompressed IPC so the file can be memory-mapped on reload.
+        df.write_ipc(tmp, compression="uncompressed")
+        os.replace(tmp, spill)
+        return self._disk_version(spill)
+
+    def _remember(self, session_id: str, df: pl.DataFrame, version: Optional[Tuple[int, int, int]]) -> None:
+        size = int(df.estimated_size())
+        self._memory[session_id] = df
+        self._sizes[session_id] = size
+        self._versions[session_id] = version
+        self._bytes += size
+
+    def _drop_memory(self, session_id: str) -> None:
+        if self._memory.pop(session_id, None) is not None:
+            self._bytes -= self._sizes.pop(session_id, 0)
+        self._versions.pop(session_id, None)
+
+    def _evict_to_budget(self, exclude: Optional[str] = None) -> None:
+        if not self.max_bytes:
+            return
+        for session_id in list(self._memory):
+            if self._bytes <= self.max_bytes:
+                break
+            if session_id == exclude:
+                continue
+            df = self._memory[session_id]
+            spill = self._spill_path(session_id)
+            if self._versions.get(session_id) is None or not spill.exists():
+                self._write_spill(session_id, df)
+            self._drop_memory(session_id)
+            self._spills += 1
+            logger.info("💾 [SESSION] spilled %s session %s to %s", self.name, session_id, spill)
+
+
+def create_session_store(name: str) -> SessionStore:
+    """Return the session store configured through ``SESSION_STORE_*`` env vars."""
+    backend = os.getenv("SESSION_STORE_BACKEND", "spill").lower()
+    if backend == "memory":
+        store: SessionStore = MemorySessionStore(name)
+    else:
+        if backend != "spill":
+            logger.warning("Unknown SESSION_STORE_BACKEND %s, using spill", backend)
+        store = SpillSessionStore(
+            name,
+            max_bytes=env_int("SESSION_STORE_MAX_BYTES", DEFAULT_MAX_BYTES),
+            ttl_seconds=env_int("SESSION_STORE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+            spill_dir=os.getenv("SESSION_STORE_DIR"),
+            shared=env_bool("SESSION_STORE_SHARED"),
+        )
+    _STORES[name] = store
+    return store
+
+
+def touch_session(session_type: str, session_id: str) -> None:
+    """Reset the idle clock of a session in the store registered for ``session_type``."""
+    store = _STORES.get(session_type)
+    if store is not None:
+        store.touch(session_id)
+
+
+def expire_sessions() -> int:
+    """Expire idle sessions in every registered store."""
+    return sum(store.expire() for store in _STORES.values())
+
+
+__all__ = [
+    "SessionStore",
+    "MemorySessionStore",
+    "SpillSessionStore",
+    "create_session_store",
+    "touch_session",
+    "expire_sessions",
+]
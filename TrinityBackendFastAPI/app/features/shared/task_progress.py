@@ -0,0 +1,68 @@
+"""
+Progress records of long-running requests, published through ``task_result_store``.
+
+Clients pass a ``run_id`` with the request and poll
+``GET /api/task-queue/{run_id}`` while it runs.  :class:`TaskProgress` owns
+the record: ``start`` creates it as ``running``, every ``_publish`` replaces
+its ``metadata`` with :meth:`TaskProgress.metadata` and ``finish`` sets the
+final status.  Subclasses keep their own counters and describe them in
+``metadata``.
+
+Progress is best effort: without Redis, or when an update fails, a warning
+is logged and the request carries on.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TaskProgress:
+    """Base class of the per-request progress records.
+
+    ``task_name`` is the task name the record is created under and ``label``
+    names the request in log messages.
+    """
+
+    task_name = "task"
+    label = "task"
+
+    def __init__(self, run_id: str, store: Any = None):
+        self.run_id = run_id
+        if store is None:
+            try:
+                from app.core.task_results import task_result_store as store
+            except Exception as exc:  # pragma: no cover - redis unavailable
+                logger.warning("%s progress disabled: %s", self.label.capitalize(), exc)
+                store = None
+        self._store = store
+
+    def metadata(self) -> Dict[str, Any]:
+        return {}
+
+    def _publish(self, **changes: Any) -> None:
+        if self._store is None:
+            return
+        try:
+            self._store.update(self.run_id, metadata=self.metadata(), **changes)
+        except Exception as exc:
+            logger.warning("Failed to publish %s progress for %s: %s", self.label, self.run_id, exc)
+
+    def start(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        if self._store is not None:
+            try:
+                self._store.create(self.run_id, self.task_name, metadata)
+            except Exception as exc:
+                logger.warning("Failed to create %s progress for %s: %s", self.label, self.run_id, exc)
+        self._publish(status="running")
+
+    def finish(self, status: str = "success", error: Optional[str] = None) -> None:
+        if error is not None:
+            self._publish(status=status, error=error)
+        else:
+            self._publish(status=status)
+
+
+__all__ = ["TaskProgress"]
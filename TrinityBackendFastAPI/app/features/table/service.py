@@ -14,11 +14,12 @@ from minio.error import S3Error
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.DataStorageRetrieval.arrow_client import download_table_bytes
+from app.features.shared.session_store import create_session_store, touch_session
 
 logger = logging.getLogger(__name__)
 
-# In-memory session storage for active DataFrames
-SESSIONS: Dict[str, pl.DataFrame] = {}
+# Memory-bounded session storage for active DataFrames
+SESSIONS = create_session_store("table")
 
 # MinIO client configuration
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
@@ -886,6 +887,7 @@ async def update_session_access_time(table_id: str) -> bool:
         )
         
         client.close()  # close() is not a coroutine in Motor
+        touch_session("table", table_id)
         return True
     except Exception as e:
         logger.error(f"❌ [SESSION] Failed to update access time for {table_id}: {e}")
@@ -1,6 +1,12 @@
 import os
 import io
+import json
 import logging
+import hashlib
+import tempfile
+import threading
+import uuid
+from pathlib import Path
 import pyarrow as pa
 import pyarrow.flight as flight
 import pyarrow.ipc as ipc
@@ -8,19 +14,58 @@ import pyarrow.ipc as ipc
 from minio import Minio
 from minio.error import S3Error
 
+from DataStorageRetrieval.env_config import env_bool
 from DataStorageRetrieval.flight_registry import get_arrow_for_flight_path
+from DataStorageRetrieval.flight_query import FlightQuery, FlightQueryError
+from DataStorageRetrieval.table_cache import SingleFlight, TableCache
 
 logger = logging.getLogger("trinity.flight")
 
+
 class ArrowFlightServer(flight.FlightServerBase):
-    """Simple in-memory Flight server storing Arrow tables by path."""
+    """Flight server keeping a byte-budgeted cache of Arrow tables by path.
+
+    Tables evicted from the cache are transparently reloaded from MinIO via
+    the flight registry the next time they are requested.
+
+    In streaming mode (``FLIGHT_STREAMING``, enabled by default) incoming
+    record batches are written straight to an Arrow IPC spill file under
+    ``FLIGHT_SPILL_DIR`` and MinIO objects are downloaded to disk rather than
+    into a ``bytes`` buffer.  Tables are then memory-mapped from the spill file
+    so only the pages a client actually reads are brought into memory.  A
+    spill file lives as long as its cache entry: it is deleted when the table
+    is evicted, dropped through ``cache_evict`` / ``cache_clear``, and left
+    over files are removed when the server starts.
+    """
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 8815):
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8815,
+        cache_max_bytes: int | None = None,
+        cache_policy: str | None = None,
+        streaming: bool | None = None,
+        spill_dir: str | None = None,
+    ):
         self._host = host
         self._port = port
         location = f"grpc://{host}:{port}"
         super().__init__(location)
-        self._tables: dict[str, pa.Table] = {}
+        self._streaming = env_bool("FLIGHT_STREAMING", True) if streaming is None else streaming
+        self._spill_dir = Path(
+            spill_dir
+            or os.getenv("FLIGHT_SPILL_DIR")
+            or os.path.join(tempfile.gettempdir(), "trinity_flight")
+        )
+        if self._streaming:
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+            self._purge_spill_dir()
+        self._tables = TableCache(
+            max_bytes=cache_max_bytes,
+            policy=cache_policy,
+            on_evict=self._discard_spill if self._streaming else None,
+        )
+        self._loads = SingleFlight()
         self._minio = None
         endpoint = os.getenv("MINIO_ENDPOINT")
         access = os.getenv("MINIO_ACCESS_KEY")
@@ -41,52 +86,151 @@ class ArrowFlightServer(flight.FlightServerBase):
             for p in descriptor.path
         )
 
+    def _spill_path(self, path: str) -> Path:
+        digest = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return self._spill_dir / f"{digest}.arrow"
+
+    @staticmethod
+    def _spill_tmp(spill: Path) -> Path:
+        # Concurrent writers of the same path (two do_put calls, or a do_put
+        # racing a MinIO reload) each get their own file; os.replace makes the
+        # last one win.
+        return spill.with_name(
+            f".{spill.name}.{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex}.part"
+        )
+
+    def _discard_spill(self, path: str) -> None:
+        self._spill_path(path).unlink(missing_ok=True)
+
+    def _purge_spill_dir(self) -> None:
+        # Files left by a previous run may be older than the MinIO objects.
+        removed = 0
+        for pattern in ("*.arrow", ".*.part"):
+            for leftover in self._spill_dir.glob(pattern):
+                leftover.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("🧹 removed %d stale spill files from %s", removed, self._spill_dir)
+
+    @staticmethod
+    def _open_spill(spill: Path) -> pa.Table:
+        # Reading from a memory map is zero-copy: batches reference the mapped
+        # pages instead of a heap buffer.
+        source = pa.memory_map(str(spill), "r")
+        return ipc.open_file(source).read_all()
+
+    def _load_from_minio(self, path: str) -> pa.Table | None:
+        if not (self._minio and self._bucket):
+            return None
+        arrow_obj = get_arrow_for_flight_path(path)
+        if not arrow_obj:
+            return None
+        try:
+            logger.info("⬇️ loading %s from MinIO object %s", path, arrow_obj)
+            if self._streaming:
+                spill = self._spill_path(path)
+                tmp = self._spill_tmp(spill)
+                try:
+                    self._minio.fget_object(self._bucket, arrow_obj, str(tmp))
+                    os.replace(tmp, spill)
+                finally:
+                    tmp.unlink(missing_ok=True)
+                return self._open_spill(spill)
+            resp = self._minio.get_object(self._bucket, arrow_obj)
+            data = resp.read()
+            reader = ipc.RecordBatchFileReader(pa.BufferReader(data))
+            return reader.read_all()
+        except S3Error:
+            return None
+
+    def _load_and_cache(self, path: str) -> pa.Table | None:
+        # Another caller may have finished loading while we waited for the
+        # single-flight slot, so look in the cache once more without counting
+        # it as a second miss.
+        if path in self._tables:
+            return self._tables.get(path)
+        table = self._load_from_minio(path)
+        if table is not None:
+            self._cache_table(path, table)
+        return table
+
+    def _cache_table(self, path: str, table: pa.Table) -> None:
+        # A table over the cache budget is served once from its mapping and
+        # not kept, so its spill file would never be evicted either.
+        if not self._tables.put(path, table) and self._streaming:
+            self._discard_spill(path)
+
+    def _get_table(self, path: str) -> pa.Table:
+        table = self._tables.get(path)
+        if table is None:
+            table = self._loads.do(path, lambda: self._load_and_cache(path))
+        if table is None:
+            raise flight.FlightUnavailableError(f"No table for {path}")
+        return table
+
     def do_put(self, context, descriptor, reader, writer):  # type: ignore[override]
         path = self._path(descriptor)
-        table = reader.read_all()
+        if self._streaming:
+            table = self._spill_put(path, reader)
+        else:
+            table = reader.read_all()
         logger.info("💾 storing table %s rows=%d", path, table.num_rows)
-        self._tables[path] = table
+        self._cache_table(path, table)
         writer.write(b"OK")
 
+    def _spill_put(self, path: str, reader) -> pa.Table:
+        """Write incoming batches to the spill file one at a time."""
+        spill = self._spill_path(path)
+        tmp = self._spill_tmp(spill)
+        try:
+            with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, reader.schema) as writer:
+                for chunk in reader:
+                    writer.write_batch(chunk.data)
+            os.replace(tmp, spill)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return self._open_spill(spill)
+
     def do_get(self, context, ticket):  # type: ignore[override]
-        path = ticket.ticket.decode()
+        try:
+            query = FlightQuery.from_ticket(ticket.ticket)
+        except FlightQueryError as exc:
+            raise flight.FlightServerError(str(exc)) from exc
+        path = query.path
         logger.info("🔎 fetching table %s", path)
-        table = self._tables.get(path)
-        if table is None and self._minio and self._bucket:
-            arrow_obj = get_arrow_for_flight_path(path)
-            if arrow_obj:
+        table = self._get_table(path)
+        try:
+            schema = query.output_schema(table.schema)
+        except FlightQueryError as exc:
+            raise flight.FlightServerError(str(exc)) from exc
+        if query.is_passthrough:
+            logger.info("\u2705 returning table %s rows=%d", path, table.num_rows)
+        else:
+            logger.info(
+                "\u2705 returning table %s columns=%s filters=%d limit=%s offset=%d",
+                path,
+                query.columns,
+                len(query.filters),
+                query.limit,
+                query.offset,
+            )
+
+        def _batches():
+            # Keep the entry pinned while the client is still reading it so
+            # the cache accounting matches what is actually held in memory.
+            with self._tables.pinned(path):
                 try:
-                    logger.info("⬇️ loading %s from MinIO object %s", path, arrow_obj)
-                    resp = self._minio.get_object(self._bucket, arrow_obj)
-                    data = resp.read()
-                    reader = ipc.RecordBatchFileReader(pa.BufferReader(data))
-                    table = reader.read_all()
-                    self._tables[path] = table
-                except S3Error:
-                    table = None
-        if table is None:
-            raise flight.FlightUnavailableError(f"No table for {path}")
-        logger.info("\u2705 returning table %s rows=%d", path, table.num_rows)
-        return flight.RecordBatchStream(table)
+                    yield from query.iter_batches(table)
+                except FlightQueryError as exc:
+                    raise flight.FlightServerError(str(exc)) from exc
+
+        return flight.GeneratorStream(schema, _batches())
 
     def get_flight_info(self, context, descriptor):  # type: ignore[override]
         path = self._path(descriptor)
         logger.info("\u2139\ufe0f info request for %s", path)
-        table = self._tables.get(path)
-        if table is None and self._minio and self._bucket:
-            arrow_obj = get_arrow_for_flight_path(path)
-            if arrow_obj:
-                try:
-                    logger.info("⬇️ loading %s from MinIO object %s", path, arrow_obj)
-                    resp = self._minio.get_object(self._bucket, arrow_obj)
-                    data = resp.read()
-                    reader = ipc.RecordBatchFileReader(pa.BufferReader(data))
-                    table = reader.read_all()
-                    self._tables[path] = table
-                except S3Error:
-                    table = None
-        if table is None:
-            raise flight.FlightUnavailableError(f"No table for {path}")
+        table = self._get_table(path)
         logger.info("\u2705 info found for %s rows=%d", path, table.num_rows)
         endpoint = flight.FlightEndpoint(
             ticket=flight.Ticket(path),
@@ -94,6 +238,26 @@ class ArrowFlightServer(flight.FlightServerBase):
         )
         return flight.FlightInfo(table.schema, descriptor, [endpoint], table.num_rows, table.nbytes)
 
+    def list_actions(self, context):  # type: ignore[override]
+        return [
+            ("cache_stats", "Return cache hit/miss/eviction and coalesced load counters"),
+            ("cache_evict", "Drop the table for the given path from the cache"),
+            ("cache_clear", "Drop every unpinned table from the cache"),
+        ]
+
+    def do_action(self, context, action):  # type: ignore[override]
+        if action.type == "cache_stats":
+            payload = {**self._tables.stats(), "loads": self._loads.stats()}
+        elif action.type == "cache_evict":
+            path = action.body.to_pybytes().decode()
+            payload = {"path": path, "evicted": self._tables.pop(path) is not None}
+        elif action.type == "cache_clear":
+            self._tables.clear()
+            payload = self._tables.stats()
+        else:
+            raise flight.FlightServerError(f"Unknown action {action.type}")
+        yield flight.Result(json.dumps(payload).encode())
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     host = os.getenv("FLIGHT_HOST", "0.0.0.0")
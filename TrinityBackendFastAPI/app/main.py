@@ -217,3 +217,10 @@ async def log_env():
             prefix,
         )
     )
+
+
+@app.on_event("shutdown")
+async def stop_worker_pools():
+    from app.DataStorageRetrieval.env_config import shutdown_pools
+
+    shutdown_pools()
@@ -0,0 +1,102 @@
+"""Benchmark the shared forecasting pool against one executor per combination.
+
+Builds ``--combinations`` daily series and fits ``--models`` on each, first the
+way ``forecast_for_combination`` used to (a new ``ProcessPoolExecutor`` per
+combination, one task per model), then through ``forecast_for_combinations``,
+which schedules the whole (combination x model) matrix on the persistent
+pool.  The pool row includes starting the pool; the per-model throughput the
+run reports is printed underneath.
+
+    python benchmarks/bench_autoregressive_pool.py --combinations 40 --workers 4
+    python benchmarks/bench_autoregressive_pool.py --models ARIMA,ETS --days 90
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "build_autoregressive" / "autoregressive"
+PACKAGE = "autoregressive_bench"
+
+
+def _load():
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.base"), importlib.import_module(f"{PACKAGE}.forecast_pool")
+
+
+def make_frames(combinations: int, days: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    frames = []
+    for index in range(combinations):
+        season = 10 * np.sin(np.arange(days) * 2 * np.pi / 7)
+        sales = 200 + index + season + rng.normal(0, 2, days)
+        frames.append(({"combination": index}, pd.DataFrame({"date": dates, "Sales": sales})))
+    return frames
+
+
+def per_combination(base, frames, models, workers: int) -> float:
+    started = time.perf_counter()
+    for _, df in frames:
+        plan, _ = base._prepare_forecast(df.copy(), "Sales", 14, "D", None, models)
+        with ProcessPoolExecutor(max_workers=min(workers, len(models))) as executor:
+            futures = [executor.submit(base.process_model_cpu_bound, **task) for task in plan["tasks"]]
+            [future.result() for future in futures]
+    return time.perf_counter() - started
+
+
+def shared_pool(base, pool, frames, models):
+    started = time.perf_counter()
+    copies = [(combination, df.copy()) for combination, df in frames]
+    result = asyncio.run(base.forecast_for_combinations(copies, "Sales", 14, frequency="D", models_to_run=models))
+    return time.perf_counter() - started, result["throughput"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--combinations", type=int, default=24)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--models", default="ARIMA,Holt-Winters,ETS")
+    parser.add_argument("--workers", type=int, default=min(multiprocessing.cpu_count(), 8))
+    args = parser.parse_args()
+
+    os.environ["FORECAST_POOL_WORKERS"] = str(args.workers)
+    base, pool = _load()
+    models = [m.strip() for m in args.models.split(",")]
+    frames = make_frames(args.combinations, args.days)
+
+    # The fit logs are not what is being measured.
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        old_s = per_combination(base, frames, models, args.workers)
+        new_s, throughput = shared_pool(base, pool, frames, models)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        pool.shutdown()
+
+    fits = args.combinations * len(models)
+    print(f"combinations={args.combinations} models={models} days={args.days} workers={args.workers}")
+    print(f"{'path':<28} {'seconds':>9} {'fits/s':>8}")
+    print(f"{'executor per combination':<28} {old_s:9.2f} {fits / old_s:8.1f}")
+    print(f"{'shared pool, full matrix':<28} {new_s:9.2f} {fits / new_s:8.1f}  ({old_s / new_s:.1f}x)")
+    for name, entry in throughput["models"].items():
+        print(f"  {name:<14} fits={entry['fits']:<5} mean={entry['mean_fit_seconds']}s failed={entry['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark the constrained regression solvers in build_model_feature_based.
+
+Fits every constrained estimator in ``models.py`` on a synthetic MMM-style
+design (``--rows`` weeks, ``--features`` media/price columns plus per-combination
+interaction terms for the stack models) with the original projected gradient
+descent (``solver="gradient"``) and the exact bounded least-squares solver
+(``solver="bounded"``).  For each estimator it prints both runtimes, the
+largest coefficient difference and both objective values; the bounded solver
+is the exact minimiser, so its objective is never larger.
+
+    python benchmarks/bench_constrained_solvers.py --rows 156 --features 12
+    python benchmarks/bench_constrained_solvers.py --iterations 50000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+MODELS_PATH = ROOT / "app" / "features" / "build_model_feature_based" / "models.py"
+
+ESTIMATORS = [
+    "CustomConstrainedRidge",
+    "ConstrainedLinearRegression",
+    "StackConstrainedRidge",
+    "StackConstrainedLinearRegression",
+]
+
+
+def _load_models():
+    spec = importlib.util.spec_from_file_location("feature_based_models", MODELS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_design(rows: int, features: int, combinations: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    base = rng.gamma(2.0, 1.0, size=(rows, features))
+    names = [f"media_{i}" for i in range(features - 1)] + ["price"]
+    dummies = rng.integers(0, 2, size=(rows, combinations))
+    interactions, inter_names = [], []
+    for i, name in enumerate(names):
+        for c in range(combinations):
+            interactions.append(base[:, i] * dummies[:, c])
+            inter_names.append(f"{name}_x_comb_{c}")
+    coef = rng.normal(0.8, 0.6, features)
+    coef[-1] = -1.5
+    Y = base @ coef + 10.0 + rng.normal(0, 1.0, rows)
+    stacked = np.column_stack([base] + interactions)
+    # Price is constrained negative and two media channels positive.
+    negative = ["price"]
+    positive = [names[0], names[1]]
+    coef_all = np.concatenate([coef, rng.normal(0, 0.5, len(inter_names))])
+    Y_stacked = stacked @ coef_all + 10.0 + rng.normal(0, 1.0, rows)
+    return (base, Y, names), (stacked, Y_stacked, names + inter_names), negative, positive
+
+
+def _objective(X, Y, coef, intercept, l2_penalty):
+    residual = Y - X @ coef - intercept
+    return float(residual @ residual + l2_penalty * coef @ coef)
+
+
+def _fit(cls, X, Y, names, repeat, **kwargs):
+    best = float("inf")
+    model = None
+    for _ in range(repeat):
+        model = cls(**kwargs)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.fit(X, Y, names)
+        best = min(best, time.perf_counter() - started)
+    return model, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=156)
+    parser.add_argument("--features", type=int, default=12)
+    parser.add_argument("--combinations", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    models = _load_models()
+    plain, stacked, negative, positive = make_design(args.rows, args.features, args.combinations)
+    print(
+        f"rows={args.rows} features={args.features} stack columns={stacked[0].shape[1]} "
+        f"iterations={args.iterations}"
+    )
+    print(
+        f"{'estimator':<34} {'gradient s':>10} {'bounded s':>10} {'speedup':>8} "
+        f"{'max |dcoef|':>12} {'gradient obj':>14} {'bounded obj':>14}"
+    )
+    for name in ESTIMATORS:
+        X, Y, names = stacked if name.startswith("Stack") else plain
+        cls = getattr(models, name)
+        common = {
+            "negative_constraints": negative,
+            "positive_constraints": positive,
+            "iterations": args.iterations,
+        }
+        gradient, gradient_s = _fit(cls, X, Y, names, args.repeat, solver="gradient", **common)
+        bounded, bounded_s = _fit(cls, X, Y, names, args.repeat, solver="bounded", **common)
+        l2 = getattr(bounded, "l2_penalty", 0.0)
+        diff = float(np.max(np.abs(gradient.coef_ - bounded.coef_)))
+        print(
+            f"{name:<34} {gradient_s:10.4f} {bounded_s:10.4f} {gradient_s / bounded_s:7.0f}x "
+            f"{diff:12.2e} {_objective(X, Y, gradient.coef_, gradient.intercept_, l2):14.4f} "
+            f"{_objective(X, Y, bounded.coef_, bounded.intercept_, l2):14.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
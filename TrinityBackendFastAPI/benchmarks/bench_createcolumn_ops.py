@@ -0,0 +1,201 @@
+"""Benchmark the createcolumn operation planner against the pandas chain.
+
+Builds a weekly panel of ``--groups`` market/brand combinations and times, per
+operation type, the pandas code ``perform_createcolumn_task`` runs for it
+(date parse, sort and the ``group_apply`` loop over the identifiers) next to
+:class:`planner.OperationPlanner`.  The last row runs every operation in one
+plan, which is what a multi-operation request does.  Results of both paths
+are compared before the timings are printed.
+
+    python benchmarks/bench_createcolumn_ops.py --groups 2000 --weeks 156
+    python benchmarks/bench_createcolumn_ops.py --only lag,fiscal_mapping
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+PLANNER_PATH = ROOT / "app" / "features" / "createcolumn" / "planner.py"
+
+IDENTIFIERS = ["market", "brand"]
+
+# name -> (form items, new columns)
+OPERATIONS = {
+    "add": ([("add_0", "volume,price")], ["volume_plus_price"]),
+    "pct_change": ([("pct_change_0", "price,volume")], ["volume_pct_change_from_price"]),
+    "dummy": ([("dummy_0", "brand")], ["brand_dummy"]),
+    "exp": ([("exp_0", "price")], ["price_exp"]),
+    "datetime": ([("datetime_0", "date"), ("datetime_0_param", "to_week")], ["date_week"]),
+    "fiscal_mapping": (
+        [
+            ("fiscal_mapping_0", "date"),
+            ("fiscal_mapping_0_param", "fiscal_quarter"),
+            ("fiscal_mapping_0_fiscal_start_month", "4"),
+        ],
+        ["date_fiscal_quarter"],
+    ),
+    "lag": ([("lag_0", "volume"), ("lag_0_param", "1")], ["volume_lag"]),
+    "growth_rate": ([("growth_rate_0", "price"), ("growth_rate_0_param", "1")], ["price_growth_rate"]),
+    "rolling_mean": ([("rolling_mean_0", "price"), ("rolling_mean_0_param", "4")], ["price_rolling_mean"]),
+    "cumulative_sum": ([("cumulative_sum_0", "volume")], ["volume_cumulative_sum"]),
+}
+
+
+def _load_planner():
+    spec = importlib.util.spec_from_file_location("createcolumn_planner", PLANNER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_frame(groups: int, weeks: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = groups * weeks
+    dates = pd.date_range("2021-01-03", periods=weeks, freq="7D").strftime("%Y-%m-%d")
+    df = pd.DataFrame(
+        {
+            "market": np.repeat([f"market_{i % 25}" for i in range(groups)], weeks),
+            "brand": np.repeat([f"brand_{i // 25}" for i in range(groups)], weeks),
+            "date": np.tile(dates, groups),
+            "volume": rng.integers(0, 1_000, rows),
+            "price": rng.uniform(1.0, 9.0, rows),
+        }
+    )
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+class Form:
+    def __init__(self, items):
+        self._map = dict(items)
+
+    def get(self, key, default=None):
+        return self._map.get(key, default)
+
+
+def _group_apply(frame: pd.DataFrame, func) -> pd.DataFrame:
+    results = [func(group) for _, group in frame.groupby(IDENTIFIERS)]
+    return pd.concat(results, axis=0).sort_index()
+
+
+def _sorted_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["__temp_date__"] = pd.to_datetime(df["date"], errors="coerce")
+    df.sort_values(by="__temp_date__", inplace=True)
+    return df
+
+
+def _window(df: pd.DataFrame, column: str, new_col: str, compute) -> pd.DataFrame:
+    def func(subdf: pd.DataFrame) -> pd.DataFrame:
+        subdf[new_col] = compute(subdf[column])
+        return subdf
+
+    return _group_apply(_sorted_by_date(df), func).drop(columns=["__temp_date__"])
+
+
+def pandas_route(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    # Same pandas code perform_createcolumn_task runs for each operation.
+    df = df.copy()
+    if name == "add":
+        df["volume_plus_price"] = df[["volume", "price"]].sum(axis=1)
+    elif name == "pct_change":
+        df["volume_pct_change_from_price"] = (
+            (df["volume"] - df["price"]) / df["price"].replace(0, np.nan)
+        ) * 100
+    elif name == "dummy":
+        df["brand_dummy"] = pd.Categorical(df["brand"]).codes
+    elif name == "exp":
+        def exp_func(subdf):
+            subdf["price_exp"] = np.exp(subdf["price"])
+            return subdf
+
+        df = _group_apply(df, exp_func)
+    elif name == "datetime":
+        df["date_week"] = pd.to_datetime(df["date"], errors="coerce").dt.isocalendar().week
+    elif name == "fiscal_mapping":
+        def get_fiscal_quarter(dt):
+            if pd.isna(dt):
+                return None
+            fiscal_year = (dt.year + 1) if dt.month >= 4 else dt.year
+            fiscal_month = (dt.month - 4) % 12 + 1
+            return f"FY{fiscal_year % 100:02d}-Q{(fiscal_month - 1) // 3 + 1}"
+
+        df["date_fiscal_quarter"] = pd.to_datetime(df["date"], errors="coerce").apply(get_fiscal_quarter)
+    elif name == "lag":
+        df = _window(df, "volume", "volume_lag", lambda s: s.shift(1))
+    elif name == "growth_rate":
+        df = _window(df, "price", "price_growth_rate", lambda s: ((s - s.shift(1)) / s.shift(1)) * 100)
+    elif name == "rolling_mean":
+        df = _window(df, "price", "price_rolling_mean", lambda s: s.rolling(window=4, min_periods=1).mean())
+    elif name == "cumulative_sum":
+        df = _window(df, "volume", "volume_cumulative_sum", lambda s: s.cumsum())
+    return df
+
+
+def planner_route(planner_module, df: pd.DataFrame, names) -> pd.DataFrame:
+    items = [item for name in names for item in OPERATIONS[name][0]]
+    form = Form(items)
+    planner = planner_module.OperationPlanner(IDENTIFIERS, form.get)
+    for key, value in items:
+        op, _, idx = key.rpartition("_")
+        if not idx.isdigit():
+            continue
+        if planner.plan(df, op, value.split(","), None, idx) is None:
+            raise RuntimeError(f"{op} was not planned")
+    return planner.flush(df)
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def _check(result: pd.DataFrame, expected: pd.DataFrame, columns) -> None:
+    for column in columns:
+        pd.testing.assert_series_equal(
+            result[column], expected[column], check_dtype=False, check_index_type=False, rtol=1e-9
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=2_000)
+    parser.add_argument("--weeks", type=int, default=156)
+    parser.add_argument("--only", help="comma-separated operations to run")
+    parser.add_argument("--skip-pandas", action="store_true", help="only time the planner")
+    args = parser.parse_args()
+
+    planner_module = _load_planner()
+    df = make_frame(args.groups, args.weeks)
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(OPERATIONS)
+
+    print(f"rows={len(df):,} groups={args.groups:,} identifiers={IDENTIFIERS}")
+    print(f"{'operation':<18} {'pandas s':>10} {'polars s':>10} {'speedup':>8}")
+    total_pandas = 0.0
+    for name in names:
+        result, polars_s = _timed(lambda: planner_route(planner_module, df, [name]))
+        pandas_s = None
+        if not args.skip_pandas:
+            expected, pandas_s = _timed(lambda: pandas_route(df, name))
+            _check(result, expected, OPERATIONS[name][1])
+            total_pandas += pandas_s
+        pandas_txt = f"{pandas_s:10.3f}" if pandas_s is not None else f"{'-':>10}"
+        speedup = f"{pandas_s / polars_s:7.1f}x" if pandas_s else f"{'-':>8}"
+        print(f"{name:<18} {pandas_txt} {polars_s:10.3f} {speedup}")
+
+    _, fused_s = _timed(lambda: planner_route(planner_module, df, names))
+    pandas_txt = f"{total_pandas:10.3f}" if total_pandas else f"{'-':>10}"
+    speedup = f"{total_pandas / fused_s:7.1f}x" if total_pandas else f"{'-':>8}"
+    print(f"{'all, one plan':<18} {pandas_txt} {fused_s:10.3f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
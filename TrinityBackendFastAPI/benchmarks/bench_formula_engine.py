@@ -0,0 +1,151 @@
+"""Benchmark the pandas formula engine against native Polars compilation.
+
+Runs one formula per function of ``_FunctionRegistry`` on a synthetic frame
+and reports the end-to-end time of the pandas path of ``/apply_formula``
+(Polars -> pandas conversion, :func:`evaluate_formula`, conversion of the
+result back to a Polars column) next to the compiled ``pl.Expr`` path.
+Formulas without a native lowering are reported as ``fallback``.
+
+    python benchmarks/bench_formula_engine.py --rows 10000000
+    python benchmarks/bench_formula_engine.py --rows 1000000 --only SUM,IF,ZSCORE
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+ROOT = Path(__file__).resolve().parents[1]
+PARSER_PATH = ROOT / "app" / "features" / "dataframe_operations" / "app" / "formula_parser.py"
+
+# One representative formula per registry function.
+FORMULAS = {
+    "SUM": "SUM(Sales, Units)",
+    "AVG": "AVG(Sales, Price)",
+    "MAX": "MAX(Sales, Price)",
+    "MIN": "MIN(Sales)",
+    "PROD": "PROD(Units, Price)",
+    "DIV": "DIV(Sales, Units)",
+    "MEDIAN": "MEDIAN(Sales)",
+    "PERCENTILE": "PERCENTILE(Sales, 0.9)",
+    "STD": "STD(Sales)",
+    "VAR": "VAR(Sales)",
+    "COV": "COV(Sales, Price)",
+    "CORR": "CORR(Sales, Price)",
+    "CUMSUM": "CUMSUM(Units)",
+    "CUMPROD": "CUMPROD(Price / 100 + 1)",
+    "CUMMAX": "CUMMAX(Sales)",
+    "CUMMIN": "CUMMIN(Sales)",
+    "DIFF": "DIFF(Sales, 1)",
+    "PCT_CHANGE": "PCT_CHANGE(Sales)",
+    "LAG": "LAG(Sales, 2)",
+    "ROLLINGSUM": "ROLLINGSUM(Units, 7)",
+    "COUNT": "COUNT(Sales)",
+    "ROUND": "ROUND(Price, 2)",
+    "ZSCORE": "ZSCORE(Sales)",
+    "NORM": "NORM(Price)",
+    "FILLNA": "FILLNA(Sales, 0)",
+    "MAP": "MAP(Region, '{\"north\": \"N\", \"south\": \"S\"}')",
+    "BIN": "BIN(Sales, '[0, 50, 100, 150]')",
+    "DATE_DIFF": "DATE_DIFF(Date, Start)",
+    "ABS": "ABS(Sales - 100)",
+    "FLOOR": "FLOOR(Price)",
+    "CEIL": "CEIL(Price)",
+    "EXP": "EXP(Price / 10)",
+    "LOG": "LOG(Price)",
+    "SQRT": "SQRT(Price)",
+    "IF": "IF(Sales > 100, Sales, 0)",
+    "ISNULL": "ISNULL(Sales)",
+    "LOWER": "LOWER(Region)",
+    "UPPER": "UPPER(Region)",
+    "LEN": "LEN(Region)",
+    "SUBSTR": "SUBSTR(Region, 0, 3)",
+    "STR_REPLACE": "STR_REPLACE(Region, 'north', 'N')",
+    "YEAR": "YEAR(Date)",
+    "MONTH": "MONTH(Date)",
+    "DAY": "DAY(Date)",
+    "WEEKDAY": "WEEKDAY(Date)",
+    "QUARTER": "QUARTER(Date)",
+    "FILLBLANK": "FILLBLANK(Region, 'unknown')",
+}
+
+
+def _load_parser():
+    spec = importlib.util.spec_from_file_location("formula_parser", PARSER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_frame(rows: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    sales = rng.normal(100, 25, rows)
+    sales[rng.random(rows) < 0.05] = np.nan
+    start = np.datetime64("2020-01-01")
+    return pl.DataFrame(
+        {
+            "Sales": sales,
+            "Units": rng.integers(0, 50, rows),
+            "Price": rng.uniform(1, 20, rows),
+            "Region": rng.choice(["north", "south", "east", "west", ""], rows),
+            "Date": start + rng.integers(0, 1500, rows).astype("timedelta64[D]"),
+            "Start": np.full(rows, start),
+        }
+    ).with_columns(pl.col("Sales").fill_nan(None), pl.col("Date").cast(pl.Date), pl.col("Start").cast(pl.Date))
+
+
+def pandas_route(fp, df: pl.DataFrame, formula: str) -> pl.Series:
+    frame = df.to_pandas(use_pyarrow_extension_array=True)
+    result = fp.evaluate_formula(formula, frame)
+    return pl.Series("_r", result.to_list(), strict=False)
+
+
+def polars_route(fp, df: pl.DataFrame, compiled: pl.Expr) -> pl.Series:
+    return fp.finalise_polars_result(df.with_columns(compiled.alias("_r")).get_column("_r"))
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--only", help="comma-separated function names to run")
+    parser.add_argument("--skip-pandas", action="store_true", help="only time the Polars path")
+    args = parser.parse_args()
+
+    fp = _load_parser()
+    df = make_frame(args.rows)
+    names = [n.strip().upper() for n in args.only.split(",")] if args.only else list(FORMULAS)
+
+    print(f"rows={args.rows:,}")
+    print(f"{'function':<12} {'pandas s':>10} {'polars s':>10} {'speedup':>8}")
+    for name in names:
+        formula = FORMULAS[name]
+        compiled = fp.compile_formula(formula, df.schema)
+        polars_s = None
+        if compiled is not None:
+            polars_s = _timed(lambda: polars_route(fp, df, compiled))
+        pandas_s = None
+        if not args.skip_pandas:
+            try:
+                pandas_s = _timed(lambda: pandas_route(fp, df, formula))
+            except fp.FormulaEvaluationError as exc:
+                print(f"{name:<12} pandas error: {exc}")
+        pandas_txt = f"{pandas_s:10.3f}" if pandas_s is not None else f"{'-':>10}"
+        polars_txt = f"{polars_s:10.3f}" if polars_s is not None else f"{'fallback':>10}"
+        speedup = f"{pandas_s / polars_s:7.1f}x" if pandas_s and polars_s else f"{'-':>8}"
+        print(f"{name:<12} {pandas_txt} {polars_txt} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
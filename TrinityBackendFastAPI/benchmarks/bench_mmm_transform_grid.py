@@ -0,0 +1,157 @@
+"""Benchmark the MMM transformation grid: per-combination transforms vs the grid cache.
+
+Builds ``--weeks`` rows with ``--variables`` media columns, each configured
+with ``--decays`` adstock decay rates x ``--growths`` logistic growth rates
+(6 x 5 x 3 by default).  The full cross-product across variables is far too
+large to enumerate (15^6 points for the default), so ``--combinations`` grid
+points are sampled from it, which is what a trainer sweep over the grid does
+per point.
+
+Three timings are printed:
+
+* adstock alone: the original per-value Python loop for every
+  (variable, decay) pair vs one ``adstock_grid`` pass over all of them;
+* the grid: re-transforming every variable for each sampled combination with
+  the loop adstock (the code before the cache) vs ``prepare_grid`` plus the
+  cached ``apply_variable_transformations`` / ``grid_matrix`` calls the
+  trainer makes;
+* the design matrices of both paths are compared before timings are shown.
+
+    python benchmarks/bench_mmm_transform_grid.py
+    python benchmarks/bench_mmm_transform_grid.py --weeks 260 --combinations 2000
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import sys
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "build_model_feature_based"
+PACKAGE = "bench_build_model"
+
+
+def _load_engine_class():
+    # mmm_training imports the MinIO/Mongo clients from .database; the
+    # transformation engine does not use them.
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    database = types.ModuleType(f"{PACKAGE}.database")
+    database.minio_client = None
+    database.save_model_results_enhanced = None
+    sys.modules[PACKAGE] = package
+    sys.modules[f"{PACKAGE}.database"] = database
+    return importlib.import_module(f"{PACKAGE}.mmm_training").MMMTransformationEngine
+
+
+def loop_adstock(x, decay_rate):
+    # apply_adstock_transform before the batched filter.
+    adstock_values = np.zeros_like(x)
+    for i in range(len(x)):
+        if i == 0:
+            adstock_values[i] = x[i]
+        else:
+            adstock_values[i] = x[i] + decay_rate * adstock_values[i - 1]
+    return adstock_values
+
+
+def make_frame(weeks: int, variables: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {f"media_{i}": rng.gamma(2.0, 50.0, weeks) for i in range(variables)}
+    data["price"] = rng.uniform(1.0, 3.0, weeks)
+    data["sales"] = rng.uniform(1_000, 2_000, weeks)
+    return pd.DataFrame(data)
+
+
+def sample_combinations(media, decays, growths, count, seed=0):
+    rng = np.random.default_rng(seed)
+    grid = [(d, g) for d in decays for g in growths]
+    combinations = []
+    for _ in range(count):
+        combo = {"price": {"type": "standard"}}
+        for var in media:
+            decay, growth = grid[rng.integers(len(grid))]
+            combo[var] = {
+                "type": "media",
+                "adstock_decay": decay,
+                "logistic_growth": growth,
+                "logistic_midpoint": 0.0,
+                "logistic_carryover": 0.0,
+            }
+        combinations.append(combo)
+    return combinations
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=156)
+    parser.add_argument("--variables", type=int, default=6)
+    parser.add_argument("--decays", type=int, default=5)
+    parser.add_argument("--growths", type=int, default=3)
+    parser.add_argument("--combinations", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    Engine = _load_engine_class()
+    df = make_frame(args.weeks, args.variables)
+    media = [f"media_{i}" for i in range(args.variables)]
+    decays = list(np.round(np.linspace(0.2, 0.8, args.decays), 3))
+    growths = list(np.round(np.linspace(1.0, 3.0, args.growths), 3))
+    columns = media + ["price"]
+    combinations = sample_combinations(media, decays, growths, args.combinations)
+    print(
+        f"weeks={args.weeks} variables={args.variables} decays={args.decays} growths={args.growths} "
+        f"sampled combinations={len(combinations)}"
+    )
+
+    engine = Engine()
+    loop, loop_s = _timed(lambda: [[loop_adstock(df[v].values, d) for d in decays] for v in media])
+    batch, batch_s = _timed(lambda: engine.adstock_grid(df, {v: decays for v in media}))
+    for v, per_var_loop in zip(media, loop):
+        for d, column in zip(decays, per_var_loop):
+            np.testing.assert_array_equal(batch[(v, d)], column)
+    print(f"{'adstock':<24} {'loop s':>10} {'batched s':>10} {'speedup':>8}")
+    print(f"{'all (variable, decay)':<24} {loop_s:10.4f} {batch_s:10.4f} {loop_s / batch_s:7.1f}x")
+
+    def uncached():
+        reference = Engine()
+        reference.apply_adstock_transform = loop_adstock
+        matrices = []
+        for combo in combinations:
+            transformed_df, _, _ = reference.apply_variable_transformations(df, combo)
+            matrices.append(transformed_df[columns].values)
+        return matrices
+
+    def cached():
+        grid = Engine()
+        grid.prepare_grid(df, combinations)
+        matrices = []
+        for combo in combinations:
+            grid.apply_variable_transformations(df, combo)
+            matrices.append(grid.grid_matrix(df, combo, columns))
+        grid.clear_grid()
+        return matrices
+
+    expected, uncached_s = _timed(uncached)
+    actual, cached_s = _timed(cached)
+    for exp, got in zip(expected, actual):
+        np.testing.assert_allclose(got, exp, rtol=1e-12)
+    print(f"{'grid':<24} {'per-combo s':>10} {'cached s':>10} {'speedup':>8}")
+    print(f"{'transform + matrices':<24} {uncached_s:10.3f} {cached_s:10.3f} {uncached_s / cached_s:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
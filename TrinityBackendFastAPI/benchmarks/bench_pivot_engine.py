@@ -0,0 +1,127 @@
+"""Benchmark the Polars pivot engine against ``pd.pivot_table``.
+
+Builds a synthetic sales frame with three row fields and two column fields
+and times, per aggregation, the pandas call ``compute_pivot`` used to make
+(``pd.pivot_table`` with ``margins=True`` and the weighted-average callable)
+next to :func:`engine.pivot_table`.  Results of both paths are compared
+before the timings are printed.
+
+    python benchmarks/bench_pivot_engine.py --rows 5000000
+    python benchmarks/bench_pivot_engine.py --rows 1000000 --only sum,weighted_average
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+ROOT = Path(__file__).resolve().parents[1]
+ENGINE_PATH = ROOT / "app" / "features" / "pivot_table" / "engine.py"
+
+ROW_FIELDS = ["Region", "Brand", "Channel"]
+COLUMN_FIELDS = ["Year", "Quarter"]
+AGGREGATIONS = ["sum", "mean", "count", "min", "max", "median", "weighted_average"]
+
+
+def _load_engine():
+    spec = importlib.util.spec_from_file_location("pivot_engine", ENGINE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_frame(rows: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    sales = rng.gamma(2.0, 50.0, rows)
+    sales[rng.random(rows) < 0.02] = np.nan
+    return pl.DataFrame(
+        {
+            "Region": rng.choice([f"region_{i}" for i in range(12)], rows),
+            "Brand": rng.choice([f"brand_{i}" for i in range(40)], rows),
+            "Channel": rng.choice(["retail", "online", "wholesale", "direct"], rows),
+            "Year": rng.choice([2021, 2022, 2023, 2024], rows),
+            "Quarter": rng.choice(["Q1", "Q2", "Q3", "Q4"], rows),
+            "Sales": sales,
+            "Volume": rng.uniform(0.0, 10.0, rows),
+        }
+    )
+
+
+def _weighted_average(df: pd.DataFrame, weight: str):
+    # Same callable compute_pivot passes to pandas.
+    def weighted_avg(values):
+        weights = df.loc[values.index, weight]
+        mask = values.notna() & weights.notna() & (weights > 0)
+        valid_values = values[mask]
+        valid_weights = weights[mask]
+        if len(valid_values) == 0 or valid_weights.sum() == 0:
+            return np.nan
+        return (valid_values * valid_weights).sum() / valid_weights.sum()
+
+    return weighted_avg
+
+
+def pandas_route(df: pd.DataFrame, aggregation: str) -> pd.DataFrame:
+    func = _weighted_average(df, "Volume") if aggregation == "weighted_average" else aggregation
+    return pd.pivot_table(
+        df,
+        index=ROW_FIELDS,
+        columns=COLUMN_FIELDS,
+        values=["Sales"],
+        aggfunc={"Sales": func},
+        margins=True,
+        margins_name="Grand Total",
+    )
+
+
+def polars_route(engine, frame: pl.DataFrame, aggregation: str) -> pd.DataFrame:
+    weight = "Volume" if aggregation == "weighted_average" else None
+    return engine.pivot_table(
+        frame,
+        ROW_FIELDS,
+        COLUMN_FIELDS,
+        [engine.ValueSpec("Sales", aggregation, weight)],
+        margins=True,
+        margins_name="Grand Total",
+    )
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--only", help="comma-separated aggregations to run")
+    parser.add_argument("--skip-pandas", action="store_true", help="only time the Polars path")
+    args = parser.parse_args()
+
+    engine = _load_engine()
+    frame = make_frame(args.rows)
+    df = None if args.skip_pandas else frame.to_pandas()
+    names = [n.strip().lower() for n in args.only.split(",")] if args.only else AGGREGATIONS
+
+    print(f"rows={args.rows:,} row fields={ROW_FIELDS} column fields={COLUMN_FIELDS}")
+    print(f"{'aggregation':<18} {'pandas s':>10} {'polars s':>10} {'speedup':>8}")
+    for name in names:
+        expected, pandas_s = (None, None) if df is None else _timed(lambda: pandas_route(df, name))
+        result, polars_s = _timed(lambda: polars_route(engine, frame, name))
+        if expected is not None:
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-6)
+        pandas_txt = f"{pandas_s:10.3f}" if pandas_s is not None else f"{'-':>10}"
+        speedup = f"{pandas_s / polars_s:7.1f}x" if pandas_s else f"{'-':>8}"
+        print(f"{name:<18} {pandas_txt} {polars_s:10.3f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark batched S-curve generation against the list implementation.
+
+For a synthetic set of models, each with a few media variables and their
+transformation steps (adstock → standardisation → logistic, or adstock →
+minmax), times the per-scenario list code the S-curve endpoint used to run
+(``generate_scaled_media_series`` + ``apply_transformation_steps`` per
+scaled series, ``sum`` per total) next to the NumPy kernels in
+``s_curve_kernels`` evaluating all scenarios of all variables as one array.
+Totals of both paths are compared before the timings are printed.
+
+The endpoint's current ``x_range`` is 51 percentage changes over 12 periods.
+
+    python benchmarks/bench_s_curve.py
+    python benchmarks/bench_s_curve.py --models 200 --variables 6 --points 101
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+KERNELS_PATH = ROOT / "app" / "features" / "select_models_feature_based" / "s_curve_kernels.py"
+
+
+def _load_kernels():
+    spec = importlib.util.spec_from_file_location("s_curve_kernels", KERNELS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_models(models: int, variables: int, periods: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for m in range(models):
+        media = []
+        for v in range(variables):
+            series = rng.uniform(10, 200, periods)
+            if (m + v) % 2:
+                steps = [
+                    {"step": "adstock", "decay_rate": float(rng.uniform(0.1, 0.7))},
+                    {"step": "standardization", "scaler_mean": float(series.mean() * 1.5), "scaler_scale": float(series.std() * 2)},
+                    {"step": "logistic", "growth_rate": float(rng.uniform(0.5, 3)), "midpoint": float(rng.normal(0, 0.3))},
+                ]
+            else:
+                steps = [
+                    {"step": "adstock", "decay_rate": float(rng.uniform(0.1, 0.7))},
+                    {"step": "minmax", "scaler_min": float(series.min()), "scaler_scale": float(np.ptp(series) * 2)},
+                ]
+            media.append((series.tolist(), steps, float(rng.uniform(0, 5))))
+        out.append((float(rng.uniform(50, 500)), media))
+    return out
+
+
+def _list_transform(series, steps):
+    # Same element-by-element code apply_transformation_steps used to run.
+    current = series.copy()
+    for step in steps:
+        kind = step.get("step", "")
+        if kind == "adstock":
+            decay_rate = step.get("decay_rate", 0.4)
+            adstock_series = []
+            for i, value in enumerate(current):
+                adstock_series.append(value if i == 0 else value + decay_rate * adstock_series[i - 1])
+            current = adstock_series
+        elif kind == "standardization":
+            mean, scale = step.get("scaler_mean", 0), step.get("scaler_scale", 1)
+            current = [0.0] * len(current) if scale == 0 else [(x - mean) / scale for x in current]
+        elif kind == "logistic":
+            g, mid = step.get("growth_rate", 1.0), step.get("midpoint", 0.0)
+            current = [1 / (1 + np.exp(-g * (x - mid))) for x in current]
+        elif kind == "minmax":
+            lo, scale = step.get("scaler_min", 0), step.get("scaler_scale", 1)
+            current = [0.0] * len(current) if scale == 0 else [(x - lo) / scale for x in current]
+    return current
+
+
+def list_route(models, x_range):
+    totals = []
+    for intercept, media in models:
+        for series, steps, beta in media:
+            scaled_list = [[v * (1 + x / 100.0) for v in series] for x in x_range]
+            volumes = [[intercept + t * beta for t in _list_transform(s, steps)] for s in scaled_list]
+            totals.append([sum(v) for v in volumes])
+    return totals
+
+
+def kernel_route(kernels, models, x_range):
+    totals = []
+    for intercept, media in models:
+        scaled_batch = kernels.scale_media([series for series, _, _ in media], x_range)
+        for (_, steps, beta), scaled in zip(media, scaled_batch):
+            volumes = intercept + kernels.transform(scaled, steps) * beta
+            totals.append(kernels.sequential_sum(volumes).tolist())
+    return totals
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=50)
+    parser.add_argument("--variables", type=int, default=4)
+    parser.add_argument("--points", type=int, default=51, help="percentage changes in x_range")
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    kernels = _load_kernels()
+    models = make_models(args.models, args.variables, args.periods)
+    x_range = np.linspace(-100, 100, args.points).tolist()
+
+    expected = list_route(models, x_range)
+    actual = kernel_route(kernels, models, x_range)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+    legacy = _time(lambda: list_route(models, x_range), args.repeat)
+    batched = _time(lambda: kernel_route(kernels, models, x_range), args.repeat)
+    curves = args.models * args.variables
+    print(f"{curves} curves × {args.points} scenarios × {args.periods} periods")
+    print(f"  lists   {legacy * 1000:9.1f} ms  ({legacy / curves * 1e6:8.1f} µs/curve)")
+    print(f"  numpy   {batched * 1000:9.1f} ms  ({batched / curves * 1e6:8.1f} µs/curve)  x{legacy / batched:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import importlib.util
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# Feature modules import their settings from ``app.DataStorageRetrieval.env_config``
+# and their progress records from ``app.features.shared.task_progress``.
+# Importing them through the ``app`` package would start the whole API, so
+# tests that load feature modules by path get the standalone modules instead.
+_STANDALONE = {
+    "app.DataStorageRetrieval.env_config": ROOT / "app" / "DataStorageRetrieval" / "env_config.py",
+    "app.features.shared.task_progress": ROOT / "app" / "features" / "shared" / "task_progress.py",
+}
+
+for _name, _path in _STANDALONE.items():
+    _spec = importlib.util.spec_from_file_location(_name, _path)
+    _module = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_module)
+    sys.modules.setdefault(_name, _module)
@@ -0,0 +1,101 @@
+import pathlib
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+import pyarrow.ipc as ipc  # noqa: E402
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "app"))
+
+from DataStorageRetrieval import arrow_results  # noqa: E402
+from DataStorageRetrieval.arrow_results import (  # noqa: E402
+    arrow_result_name,
+    encode_arrow_ipc,
+    result_compression,
+    save_arrow_result,
+)
+from DataStorageRetrieval.dataset_cache import dataset_cache  # noqa: E402
+
+
+class FakeMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket, name, data, length, content_type):
+        self.objects[(bucket, name)] = (data.read(), content_type)
+        return SimpleNamespace(etag=f'"etag-{len(self.objects)}"')
+
+    def stat_object(self, bucket, name):
+        return SimpleNamespace(etag=f"etag-{len(self.objects)}")
+
+    def get_object(self, bucket, name):  # pragma: no cover - must not be called
+        raise AssertionError("saved results should be served from the dataset cache")
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "region": ["N", "S", None],
+            "units": pd.array([1, None, 3], dtype="Int64"),
+            "date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01"]),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("a/b_grouped.csv", "a/b_grouped.arrow"),
+        ("a/b.xlsx", "a/b.arrow"),
+        ("a/b.arrow", "a/b.arrow"),
+        ("a/b", "a/b.arrow"),
+    ],
+)
+def test_arrow_result_name(name, expected):
+    assert arrow_result_name(name) == expected
+
+
+@pytest.mark.parametrize("codec", [None, "zstd", "lz4"])
+def test_ipc_round_trip_preserves_schema(codec):
+    table = pa.Table.from_pandas(_frame(), preserve_index=False)
+    payload = encode_arrow_ipc(table, codec)
+    restored = ipc.open_file(pa.BufferReader(payload)).read_all()
+    assert restored.schema.equals(table.schema)
+    result = restored.to_pandas()
+    assert str(result["units"].dtype) == "Int64"
+    assert pd.api.types.is_datetime64_any_dtype(result["date"])
+
+
+def test_result_compression_env(monkeypatch):
+    monkeypatch.setenv("ARROW_RESULT_COMPRESSION", "ZSTD")
+    assert result_compression() == "zstd"
+    monkeypatch.setenv("ARROW_RESULT_COMPRESSION", "gzip")
+    assert result_compression() is None
+    monkeypatch.delenv("ARROW_RESULT_COMPRESSION")
+    assert result_compression() is None
+
+
+def test_save_registers_and_primes_cache(monkeypatch):
+    registered = []
+    fake_registry = types.ModuleType("DataStorageRetrieval.flight_registry")
+    fake_registry.set_ticket = lambda *args: registered.append(args)
+    monkeypatch.setitem(sys.modules, "DataStorageRetrieval.flight_registry", fake_registry)
+    dataset_cache.clear()
+
+    client = FakeMinio()
+    saved = save_arrow_result(client, "trinity", "p/groupby/out.arrow", _frame(), compression="zstd")
+
+    payload, content_type = client.objects[("trinity", "p/groupby/out.arrow")]
+    assert content_type == arrow_results.ARROW_CONTENT_TYPE
+    assert saved["size"] == len(payload) and saved["compression"] == "zstd"
+    assert registered == [("p/groupby/out.arrow",) * 3 + ("out.arrow",)]
+
+    table = dataset_cache.load(client, "trinity", "p/groupby/out.arrow", "merge")
+    assert table.num_rows == 3
+    dataset_cache.clear()
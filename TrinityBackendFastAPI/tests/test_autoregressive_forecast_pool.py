@@ -0,0 +1,103 @@
+import asyncio
+import importlib
+import pathlib
+import sys
+import types
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("statsmodels")
+pytest.importorskip("sklearn")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "build_autoregressive" / "autoregressive"
+PACKAGE = "autoregressive_pool_under_test"
+MODELS = ["ARIMA", "Holt-Winters", "ETS"]
+
+
+def _load(monkeypatch, workers, batch_size=8):
+    monkeypatch.setenv("FORECAST_POOL_WORKERS", str(workers))
+    monkeypatch.setenv("FORECAST_BATCH_SIZE", str(batch_size))
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    monkeypatch.setitem(sys.modules, PACKAGE, package)
+    for name in ("base", "forecast_pool"):
+        monkeypatch.delitem(sys.modules, f"{PACKAGE}.{name}", raising=False)
+    base = importlib.import_module(f"{PACKAGE}.base")
+    pool = importlib.import_module(f"{PACKAGE}.forecast_pool")
+    return base, pool
+
+
+def _frames(count=4, days=60):
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    frames = []
+    for index in range(count):
+        season = 10 * np.sin(np.arange(days) * 2 * np.pi / 7)
+        sales = 200 + 5 * index + season + rng.normal(0, 1, days)
+        frames.append(({"Market": f"m{index}"}, pd.DataFrame({"date": dates, "Sales": sales})))
+    return frames
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _copy(frames):
+    return [(combination, df.copy()) for combination, df in frames]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_matrix_matches_single_combination(monkeypatch, workers):
+    base, pool = _load(monkeypatch, workers)
+    frames = _frames()
+    try:
+        single = [
+            _run(base.forecast_for_combination(df, "sales", frequency="D", combination=combination, models_to_run=MODELS))
+            for combination, df in _copy(frames)
+        ]
+        batched = _run(base.forecast_for_combinations(_copy(frames), "sales", frequency="D", models_to_run=MODELS))
+    finally:
+        pool.shutdown()
+
+    assert [r["combination"] for r in batched["results"]] == [c for c, _ in frames]
+    for expected, actual in zip(single, batched["results"]):
+        assert actual["status"] == expected["status"] == "SUCCESS"
+        assert actual["models_run"] == expected["models_run"] == MODELS
+        pd.testing.assert_frame_equal(pd.DataFrame(actual["forecast_df"]), pd.DataFrame(expected["forecast_df"]))
+        assert actual["metrics"].keys() == expected["metrics"].keys()
+
+    throughput = batched["throughput"]
+    assert throughput["total_fits"] == len(frames) * len(MODELS)
+    assert {name: entry["fits"] for name, entry in throughput["models"].items()} == {m: len(frames) for m in MODELS}
+
+
+def test_failed_combinations_keep_their_position(monkeypatch):
+    base, pool = _load(monkeypatch, 1)
+    frames = _frames(count=2)
+    frames.insert(1, ({"Market": "empty"}, pd.DataFrame({"date": [], "Sales": []})))
+    try:
+        result = _run(base.forecast_for_combinations(frames, "sales", frequency="D", models_to_run=["ARIMA"]))
+    finally:
+        pool.shutdown()
+
+    statuses = [r["status"] for r in result["results"]]
+    assert statuses == ["SUCCESS", "FAILURE", "SUCCESS"]
+    assert "No data found" in result["results"][1]["error"]
+    assert result["throughput"]["models"]["ARIMA"]["fits"] == 2
+
+
+def test_plan_batches_packs_short_series_slowest_first(monkeypatch):
+    _, pool = _load(monkeypatch, 1, batch_size=2)
+    monkeypatch.setenv("FORECAST_BATCH_POINTS", "50")
+    tasks = [
+        {"model_name": "ARIMA", "points": 36},
+        {"model_name": "SARIMA", "points": 36},
+        {"model_name": "ARIMA", "points": 36},
+        {"model_name": "ARIMA", "points": 36},
+        {"model_name": "SARIMA", "points": 200},
+    ]
+
+    assert pool.plan_batches(tasks) == [[1], [4], [0, 2], [3]]
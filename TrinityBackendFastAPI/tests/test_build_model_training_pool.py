@@ -0,0 +1,110 @@
+import asyncio
+import importlib
+import os
+import pathlib
+import sys
+import time
+import types
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "build_model_feature_based"
+PACKAGE = "build_model_pool_under_test"
+
+
+def train_models_for_frame(df, file_key, x_variables, y_variable, delay=0.0, **kwargs):
+    time.sleep(delay)
+    return [{"file_key": file_key, "rows": len(df), "pid": os.getpid(), "kwargs": sorted(kwargs)}], {}
+
+
+async def train_models_for_combination_enhanced(file_key, **kwargs):
+    return [{"file_key": file_key, "pid": os.getpid(), "inline": True}], {}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    database = types.ModuleType(f"{PACKAGE}.database")
+    database.train_models_for_frame = train_models_for_frame
+    database.train_models_for_combination_enhanced = train_models_for_combination_enhanced
+    monkeypatch.setitem(sys.modules, PACKAGE, package)
+    monkeypatch.setitem(sys.modules, f"{PACKAGE}.database", database)
+    monkeypatch.delitem(sys.modules, f"{PACKAGE}.training_pool", raising=False)
+    module = importlib.import_module(f"{PACKAGE}.training_pool")
+    yield module
+    module.shutdown()
+
+
+def _frame():
+    return pd.DataFrame({"price": [1.0, 2.0, 3.0], "volume": [3.0, 2.0, 1.0]})
+
+
+def test_combinations_train_in_worker_processes(monkeypatch, pool):
+    monkeypatch.setenv("BUILD_MODEL_TRAIN_WORKERS", "2")
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                pool.train_combination(
+                    _frame(), run_id="run", file_key=f"c{i}.arrow", x_variables=["price"],
+                    y_variable="volume", bucket_name="trinity", k_folds=3,
+                )
+                for i in range(4)
+            )
+        )
+
+    outcomes = asyncio.run(run())
+    assert [results[0]["file_key"] for results, _ in outcomes] == [f"c{i}.arrow" for i in range(4)]
+    assert all(results[0]["pid"] != os.getpid() for results, _ in outcomes)
+    assert outcomes[0][0][0]["rows"] == 3
+    assert outcomes[0][0][0]["kwargs"] == ["k_folds"]
+    assert pool.max_inflight() == 4
+
+
+def test_shutdown_pools_stops_the_training_pool(monkeypatch, pool):
+    from app.DataStorageRetrieval.env_config import shutdown_pools
+
+    monkeypatch.setenv("BUILD_MODEL_TRAIN_WORKERS", "1")
+    asyncio.run(pool.train_combination(_frame(), file_key="c.arrow", x_variables=["price"], y_variable="volume"))
+    assert pool._pool.executor is not None
+    shutdown_pools()
+    assert pool._pool.executor is None
+
+
+def test_zero_workers_keeps_in_loop_training(monkeypatch, pool):
+    monkeypatch.setenv("BUILD_MODEL_TRAIN_WORKERS", "0")
+    results, _ = asyncio.run(
+        pool.train_combination(_frame(), file_key="c.arrow", x_variables=["price"], y_variable="volume")
+    )
+    assert results[0]["inline"] and results[0]["pid"] == os.getpid()
+    assert pool.max_inflight() == 1
+
+
+def test_cancel_abandons_waiting_fits(monkeypatch, pool):
+    monkeypatch.setenv("BUILD_MODEL_TRAIN_WORKERS", "1")
+
+    async def run():
+        tasks = [
+            asyncio.ensure_future(
+                pool.train_combination(
+                    _frame(), run_id="run-c", file_key=f"c{i}.arrow", x_variables=["price"],
+                    y_variable="volume", delay=0.5,
+                )
+            )
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.1)
+        abandoned = pool.request_cancel("run-c")
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return abandoned, outcomes
+
+    abandoned, outcomes = asyncio.run(run())
+    assert abandoned == 3
+    assert all(isinstance(outcome, asyncio.CancelledError) for outcome in outcomes)
+    assert pool.is_cancelled("run-c")
+    pool.forget_run("run-c")
+    assert not pool.is_cancelled("run-c")
@@ -0,0 +1,85 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+sklearn_linear = pytest.importorskip("sklearn.linear_model")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODELS_PATH = ROOT / "app" / "features" / "build_model_feature_based" / "models.py"
+
+
+def _load_models():
+    spec = importlib.util.spec_from_file_location("constrained_models_under_test", MODELS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+models = _load_models()
+
+
+def _data(rows=120, seed=3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 5))
+    coef = np.array([1.5, -0.8, 0.6, 0.0, 2.0])
+    Y = X @ coef + 4.0 + rng.normal(0, 0.3, rows)
+    return X, Y, ["price", "tv", "radio", "promo", "base"]
+
+
+def _objective(X, Y, coef, intercept, l2_penalty):
+    residual = Y - X @ coef - intercept
+    return residual @ residual + l2_penalty * coef @ coef
+
+
+def test_unconstrained_bounded_solver_matches_sklearn():
+    X, Y, names = _data()
+    ridge = models.CustomConstrainedRidge(l2_penalty=2.5).fit(X, Y, names)
+    reference = sklearn_linear.Ridge(alpha=2.5).fit(X, Y)
+    np.testing.assert_allclose(ridge.coef_, reference.coef_, atol=1e-9)
+    assert ridge.intercept_ == pytest.approx(reference.intercept_)
+
+    ols = models.ConstrainedLinearRegression().fit(X, Y, names)
+    reference = sklearn_linear.LinearRegression().fit(X, Y)
+    np.testing.assert_allclose(ols.coef_, reference.coef_, atol=1e-9)
+    assert ols.intercept_ == pytest.approx(reference.intercept_)
+
+
+@pytest.mark.parametrize("cls", ["CustomConstrainedRidge", "ConstrainedLinearRegression"])
+def test_bounded_solver_respects_signs_and_beats_gradient(cls):
+    X, Y, names = _data()
+    # Wrong-signed constraints force both bounds to be active.
+    kwargs = {"negative_constraints": ["Price"], "positive_constraints": ["tv"]}
+    bounded = getattr(models, cls)(**kwargs).fit(X, Y, names)
+    gradient = getattr(models, cls)(solver="gradient", **kwargs).fit(X, Y, names)
+
+    assert bounded.validate_constraints()
+    assert bounded.coef_[0] == pytest.approx(0.0, abs=1e-12)
+    assert bounded.coef_[1] == pytest.approx(0.0, abs=1e-12)
+    l2 = getattr(bounded, "l2_penalty", 0.0)
+    assert _objective(X, Y, bounded.coef_, bounded.intercept_, l2) <= (
+        _objective(X, Y, gradient.coef_, gradient.intercept_, l2) + 1e-9
+    )
+    np.testing.assert_allclose(bounded.coef_, gradient.coef_, atol=1e-2)
+
+
+@pytest.mark.parametrize("cls", ["StackConstrainedRidge", "StackConstrainedLinearRegression"])
+def test_stack_bounded_solver_enforces_combination_constraints(cls):
+    rng = np.random.default_rng(8)
+    rows = 200
+    base = rng.normal(size=(rows, 2))
+    dummies = rng.integers(0, 2, size=(rows, 2))
+    X = np.column_stack([base, base[:, [0]] * dummies, base[:, [1]] * dummies])
+    names = ["tv", "price", "tv_x_comb_a", "tv_x_comb_b", "price_x_comb_a", "price_x_comb_b"]
+    coef = np.array([0.5, -1.0, -1.2, 0.3, 1.6, 0.2])
+    Y = X @ coef + 1.0 + rng.normal(0, 0.1, rows)
+
+    model = getattr(models, cls)(negative_constraints=["price"], positive_constraints=["tv"]).fit(X, Y, names)
+    W = model.coef_
+    assert W[1] + W[4] <= 1e-10 and W[1] + W[5] <= 1e-10
+    assert W[0] + W[2] >= -1e-10 and W[0] + W[3] >= -1e-10
+
+    clone = model.__sklearn_clone__()
+    assert clone.solver == "bounded" and clone.get_params()["solver"] == "bounded"
@@ -0,0 +1,190 @@
+import importlib.util
+import io
+import pathlib
+import sys
+import types
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("polars")
+pytest.importorskip("statsmodels")
+pytest.importorskip("sklearn")
+pytest.importorskip("pymongo")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "createcolumn"
+PACKAGE = "createcolumn_fits_under_test"
+
+
+class FakeMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket_name, object_name, data, length, content_type):
+        self.objects[object_name] = data.read()
+
+
+class FakeStore:
+    def __init__(self):
+        self.records = {}
+        self.history = []
+
+    def create(self, task_id, name, metadata=None):
+        self.records[task_id] = {"task_id": task_id, "name": name, "status": "pending"}
+
+    def update(self, task_id, **changes):
+        record = self.records.setdefault(task_id, {"task_id": task_id})
+        metadata = changes.pop("metadata", None)
+        if metadata:
+            record.setdefault("metadata", {}).update(metadata)
+        record.update(changes)
+        self.history.append(dict(record))
+        return record
+
+
+def _load_service(monkeypatch, frame, store):
+    client = FakeMinio()
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    deps = types.ModuleType(f"{PACKAGE}.deps")
+    deps.MINIO_BUCKET = "trinity"
+    deps.get_minio_df = lambda bucket, name: frame.copy()
+    deps.minio_client = client
+    deps.redis_client = None
+    deps.redis_classifier_config = None
+    spec = importlib.util.spec_from_file_location("app.core.mongo", ROOT / "app" / "core" / "mongo.py")
+    mongo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mongo)
+    task_results = types.ModuleType("app.core.task_results")
+    task_results.task_result_store = store
+    monkeypatch.setitem(sys.modules, PACKAGE, package)
+    monkeypatch.setitem(sys.modules, f"{PACKAGE}.deps", deps)
+    monkeypatch.setitem(sys.modules, "app.core.mongo", mongo)
+    monkeypatch.setitem(sys.modules, "app.core.task_results", task_results)
+    for name in ("service", "planner", "group_fits"):
+        monkeypatch.delitem(sys.modules, f"{PACKAGE}.{name}", raising=False)
+    return importlib.import_module(f"{PACKAGE}.service"), client
+
+
+def _frame(groups=6, weeks=40):
+    rng = np.random.default_rng(11)
+    dates = pd.date_range("2022-01-02", periods=weeks, freq="7D").strftime("%Y-%m-%d")
+    pieces = []
+    for group in range(groups):
+        season = np.sin(np.arange(weeks) * 2 * np.pi / 4) * 10
+        volume = 100 + season + rng.normal(0, 2, weeks)
+        volume[rng.integers(0, weeks)] += 80
+        pieces.append(
+            pd.DataFrame(
+                {
+                    "Market": f"m{group % 3}",
+                    "Brand": f"b{group // 3}",
+                    "Date": dates,
+                    "Volume": volume,
+                    "Price": rng.uniform(1.0, 3.0, weeks),
+                }
+            )
+        )
+    return pd.concat(pieces, ignore_index=True).sample(frac=1.0, random_state=5).reset_index(drop=True)
+
+
+OPERATIONS = [
+    ("residual_0", "volume,price"),
+    ("detrend_1", "volume,price"),
+    ("detrend_1_period", "4"),
+    ("deseasonalize_2", "volume"),
+    ("deseasonalize_2_period", "4"),
+    ("stl_outlier_3", "volume"),
+]
+
+
+def _run(monkeypatch, workers, run_id=None, store=None):
+    monkeypatch.setenv("CREATECOLUMN_FIT_WORKERS", str(workers))
+    monkeypatch.setenv("CREATECOLUMN_FIT_MIN_GROUPS", "1")
+    store = store or FakeStore()
+    service, client = _load_service(monkeypatch, _frame(), store)
+    try:
+        result = service.perform_createcolumn_task(
+            bucket_name="trinity",
+            object_name="data.arrow",
+            object_prefix="",
+            identifiers="market,brand",
+            form_items=OPERATIONS,
+            run_id=run_id,
+        )
+    finally:
+        service.group_fits.shutdown()
+    return result, pd.read_csv(io.BytesIO(client.objects[result["result_file"]]))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_group_fits_match_group_apply(monkeypatch, workers):
+    expected_result, expected = _run(monkeypatch, 0)
+    result, actual = _run(monkeypatch, workers)
+
+    assert result["new_columns"] == expected_result["new_columns"]
+    assert actual["is_outlier"].sum() > 0
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9, atol=1e-9)
+
+
+def test_group_fits_reuse_one_pool_and_skip_it_in_daemon_processes(monkeypatch):
+    monkeypatch.setenv("CREATECOLUMN_FIT_WORKERS", "2")
+    monkeypatch.setenv("CREATECOLUMN_FIT_MIN_GROUPS", "1")
+    service, _ = _load_service(monkeypatch, _frame(), FakeStore())
+    group_fits = service.group_fits
+    frame = _frame()
+    layout = group_fits.group_layout(frame, ["Market", "Brand"])
+    values = frame[["Volume", "Price"]].to_numpy()
+    params = {"y": "Volume", "x": ["Price"]}
+    try:
+        pooled = group_fits.run_group_fits(group_fits.RESIDUAL, values, layout, params)
+        executor = group_fits._pool.executor
+        assert executor is not None
+        group_fits.run_group_fits(group_fits.RESIDUAL, values, layout, params)
+        assert group_fits._pool.executor is executor
+
+        group_fits.shutdown()
+        daemon = types.SimpleNamespace(daemon=True)
+        monkeypatch.setattr(group_fits.multiprocessing, "current_process", lambda: daemon)
+        in_process = group_fits.run_group_fits(group_fits.RESIDUAL, values, layout, params)
+        assert group_fits._pool.executor is None
+        np.testing.assert_allclose(in_process, pooled, rtol=1e-12)
+    finally:
+        group_fits.shutdown()
+
+
+def test_group_fits_publish_progress(monkeypatch):
+    store = FakeStore()
+    _run(monkeypatch, 2, run_id="run-1", store=store)
+
+    record = store.records["run-1"]
+    assert record["status"] == "success"
+    assert record["metadata"]["fits"]["residual_0"] == {"groups_done": 6, "groups_total": 6}
+    assert set(record["metadata"]["fits"]) == {"residual_0", "detrend_1", "deseasonalize_2", "stl_outlier_3"}
+    assert any(entry["status"] == "running" for entry in store.history)
+
+
+def test_group_fit_errors_mark_the_run_failed(monkeypatch):
+    monkeypatch.setenv("CREATECOLUMN_FIT_WORKERS", "2")
+    monkeypatch.setenv("CREATECOLUMN_FIT_MIN_GROUPS", "1")
+    store = FakeStore()
+    frame = _frame()
+    frame.loc[(frame["Market"] == "m1") & (frame["Brand"] == "b0"), "Volume"] = np.nan
+    service, _ = _load_service(monkeypatch, frame, store)
+    with pytest.raises(Exception, match="Residual calculation failed"):
+        try:
+            service.perform_createcolumn_task(
+                bucket_name="trinity",
+                object_name="data.arrow",
+                object_prefix="",
+                identifiers="market,brand",
+                form_items=[("residual_0", "volume,price")],
+                run_id="run-2",
+            )
+        finally:
+            service.group_fits.shutdown()
+    record = store.records["run-2"]
+    assert record["status"] == "failure"
+    assert "Residual calculation failed" in record["error"]
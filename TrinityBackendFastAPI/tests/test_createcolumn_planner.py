@@ -0,0 +1,188 @@
+import importlib.util
+import io
+import pathlib
+import sys
+import types
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("polars")
+pytest.importorskip("statsmodels")
+pytest.importorskip("sklearn")
+pytest.importorskip("pymongo")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "createcolumn"
+PACKAGE = "createcolumn_under_test"
+
+
+class FakeMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket_name, object_name, data, length, content_type):
+        self.objects[object_name] = data.read()
+
+
+def _load_service(monkeypatch, frame):
+    client = FakeMinio()
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    deps = types.ModuleType(f"{PACKAGE}.deps")
+    deps.MINIO_BUCKET = "trinity"
+    deps.get_minio_df = lambda bucket, name: frame.copy()
+    deps.minio_client = client
+    deps.redis_client = None
+    deps.redis_classifier_config = None
+    spec = importlib.util.spec_from_file_location("app.core.mongo", ROOT / "app" / "core" / "mongo.py")
+    mongo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mongo)
+    monkeypatch.setitem(sys.modules, PACKAGE, package)
+    monkeypatch.setitem(sys.modules, f"{PACKAGE}.deps", deps)
+    monkeypatch.setitem(sys.modules, "app.core.mongo", mongo)
+    monkeypatch.delitem(sys.modules, f"{PACKAGE}.service", raising=False)
+    monkeypatch.delitem(sys.modules, f"{PACKAGE}.planner", raising=False)
+    service = importlib.import_module(f"{PACKAGE}.service")
+    return service, client
+
+
+def _frame(rows_per_group=30):
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2023-01-01", periods=rows_per_group, freq="7D")
+    pieces = []
+    for market in ["north", "south"]:
+        for brand in ["a", "b", "c"]:
+            piece = pd.DataFrame(
+                {
+                    "Market": market,
+                    "Brand": brand,
+                    "Date": dates.strftime("%Y-%m-%d"),
+                    "Volume": rng.integers(0, 100, rows_per_group),
+                    "Price": rng.uniform(1.0, 5.0, rows_per_group).round(3),
+                }
+            )
+            pieces.append(piece)
+    df = pd.concat(pieces, ignore_index=True)
+    df.loc[5, "Price"] = np.nan
+    df.loc[7, "Volume"] = 0
+    # Shuffle so grouped operations have to restore the index order.
+    return df.sample(frac=1.0, random_state=3).reset_index(drop=True)
+
+
+OPERATIONS = [
+    ("add_0", "volume,price"),
+    ("subtract_1", "volume,price"),
+    ("divide_2", "price,volume"),
+    ("pct_change_3", "price,volume"),
+    ("log_4", "price"),
+    ("power_5", "price"),
+    ("power_5_param", "2"),
+    ("dummy_6", "brand"),
+    ("exp_7", "price"),
+    ("datetime_8", "date"),
+    ("datetime_8_param", "to_week"),
+    ("datetime_9", "date"),
+    ("datetime_9_param", "to_month_name"),
+    ("fiscal_mapping_10", "date"),
+    ("fiscal_mapping_10_param", "fiscal_quarter"),
+    ("fiscal_mapping_10_fiscal_start_month", "4"),
+    ("is_month_end_11", "date"),
+    ("lag_12", "volume"),
+    ("lag_12_param", "2"),
+    ("growth_rate_13", "price"),
+    ("growth_rate_13_param", "1"),
+    ("rolling_mean_14", "price"),
+    ("rolling_mean_14_param", "3"),
+    ("cumulative_sum_15", "volume"),
+    ("diff_16", "volume_plus_price"),
+    ("diff_16_param", "1"),
+]
+
+
+def _run(monkeypatch, engine, identifiers, operations, frame):
+    monkeypatch.setenv("CREATECOLUMN_ENGINE", engine)
+    service, client = _load_service(monkeypatch, frame)
+    result = service.perform_createcolumn_task(
+        bucket_name="trinity",
+        object_name="data.arrow",
+        object_prefix="",
+        identifiers=identifiers,
+        form_items=operations,
+    )
+    csv = client.objects[result["result_file"]]
+    return result, pd.read_csv(io.BytesIO(csv))
+
+
+@pytest.mark.parametrize("identifiers", ["market,brand", ""])
+def test_planner_matches_pandas_chain(monkeypatch, identifiers):
+    frame = _frame()
+    if not identifiers:
+        frame = frame[(frame["Market"] == "north") & (frame["Brand"] == "a")].reset_index(drop=True)
+    expected_result, expected = _run(monkeypatch, "pandas", identifiers, OPERATIONS, frame)
+    result, actual = _run(monkeypatch, "polars", identifiers, OPERATIONS, frame)
+
+    assert result["new_columns"] == expected_result["new_columns"]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_tied_dates_keep_their_row_order(monkeypatch):
+    # Ungrouped time-series operations leave the frame sorted by date; rows
+    # sharing a date stay in their original order on both engines.
+    rng = np.random.default_rng(11)
+    frame = pd.DataFrame(
+        {
+            "Date": pd.Series(pd.date_range("2024-01-01", periods=5, freq="D").strftime("%Y-%m-%d"))
+            .sample(n=600, replace=True, random_state=5)
+            .to_numpy(),
+            "Volume": np.arange(600),
+            "Price": rng.uniform(1.0, 5.0, 600).round(3),
+        }
+    )
+    operations = [("lag_0", "volume"), ("lag_0_param", "1"), ("cumulative_sum_1", "price")]
+    _, expected = _run(monkeypatch, "pandas", "", operations, frame)
+    _, actual = _run(monkeypatch, "polars", "", operations, frame)
+
+    assert expected["volume"].tolist() == frame.sort_values("Date", kind="stable")["Volume"].tolist()
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_statsmodels_operation_flushes_pending_plan(monkeypatch):
+    frame = _frame()
+    operations = [
+        ("add_0", "volume,price"),
+        ("residual_1", "volume,price"),
+        ("lag_2", "Res_volume"),
+        ("lag_2_param", "1"),
+        ("lag_2_rename", "res_lag"),
+    ]
+    expected_result, expected = _run(monkeypatch, "pandas", "market,brand", operations, frame)
+    result, actual = _run(monkeypatch, "polars", "market,brand", operations, frame)
+
+    assert result["new_columns"] == expected_result["new_columns"] == ["volume_plus_price", "Res_volume", "res_lag"]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_missing_identifier_values_fall_back_to_pandas(monkeypatch):
+    frame = _frame()
+    frame.loc[3, "Brand"] = None
+    operations = [("lag_0", "volume"), ("lag_0_param", "1")]
+    _, expected = _run(monkeypatch, "pandas", "market,brand", operations, frame)
+    _, actual = _run(monkeypatch, "polars", "market,brand", operations, frame)
+
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_planner_raises_the_chain_validation_errors(monkeypatch):
+    frame = _frame()
+    monkeypatch.setenv("CREATECOLUMN_ENGINE", "polars")
+    service, _ = _load_service(monkeypatch, frame)
+    with pytest.raises(ValueError, match="Period must be at least 1 for lag operation"):
+        service.perform_createcolumn_task(
+            bucket_name="trinity",
+            object_name="data.arrow",
+            object_prefix="",
+            identifiers="market",
+            form_items=[("lag_0", "volume"), ("lag_0_param", "0")],
+        )
@@ -0,0 +1,61 @@
+import importlib.util
+import pathlib
+import sys
+import types
+
+import pytest
+
+pl = pytest.importorskip("polars")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def load_service(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_STORE_DIR", str(tmp_path))
+    for pkg in ["app", "app.features", "app.features.shared", "app.features.dataframe_operations"]:
+        if pkg not in sys.modules:
+            mod = types.ModuleType(pkg)
+            mod.__path__ = [str(ROOT.joinpath(*pkg.split(".")))]
+            sys.modules[pkg] = mod
+    spec = importlib.util.spec_from_file_location(
+        "dataframe_operations_service", ROOT / "app/features/dataframe_operations/service.py"
+    )
+    service = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(service)  # type: ignore
+    return service
+
+
+def test_payload_without_viewport_returns_all_rows(tmp_path, monkeypatch):
+    service = load_service(tmp_path, monkeypatch)
+    df = pl.DataFrame({"a": list(range(10)), "b": list("abcdefghij")})
+    payload = service.dataframe_payload(df, "id")
+    assert len(payload["rows"]) == 10
+    assert "window" not in payload
+
+
+def test_payload_with_viewport_returns_only_window(tmp_path, monkeypatch):
+    service = load_service(tmp_path, monkeypatch)
+    df = pl.DataFrame({"a": list(range(1000)), "b": [str(i) for i in range(1000)]})
+    payload = service.dataframe_payload(df, "id", {"offset": 100, "limit": 3, "columns": ["b"]})
+    assert payload["row_count"] == 1000
+    assert payload["headers"] == ["a", "b"]
+    assert payload["rows"] == [{"b": "100"}, {"b": "101"}, {"b": "102"}]
+    assert payload["window"]["row_count"] == 3
+
+    columnar = service.dataframe_payload(df, "id", {"offset": 998, "limit": 5, "format": "columnar"})
+    assert columnar["columns"] == {"a": [998, 999], "b": ["998", "999"]}
+    assert "rows" not in columnar
+
+
+def test_sort_applies_viewport(tmp_path, monkeypatch):
+    service = load_service(tmp_path, monkeypatch)
+    service.SESSIONS["df"] = pl.DataFrame({"a": [3, 1, 2]})
+    payload = service.sort_dataframe("df", "a", viewport={"limit": 1})
+    assert payload["rows"] == [{"a": 1}]
+    assert service.SESSIONS["df"]["a"].to_list() == [1, 2, 3]
+
+
+def test_invalid_viewport_format_is_rejected(tmp_path, monkeypatch):
+    service = load_service(tmp_path, monkeypatch)
+    with pytest.raises(ValueError):
+        service.dataframe_payload(pl.DataFrame({"a": [1]}), "id", {"format": "xml"})
@@ -0,0 +1,119 @@
+import io
+import pathlib
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+pl = pytest.importorskip("polars")
+import pyarrow.ipc as ipc  # noqa: E402
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "app"))
+
+from DataStorageRetrieval.dataset_cache import (  # noqa: E402
+    DatasetCache,
+    UnsupportedDatasetFormat,
+    decode_table,
+)
+
+
+class _Response:
+    def __init__(self, payload: bytes):
+        self._payload = payload
+
+    def read(self) -> bytes:
+        return self._payload
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeMinio:
+    def __init__(self):
+        self.objects = {}
+        self.gets = 0
+        self._lock = threading.Lock()
+
+    def put(self, bucket, name, payload):
+        self.objects[(bucket, name)] = payload
+
+    def stat_object(self, bucket, name):
+        payload = self.objects[(bucket, name)]
+        return SimpleNamespace(etag=str(hash(payload)))
+
+    def get_object(self, bucket, name):
+        with self._lock:
+            self.gets += 1
+        return _Response(self.objects[(bucket, name)])
+
+
+def _arrow_bytes(frame: "pd.DataFrame") -> bytes:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_objects_are_decoded_once_across_features():
+    client = FakeMinio()
+    client.put("trinity", "p/sales.arrow", _arrow_bytes(pd.DataFrame({"a": [1, 2, 3]})))
+    cache = DatasetCache(max_bytes=10**6, enabled=True)
+
+    for feature in ("groupby", "pivot_table", "correlation"):
+        table = cache.load(client, "trinity", "p/sales.arrow", feature)
+        assert table.column("a").to_pylist() == [1, 2, 3]
+
+    assert client.gets == 1
+    stats = cache.stats()["features"]
+    assert stats["groupby"]["misses"] == 1
+    assert stats["pivot_table"]["hits"] == 1
+    assert stats["correlation"]["hit_rate"] == 1.0
+
+
+def test_overwritten_object_is_reloaded():
+    client = FakeMinio()
+    client.put("trinity", "p/sales.arrow", _arrow_bytes(pd.DataFrame({"a": [1]})))
+    cache = DatasetCache(max_bytes=10**6, enabled=True)
+    cache.load(client, "trinity", "p/sales.arrow")
+
+    client.put("trinity", "p/sales.arrow", _arrow_bytes(pd.DataFrame({"a": [5, 6]})))
+    table = cache.load(client, "trinity", "p/sales.arrow")
+
+    assert table.column("a").to_pylist() == [5, 6]
+    assert client.gets == 2
+    # The superseded version no longer occupies the budget.
+    assert cache.stats()["tables"]["entries"] == 1
+
+
+def test_csv_decoding_matches_pandas():
+    payload = b"region,sales,code\nN,1.5,1\nS,,x\n"
+    table = decode_table("p/file.csv", payload)
+    expected = pd.read_csv(io.BytesIO(payload))
+    result = table.to_pandas()
+    assert list(result.columns) == list(expected.columns)
+    assert result["sales"].isna().tolist() == expected["sales"].isna().tolist()
+    assert result["code"].tolist() == ["1", "x"]
+    assert pl.from_arrow(table).height == 2
+
+
+def test_unknown_extension_raises():
+    with pytest.raises(UnsupportedDatasetFormat):
+        decode_table("p/file.bin", b"")
+
+
+def test_disabled_cache_always_downloads():
+    client = FakeMinio()
+    client.put("trinity", "p/a.csv", b"x\n1\n")
+    cache = DatasetCache(max_bytes=10**6, enabled=False)
+    cache.load(client, "trinity", "p/a.csv")
+    cache.load(client, "trinity", "p/a.csv")
+    assert client.gets == 2
@@ -0,0 +1,292 @@
+import json
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+flight = pytest.importorskip("pyarrow.flight")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "app"))
+
+from DataStorageRetrieval.table_cache import SingleFlight, TableCache  # noqa: E402
+
+
+def _table(rows: int) -> "pa.Table":
+    return pa.table({"a": list(range(rows))})
+
+
+def test_lru_eviction_respects_budget():
+    size = _table(100).nbytes
+    cache = TableCache(max_bytes=size * 2, policy="lru")
+    cache.put("a", _table(100))
+    cache.put("b", _table(100))
+    assert cache.get("a") is not None  # "b" becomes least recently used
+    cache.put("c", _table(100))
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["current_bytes"] <= size * 2
+
+
+def test_lfu_evicts_least_frequent():
+    size = _table(100).nbytes
+    cache = TableCache(max_bytes=size * 2, policy="lfu")
+    cache.put("a", _table(100))
+    cache.put("b", _table(100))
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache.put("c", _table(100))
+    assert "b" not in cache
+    assert "a" in cache
+
+
+def test_pinned_entries_are_not_evicted():
+    size = _table(100).nbytes
+    cache = TableCache(max_bytes=size, policy="lru")
+    cache.put("a", _table(100))
+    with cache.pinned("a"):
+        cache.put("b", _table(100))
+        assert "a" in cache
+    # once unpinned the cache shrinks back to its budget
+    assert cache.stats()["current_bytes"] <= size
+
+
+def test_pop_and_clear_drop_pinned_entries_on_release():
+    cache = TableCache(max_bytes=0)
+    cache.put("a", _table(10))
+    cache.put("b", _table(10))
+    with cache.pinned("a"), cache.pinned("b"):
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 2
+        assert "a" not in cache and "b" not in cache
+        assert cache.get("a") is None and cache.get("b") is None
+    assert len(cache) == 0
+
+    cache.put("c", _table(10))
+    with cache.pinned("c"):
+        cache.pop("c")
+        cache.put("c", _table(20))  # a reload replaces the marked entry
+    assert cache.get("c").num_rows == 20
+
+
+def test_oversized_tables_are_rejected():
+    cache = TableCache(max_bytes=10)
+    assert cache.put("big", _table(100)) is False
+    assert "big" not in cache
+    assert cache.stats()["rejected"] == 1
+
+
+def test_single_flight_coalesces_concurrent_loads():
+    single = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "table"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(single.do("p", loader)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(single.do("p", loader))) for _ in range(5)
+    ]
+    for t in followers:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["table"] * 6
+    stats = single.stats()
+    assert stats["loads"] == 1
+    assert stats["coalesced"] == 5
+    assert stats["in_flight"] == 0
+
+
+def test_single_flight_propagates_failures():
+    single = SingleFlight()
+
+    def boom():
+        raise RuntimeError("minio down")
+
+    with pytest.raises(RuntimeError):
+        single.do("p", boom)
+    assert single.stats()["failures"] == 1
+    # the failed call is not memoised
+    assert single.do("p", lambda: 1) == 1
+
+
+def _start_server(**kwargs):
+    from flight_server import ArrowFlightServer
+
+    server = ArrowFlightServer(host="localhost", port=0, **kwargs)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    return server, thread
+
+
+def test_server_exposes_cache_stats(tmp_path):
+    server, thread = _start_server(spill_dir=str(tmp_path))
+    try:
+        client = flight.FlightClient(f"grpc://localhost:{server.port}")
+        table = _table(10)
+        writer, _ = client.do_put(flight.FlightDescriptor.for_path("t"), table.schema)
+        writer.write_table(table)
+        writer.close()
+        result = client.do_get(flight.Ticket(b"t")).read_all()
+        assert result.equals(table)
+        actions = {a.type for a in client.list_actions()}
+        assert {"cache_stats", "cache_evict", "cache_clear"} <= actions
+        stats = json.loads(next(iter(client.do_action(flight.Action("cache_stats", b"")))).body.to_pybytes())
+        assert stats["hits"] == 1
+        assert stats["entries"] == 1
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_streaming_put_serves_spill_file_until_evicted(tmp_path):
+    (tmp_path / f"{'0' * 40}.arrow").write_bytes(b"stale")
+    table = pa.concat_tables([_table(1000), _table(1000)])
+    server, thread = _start_server(streaming=True, spill_dir=str(tmp_path), cache_max_bytes=table.nbytes)
+    try:
+        assert not list(tmp_path.iterdir())
+        client = flight.FlightClient(f"grpc://localhost:{server.port}")
+
+        def put(path):
+            writer, _ = client.do_put(flight.FlightDescriptor.for_path(path), table.schema)
+            for batch in table.to_batches(max_chunksize=250):
+                writer.write_batch(batch)
+            writer.close()
+
+        put("big")
+        assert [p.name for p in tmp_path.iterdir()] == [server._spill_path("big").name]
+        assert client.do_get(flight.Ticket(b"big")).read_all().equals(table)
+
+        put("other")  # evicts "big" from the budget
+        assert [p.name for p in tmp_path.iterdir()] == [server._spill_path("other").name]
+
+        evicted = json.loads(
+            next(iter(client.do_action(flight.Action("cache_evict", b"other")))).body.to_pybytes()
+        )
+        assert evicted["evicted"] is True
+        assert not list(tmp_path.iterdir())
+        # Without MinIO there is nothing left to reload from.
+        with pytest.raises(flight.FlightError):
+            client.do_get(flight.Ticket(b"other")).read_all()
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_evicting_a_pinned_table_reloads_it_on_the_next_get(tmp_path, monkeypatch):
+    server, thread = _start_server(spill_dir=str(tmp_path))
+    loads = []
+
+    def load_from_minio(path):
+        loads.append(path)
+        return _table(20)
+
+    monkeypatch.setattr(server, "_load_from_minio", load_from_minio)
+    try:
+        client = flight.FlightClient(f"grpc://localhost:{server.port}")
+        table = _table(10)
+        writer, _ = client.do_put(flight.FlightDescriptor.for_path("t"), table.schema)
+        writer.write_table(table)
+        writer.close()
+
+        # Hold the pin an active do_get stream would hold while it is evicted.
+        with server._tables.pinned("t"):
+            evicted = json.loads(
+                next(iter(client.do_action(flight.Action("cache_evict", b"t")))).body.to_pybytes()
+            )
+            assert evicted["evicted"] is False
+            assert client.do_get(flight.Ticket(b"t")).read_all().num_rows == 20
+        assert loads == ["t"]
+        assert client.do_get(flight.Ticket(b"t")).read_all().num_rows == 20
+        assert loads == ["t"]
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_ticket_command_pushes_down_projection_and_filters(tmp_path):
+    from DataStorageRetrieval.flight_query import FlightQuery
+
+    server, thread = _start_server(spill_dir=str(tmp_path))
+    try:
+        client = flight.FlightClient(f"grpc://localhost:{server.port}")
+        table = pa.table({"a": list(range(100)), "b": ["x", "y"] * 50, "c": [1.0] * 100})
+        writer, _ = client.do_put(flight.FlightDescriptor.for_path("q"), table.schema)
+        writer.write_table(table, max_chunksize=30)
+        writer.close()
+
+        query = FlightQuery(
+            path="q",
+            columns=["a"],
+            filters=[{"column": "b", "op": "==", "value": "y"}, {"column": "a", "op": ">=", "value": 10}],
+            limit=5,
+            offset=2,
+        )
+        result = client.do_get(flight.Ticket(query.to_ticket())).read_all()
+        assert result.column_names == ["a"]
+        assert result.column("a").to_pylist() == [15, 17, 19, 21, 23]
+
+        page = client.do_get(flight.Ticket(FlightQuery("q", limit=3, offset=98).to_ticket())).read_all()
+        assert page.num_rows == 2
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"path": "q", "limit": "abc"},
+        {"path": "q", "offset": [1]},
+        {"path": "q", "columns": 3},
+        {"path": "q", "limit": -1},
+    ],
+)
+def test_malformed_ticket_commands_raise_query_errors(payload):
+    from DataStorageRetrieval.flight_query import FlightQuery, FlightQueryError
+
+    with pytest.raises(FlightQueryError):
+        FlightQuery.from_ticket(json.dumps(payload).encode())
+
+
+def test_uncastable_filter_values_raise_query_errors(tmp_path):
+    from DataStorageRetrieval.flight_query import FlightQuery, FlightQueryError
+
+    table = pa.table({"a": list(range(10))})
+    query = FlightQuery("q", filters=[{"column": "a", "op": ">=", "value": "abc"}])
+    with pytest.raises(FlightQueryError):
+        query.apply(table)
+
+    server, thread = _start_server(spill_dir=str(tmp_path))
+    try:
+        client = flight.FlightClient(f"grpc://localhost:{server.port}")
+        writer, _ = client.do_put(flight.FlightDescriptor.for_path("q"), table.schema)
+        writer.write_table(table)
+        writer.close()
+        with pytest.raises(flight.FlightServerError, match="Invalid filter"):
+            client.do_get(flight.Ticket(query.to_ticket())).read_all()
+    finally:
+        server.shutdown()
+        thread.join()
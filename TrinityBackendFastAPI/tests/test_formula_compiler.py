@@ -0,0 +1,135 @@
+import importlib.util
+import math
+import sys
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+import pytest
+
+PARSER_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "app"
+    / "features"
+    / "dataframe_operations"
+    / "app"
+    / "formula_parser.py"
+)
+
+
+@pytest.fixture(scope="module")
+def fp():
+    spec = importlib.util.spec_from_file_location("formula_parser_under_test", PARSER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def frame():
+    return pl.DataFrame(
+        {
+            "Sales": [10.0, None, 30.0, 40.0, 0.0, 60.0, 70.0],
+            "Units": [1, 2, 0, 4, 5, 6, None],
+            "Unit Price": [2.5, 3.0, 1.0, -1.0, 4.0, 9.0, None],
+            "Region": [" north", "south ", "", None, "east", "west", "north"],
+        }
+    )
+
+
+def _compiled(fp, df, formula):
+    expr = fp.compile_formula(formula, df.schema)
+    assert expr is not None, formula
+    return fp.finalise_polars_result(df.with_columns(expr.alias("_r")).get_column("_r")).to_list()
+
+
+def _pandas(fp, df, formula):
+    values = fp.evaluate_formula(formula, df.to_pandas()).to_list()
+    cleaned = [
+        None if v is pd.NA or (isinstance(v, float) and not math.isfinite(v)) else v for v in values
+    ]
+    return fp.finalise_polars_result(pl.Series("_r", cleaned, strict=False)).to_list()
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        "Sales + Units * 2",
+        "SUM(Sales)",
+        "SUM(Sales, Units)",
+        "MAX(Sales, Units)",
+        "DIV(Sales, Units)",
+        "LOG(Unit Price)",
+        "SQRT(Unit Price)",
+        "ROUND(Unit Price / 3, 2)",
+        "ZSCORE(Units)",
+        "CUMSUM(Units)",
+        "ROLLINGSUM(Units, 3)",
+        "LAG(Units, 2)",
+        "COUNT(Sales)",
+        "PERCENTILE(Unit Price, 0.25)",
+        "CORR(Sales, Units)",
+        "ISNULL(Region)",
+        "UPPER(Region)",
+        "LEN(Region)",
+        "FILLBLANK(Region, 'n/a')",
+        "Sales > 20",
+        "Sales == Units",
+        "Sales != Units",
+        "Units <= 2",
+        "Sales >= Unit Price",
+        "Units < 5",
+    ],
+)
+def test_compiled_formula_matches_pandas_engine(fp, frame, formula):
+    expected = _pandas(fp, frame, formula)
+    actual = _compiled(fp, frame, formula)
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        if isinstance(want, float):
+            assert got == pytest.approx(want)
+        else:
+            assert got == want
+
+
+def test_unsupported_functions_fall_back(fp, frame):
+    assert fp.compile_formula("MAP(Region, '{\"east\": \"E\"}')", frame.schema) is None
+    assert fp.compile_formula("STR_REPLACE(Region, 'n', 'N')", frame.schema) is None
+    # Date parts of string columns need pandas' lenient date parsing.
+    assert fp.compile_formula("YEAR(Region)", frame.schema) is None
+
+
+def test_compile_rejects_disallowed_syntax(fp, frame):
+    with pytest.raises(fp.FormulaEvaluationError):
+        fp.compile_formula("__import__('os')", frame.schema)
+
+
+def test_plan_cache_keys_on_expression_and_referenced_dtypes(fp, frame):
+    cache = fp.FormulaPlanCache(max_entries=2)
+    engine = fp.FormulaEngine(cache=cache)
+
+    first = engine.compile_polars("Sales * 2", frame.schema)
+    # Extra, unreferenced columns do not change the plan.
+    widened = frame.with_columns(pl.lit(1).alias("Other"))
+    assert engine.compile_polars(" Sales * 2 ", widened.schema) is first
+    # A different dtype for a referenced column needs a new plan.
+    engine.compile_polars("Sales * 2", frame.with_columns(pl.col("Sales").cast(pl.Int64)).schema)
+    engine.evaluate("Sales * 2", frame.to_pandas())
+    engine.evaluate("Sales * 2", frame.to_pandas())
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["hit_rate"] == pytest.approx(0.4)
+
+
+def test_plan_cache_does_not_store_failures(fp, frame):
+    cache = fp.FormulaPlanCache(max_entries=4)
+    engine = fp.FormulaEngine(cache=cache)
+    for _ in range(2):
+        with pytest.raises(fp.FormulaEvaluationError):
+            engine.compile_polars("Sales.__class__", frame.schema)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,96 @@
+import importlib
+import pathlib
+import sys
+import types
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("scipy")
+pytest.importorskip("pyarrow")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "build_model_feature_based"
+PACKAGE = "build_model_mmm_under_test"
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PACKAGE_DIR)]
+    database = types.ModuleType(f"{PACKAGE}.database")
+    database.minio_client = None
+    database.save_model_results_enhanced = None
+    monkeypatch.setitem(sys.modules, PACKAGE, package)
+    monkeypatch.setitem(sys.modules, f"{PACKAGE}.database", database)
+    for name in ("mmm_training", "models"):
+        monkeypatch.delitem(sys.modules, f"{PACKAGE}.{name}", raising=False)
+    return importlib.import_module(f"{PACKAGE}.mmm_training").MMMTransformationEngine()
+
+
+def _loop_adstock(x, decay_rate):
+    if decay_rate <= 0 or decay_rate >= 1:
+        decay_rate = 0.5
+    values = np.zeros_like(x)
+    for i in range(len(x)):
+        values[i] = x[i] if i == 0 else x[i] + decay_rate * values[i - 1]
+    return values
+
+
+def test_batched_adstock_matches_recursion(engine):
+    rng = np.random.default_rng(1)
+    decays = [0.1, 0.5, 0.9, 1.2]
+    for x in (rng.uniform(0, 100, 52), rng.integers(0, 100, 52)):
+        batch = engine.apply_adstock_batch(x, decays)
+        assert batch.dtype == x.dtype
+        for j, decay in enumerate(decays):
+            np.testing.assert_array_equal(batch[:, j], _loop_adstock(x, decay))
+            np.testing.assert_array_equal(engine.apply_adstock_transform(x, decay), _loop_adstock(x, decay))
+
+
+def _frame():
+    rng = np.random.default_rng(4)
+    return pd.DataFrame(
+        {
+            "tv": rng.uniform(0, 50, 60),
+            "radio": rng.uniform(0, 20, 60),
+            "price": rng.uniform(1, 3, 60),
+            "sales": rng.uniform(100, 200, 60),
+        }
+    )
+
+
+def _configs():
+    return {
+        "tv": {"type": "media", "adstock_decay": [0.3, 0.6], "logistic_growth": [1.5, 2.5]},
+        "radio": {"type": "media", "adstock_decay": [0.3, 0.6], "logistic_growth": [1.5, 2.5]},
+        "price": {"type": "standard"},
+    }
+
+
+def test_grid_cache_matches_uncached_transforms(engine):
+    df = _frame()
+    combinations = engine.generate_parameter_combinations(_configs())
+    assert len(combinations) == 16
+    expected = [engine.apply_variable_transformations(df, combo) for combo in combinations]
+
+    engine.prepare_grid(df, combinations)
+    for combo, (exp_df, exp_meta, exp_config) in zip(combinations, expected):
+        got_df, got_meta, got_config = engine.apply_variable_transformations(df, combo)
+        pd.testing.assert_frame_equal(got_df, exp_df)
+        assert got_meta == exp_meta and got_config == exp_config
+        np.testing.assert_array_equal(
+            engine.grid_matrix(df, combo, ["tv", "radio", "price", "sales"]),
+            exp_df[["tv", "radio", "price", "sales"]].values,
+        )
+    # 2 media variables x 4 parameter sets + price.
+    assert len(engine._grid_columns) == 9
+
+    # A different frame is never served from the cache.
+    other = df * 2
+    got_df, _, _ = engine.apply_variable_transformations(other, combinations[0])
+    pd.testing.assert_frame_equal(got_df, engine.apply_variable_transformations(other.copy(), combinations[0])[0])
+    engine.clear_grid()
+    assert engine._grid_frame is None
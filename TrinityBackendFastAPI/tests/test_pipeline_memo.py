@@ -0,0 +1,140 @@
+import importlib.util
+import pathlib
+import sys
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PIPELINE_DIR = ROOT / "app" / "features" / "pipeline"
+
+# Load scheduler/memo as a package without importing the FastAPI app.
+package = types.ModuleType("pipeline_memo_pkg")
+package.__path__ = [str(PIPELINE_DIR)]
+sys.modules["pipeline_memo_pkg"] = package
+for name in ("scheduler", "memo"):
+    spec = importlib.util.spec_from_file_location(f"pipeline_memo_pkg.{name}", PIPELINE_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)  # type: ignore
+scheduler = sys.modules["pipeline_memo_pkg.scheduler"]
+memo = sys.modules["pipeline_memo_pkg.memo"]
+
+
+def _steps():
+    return [
+        {
+            "atom_instance_id": "g1",
+            "atom_type": "groupby-wtg-avg",
+            "configuration": {"identifiers": ["Region"]},
+            "inputs": [{"file_key": "a.arrow"}],
+            "outputs": [{"file_key": "a_grouped.arrow"}],
+            "api_calls": [{"endpoint": "/api/groupby/run", "params": {"object_names": "a.arrow"}, "timestamp": "t1"}],
+        },
+        {
+            "atom_instance_id": "g2",
+            "atom_type": "groupby-wtg-avg",
+            "configuration": {"identifiers": ["Brand"]},
+            "inputs": [{"file_key": "b.arrow"}],
+            "outputs": [{"file_key": "b_grouped.arrow"}],
+            "api_calls": [],
+        },
+        {
+            "atom_instance_id": "m1",
+            "atom_type": "merge",
+            "configuration": {"join_columns": ["Region"]},
+            "inputs": [{"file_key": "a_grouped.arrow"}, {"file_key": "b_grouped.arrow"}],
+            "outputs": [{"file_key": "merged.arrow"}],
+            "api_calls": [],
+        },
+    ]
+
+
+def _plan(steps, digests, memos, existing=None, **kwargs):
+    input_files = [sorted(scheduler.step_input_files(s)) for s in steps]
+    existing = existing if existing is not None else {"a_grouped.arrow", "b_grouped.arrow", "merged.arrow"}
+    return memo.plan_steps(
+        steps,
+        input_files,
+        scheduler.build_step_dependencies(steps, kwargs.get("column_operations", ())),
+        root_digests=digests,
+        memos=memos,
+        output_exists=lambda f: f in existing,
+        **kwargs,
+    )
+
+
+def _memos(decisions):
+    return {d.atom_instance_id: {"memo_key": d.memo_key} for d in decisions}
+
+
+def test_first_run_recomputes_everything_and_rerun_reuses():
+    steps = _steps()
+    digests = {"a.arrow": "etag-a", "b.arrow": "etag-b"}
+    first = _plan(steps, digests, {})
+    assert [d.action for d in first] == ["recompute"] * 3
+    assert first[0].reason == "no previous result"
+
+    second = _plan(steps, digests, _memos(first))
+    assert [d.action for d in second] == ["reuse"] * 3
+    assert [d.memo_key for d in second] == [d.memo_key for d in first]
+
+
+def test_changed_root_file_only_invalidates_its_downstream():
+    steps = _steps()
+    previous = _plan(steps, {"a.arrow": "etag-a", "b.arrow": "etag-b"}, {})
+    plan = _plan(steps, {"a.arrow": "etag-a2", "b.arrow": "etag-b"}, _memos(previous))
+    assert [d.action for d in plan] == ["recompute", "reuse", "recompute"]
+    assert plan[0].reason == "configuration or input files changed"
+
+
+def test_config_change_missing_output_and_column_ops_force_recompute():
+    steps = _steps()
+    digests = {"a.arrow": "etag-a", "b.arrow": "etag-b"}
+    memos = _memos(_plan(steps, digests, {}))
+
+    changed = _steps()
+    changed[1]["configuration"] = {"identifiers": ["Channel"]}
+    assert [d.action for d in _plan(changed, digests, memos)] == ["reuse", "recompute", "recompute"]
+
+    missing = _plan(steps, digests, memos, existing={"a_grouped.arrow", "merged.arrow"})
+    assert missing[1].reason == "previous output missing"
+    assert missing[2].reason == "upstream step recomputed"
+
+    col_ops = _plan(steps, digests, memos, column_operations=[{"input_file": "/a_grouped.arrow"}])
+    assert col_ops[0].reason == "outputs feed column operations"
+
+    forced = _plan(steps, digests, memos, incremental=False)
+    assert {d.action for d in forced} == {"recompute"}
+
+
+def test_save_as_column_operation_output_is_keyed_by_its_producer():
+    steps = _steps()
+    steps[2]["inputs"][0] = {"file_key": "a_cols.arrow"}
+    col_op = {
+        "input_file": "a_grouped.arrow",
+        "output_file": "a_cols.arrow",
+        "overwrite_original": False,
+        "operations": [{"type": "add", "columns": ["x", "y"]}],
+        "saved_at": "t1",
+    }
+    digests = {"a.arrow": "etag-a", "b.arrow": "etag-b", "a_cols.arrow": "etag-stale"}
+    input_files = [sorted(scheduler.step_input_files(s)) for s in steps]
+    assert memo.root_input_files(steps, input_files, [col_op]) == {"a.arrow", "b.arrow"}
+
+    first = _plan(steps, digests, {}, column_operations=[col_op])
+    rerun = _plan(steps, digests, {}, column_operations=[dict(col_op, saved_at="t2", execution_order=1)])
+    assert rerun[2].memo_key == first[2].memo_key
+
+    upstream = _plan(steps, dict(digests, **{"a.arrow": "etag-a2"}), _memos(first), column_operations=[col_op])
+    assert upstream[2].memo_key != first[2].memo_key
+    assert upstream[2].action == "recompute"
+
+    reconfigured = dict(col_op, operations=[{"type": "subtract", "columns": ["x", "y"]}])
+    assert _plan(steps, digests, {}, column_operations=[reconfigured])[2].memo_key != first[2].memo_key
+
+
+def test_memo_key_ignores_api_call_responses():
+    step = _steps()[0]
+    key = memo.step_memo_key(step, ["a.arrow"], {"a.arrow": "etag"})
+    step["api_calls"][0]["timestamp"] = "t2"
+    step["api_calls"][0]["response_data"] = {"rows": 10}
+    assert memo.step_memo_key(step, ["a.arrow"], {"a.arrow": "etag"}) == key
@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location(
+    "pipeline_scheduler", ROOT / "app" / "features" / "pipeline" / "scheduler.py"
+)
+scheduler = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scheduler)  # type: ignore
+
+
+def _step(inputs, outputs=(), atom_type="groupby-wtg-avg"):
+    return {
+        "atom_type": atom_type,
+        "inputs": [{"file_key": f} for f in inputs],
+        "outputs": [{"file_key": f} for f in outputs],
+        "api_calls": [],
+    }
+
+
+def test_dependencies_follow_files_between_steps():
+    steps = [
+        _step(["a.arrow"], ["a_grouped.arrow"]),
+        _step(["b.arrow"], ["b_grouped.arrow"]),
+        _step(["a_grouped.arrow", "/b_grouped.arrow"], ["merged.arrow"]),
+        _step(["a.arrow"]),
+        # Overwrites a file read by step 0 and must wait for it.
+        _step(["c.arrow"], ["a.arrow"]),
+    ]
+    deps = scheduler.build_step_dependencies(steps)
+    assert deps == [set(), set(), {0, 1}, set(), {0, 3}]
+    assert scheduler.execution_waves(deps) == [[0, 1, 3], [2, 4]]
+
+
+def test_save_calls_count_as_outputs():
+    producer = _step(["a.arrow"])
+    producer["api_calls"] = [
+        {"endpoint": "/api/groupby/save", "response_data": {"filename": "saved/out.arrow"}}
+    ]
+    deps = scheduler.build_step_dependencies([producer, _step(["saved/out.arrow"])])
+    assert deps == [set(), {0}]
+
+
+def test_save_as_column_operations_count_as_outputs_of_their_producer():
+    column_operations = [
+        {"input_file": "a_grouped.arrow", "output_file": "/a_with_cols.arrow", "overwrite_original": False},
+        {"input_file": "a_grouped.arrow", "overwrite_original": True},
+    ]
+    steps = [
+        _step(["a.arrow"], ["a_grouped.arrow"]),
+        _step(["b.arrow"], ["b_grouped.arrow"]),
+        _step(["a_with_cols.arrow"], ["report.arrow"]),
+    ]
+    assert scheduler.build_step_dependencies(steps) == [set(), set(), set()]
+    deps = scheduler.build_step_dependencies(steps, column_operations)
+    assert deps == [set(), set(), {0}]
+    assert scheduler.step_output_files(steps[0], column_operations) == {"a_grouped.arrow", "a_with_cols.arrow"}
+
+
+def test_run_dag_respects_dependencies_and_limit():
+    deps = [set(), set(), set(), {0, 1}, {3}]
+    events = []
+    active = {"now": 0, "peak": 0}
+
+    async def run_step(index):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        events.append(("start", index))
+        await asyncio.sleep(0.01)
+        events.append(("end", index))
+        active["now"] -= 1
+        return index * 10
+
+    results = asyncio.run(scheduler.run_dag(deps, run_step, max_concurrency=2))
+
+    assert results == [0, 10, 20, 30, 40]
+    assert active["peak"] == 2
+    assert events.index(("start", 3)) > max(events.index(("end", 0)), events.index(("end", 1)))
+    assert events.index(("start", 4)) > events.index(("end", 3))
+
+
+def test_run_dag_serial_order_and_failures_do_not_block_dependents():
+    order = []
+
+    async def run_step(index):
+        order.append(index)
+        if index == 0:
+            raise RuntimeError("boom")
+        return index
+
+    results = asyncio.run(scheduler.run_dag([set(), {0}, set()], run_step, max_concurrency=1))
+
+    assert order == [0, 1, 2]
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == [1, 2]
+
+
+class _FakeStore:
+    def __init__(self):
+        self.records = {}
+
+    def create(self, task_id, name, metadata=None):
+        self.records[task_id] = {"name": name, "status": "pending", "metadata": metadata or {}}
+
+    def update(self, task_id, metadata=None, **changes):
+        record = self.records.setdefault(task_id, {"metadata": {}})
+        record["metadata"].update(metadata or {})
+        record.update(changes)
+
+
+def test_progress_reports_each_step():
+    store = _FakeStore()
+    progress = scheduler.PipelineRunProgress("run-1", [_step(["a"]), _step(["b"])], store=store)
+    progress.start({"doc_id": "c/a/p"})
+    progress.step_started(1)
+    progress.step_finished(1, "success")
+    meta = store.records["run-1"]["metadata"]
+    assert store.records["run-1"]["status"] == "running"
+    assert meta["completed"] == 1 and meta["total"] == 2
+    assert meta["steps"]["0"]["status"] == "pending"
+    assert meta["steps"]["1"]["status"] == "success"
+    progress.finish()
+    assert store.records["run-1"]["status"] == "success"
@@ -0,0 +1,96 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pl = pytest.importorskip("polars")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "app"))
+
+from DataStorageRetrieval import table_cache  # noqa: E402
+
+# Load the module by path: importing the ``app`` package connects to MinIO and Mongo.
+sys.modules.setdefault("app.DataStorageRetrieval.table_cache", table_cache)
+_spec = importlib.util.spec_from_file_location(
+    "pivot_cube_cache", ROOT / "app" / "features" / "pivot_table" / "cube_cache.py"
+)
+cube_cache = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = cube_cache
+_spec.loader.exec_module(cube_cache)
+
+
+def _key(version="v1", filters=(), rows=("region",), fill_value=None):
+    return cube_cache.cube_key(
+        version,
+        list(filters),
+        list(rows),
+        [],
+        [("sales", "sum", None)],
+        dropna=True,
+        fill_value=fill_value,
+        margins=True,
+    )
+
+
+def test_cube_key_changes_with_version_filters_and_fields():
+    base = _key()
+    assert base == _key()
+    assert base != _key(version="v2")
+    assert base != _key(filters=[{"field": "region", "include": ["a"]}])
+    assert base != _key(rows=("region", "brand"))
+    assert base != _key(fill_value=0)
+
+
+def test_cube_hits_and_memoised_aggregates():
+    cache = cube_cache.PivotCubeCache(max_cubes=2, max_filter_bytes=10**6, enabled=True)
+    assert cache.get(_key()) is None
+    cube = cache.put(_key(), pd.DataFrame({"sales": [1.0]}))
+
+    calls = []
+
+    def compute(fields):
+        calls.append(tuple(fields))
+        return pd.DataFrame({"region": ["a"], "sales": [1.0]})
+
+    aggregate = cache.get(_key()).aggregator(compute)
+    first = aggregate(["region"])
+    first.columns = ["mutated", "by caller"]
+    assert list(aggregate(["region"]).columns) == ["region", "sales"]
+    assert calls == [("region",)]
+    assert cube.pivot_frame() is not cube.pivot
+
+    stats = cache.stats()
+    assert stats["cube_hits"] == 1 and stats["cube_misses"] == 1
+
+
+def test_cubes_are_evicted_in_lru_order():
+    cache = cube_cache.PivotCubeCache(max_cubes=2, max_filter_bytes=10**6, enabled=True)
+    for version in ("v1", "v2", "v3"):
+        cache.put(_key(version=version), pd.DataFrame())
+    assert cache.get(_key(version="v1")) is None
+    assert cache.get(_key(version="v3")) is not None
+    assert cache.stats()["cube_evictions"] == 1
+
+
+def test_filtered_frames_are_reused_per_version():
+    cache = cube_cache.PivotCubeCache(max_cubes=4, max_filter_bytes=10**6, enabled=True)
+    frame = pl.DataFrame({"region": ["a", "b"], "sales": [1.0, 2.0]})
+    calls = []
+
+    def apply():
+        calls.append(1)
+        return frame.filter(pl.col("region") == "a")
+
+    filters = [{"field": "region", "include": ["a"]}]
+    first, status = cache.filtered("v1", filters, apply)
+    again, again_status = cache.filtered("v1", filters, apply)
+    assert (status, again_status) == (cube_cache.MISS, cube_cache.HIT)
+    assert again.equals(first) and len(calls) == 1
+
+    _, status = cache.filtered("v2", filters, apply)
+    assert status == cube_cache.MISS
+    _, status = cache.filtered(None, filters, apply)
+    assert status == cube_cache.DISABLED
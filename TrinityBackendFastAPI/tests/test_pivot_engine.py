@@ -0,0 +1,94 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pl = pytest.importorskip("polars")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+ENGINE_PATH = ROOT / "app" / "features" / "pivot_table" / "engine.py"
+
+# Loaded by path: importing the ``app`` package connects to MinIO and Mongo.
+_spec = importlib.util.spec_from_file_location("pivot_engine", ENGINE_PATH)
+engine = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = engine
+_spec.loader.exec_module(engine)
+
+
+def _frame(rows: int = 300) -> "pd.DataFrame":
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(
+        {
+            "region": rng.choice(["a", "b", "c", None], rows),
+            "year": rng.choice([2020, 2021], rows),
+            "channel": rng.choice(["p", "q", None], rows),
+            "sales": np.where(rng.random(rows) < 0.1, np.nan, rng.random(rows) * 100),
+            "units": rng.integers(0, 20, rows),
+            "weight": np.where(rng.random(rows) < 0.1, np.nan, rng.random(rows) * 2 - 0.2),
+        }
+    )
+
+
+def _weighted_average(df, weight):
+    def weighted_avg(values):
+        weights = df.loc[values.index, weight]
+        mask = values.notna() & weights.notna() & (weights > 0)
+        if mask.sum() == 0 or weights[mask].sum() == 0:
+            return np.nan
+        return (values[mask] * weights[mask]).sum() / weights[mask].sum()
+
+    return weighted_avg
+
+
+@pytest.mark.parametrize("rows", [["region"], ["region", "year"]])
+@pytest.mark.parametrize("columns", [[], ["channel"], ["channel", "year"]])
+@pytest.mark.parametrize("fill_value", [None, 0])
+def test_pivot_matches_pandas_with_margins(rows, columns, fill_value):
+    if set(rows) & set(columns):
+        pytest.skip("field used on both axes")
+    df = _frame()
+    agg_map = {"sales": _weighted_average(df, "weight"), "units": "mean"}
+    expected = pd.pivot_table(
+        df,
+        index=rows,
+        columns=columns or None,
+        values=list(agg_map),
+        aggfunc=agg_map,
+        fill_value=fill_value,
+        margins=True,
+        margins_name="Grand Total",
+    )
+    specs = [engine.ValueSpec("sales", "weighted_average", "weight"), engine.ValueSpec("units", "mean")]
+    result = engine.pivot_table(
+        pl.from_pandas(df), rows, columns, specs, fill_value=fill_value, margins=True, margins_name="Grand Total"
+    )
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_aggregate_matches_groupby_with_missing_keys():
+    df = _frame()
+    expected = df.groupby(["region", "channel"], dropna=False).agg({"sales": "sum", "units": "count"}).reset_index()
+    result = engine.aggregate(
+        pl.from_pandas(df), ["region", "channel"], [engine.ValueSpec("sales", "sum"), engine.ValueSpec("units", "count")]
+    )
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_text_mask_uses_pandas_string_form():
+    series = pl.Series("code", [1, 2, None, 1])
+    assert engine.text_mask(series, {"1.0"}).to_list() == [True, False, False, True]
+    assert engine.text_mask(pl.Series("code", [1, 2]), {"1"}).to_list() == [True, False]
+
+
+def test_unsupported_inputs_fall_back_to_pandas():
+    frame = pl.DataFrame({"region": ["a"], "name": ["x"], "sales": [1.0]})
+    specs = [engine.ValueSpec("sales", "sum")]
+    assert engine.unsupported_reason(frame, ["region"], [], specs) is None
+    assert engine.unsupported_reason(frame, [], ["region"], specs) == "pivot without row fields"
+    assert engine.unsupported_reason(frame, ["region"], [], specs, dropna=False) == "dropna=False"
+    assert "non-numeric" in engine.unsupported_reason(frame, ["region"], [], [engine.ValueSpec("name", "sum")])
+    categorical = frame.with_columns(pl.col("region").cast(pl.Categorical))
+    assert "dtype" in engine.unsupported_reason(categorical, ["region"], [], specs)
@@ -0,0 +1,77 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "app" / "features" / "select_models_feature_based" / "s_curve_kernels.py"
+
+STEPS = [
+    {"step": "adstock", "decay_rate": 0.35},
+    {"step": "standardization", "scaler_mean": 120.0, "scaler_scale": 40.0},
+    {"step": "logistic", "growth_rate": 1.7, "midpoint": 0.3},
+    {"step": "minmax", "scaler_min": 0.1, "scaler_scale": 0.8},
+]
+
+
+def _load():
+    spec = importlib.util.spec_from_file_location("s_curve_kernels_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _transform_lists(series, steps):
+    """The element-by-element apply_transformation_steps the kernels replace."""
+    current = list(series)
+    for step in steps:
+        kind = step.get("step", "")
+        if kind == "adstock":
+            out = []
+            for i, value in enumerate(current):
+                out.append(value if i == 0 else value + step.get("decay_rate", 0.4) * out[i - 1])
+            current = out
+        elif kind in ("standardization", "minmax"):
+            shift = step.get("scaler_mean" if kind == "standardization" else "scaler_min", 0)
+            scale = step.get("scaler_scale", 1)
+            current = [0.0] * len(current) if scale == 0 else [(x - shift) / scale for x in current]
+        elif kind == "logistic":
+            g, m = step.get("growth_rate", 1.0), step.get("midpoint", 0.0)
+            current = [1 / (1 + np.exp(-g * (x - m))) for x in current]
+    return current
+
+
+def test_scale_media_batches_variables_and_scenarios():
+    kernels = _load()
+    series = np.random.default_rng(0).uniform(10, 200, (3, 12))
+    x_range = np.linspace(-100, 100, 51).tolist()
+
+    scaled = kernels.scale_media(series, x_range)
+
+    assert scaled.shape == (3, 51, 12)
+    for v in range(3):
+        for k, x in enumerate(x_range):
+            assert scaled[v, k].tolist() == [value * (1 + x / 100.0) for value in series[v]]
+
+
+def test_transform_matches_list_steps_for_every_scenario():
+    kernels = _load()
+    series = np.random.default_rng(1).uniform(10, 200, 12).tolist()
+    scaled = kernels.scale_media(series, np.linspace(-100, 100, 51))
+
+    transformed = kernels.transform(scaled, STEPS)
+
+    for row, out in zip(scaled.tolist(), transformed):
+        np.testing.assert_allclose(out, _transform_lists(row, STEPS), rtol=1e-13)
+    degenerate = [{"step": "standardization", "scaler_scale": 0}, {"step": "unknown"}]
+    assert kernels.transform([1.0, 2.0], degenerate).tolist() == [0.0, 0.0]
+
+
+def test_sequential_sum_matches_python_sum():
+    kernels = _load()
+    values = np.random.default_rng(2).normal(0, 1e6, (51, 12))
+
+    assert kernels.sequential_sum(values).tolist() == [sum(row) for row in values.tolist()]
+    assert kernels.sequential_sum(np.empty((4, 0))).tolist() == [0.0] * 4
@@ -0,0 +1,151 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SCENARIO_DIR = (
+    ROOT
+    / "app"
+    / "features"
+    / "scenario_planner_category_forecasting"
+    / "scenario_planner_category_forecasting"
+    / "app"
+    / "scenario"
+)
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(f"scenario_{name}_under_test", SCENARIO_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _models(count=40):
+    rng = np.random.default_rng(8)
+    variables = ["Price", "TV", "Digital", "Promo", "Radio"]
+    models = []
+    for i in range(count):
+        x_vars = list(rng.choice(variables, size=rng.integers(2, 5), replace=False))
+        coefficients = {f"Beta_{x}": float(rng.normal()) for x in x_vars[:-1]}
+        coefficients[x_vars[-1]] = float(rng.normal())  # unprefixed fallback
+        transformations = {}
+        for x in x_vars:
+            kind = i % 4
+            if kind == 0:
+                transformations[x] = {"s": {"method": "standard_scaler", "params": {"mean": 5.0, "std": 2.0}}}
+            elif kind == 1:
+                transformations[x] = {"s": {"method": "minmax_scaler", "params": {"min": 1.0, "max": 11.0}}}
+            elif kind == 2:
+                transformations[x] = {
+                    "a": {"method": "log"},
+                    "b": {"method": "standard_scaler", "params": {"mean": 1.0, "std": 0.5}},
+                }
+        models.append(
+            {
+                "combination": f"combo_{i % 10}",
+                "identifiers": {"Market": f"m{i}"},
+                "x_variables": x_vars,
+                "coefficients": coefficients,
+                "intercept": float(rng.normal(10)),
+                "transformations": transformations,
+            }
+        )
+    return models
+
+
+def _refs(models):
+    rng = np.random.default_rng(2)
+    return [{x: float(rng.uniform(1, 10)) for x in meta["x_variables"]} for meta in models]
+
+
+def _defs():
+    return {
+        "combo_1": {"Price": {"type": "pct", "value": -10}, "TV": {"type": "abs", "value": 7.5}},
+        "combo_4": {"Digital": {"type": "pct", "value": "25"}, "Missing": {"type": "pct", "value": 5}},
+        "combo_7": {"Promo": {"type": "bogus", "value": 1}},
+    }
+
+
+def _per_model(transform_service, matrix_module, meta, ref_vals, local_defs):
+    """The per-model computation run_scenario used to do."""
+    scen = dict(ref_vals)
+    for feat, spec in local_defs.items():
+        parsed = matrix_module.parse_tweak(feat, spec) if feat in scen else None
+        if parsed:
+            scen[feat] = scen[feat] * (1 + parsed[1] / 100.0) if parsed[0] == "pct" else parsed[1]
+    transf = transform_service.TransformService(meta["transformations"])
+    x_ref = transf.transform(pd.DataFrame([ref_vals])).iloc[0]
+    x_scen = transf.transform(pd.DataFrame([scen])).iloc[0]
+    coeff = pd.Series(
+        {x: meta["coefficients"].get(f"Beta_{x}", meta["coefficients"].get(x, 0.0)) for x in meta["x_variables"]}
+    )
+    contrib_ref, contrib_scen = x_ref * coeff, x_scen * coeff
+    y_ref = contrib_ref.sum() + meta["intercept"]
+    y_scen = contrib_scen.sum() + meta["intercept"]
+    return scen, contrib_ref.to_dict(), contrib_scen.to_dict(), y_ref, y_scen
+
+
+def test_matrix_matches_per_model_evaluation():
+    matrix_module = _load("scenario_matrix")
+    transform_service = _load("transform_service")
+    models = _models()
+    refs = _refs(models)
+    defs = _defs()
+    local = [defs.get(meta["combination"], {}) for meta in models]
+
+    matrix = matrix_module.ModelMatrix(models)
+    reference = matrix.reference_matrix(refs)
+    scenario = matrix.apply_tweaks(reference, local)
+    ev = matrix.evaluate(reference, scenario)
+
+    for i, meta in enumerate(models):
+        scen, contrib_ref, contrib_scen, y_ref, y_scen = _per_model(
+            transform_service, matrix_module, meta, refs[i], local[i]
+        )
+        assert list(matrix.row(i, scenario)) == meta["x_variables"]
+        np.testing.assert_allclose(list(matrix.row(i, scenario).values()), list(scen.values()))
+        np.testing.assert_allclose(list(matrix.row(i, ev["contrib_ref"]).values()), list(contrib_ref.values()))
+        np.testing.assert_allclose(list(matrix.row(i, ev["contrib_scen"]).values()), list(contrib_scen.values()))
+        assert ev["y_ref"][i] == pytest.approx(y_ref)
+        assert ev["y_scen"][i] == pytest.approx(y_scen)
+        expected_pct = (y_scen - y_ref) / y_ref * 100 if y_ref else 0.0
+        assert ev["pct_pred"][i] == pytest.approx(expected_pct)
+
+
+def test_missing_reference_values_drop_out_of_the_prediction():
+    matrix_module = _load("scenario_matrix")
+    models = _models(3)
+    refs = _refs(models)
+    first = models[0]["x_variables"][0]
+    refs[0][first] = float("nan")
+
+    matrix = matrix_module.ModelMatrix(models)
+    ev = matrix.evaluate(*(2 * [matrix.reference_matrix(refs)]))
+
+    assert np.isfinite(ev["y_ref"][0])
+    assert np.isnan(matrix.row(0, ev["contrib_ref"])[first])
+
+
+def test_cache_is_keyed_on_model_content(monkeypatch):
+    matrix_module = _load("scenario_matrix")
+    monkeypatch.setenv("SCENARIO_MATRIX_CACHE_SIZE", "2")
+    models = _models(4)
+    matrix = matrix_module.ModelMatrix(models)
+    reference = matrix.reference_matrix(_refs(models))
+
+    key = matrix_module.cache_key(models, "d0.arrow", "period-mean", "2024-01-01", "2024-06-30")
+    matrix_module.store(key, matrix, reference)
+    assert matrix_module.lookup(key)[0] is matrix
+
+    retrained = [dict(meta, intercept=meta["intercept"] + 1) for meta in models]
+    assert matrix_module.lookup(
+        matrix_module.cache_key(retrained, "d0.arrow", "period-mean", "2024-01-01", "2024-06-30")
+    ) is None
+
+    matrix_module.invalidate("d0.arrow")
+    assert matrix_module.lookup(key) is None
@@ -0,0 +1,105 @@
+import importlib.util
+import pathlib
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODULE_PATH = (
+    ROOT
+    / "app"
+    / "features"
+    / "scenario_planner_category_forecasting"
+    / "scenario_planner_category_forecasting"
+    / "app"
+    / "scenario"
+    / "slice_cache.py"
+)
+
+
+def _load():
+    spec = importlib.util.spec_from_file_location("scenario_slice_cache_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _frame():
+    rng = np.random.default_rng(6)
+    rows = 400
+    return pd.DataFrame(
+        {
+            "Market": rng.choice(["North", " north", "South", "East ", None], rows),
+            "Brand": rng.choice(["Alpha", "beta", "Gamma"], rows),
+            "Volume": rng.uniform(0, 100, rows),
+            "Date": pd.date_range("2023-01-01", periods=rows, freq="D"),
+        },
+        index=pd.RangeIndex(1000, 1000 + rows),
+    )
+
+
+def _mask_slice(df, col, value):
+    """The per-value mask _cache_identifier_slice used to build."""
+    return df.loc[df[col].astype(str).str.strip().str.lower() == str(value).strip().lower()]
+
+
+def _old_missing_clusters(df, cols, model_idents):
+    """The unique-row scan build_and_cache_cluster_slices used to run."""
+    unique = pd.DataFrame({c: df[c].fillna("").astype(str).str.strip() for c in cols}).drop_duplicates()
+    missing = []
+    for _, row in unique.iterrows():
+        row_norm = {c: row[c].lower() for c in cols}
+        if any(
+            ident and all(k in row_norm and row_norm[k] == (v or "").lower() for k, v in ident.items())
+            for ident in model_idents
+        ):
+            continue
+        mask = pd.Series(True, index=df.index)
+        for c in cols:
+            mask &= df[c].astype(str).str.strip().str.lower() == row_norm[c]
+        missing.append(({c: row[c] for c in cols}, df.loc[mask]))
+    return missing
+
+
+def test_arrow_round_trip_keeps_index_and_dtypes():
+    slice_cache = _load()
+    df = _frame()
+
+    blob = slice_cache.encode_frame(df)
+
+    assert slice_cache.is_arrow_blob(blob)
+    assert not slice_cache.is_arrow_blob(pickle.dumps(df))
+    pd.testing.assert_frame_equal(slice_cache.decode_frame(blob), df)
+
+
+def test_identifier_positions_match_string_masks():
+    slice_cache = _load()
+    df = _frame()
+    index = slice_cache.IdentifierIndex(df, ["Market", "Brand", "Missing"])
+
+    assert index.columns == ["Market", "Brand"]
+    for col, value in [("Market", "NORTH"), ("Market", "east"), ("Brand", " Beta "), ("Market", "west")]:
+        pd.testing.assert_frame_equal(index.take(index.positions(col, value)), _mask_slice(df, col, value))
+
+
+def test_missing_clusters_match_unique_row_scan():
+    slice_cache = _load()
+    df = _frame()
+    cols = ["Market", "Brand"]
+    model_idents = [{"market": "north"}, {"Market": "south", "Brand": "alpha"}, {"Brand": "gamma"}, {}]
+    model_idents = [{k.capitalize(): v for k, v in ident.items()} for ident in model_idents]
+
+    index = slice_cache.IdentifierIndex(df, cols)
+    actual = slice_cache.find_missing_clusters(index, model_idents)
+    expected = _old_missing_clusters(df, cols, model_idents)
+
+    assert [ident for ident, _ in actual] == [ident for ident, _ in expected]
+    for (_, rows), (_, frame) in zip(actual, expected):
+        if frame.empty:
+            assert rows is None
+        else:
+            pd.testing.assert_frame_equal(index.take(rows), frame)
@@ -0,0 +1,157 @@
+import asyncio
+import importlib.util
+import io
+import pathlib
+import threading
+import types
+from itertools import product
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+feather = pytest.importorskip("pyarrow.feather")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "app" / "features" / "scope_selector" / "partitions.py"
+
+
+def _load():
+    spec = importlib.util.spec_from_file_location("scope_partitions_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _criteria(**overrides):
+    values = dict(
+        min_datapoints_enabled=True,
+        min_datapoints=10,
+        pct90_enabled=True,
+        pct_percentile=90,
+        pct_threshold=30.0,
+        pct_base="max",
+        pct_column="Sales",
+    )
+    values.update(overrides)
+    return types.SimpleNamespace(**values)
+
+
+def _frame():
+    rng = np.random.default_rng(4)
+    rows = 600
+    df = pd.DataFrame(
+        {
+            "Market": rng.choice(["North", "South", "East", None], rows),
+            "Brand": rng.choice(["A", "B", "C"], rows),
+            "Sales": rng.gamma(2.0, 50.0, rows),
+        }
+    )
+    df.loc[df["Market"] == "East", "Sales"] *= 0.1
+    return df.sample(frac=1.0, random_state=1)
+
+
+def _expected(df, names, combinations, criteria):
+    """The per-combination masks and checks the route used to run."""
+    kept = []
+    base = df[criteria.pct_column].max()
+    for combination in combinations:
+        subset = df
+        for name, value in zip(names, combination):
+            subset = subset[subset[name] == value]
+        if len(subset) == 0 or len(subset) < criteria.min_datapoints:
+            continue
+        if subset[criteria.pct_column].quantile(criteria.pct_percentile / 100) / base * 100 <= criteria.pct_threshold:
+            continue
+        kept.append((combination, subset))
+    return kept
+
+
+def test_partitions_match_per_combination_masks():
+    partitions = _load()
+    df = _frame()
+    names = ["Market", "Brand"]
+    combinations = list(product(["South", "East", "North", "West"], ["C", "A"]))
+    criteria = _criteria()
+
+    split = partitions.split_partitions(df, names, combinations)
+    keep = partitions.criteria_mask(df, split, criteria, df)
+    actual = [(combination, df.iloc[positions]) for (combination, positions), k in zip(split, keep) if k]
+    expected = _expected(df, names, combinations, criteria)
+
+    assert [c for c, _ in actual] == [c for c, _ in expected]
+    assert ("East", "A") not in [c for c, _ in actual]
+    for (_, frame), (_, expected_frame) in zip(actual, expected):
+        pd.testing.assert_frame_equal(frame, expected_frame)
+
+
+def test_criteria_skip_missing_column_and_zero_base():
+    partitions = _load()
+    df = _frame()
+    split = partitions.split_partitions(df, ["Brand"], [("A",), ("B",)])
+
+    missing = partitions.criteria_mask(df, split, _criteria(pct_column="Price", min_datapoints=1), df)
+    zero = df.assign(Sales=0.0)
+    zero_base = partitions.criteria_mask(zero, split, _criteria(min_datapoints=1), zero)
+
+    assert missing.tolist() == [True, True]
+    assert zero_base.tolist() == [True, True]
+    assert partitions.criteria_mask(df, split, None, df).tolist() == [True, True]
+
+
+class FakeMinio:
+    def __init__(self, fail=()):
+        self.objects = {}
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def put_object(self, bucket, name, data, length, content_type):
+        if name in self.fail:
+            raise RuntimeError("upload refused")
+        with self.lock:
+            self.objects[name] = data.read()
+
+
+@pytest.mark.parametrize("workers", [0, 4])
+def test_upload_partitions_reports_each_file(monkeypatch, workers):
+    monkeypatch.setenv("SCOPE_UPLOAD_WORKERS", str(workers))
+    partitions = _load()
+    df = _frame()
+    split = partitions.split_partitions(df, ["Brand"], [("A",), ("B",), ("C",)])
+    uploads = [(f"scope/{c[0]}.arrow", df.iloc[positions]) for c, positions in split]
+    client = FakeMinio(fail={"scope/B.arrow"})
+    done = []
+
+    flags = asyncio.run(partitions.upload_partitions(client, "trinity", uploads, on_done=done.append))
+
+    assert flags == [True, False, True]
+    assert sorted(done) == [False, True, True]
+    table = feather.read_table(io.BytesIO(client.objects["scope/C.arrow"]))
+    pd.testing.assert_frame_equal(table.to_pandas(), uploads[2][1])
+
+
+def test_progress_tracks_sets():
+    partitions = _load()
+
+    class Store:
+        def __init__(self):
+            self.records = {}
+
+        def create(self, task_id, name, metadata=None):
+            self.records[task_id] = {"name": name}
+
+        def update(self, task_id, **changes):
+            self.records[task_id].update(changes)
+
+    store = Store()
+    progress = partitions.ScopeProgress("run-1", store=store)
+    progress.start()
+    progress.set_planned("Scope_1", 12, 3)
+    for ok in (True, True, False):
+        progress.uploaded("Scope_1", ok)
+    progress.finish()
+
+    record = store.records["run-1"]
+    assert record["status"] == "success"
+    assert record["metadata"]["sets"]["Scope_1"] == {"combinations": 12, "partitions": 3, "uploaded": 2, "failed": 1}
@@ -0,0 +1,91 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "app" / "features" / "select_models_feature_based" / "model_index.py"
+
+
+def _load():
+    spec = importlib.util.spec_from_file_location("select_models_index_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "combination_id": ["A", " B", None, "A", "B ", "", "A"],
+            "model_name": ["m1", "m2", "m3", "m4", "m5", "m6", "m7"],
+            "mape_test": [0.1, "0.4", None, " 0.2 ", "n/a", 0.9, 0.3],
+            "tv_elasticity": [1.0, np.nan, 2.0, -1.0, 0.5, 3.0, 0.0],
+        }
+    )
+
+
+class _Stat:
+    def __init__(self, etag):
+        self.etag = etag
+
+
+class _Client:
+    def __init__(self):
+        self.etag = '"v1"'
+
+    def stat_object(self, bucket, key):
+        return _Stat(self.etag)
+
+
+def test_numeric_columns_and_range_masks():
+    model_index = _load()
+    index = model_index.ModelIndex(_frame())
+
+    np.testing.assert_array_equal(
+        index.numeric(index.column("MAPE_TEST")), [0.1, 0.4, np.nan, 0.2, np.nan, 0.9, 0.3]
+    )
+    mask = model_index.range_mask(index.numeric("tv_elasticity"), 0.0, 2.0)
+    assert mask.tolist() == [True, False, True, False, True, False, True]
+    assert model_index.range_mask(index.numeric("tv_elasticity"), None, None).all()
+
+
+def test_positions_group_rows_by_raw_or_stripped_value():
+    model_index = _load()
+    index = model_index.ModelIndex(_frame())
+
+    assert index.positions("combination_id", "A").tolist() == [0, 3, 6]
+    assert index.positions("combination_id", "B").tolist() == []
+    assert index.positions("combination_id", "B", stripped=True).tolist() == [1, 4]
+    assert index.non_missing("combination_id", stripped=True).tolist() == [0, 1, 3, 4, 6]
+    assert index.values("combination_id", stripped=True) == ["A", "B"]
+
+
+def test_cache_rebuilds_when_the_etag_changes(monkeypatch):
+    model_index = _load()
+    client = _Client()
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return _frame()
+
+    first = model_index.get_index(client, "bucket", "results.arrow", loader)
+    assert model_index.get_index(client, "bucket", "results.arrow", loader) is first
+    assert loads == ["results.arrow"]
+
+    client.etag = '"v2"'
+    second = model_index.get_index(client, "bucket", "results.arrow", loader)
+    assert second is not first and second.etag == "v2"
+
+    model_index.invalidate("results.arrow")
+    assert model_index.get_index(client, "bucket", "results.arrow", loader) is not second
+    assert len(loads) == 3
+
+    monkeypatch.setenv("SELECT_MODEL_INDEX_CACHE_SIZE", "0")
+    model_index.get_index(client, "bucket", "results.arrow", loader)
+    assert len(loads) == 4
+    assert model_index.get_index(client, "bucket", "missing.arrow", lambda key: None) is None
@@ -0,0 +1,148 @@
+import importlib
+import io
+import json
+import math
+import pathlib
+import sys
+import types
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+ipc = pytest.importorskip("pyarrow.ipc")
+pytest.importorskip("pydantic")
+pytest.importorskip("minio")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE_DIR = ROOT / "app" / "features" / "select_models_feature_based"
+# Inputs and answers of service.py before the ModelIndex rewrite; the
+# rewritten reads must answer the same.
+BASELINE = json.loads((pathlib.Path(__file__).parent / "data" / "select_models_parity.json").read_text())
+FILE_KEY = BASELINE["file_key"]
+
+
+def _plain(value):
+    """JSON form of a service answer, with NaN spelled as in the baseline file."""
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.floating):
+        return _plain(float(value))
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def read(self):
+        return self._payload
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class _Stat:
+    etag = '"v1"'
+
+
+class _Client:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def get_object(self, bucket, key):
+        return _Response(self._payload)
+
+    def stat_object(self, bucket, key):
+        return _Stat()
+
+
+def _load(monkeypatch, name, payload):
+    package = types.ModuleType(name)
+    package.__path__ = [str(PACKAGE_DIR)]
+    database = types.ModuleType(f"{name}.database")
+    database.MINIO_BUCKET = "trinity"
+    database.minio_client = _Client(payload)
+    database.client = database.db = None
+    database.get_minio_df = lambda bucket, key: ipc.open_file(pa.BufferReader(payload)).read_all().to_pandas()
+    monkeypatch.setitem(sys.modules, name, package)
+    monkeypatch.setitem(sys.modules, f"{name}.database", database)
+    for module in ("service", "model_index"):
+        monkeypatch.delitem(sys.modules, f"{name}.{module}", raising=False)
+    return importlib.import_module(f"{name}.service")
+
+
+@pytest.fixture(params=range(len(BASELINE["cases"])))
+def case(request, monkeypatch):
+    expected = BASELINE["cases"][request.param]
+    table = pa.Table.from_pandas(pd.DataFrame(expected["rows"]), preserve_index=False)
+    sink = io.BytesIO()
+    with ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return _load(monkeypatch, "select_models_current", sink.getvalue()), expected
+
+
+def _records(records):
+    return [
+        (
+            r.combination_id,
+            r.model_name,
+            r.metrics,
+            r.variable_impacts,
+            r.variable_averages,
+            r.rpi_competitors,
+            r.price_variable,
+            r.base_price,
+            r.base_volume,
+            sorted(r.combination.items()),
+            (list(r.series.dates), list(r.series.actual), list(r.series.predicted)),
+        )
+        for r in records
+    ]
+
+
+def _models(service, combination):
+    try:
+        return _records(service._models_for_file(FILE_KEY, combination))
+    except Exception as exc:
+        return repr(exc)
+
+
+def test_models_for_file_and_filter_options_match_baseline(case):
+    service, expected = case
+    for combination, models in expected["models"]:
+        assert _plain(_models(service, combination)) == models, combination
+    for combination, variable, options in expected["filter_options"]:
+        assert _plain(service.get_filter_options(FILE_KEY, combination, variable)) == options, (
+            combination,
+            variable,
+        )
+
+
+def test_variable_ranges_match_baseline(case):
+    service, expected = case
+    for combination, variables, method, ranges in expected["variable_ranges"]:
+        assert _plain(service.get_variable_ranges(FILE_KEY, combination, variables, method)) == ranges, (
+            combination,
+            variables,
+            method,
+        )
+
+
+def test_filter_models_matches_baseline(case):
+    # Where a variable filter made the baseline re-select columns it dropped
+    # every range filter applied before (MAPE, R2, AIC, BIC and self
+    # elasticity); the stored answers apply them, as the index always does.
+    service, expected = case
+    for payload, rows in expected["filter_models"]:
+        assert _plain(service.filter_models(payload)) == rows, payload
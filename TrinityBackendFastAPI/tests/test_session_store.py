@@ -0,0 +1,104 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+pl = pytest.importorskip("polars")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location(
+    "session_store", ROOT / "app" / "features" / "shared" / "session_store.py"
+)
+session_store = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(session_store)  # type: ignore
+
+SpillSessionStore = session_store.SpillSessionStore
+create_session_store = session_store.create_session_store
+touch_session = session_store.touch_session
+
+
+def _frame(rows: int) -> "pl.DataFrame":
+    return pl.DataFrame({"a": list(range(rows)), "b": [float(i) for i in range(rows)]})
+
+
+def test_spill_store_evicts_lru_to_disk_and_reloads(tmp_path):
+    size = _frame(1000).estimated_size()
+    store = SpillSessionStore("t", max_bytes=int(size * 1.5), spill_dir=str(tmp_path))
+    store["one"] = _frame(1000)
+    store["two"] = _frame(1000)
+
+    stats = store.stats()
+    assert stats["in_memory"] == 1
+    assert stats["spills"] == 1
+    assert (tmp_path / "t" / "one.arrow").exists()
+
+    assert "one" in store
+    assert store["one"].equals(_frame(1000))
+    assert store.stats()["reloads"] == 1
+    assert sorted(store) == ["one", "two"]
+
+
+def test_overwrite_discards_stale_spill(tmp_path):
+    size = _frame(1000).estimated_size()
+    store = SpillSessionStore("t", max_bytes=int(size * 1.5), spill_dir=str(tmp_path))
+    store["one"] = _frame(1000)
+    store["two"] = _frame(1000)  # spills "one"
+    store["one"] = _frame(10)
+    assert store["one"].height == 10
+    del store["one"]
+    assert "one" not in store
+    with pytest.raises(KeyError):
+        store["one"]
+
+
+def test_shared_store_sees_writes_from_other_workers(tmp_path):
+    worker_a = SpillSessionStore("t", spill_dir=str(tmp_path), shared=True)
+    worker_b = SpillSessionStore("t", spill_dir=str(tmp_path), shared=True)
+    worker_a["df"] = _frame(5)
+    assert worker_b["df"].height == 5
+    worker_a["df"] = _frame(7)
+    assert worker_b["df"].height == 7
+
+
+def test_ttl_expires_idle_sessions(tmp_path, monkeypatch):
+    store = SpillSessionStore("t", ttl_seconds=10, spill_dir=str(tmp_path), shared=True)
+    store["old"] = _frame(3)
+    store["fresh"] = _frame(3)
+
+    now = session_store.time.time()
+    monkeypatch.setattr(session_store.time, "time", lambda: now + 20)
+    store.touch("fresh")
+    assert store.expire() == 1
+    assert "old" not in store
+    assert "fresh" in store
+
+
+def test_shared_ttl_uses_last_access_by_any_worker(tmp_path, monkeypatch):
+    worker_a = SpillSessionStore("t", ttl_seconds=10, spill_dir=str(tmp_path), shared=True)
+    worker_b = SpillSessionStore("t", ttl_seconds=10, spill_dir=str(tmp_path), shared=True)
+    worker_a["df"] = _frame(3)
+    assert worker_b["df"].height == 3
+
+    now = session_store.time.time()
+    monkeypatch.setattr(session_store.time, "time", lambda: now + 20)
+    worker_b["df"]  # worker_a has not seen the session for 20s
+    assert worker_a.expire() == 0
+
+    monkeypatch.setattr(session_store.time, "time", lambda: now + 40)
+    assert worker_a.expire() == 1
+    assert "df" not in worker_b
+    assert not list((tmp_path / "t").iterdir())
+
+
+def test_factory_registers_store_for_touch(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_STORE_DIR", str(tmp_path))
+    store = create_session_store("dataframe_test")
+    store["x"] = _frame(2)
+    touch_session("dataframe_test", "x")
+    assert store["x"].height == 2
+
+    monkeypatch.setenv("SESSION_STORE_BACKEND", "memory")
+    memory = create_session_store("memory_test")
+    memory["x"] = _frame(2)
+    assert dict(memory)["x"].height == 2